@@ -1,51 +1,155 @@
 # models/attendance.py
-from dataclasses import dataclass
+"""Row models returned by DatabaseManager.
+
+Models are NamedTuples: immutable, without a per-instance ``__dict__``, and
+built straight from SQLite rows by ``row_builder``. Times are kept as the
+stored epoch seconds and converted to wall-clock datetimes on access.
+"""
 from datetime import datetime
+from functools import partial
+from typing import NamedTuple, Optional
+from utils.timeutil import from_epoch
+
+
+class Meeting(NamedTuple):
+    id: int
+    channel_id: int
+    guild_id: Optional[int]
+    start_ts: int
+    description: Optional[str]
+    status: str
+
+    @property
+    def start(self) -> datetime:
+        return from_epoch(self.start_ts)
+
+
+class AttendanceRecord(NamedTuple):
+    user_id: int
+    user_name: Optional[str]
+    join_ts: int
+    late_minutes: int
+    fee_amount: float
+    # Set when the meeting ends; leave_ts only for members who left before then
+    leave_ts: Optional[int]
+    attended_seconds: Optional[int]
+
+    @property
+    def join_time(self) -> datetime:
+        return from_epoch(self.join_ts)
+
+    @property
+    def leave_time(self) -> Optional[datetime]:
+        return from_epoch(self.leave_ts) if self.leave_ts is not None else None
+
+    @property
+    def minutes_attended(self) -> Optional[int]:
+        return self.attended_seconds // 60 if self.attended_seconds is not None else None
+
+
+class FeePolicy(NamedTuple):
+    """One version of a guild's lateness rules (guild_id 0: every guild without its own)"""
+
+    id: int
+    guild_id: int
+    effective_from: str  # YYYY-MM-DD; applies to meetings on or after this date
+    grace_minutes: int
+    fee_per_minute: float
+    max_fee: Optional[float]  # cap per meeting, None for no cap
+    note: Optional[str]
+
+
+class FeeOverride(NamedTuple):
+    """Different terms for members of a role under one policy; None fields inherit"""
+
+    policy_id: int
+    role_id: int
+    grace_minutes: Optional[int]
+    fee_per_minute: Optional[float]
+    max_fee: Optional[float]
+
+
+class FeeChange(NamedTuple):
+    meeting_id: int
+    user_id: int
+    old_late_minutes: int
+    old_fee: float
+    new_late_minutes: int
+    new_fee: float
+
+
+class LoyaltyStreak(NamedTuple):
+    """A member's streak state in one guild
+
+    Sequence numbers count the guild's meetings that had attendance, so
+    ``last_seq`` tells whether the member missed any since.
+    """
+
+    guild_id: int
+    user_id: int
+    current_streak: int  # on-time meetings in a row, as of last_seq
+    best_streak: int
+    on_time: int
+    attended: int
+    first_seq: int
+    last_seq: int
+
+
+class MeetingRule(NamedTuple):
+    """A recurring meeting: when it repeats, at what time, on which clock"""
+
+    id: int
+    guild_id: int
+    channel_id: int
+    rrule: str  # FREQ=DAILY|WEEKLY;INTERVAL=n;BYDAY=MO,... (see utils.recurrence)
+    start_time: str  # HH:MM on the rule's clock
+    timezone: str
+    first_date: str  # YYYY-MM-DD; no occurrences before it
+    until_date: Optional[str]  # last possible date, None for no end
+    description: Optional[str]
+
+
+class RuleSkip(NamedTuple):
+    """A date a rule doesn't run, e.g. a holiday (rule_id 0: every rule of the guild)"""
+
+    guild_id: int
+    rule_id: int
+    skip_date: str  # YYYY-MM-DD on the rule's clock
+    reason: Optional[str]
+
+
+class FeeReevaluation(NamedTuple):
+    """Outcome of re-evaluating fees over a date range, applied or not"""
+
+    rows_changed: int
+    meetings_changed: int
+    fees_before: float
+    fees_after: float
+    changes: list  # largest FeeChanges by fee difference, a sample of all of them
+    meeting_ids: tuple = ()  # meetings whose fees changed; only filled in when applied
+
+
+# Column lists matching the model fields, for SELECTs that use row_factory
+MEETING_COLUMNS = "m.id, m.channel_id, m.guild_id, m.start_ts, m.description, m.status"
+ATTENDANCE_COLUMNS = (
+    "p.user_id, u.user_name, p.join_ts, p.late_minutes, p.fee_amount, p.leave_ts, p.attended_seconds"
+)
+
+
+def row_builder(model):
+    """Callable that builds ``model`` from a row tuple in field order
+
+    It is a partial of ``tuple.__new__``, so ``list(map(build, cursor))``
+    constructs models without a Python-level call per row.
+    """
+    return partial(tuple.__new__, model)
 
 
-@dataclass
-class Meeting:
-    id: int = None
-    meeting_date: str = None
-    start_time: str = None
-    end_time: str = None
-    channel_id: int = None
-
-    @classmethod
-    def from_db_record(cls, record):
-        if not record:
-            return None
-        return cls(
-            id=record[0],
-            meeting_date=record[1],
-            start_time=record[2],
-            end_time=record[3] if len(record) > 3 else None,
-            channel_id=record[4] if len(record) > 4 else None,
-        )
-
-
-@dataclass
-class AttendanceRecord:
-    id: int = None
-    meeting_id: int = None
-    user_id: int = None
-    user_name: str = None
-    join_time: str = None
-    leave_time: str = None
-    late_minutes: int = 0
-    fee_amount: float = 0.0
-
-    @classmethod
-    def from_db_record(cls, record):
-        if not record:
-            return None
-        return cls(
-            id=record[0],
-            meeting_id=record[1],
-            user_id=record[2],
-            user_name=record[3],
-            join_time=record[4],
-            leave_time=record[5] if len(record) > 5 else None,
-            late_minutes=record[6] if len(record) > 6 else 0,
-            fee_amount=record[7] if len(record) > 7 else 0.0,
-        )
+meeting_from_row = row_builder(Meeting)
+attendance_from_row = row_builder(AttendanceRecord)
+fee_policy_from_row = row_builder(FeePolicy)
+fee_override_from_row = row_builder(FeeOverride)
+fee_change_from_row = row_builder(FeeChange)
+loyalty_streak_from_row = row_builder(LoyaltyStreak)
+meeting_rule_from_row = row_builder(MeetingRule)
+rule_skip_from_row = row_builder(RuleSkip)
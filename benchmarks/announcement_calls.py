@@ -0,0 +1,81 @@
+# benchmarks/announcement_calls.py
+"""Discord API calls made for a join burst, with join digests.
+
+Replays ``--joins`` members arriving over ``--spread`` seconds into one
+meeting and counts the send/edit calls that reach a fake announcement
+channel. Before digests this was one message per joiner.
+
+    python -m benchmarks.announcement_calls --joins 40 --spread 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+
+from benchmarks.multi_channel_events import FakeBot, make_member
+from cogs.punctuality_tracker import PunctualityTracker
+from utils import timeutil
+from utils.db_manager import DatabaseManager
+
+
+class CountingMessage:
+    def __init__(self, channel, content):
+        self.channel = channel
+        self.content = content
+
+    async def edit(self, content=None, **kwargs):
+        self.channel.calls.append("edit")
+        self.content = content
+
+
+class CountingChannel:
+    """Announcement channel that records every API call made against it"""
+
+    def __init__(self, channel_id, guild):
+        self.id = channel_id
+        self.guild = guild
+        self.mention = f"<#{channel_id}>"
+        self.calls = []
+
+    async def send(self, content=None, **kwargs):
+        self.calls.append("send")
+        return CountingMessage(self, content)
+
+
+async def main(joins, spread, debounce):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        await db.initialize()
+
+        bot = FakeBot()
+        cog = PunctualityTracker(bot, db)
+        cog.notifier.debounce = debounce
+        guild = SimpleNamespace(id=1)
+        voice = CountingChannel(100, guild)
+        announcements = CountingChannel(200, guild)
+        bot.channels = {voice.id: voice, announcements.id: announcements}
+        cog.meeting_channels.add(voice.id)
+        cog.announcement_channels[guild.id] = announcements.id
+        cog.cache_meeting(voice.id, 1, timeutil.now().replace(microsecond=0), guild.id)
+
+        before = SimpleNamespace(channel=None)
+        after = SimpleNamespace(channel=voice)
+        for user_id in range(joins):
+            await cog.on_voice_state_update(make_member(user_id, guild), before, after)
+            await asyncio.sleep(spread / joins)
+        await cog.cog_unload()
+
+        sends = announcements.calls.count("send")
+        edits = announcements.calls.count("edit")
+        print(f"{joins} joins over {spread}s: {sends} send(s) + {edits} edit(s) "
+              f"= {len(announcements.calls)} API calls (was {joins})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--joins", type=int, default=40)
+    parser.add_argument("--spread", type=float, default=5.0)
+    parser.add_argument("--debounce", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.joins, args.spread, args.debounce))
@@ -0,0 +1,131 @@
+# benchmarks/cold_start.py
+"""Cold-start time: process start to the first tracked join.
+
+Prepares a database with history, configured channels and a meeting that is
+in progress, then starts fresh interpreters that import the bot, run the
+same startup as ``setup_hook`` (the extension's ``setup``) against a fake
+bot, and replay one join until its row is written. Reports the median of
+each phase over several runs.
+
+    python -m benchmarks.cold_start --runs 5 --meetings 2000
+"""
+# Only light modules at the top: the child process times its own imports
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CHANNEL_ID = 10
+GUILD_ID = 1
+
+
+async def prepare(db_path, meetings, per_meeting):
+    from datetime import timedelta
+    from utils import timeutil
+    from utils.db_manager import DatabaseManager
+
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    await db.add_meeting_channel(GUILD_ID, CHANNEL_ID)
+    history = timeutil.now().replace(hour=9, minute=0, second=0, microsecond=0) - timedelta(days=meetings)
+    for index in range(meetings):
+        day = history + timedelta(days=index)
+        meeting_id = await db.create_meeting(day, CHANNEL_ID, guild_id=GUILD_ID, status="closed")
+        await db.record_punctuality_batch([
+            (meeting_id, user_id, f"user{user_id}", day, user_id % 5, 0.0)
+            for user_id in range(per_meeting)
+        ])
+    started = timeutil.now().replace(microsecond=0) - timedelta(minutes=5)
+    await db.create_meeting(started, CHANNEL_ID, guild_id=GUILD_ID)
+    await db.close()
+
+
+async def child():
+    """Runs in a fresh interpreter; prints phase timings as JSON"""
+    marks = {}
+    started = time.perf_counter()
+
+    import asyncio
+    from types import SimpleNamespace
+    import cogs.punctuality_tracker as tracker
+    from benchmarks.multi_channel_events import FakeBot, FakeChannel, make_member
+    marks["import_ms"] = time.perf_counter() - started
+
+    class StartupBot(FakeBot):
+        async def add_cog(self, cog):
+            # discord.py awaits cog_load while adding a cog
+            await cog.cog_load()
+            self.cog = cog
+
+    bot = StartupBot()
+    guild = SimpleNamespace(id=GUILD_ID)
+    channel = FakeChannel(CHANNEL_ID, guild)
+    bot.channels[channel.id] = channel
+
+    phase = time.perf_counter()
+    await tracker.setup(bot)
+    marks["setup_ms"] = time.perf_counter() - phase
+
+    phase = time.perf_counter()
+    cog = bot.cog
+    await cog.on_voice_state_update(
+        # A new member each run; earlier runs already recorded theirs
+        make_member(1_000_000 + os.getpid(), guild),
+        SimpleNamespace(channel=None),
+        SimpleNamespace(channel=channel),
+    )
+    written = await cog.write_buffer.flush()
+    marks["first_join_ms"] = time.perf_counter() - phase
+    marks["total_ms"] = time.perf_counter() - started
+
+    await cog.cog_unload()
+    await asyncio.sleep(0)
+    result = {name: value * 1000 for name, value in marks.items()}
+    result["tracked"] = written == 1
+    print(json.dumps(result))
+
+
+def main(runs, meetings, per_meeting):
+    import asyncio
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "cold.db")
+        asyncio.run(prepare(db_path, meetings, per_meeting))
+        env = dict(os.environ, DATABASE_PATH=db_path, METRICS_PORT="0")
+
+        results = []
+        for _ in range(runs):
+            spawned = time.perf_counter()
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.cold_start", "--child"],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            result["process_ms"] = (time.perf_counter() - spawned) * 1000
+            results.append(result)
+
+    if not all(result["tracked"] for result in results):
+        print("FAIL: the first join was not recorded")
+        return 1
+    print(f"{meetings} meetings of history, {runs} cold starts (median)")
+    for name in ("import_ms", "setup_ms", "first_join_ms", "total_ms", "process_ms"):
+        print(f"  {name:<14} {statistics.median(result[name] for result in results):8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--meetings", type=int, default=2000)
+    parser.add_argument("--per-meeting", type=int, default=30)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        import asyncio
+        asyncio.run(child())
+    else:
+        sys.exit(main(args.runs, args.meetings, args.per_meeting))
@@ -0,0 +1,98 @@
+# benchmarks/db_event_loop_lag.py
+"""Event-loop lag under a join burst: connect-per-call vs async DatabaseManager.
+
+Run from the repository root:
+
+    python -m benchmarks.db_event_loop_lag --joins 200
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from utils.db_manager import DatabaseManager
+
+
+TICK_SECONDS = 0.005
+
+
+async def measure_lag(stop, samples):
+    """Record how late a short sleep wakes up until ``stop`` is set"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + TICK_SECONDS
+        await asyncio.sleep(TICK_SECONDS)
+        samples.append(max(0.0, loop.time() - expected) * 1000)
+
+
+def blocking_record(db_path, meeting_id, user_id):
+    """The pre-async code path: open, check, insert, commit, close"""
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id FROM punctuality WHERE meeting_id = ? AND user_id = ?",
+            (meeting_id, user_id),
+        )
+        if cursor.fetchone() is None:
+            cursor.execute(
+                "INSERT INTO punctuality (meeting_id, user_id, join_ts, late_minutes, fee_amount) "
+                "VALUES (?, ?, ?, 0, 0)",
+                (meeting_id, user_id, 1704099600),
+            )
+            conn.commit()
+    finally:
+        conn.close()
+
+
+async def run_burst(joins, handler):
+    stop = asyncio.Event()
+    samples = []
+    monitor = asyncio.create_task(measure_lag(stop, samples))
+    await asyncio.sleep(TICK_SECONDS * 2)
+    started = time.perf_counter()
+    await asyncio.gather(*(handler(user_id) for user_id in range(joins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+    return elapsed, samples
+
+
+def report(label, elapsed, samples):
+    samples = sorted(samples) or [0.0]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f"{label:<10} total={elapsed * 1000:8.1f}ms  "
+        f"lag mean={statistics.mean(samples):7.2f}ms  p99={p99:7.2f}ms  max={samples[-1]:7.2f}ms"
+    )
+
+
+async def main(joins):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        await db.initialize()
+        meeting_id = await db.create_meeting(datetime(2024, 1, 1, 9), 1)
+
+        async def blocking(user_id):
+            blocking_record(db.db_path, meeting_id, user_id)
+
+        async def non_blocking(user_id):
+            await db.record_punctuality(
+                meeting_id + 1, user_id, f"user{user_id}", datetime(2024, 1, 1, 10)
+            )
+
+        report("blocking", *await run_burst(joins, blocking))
+        await db.create_meeting(datetime(2024, 1, 1, 10), 1)
+        report("async", *await run_burst(joins, non_blocking))
+        await db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--joins", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.joins))
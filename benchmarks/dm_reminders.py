@@ -0,0 +1,252 @@
+# benchmarks/dm_reminders.py
+"""DM reminder fan-out against a fake Discord HTTP API that enforces rate limits.
+
+The fake API answers like Discord: a global bucket of 50 requests per
+second, a shared bucket for opening DM channels, a bucket
+per DM channel, and 429 responses carrying Retry-After,
+X-RateLimit-Reset-After, X-RateLimit-Bucket and X-RateLimit-Global
+headers. A first DM to a member costs two requests (open the channel,
+then send). Some members have DMs closed and some requests fail with a
+500 once.
+
+A reminder event for a guild whose reminder role has ``--members``
+members (plus the previous meeting's attendees) is fired through the
+cog. The run is repeated with the fake's limits halved, which forces
+429s.
+
+Exits non-zero if the reminder event blocked the scheduler, a member
+got zero or two DMs, a request ignored an announced rate limit, or the
+fan-out ran slower than the global limit allows by more than
+SLOWDOWN_LIMIT.
+
+    python -m benchmarks.dm_reminders --members 500
+"""
+import argparse
+import asyncio
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import timedelta
+from types import SimpleNamespace
+
+import discord
+
+from benchmarks.db_event_loop_lag import measure_lag
+from benchmarks.multi_channel_events import FakeBot, FakeChannel
+from cogs.punctuality_tracker import PunctualityTracker
+from utils import timeutil
+from utils.db_manager import DatabaseManager
+
+GUILD_ID = 1
+VOICE_ID = 10
+ANNOUNCEMENTS_ID = 11
+ROLE_ID = 99
+LATENCY = 0.05
+# Allowed time over the floor set by the global limit
+SLOWDOWN_LIMIT = 1.5
+# The reminder event must hand the DMs off rather than wait for them
+EVENT_LIMIT_MS = 50
+
+
+class FakeDiscordHTTP:
+    """Counts requests per bucket in fixed windows and answers 429 past the limit"""
+
+    def __init__(self, global_limit, open_limit, closed_dms, fail_every=97):
+        self.limits = {"global": (global_limit, 1.0), "dm-open": (open_limit, 1.0)}
+        self.closed_dms = closed_dms
+        self.fail_every = fail_every
+        self.windows = {}  # bucket -> (window start, requests)
+        self.announced = {}  # bucket -> time the last 429 said it resets
+        self.opened = set()
+        self.delivered = Counter()
+        self.requests = 0
+        self.rate_limited = 0
+        self.violations = 0
+
+    def _take(self, bucket, limit, per):
+        """Count a request against a bucket; returns seconds until reset if it is over"""
+        now = time.monotonic()
+        if now < self.announced.get(bucket, 0):
+            self.violations += 1
+        start, count = self.windows.get(bucket, (now, 0))
+        if now - start >= per:
+            start, count = now, 0
+        self.windows[bucket] = (start, count + 1)
+        return start + per - now if count >= limit else None
+
+    async def request(self, bucket, limit, per):
+        self.requests += 1
+        number = self.requests
+        reset = self._take("global", *self.limits["global"])
+        is_global = reset is not None
+        if reset is None:
+            reset = self._take(bucket, limit, per)
+        await asyncio.sleep(LATENCY)
+        if reset is not None:
+            self.rate_limited += 1
+            limited = "global" if is_global else bucket
+            self.announced[limited] = time.monotonic() + reset - LATENCY
+            headers = {
+                "Retry-After": str(math.ceil(reset)),
+                "X-RateLimit-Reset-After": f"{reset:.3f}",
+                "X-RateLimit-Bucket": limited,
+                "X-RateLimit-Scope": "global" if is_global else "user",
+            }
+            if is_global:
+                headers["X-RateLimit-Global"] = "true"
+            response = SimpleNamespace(status=429, reason="Too Many Requests", headers=headers)
+            raise discord.HTTPException(response, {"message": "You are being rate limited.", "code": 0})
+        if number % self.fail_every == 0:
+            response = SimpleNamespace(status=500, reason="Internal Server Error", headers={})
+            raise discord.HTTPException(response, "")
+
+    async def send_dm(self, user_id, content):
+        if user_id not in self.opened:
+            await self.request("dm-open", *self.limits["dm-open"])
+            self.opened.add(user_id)
+        await self.request(f"messages-{user_id}", 5, 5.0)
+        if user_id in self.closed_dms:
+            response = SimpleNamespace(status=403, reason="Forbidden", headers={})
+            raise discord.Forbidden(response, {"message": "Cannot send messages to this user", "code": 50007})
+        self.delivered[user_id] += 1
+
+
+class FakeMember:
+    def __init__(self, user_id, http):
+        self.id = user_id
+        self.bot = False
+        self.display_name = f"user{user_id}"
+        self.mention = f"<@{user_id}>"
+        self.http = http
+
+    async def send(self, content=None, **kwargs):
+        await self.http.send_dm(self.id, content)
+
+
+class FakeGuild:
+    def __init__(self, members, role_members):
+        self.id = GUILD_ID
+        self.members = {member.id: member for member in members}
+        self.role = SimpleNamespace(id=ROLE_ID, members=role_members, mention=f"<@&{ROLE_ID}>")
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+    def get_role(self, role_id):
+        return self.role if role_id == ROLE_ID else None
+
+
+class GuildBot(FakeBot):
+    def __init__(self, guild):
+        super().__init__()
+        self.guild = guild
+
+    def get_guild(self, guild_id):
+        return self.guild if guild_id == GUILD_ID else None
+
+
+async def run(db_path, members, global_limit, open_limit):
+    """Fire one reminder event; returns (stats dict, failures)"""
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    closed = set(range(1, members + 1, 50))
+    http = FakeDiscordHTTP(global_limit, open_limit, closed)
+    everyone = [FakeMember(user_id, http) for user_id in range(1, members + 51)]
+    # The role covers the first ``members``; the previous meeting adds 20 more
+    # (10 of them also in the role) and two members already sit in the channel
+    previous = list(range(members - 9, members + 11))
+    guild = FakeGuild(everyone, everyone[:members])
+    bot = GuildBot(guild)
+    voice = FakeChannel(VOICE_ID, guild)
+    voice.members = [everyone[1], everyone[2]]
+    bot.channels = {VOICE_ID: voice, ANNOUNCEMENTS_ID: FakeChannel(ANNOUNCEMENTS_ID, guild)}
+
+    meeting_time = timeutil.now().replace(microsecond=0) + timedelta(minutes=15)
+    last_week = meeting_time - timedelta(days=7)
+    previous_id = await db.create_meeting(last_week, VOICE_ID, "weekly", GUILD_ID, "closed")
+    await db.record_punctuality_batch(
+        [(previous_id, user_id, f"user{user_id}", last_week, 0, 0) for user_id in previous]
+    )
+
+    cog = PunctualityTracker(bot, db)
+    cog.meeting_channels.add(VOICE_ID)
+    cog.announcement_channels[GUILD_ID] = ANNOUNCEMENTS_ID
+    cog.reminder_audiences[GUILD_ID] = (ROLE_ID, True)
+    event = SimpleNamespace(key=1, kind="reminder", payload=(VOICE_ID, GUILD_ID, meeting_time, "weekly"))
+
+    stop = asyncio.Event()
+    lag = []
+    monitor = asyncio.create_task(measure_lag(stop, lag))
+    started = time.perf_counter()
+    await cog.handle_scheduled_event(event)
+    event_ms = (time.perf_counter() - started) * 1000
+    await asyncio.gather(*cog.dm_tasks)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+    await cog.cog_unload()
+
+    expected = set(range(1, members + 11)) - closed - {2, 3}
+    stats = {
+        "recipients": len(expected),
+        "seconds": elapsed,
+        "requests": http.requests,
+        "429s": http.rate_limited,
+        "event ms": event_ms,
+        "lag max ms": max(lag, default=0),
+    }
+    failures = []
+    if event_ms > EVENT_LIMIT_MS:
+        failures.append(f"reminder event took {event_ms:.0f}ms")
+    if set(http.delivered) != expected:
+        failures.append(f"{len(expected - set(http.delivered))} missed, "
+                        f"{len(set(http.delivered) - expected)} unexpected DMs")
+    if any(count > 1 for count in http.delivered.values()):
+        failures.append("members got more than one DM")
+    if http.violations:
+        failures.append(f"{http.violations} requests ignored an announced rate limit")
+    # Two requests per member (open + send), the global limit sets the floor
+    floor = http.requests / global_limit
+    if elapsed > floor * SLOWDOWN_LIMIT + 1:
+        failures.append(f"took {elapsed:.1f}s, floor {floor:.1f}s")
+    return stats, failures
+
+
+async def main(members):
+    failures = []
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, global_limit, open_limit, count in (
+            ("discord limits", 50, 30, members),
+            ("halved limits", 25, 15, members // 3),
+        ):
+            stats, problems = await run(
+                os.path.join(tmp, f"{global_limit}.db"), count, global_limit, open_limit
+            )
+            rows.append((label, stats))
+            failures.extend(f"{label}: {problem}" for problem in problems)
+
+    print(f"{'limits':<16} {'members':>8} {'seconds':>8} {'requests':>9} {'429s':>5} "
+          f"{'event ms':>9} {'lag max':>8}")
+    for label, stats in rows:
+        print(f"{label:<16} {stats['recipients']:>8} {stats['seconds']:>8.1f} {stats['requests']:>9} "
+              f"{stats['429s']:>5} {stats['event ms']:>9.2f} {stats['lag max ms']:>6.1f}ms")
+    sequential = rows[0][1]["requests"] * LATENCY
+    print(f"one DM at a time would take at least {sequential:.0f}s")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+    print("ok: every expected member got one DM within the rate limits")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=500)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.members)))
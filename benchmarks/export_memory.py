@@ -0,0 +1,154 @@
+# benchmarks/export_memory.py
+"""Resident memory of !export as the exported range grows.
+
+Builds a database of ``--meetings`` daily meetings with ``--members``
+attendees each (1M rows by default), then exports growing date ranges the
+way the command does: rows streamed on a reader thread through
+``write_export`` into a spooled temp file. A sampler thread tracks resident
+memory while each export runs, and event-loop lag is measured alongside.
+Exits non-zero if the largest export peaks more than FLAT_TOLERANCE_MB
+above the smallest.
+
+    python -m benchmarks.export_memory --meetings 1000 --members 1000
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import partial
+
+from benchmarks.db_event_loop_lag import measure_lag
+from config import Config
+from utils import timeutil
+from utils.db_manager import DatabaseManager
+from utils.export import write_export
+
+FLAT_TOLERANCE_MB = 8
+FIRST_DAY = datetime(2021, 1, 4, 9, 0, 0)
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as fp:
+        return int(fp.read().split()[1]) * PAGE_SIZE
+
+
+class PeakSampler:
+    """Samples resident memory every few milliseconds on a background thread"""
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_bytes())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.peak = rss_bytes()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+def populate(db_path, meetings, members):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO meetings (id, meeting_date, start_ts, channel_id, guild_id, status) "
+        "VALUES (?, ?, ?, 1, 1, 'closed')",
+        (
+            (day + 1, (FIRST_DAY + timedelta(days=day)).strftime("%Y-%m-%d"),
+             timeutil.to_epoch(FIRST_DAY + timedelta(days=day)))
+            for day in range(meetings)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO users (user_id, user_name) VALUES (?, ?)",
+        ((user, f"member-{user}") for user in range(members)),
+    )
+    # Generated inside SQLite; the rollup triggers still run for every row
+    conn.execute(
+        """
+        WITH RECURSIVE member(user_id) AS (
+            SELECT 0 UNION ALL SELECT user_id + 1 FROM member WHERE user_id + 1 < ?
+        )
+        INSERT INTO punctuality (meeting_id, user_id, join_ts, late_minutes, fee_amount)
+        SELECT m.id, member.user_id, m.start_ts + member.user_id % 900,
+               member.user_id % 900 / 60, member.user_id % 900 / 60 * 200.0
+        FROM meetings m, member
+        """,
+        (members,),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def export(db, days):
+    """Export the first ``days`` days; returns (rows, bytes, seconds, peak RSS, lag samples)"""
+    stop = asyncio.Event()
+    lag = []
+    monitor = asyncio.create_task(measure_lag(stop, lag))
+    with tempfile.SpooledTemporaryFile(max_size=Config.EXPORT_SPOOL_BYTES) as fp:
+        started = time.perf_counter()
+        with PeakSampler() as sampler:
+            rows = await db.stream_attendance(
+                FIRST_DAY.replace(hour=0),
+                FIRST_DAY.replace(hour=0) + timedelta(days=days),
+                partial(write_export, fp=fp, fmt="csv", compress=True),
+                1,
+            )
+        elapsed = time.perf_counter() - started
+        size = fp.tell()
+    stop.set()
+    await monitor
+    return rows, size, elapsed, sampler.peak, sorted(lag) or [0.0]
+
+
+async def main(meetings, members):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "export.db"))
+        await db.initialize()
+        started = time.perf_counter()
+        populate(db.db_path, meetings, members)
+        print(f"built {meetings * members} rows in {time.perf_counter() - started:.1f}s")
+
+        # Warm up the reader connection and code paths before the baseline
+        await export(db, 1)
+        baseline = rss_bytes()
+        peaks = []
+        print(f"{'rows':>9} {'gzip MB':>8} {'rows/s':>9} {'peak RSS +MB':>13} {'lag mean':>9} {'lag p99':>8}")
+        for days in sorted({max(1, meetings // 100), max(1, meetings // 10), meetings}):
+            rows, size, elapsed, peak, lag = await export(db, days)
+            growth = (peak - baseline) / 1024 / 1024
+            peaks.append(growth)
+            p99 = lag[min(len(lag) - 1, int(len(lag) * 0.99))]
+            print(f"{rows:>9} {size / 1024 / 1024:>8.1f} {rows / elapsed:>9.0f} {growth:>13.1f} "
+                  f"{statistics.mean(lag):>8.2f}ms {p99:>6.2f}ms")
+        await db.close()
+
+    if peaks[-1] - peaks[0] > FLAT_TOLERANCE_MB:
+        print(f"FAIL: peak memory grew {peaks[-1] - peaks[0]:.1f} MB with the export size")
+        return 1
+    print(f"ok: peak memory within {FLAT_TOLERANCE_MB} MB across export sizes")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=1000)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.meetings, args.members)))
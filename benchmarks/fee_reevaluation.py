@@ -0,0 +1,157 @@
+# benchmarks/fee_reevaluation.py
+"""Re-evaluating fees across history under a new fee policy.
+
+Builds ``--days`` daily meetings of ``--members`` attendees (about a
+million rows by default) priced with the environment's policy, then stores
+a new policy with a fee cap and a role override, waives a few meetings and
+re-evaluates everything: first as a dry run, then applied. For comparison
+it times the per-row Python loop this replaces on a slice of the rows.
+
+Exits non-zero if the applied run took more than APPLY_LIMIT_SECONDS or
+was not MIN_SPEEDUP times faster than the loop's estimate for all rows, the
+dry run and the applied run disagree, a sample of rows differs from the
+fees calculate_fee gives, the rollups no longer match the raw rows, or a
+second run still finds changes.
+
+    python -m benchmarks.fee_reevaluation --days 3334 --members 300
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.retention import GUILD_ID, populate
+from utils import timeutil
+from utils.db_manager import DatabaseManager
+from utils.fee_policy import FeeSchedule, calculate_fee
+
+APPLY_LIMIT_SECONDS = 10
+MIN_SPEEDUP = 1.5
+ROLE_ID = 500
+ROLE_MEMBERS = range(30)
+LOOP_SAMPLE_MEETINGS = 60
+
+
+def python_loop(db_path, grace, rate, meetings):
+    """The row-at-a-time alternative: read, price in Python, update each row; returns seconds"""
+    conn = sqlite3.connect(db_path)
+    started = time.perf_counter()
+    rows = conn.execute(
+        """
+        SELECT p.id, p.join_ts, m.start_ts FROM punctuality p JOIN meetings m ON m.id = p.meeting_id
+        WHERE m.id <= ?
+        """,
+        (meetings,),
+    ).fetchall()
+    for row_id, join_ts, start_ts in rows:
+        late, fee = calculate_fee(join_ts - start_ts, grace, rate)
+        conn.execute(
+            "UPDATE punctuality SET late_minutes = ?, fee_amount = ? WHERE id = ?", (late, fee, row_id)
+        )
+    elapsed = time.perf_counter() - started
+    conn.rollback()
+    conn.close()
+    return elapsed, len(rows)
+
+
+def sample_mismatches(db_path, schedule, waived, count):
+    """Rows whose stored fee differs from calculate_fee under the stored policies"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        """
+        SELECT p.meeting_id, p.user_id, p.join_ts, m.start_ts, p.late_minutes, p.fee_amount
+        FROM punctuality p JOIN meetings m ON m.id = p.meeting_id
+        """
+    ).fetchall()
+    conn.close()
+    mismatches = 0
+    for meeting_id, user_id, join_ts, start_ts, late, fee in random.sample(rows, count):
+        policy = schedule.policy_for(GUILD_ID, timeutil.from_epoch(start_ts).date())
+        roles = [ROLE_ID] if user_id in ROLE_MEMBERS else []
+        expected = calculate_fee(join_ts - start_ts, *schedule.terms_for(policy, roles))
+        if meeting_id in waived:
+            expected = (expected[0], 0)
+        if (late, round(fee, 6)) != (expected[0], round(expected[1], 6)):
+            mismatches += 1
+    return mismatches
+
+
+async def main(days, members):
+    today = timeutil.now().replace(hour=9, minute=0, second=0, microsecond=0)
+    first_day = today - timedelta(days=days)
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "fees.db"), archive_path=os.path.join(tmp, "archive"))
+        await db.initialize()
+        started = time.perf_counter()
+        populate(db.db_path, first_day, days, members)
+        await db.rebuild_rollups()
+        print(f"built {days * members} rows in {time.perf_counter() - started:.1f}s")
+
+        loop_seconds, loop_rows = python_loop(db.db_path, 3, 150.0, LOOP_SAMPLE_MEETINGS)
+
+        # A new policy for the first half, a stricter capped one after, a
+        # lenient role, and three forgiven meetings
+        await db.add_fee_policy(GUILD_ID, first_day.date(), 3, 150.0, note="benchmark")
+        await db.add_fee_policy(
+            GUILD_ID, (first_day + timedelta(days=days // 2)).date(), 0, 250.0, 2000.0,
+            overrides=[(ROLE_ID, 10, 50.0, None)],
+        )
+        waived = {5, 500, days - 1}
+        for meeting_id in waived:
+            await db.waive_meeting_fees(meeting_id, "benchmark")
+        member_roles = [(user_id, ROLE_ID) for user_id in ROLE_MEMBERS]
+        end = (today + timedelta(days=1)).date()
+
+        started = time.perf_counter()
+        preview = await db.preview_fee_reevaluation(GUILD_ID, first_day.date(), end, member_roles)
+        preview_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        applied = await db.reevaluate_fees(GUILD_ID, first_day.date(), end, member_roles)
+        apply_seconds = time.perf_counter() - started
+        again = await db.preview_fee_reevaluation(GUILD_ID, first_day.date(), end, member_roles)
+        mismatches = await db.rebuild_rollups()
+
+        schedule = FeeSchedule(*await db.get_fee_policies())
+        wrong = sample_mismatches(db.db_path, schedule, waived, 5000)
+        await db.close()
+
+    per_row = loop_seconds / loop_rows
+    print(f"dry run  {preview_seconds:6.2f}s  {preview.rows_changed} rows in {preview.meetings_changed} "
+          f"meetings, fees {preview.fees_before:.0f} -> {preview.fees_after:.0f}")
+    print(f"applied  {apply_seconds:6.2f}s")
+    print(f"python loop: {per_row * 1e6:.1f}us/row, about {per_row * days * members:.0f}s for all rows")
+
+    if preview[:4] != applied[:4]:
+        failures.append(f"dry run {preview[:4]} differs from applied run {applied[:4]}")
+    if not applied.rows_changed:
+        failures.append("nothing changed")
+    if again.rows_changed:
+        failures.append(f"{again.rows_changed} rows still change on a second run")
+    if mismatches:
+        failures.append(f"{mismatches} rollup rows out of sync")
+    if wrong:
+        failures.append(f"{wrong} of 5000 sampled rows differ from calculate_fee")
+    if apply_seconds > APPLY_LIMIT_SECONDS:
+        failures.append(f"applying took {apply_seconds:.1f}s")
+    if apply_seconds * MIN_SPEEDUP > per_row * days * members:
+        failures.append(f"applying took {apply_seconds:.1f}s, not {MIN_SPEEDUP}x faster than the python loop")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+    print("ok: fees re-evaluated in one transaction and rollups kept in step")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=3334)
+    parser.add_argument("--members", type=int, default=300)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.days, args.members)))
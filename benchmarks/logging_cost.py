@@ -0,0 +1,90 @@
+# benchmarks/logging_cost.py
+"""Logging cost per join event: direct file/console handlers vs the queue pipeline.
+
+Logs the lines a join produces (the handle_join message plus the batched
+write it feeds) through each setup and reports the time spent on the
+calling thread, which is what the event loop pays, plus event-loop lag
+while a burst of joins is being logged.
+
+    python -m benchmarks.logging_cost --joins 20000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.db_event_loop_lag import measure_lag
+from config import Config
+from utils import logger as logger_module
+
+
+def legacy_logger(log_path):
+    """The previous setup: FileHandler and StreamHandler attached directly"""
+    logger = logging.getLogger("discord_bot")
+    logger.setLevel(logging.INFO)
+    formatter = logging.Formatter(logger_module.TEXT_FORMAT)
+    file_handler = logging.FileHandler(os.path.join(log_path, "legacy.log"))
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler(open(os.devnull, "w"))
+    console_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
+    logger.propagate = False
+    return logger, [file_handler, console_handler]
+
+
+def log_join(logger, user_id):
+    logger.info(f"No active meeting found for channel 1234567890 on 2024-03-04 (user {user_id})")
+    if user_id % Config.WRITE_BATCH_SIZE == 0:
+        logger.info(f"Recorded {Config.WRITE_BATCH_SIZE} punctuality row(s) in one batch")
+
+
+async def burst(logger, joins):
+    """Log ``joins`` join events in small bursts; returns (us per join, lag samples)"""
+    stop = asyncio.Event()
+    lag = []
+    monitor = asyncio.create_task(measure_lag(stop, lag))
+    await asyncio.sleep(0.01)
+    spent = 0.0
+    for start in range(0, joins, 100):
+        started = time.perf_counter()
+        for user_id in range(start, min(start + 100, joins)):
+            log_join(logger, user_id)
+        spent += time.perf_counter() - started
+        await asyncio.sleep(0)
+    stop.set()
+    await monitor
+    return spent / joins * 1e6, sorted(lag) or [0.0]
+
+
+def report(label, per_join, lag):
+    p99 = lag[min(len(lag) - 1, int(len(lag) * 0.99))]
+    print(f"{label:<22} {per_join:8.2f} us/join   lag mean={statistics.mean(lag):6.2f}ms  p99={p99:6.2f}ms")
+
+
+async def main(joins, json_format):
+    with tempfile.TemporaryDirectory() as tmp:
+        logger, handlers = legacy_logger(tmp)
+        report("direct handlers", *await burst(logger, joins))
+        for handler in handlers:
+            logger.removeHandler(handler)
+            handler.close()
+
+        # The console handler goes to stderr; keep the comparison to file output
+        logger = logger_module.setup_logger(tmp, json_format=json_format, console=False)
+        label = "queue pipeline (json)" if json_format else "queue pipeline"
+        report(label, *await burst(logger, joins))
+        started = time.perf_counter()
+        logger_module.stop_logger()
+        print(f"{'':<22} writer thread drained the backlog in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--joins", type=int, default=20000)
+    parser.add_argument("--json", action="store_true", help="use structured JSON output")
+    args = parser.parse_args()
+    asyncio.run(main(args.joins, args.json))
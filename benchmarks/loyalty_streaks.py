@@ -0,0 +1,182 @@
+# benchmarks/loyalty_streaks.py
+"""Loyalty streaks kept up to date per join, checked against full replays.
+
+Records ``--meetings`` meetings in each of two guilds, ``--members``
+possible attendees each, with random absences and lateness, through
+record_punctuality_batch so the loyalty trigger runs as it does for the
+bot. It compares the recording time of the first and last tenth of the
+meetings (the per-join update must not grow with history), times
+!streak and !loyalty reads against scanning a member's whole history,
+then rebuilds from history, corrupts a streak and rebuilds again, and
+finally archives half the meetings and rebuilds once more.
+
+Exits non-zero if recording slowed down with history by more than
+GROWTH_LIMIT, a read was slower than READ_LIMIT_MS, the incremental
+state differs from a full replay, the corrupted row was not found and
+fixed, or archiving changed the streaks.
+
+    python -m benchmarks.loyalty_streaks --meetings 2000 --members 300
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from utils import timeutil
+from utils.db_manager import LOYALTY_ORDERS, DatabaseManager
+from utils.loyalty import live_streak, replay
+
+GUILDS = (1, 2)
+GROWTH_LIMIT = 2.0
+READ_LIMIT_MS = 5
+
+
+def scan_streak(db_path, guild_id, user_id):
+    """The per-query alternative: replay the guild's whole history for one member; returns seconds"""
+    conn = sqlite3.connect(db_path)
+    started = time.perf_counter()
+    rows = conn.execute(
+        """
+        SELECT p.meeting_id, m.guild_id, p.user_id, p.late_minutes
+        FROM punctuality p JOIN meetings m ON m.id = p.meeting_id
+        WHERE m.guild_id = ? ORDER BY p.id
+        """,
+        (guild_id,),
+    ).fetchall()
+    _, streaks = replay(rows)
+    streaks.get((guild_id, user_id))
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return elapsed
+
+
+def stored(db_path):
+    """Both loyalty tables, for comparing before and after"""
+    conn = sqlite3.connect(db_path)
+    state = (
+        conn.execute("SELECT * FROM loyalty_meetings ORDER BY meeting_id").fetchall(),
+        conn.execute("SELECT * FROM loyalty_streaks ORDER BY guild_id, user_id").fetchall(),
+    )
+    conn.close()
+    return state
+
+
+async def timed(call, *args):
+    started = time.perf_counter()
+    result = await call(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+async def main(meetings, members):
+    rng = random.Random(23)
+    failures = []
+    first_day = timeutil.now().replace(hour=9, minute=0, second=0, microsecond=0) - timedelta(days=meetings + 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "loyalty.db"), archive_path=os.path.join(tmp, "archive"))
+        await db.initialize()
+
+        # Regulars who are rarely late or absent, and the rest
+        punctual = {user_id: rng.random() < 0.2 for user_id in range(members)}
+        batch_ms = []
+        started = time.perf_counter()
+        for day in range(meetings):
+            start = first_day + timedelta(days=day)
+            for guild_id in GUILDS:
+                meeting_id = await db.create_meeting(start, guild_id, "daily", guild_id, "closed")
+                rows = []
+                for user_id in range(members):
+                    regular = punctual[user_id]
+                    if rng.random() < (0.02 if regular else 0.2):
+                        continue
+                    late = 0 if rng.random() < (0.97 if regular else 0.7) else rng.randint(1, 30)
+                    rows.append((meeting_id, user_id, f"user{user_id}",
+                                 start + timedelta(minutes=late), late, late * 200.0))
+                batch_started = time.perf_counter()
+                await db.record_punctuality_batch(rows)
+                batch_ms.append((time.perf_counter() - batch_started) * 1000)
+        print(f"recorded {meetings * len(GUILDS)} meetings in {time.perf_counter() - started:.1f}s")
+
+        tenth = max(1, len(batch_ms) // 10)
+        early = statistics.median(batch_ms[:tenth])
+        late = statistics.median(batch_ms[-tenth:])
+        print(f"median batch: {early:.2f}ms in the first tenth, {late:.2f}ms in the last")
+        if late > early * GROWTH_LIMIT:
+            failures.append(f"recording slowed from {early:.2f}ms to {late:.2f}ms per meeting as history grew")
+
+        # Reads: one row or one leaderboard, against replaying history per query
+        sample = rng.sample(range(members), 20)
+        read_ms = []
+        for user_id in sample:
+            (streak, latest_seq, latest_open), ms = await timed(db.get_loyalty, GUILDS[0], user_id)
+            read_ms.append(ms)
+        for order in LOYALTY_ORDERS:
+            (board, latest_seq, latest_open), ms = await timed(db.get_loyalty_leaderboard, GUILDS[0], order)
+            read_ms.append(ms)
+            if not board:
+                failures.append(f"the {order} leaderboard is empty")
+            print(f"{order:<10} leaderboard {ms:6.2f}ms, top: "
+                  f"{board[0].user_id if board else None} "
+                  f"({live_streak(board[0], latest_seq, latest_open) if board else 0} live, "
+                  f"{board[0].best_streak if board else 0} best)")
+        scan_ms = statistics.median(scan_streak(db.db_path, GUILDS[0], user_id) for user_id in sample[:5]) * 1000
+        read_p99 = sorted(read_ms)[int(len(read_ms) * 0.99)]
+        print(f"reads: median {statistics.median(read_ms):.2f}ms, max {read_p99:.2f}ms; "
+              f"scanning history per query: {scan_ms:.0f}ms")
+        if read_p99 > READ_LIMIT_MS:
+            failures.append(f"a loyalty read took {read_p99:.2f}ms")
+
+        # The incremental state must match a full replay
+        (mismatches, rebuild_ms) = await timed(db.rebuild_loyalty)
+        print(f"rebuild from history: {rebuild_ms:.0f}ms, {mismatches} row(s) differed")
+        if mismatches != 0:
+            failures.append(f"incremental streaks differ from a full replay in {mismatches} row(s)")
+
+        conn = sqlite3.connect(db.db_path)
+        conn.execute(
+            "UPDATE loyalty_streaks SET current_streak = current_streak + 3 WHERE guild_id = ? AND user_id = ?",
+            (GUILDS[1], sample[0]),
+        )
+        conn.commit()
+        conn.close()
+        found = await db.rebuild_loyalty()
+        again = await db.rebuild_loyalty()
+        if found != 1 or again != 0:
+            failures.append(f"a corrupted streak was reported as {found} then {again} row(s)")
+
+        # Archived meetings still count towards the rebuild
+        before = stored(db.db_path)
+        moved = 0
+        while True:
+            result = await db.archive_meetings((first_day + timedelta(days=meetings // 2)).date())
+            if not result or not result[0]:
+                break
+            moved += result[0]
+        after_archive = await db.rebuild_loyalty()
+        print(f"archived {moved} meetings; rebuild found {after_archive} row(s) differing")
+        if not moved:
+            failures.append("nothing was archived")
+        if after_archive != 0 or stored(db.db_path) != before:
+            failures.append("rebuilding after archiving changed the streaks")
+
+        await db.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+    print("ok: streaks updated per join match a replay of the full history")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=2000)
+    parser.add_argument("--members", type=int, default=300)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.meetings, args.members)))
@@ -0,0 +1,156 @@
+# benchmarks/metrics_overhead.py
+"""Cost of the metrics instrumentation on the join path.
+
+Replays joins through ``on_voice_state_update`` -> ``handle_join`` -> write
+buffer -> SQLite with the metrics registry live and with every metric
+swapped for a no-op, alternating runs and keeping the fastest of each. It
+also times one join's worth of instrumentation in isolation, which is a
+much steadier figure than the A/B difference on a noisy machine. Exits non-zero if the instrumentation adds
+more than 1% to the join path.
+
+    python -m benchmarks.metrics_overhead --joins 5000 --rounds 7
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import timeit
+from types import SimpleNamespace
+
+import utils.db_manager as db_module
+from benchmarks.multi_channel_events import FakeBot, FakeChannel, make_member
+from cogs.punctuality_tracker import PunctualityTracker
+from config import Config
+from utils import metrics, timeutil
+from utils.db_manager import DatabaseManager
+
+
+BUDGET = 0.01
+
+
+class NullMetric:
+    def labels(self, *values):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+def set_instrumentation(enabled, live):
+    null = NullMetric()
+    for name in ("JOIN_LATENCY", "DB_LATENCY", "DISCORD_LATENCY", "DISCORD_ERRORS"):
+        setattr(metrics, name, live[name] if enabled else null)
+    db_module.DB_LATENCY = live["DB_LATENCY"] if enabled else null
+
+
+async def join_path(db_path, joins, round_number):
+    """Seconds per join for ``joins`` members joining one live meeting"""
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    bot = FakeBot()
+    cog = PunctualityTracker(bot, db)
+    guild = SimpleNamespace(id=1)
+    channel = FakeChannel(10, guild)
+    announcements = FakeChannel(20, guild)
+    bot.channels[channel.id] = channel
+    bot.channels[announcements.id] = announcements
+    cog.meeting_channels.add(channel.id)
+    cog.announcement_channels[guild.id] = announcements.id
+
+    start = timeutil.now().replace(microsecond=0)
+    meeting_id = await db.create_meeting(start, channel.id, guild_id=guild.id)
+    cog.cache_meeting(channel.id, meeting_id, start, guild.id)
+
+    members = [make_member(round_number * joins + i, guild) for i in range(joins)]
+    before, after = SimpleNamespace(channel=None), SimpleNamespace(channel=channel)
+    started = time.perf_counter()
+    for member in members:
+        await cog.on_voice_state_update(member, before, after)
+    await cog.write_buffer.flush()
+    elapsed = time.perf_counter() - started
+    await cog.cog_unload()
+    return elapsed / joins
+
+
+def instrumentation_cost(calls=200_000):
+    """Seconds of metrics work per join, timed in isolation
+
+    join() mirrors the bookkeeping on_voice_state_update does around
+    handle_join; keep the two in step.
+    """
+    perf_counter = time.perf_counter
+    join_latency = {"recorded": metrics.Histogram(metrics.DEFAULT_BUCKETS)}
+    state = SimpleNamespace(joins_seen=metrics.Counter())
+
+    def handle_join():
+        return "recorded"
+
+    def join():
+        joins = state.joins_seen
+        joins.value += 1
+        if joins.value % metrics.JOIN_SAMPLE_EVERY:
+            handle_join()
+        else:
+            started = perf_counter()
+            outcome = handle_join()
+            join_latency[outcome].observe(perf_counter() - started)
+
+    def bare_join():
+        handle_join()
+
+    # One batched write, timed in DatabaseManager._run, is shared by WRITE_BATCH_SIZE joins
+    db_histogram = metrics.Metric("bench_seconds", "", "histogram", ("method",))
+
+    def one_batch():
+        started = perf_counter()
+        db_histogram.labels("record_punctuality_batch").observe(perf_counter() - started)
+
+    def timed(func):
+        return min(timeit.repeat(func, number=calls, repeat=5)) / calls
+
+    per_join = timed(join) - timed(bare_join)
+    return per_join + timed(one_batch) / Config.WRITE_BATCH_SIZE
+
+
+async def main(joins, rounds):
+    live = {
+        name: getattr(metrics, name)
+        for name in ("JOIN_LATENCY", "DB_LATENCY", "DISCORD_LATENCY", "DISCORD_ERRORS")
+    }
+    timings = {True: [], False: []}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        # Warm up connections and caches before measuring
+        await join_path(path, joins, 0)
+        for round_number in range(1, rounds + 1):
+            for enabled in (round_number % 2 == 0, round_number % 2 == 1):
+                set_instrumentation(enabled, live)
+                timings[enabled].append(await join_path(path, joins, round_number * 2 + enabled))
+        set_instrumentation(True, live)
+
+    with_metrics, without_metrics = min(timings[True]), min(timings[False])
+    cost = instrumentation_cost()
+    estimated = cost / without_metrics
+    measured = with_metrics / without_metrics - 1
+
+    print(f"join path without metrics: {without_metrics * 1e6:8.2f} us/join")
+    print(f"join path with metrics:    {with_metrics * 1e6:8.2f} us/join  (A/B {measured * 100:+.2f}%)")
+    print(f"instrumentation per join:  {cost * 1e6:8.3f} us      (overhead {estimated * 100:.2f}%)")
+    if estimated > BUDGET:
+        print(f"FAIL: instrumentation exceeds the {BUDGET:.0%} budget")
+        return 1
+    print(f"ok: within the {BUDGET:.0%} budget")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--joins", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=7)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.joins, args.rounds)))
@@ -0,0 +1,139 @@
+# benchmarks/multi_channel_events.py
+"""Per-event cost and memory of PunctualityTracker as concurrent meetings grow.
+
+Registers N meeting channels with a live meeting each, replays joins spread
+across all of them and reports the mean cost of ``on_voice_state_update``
+plus the memory held per meeting. Each count is run ``--repeats`` times,
+taking turns with the other counts, and the fastest run is kept, as
+timing noise only ever adds.
+
+Exits non-zero if the per-event cost at the largest count is more than
+MAX_GROWTH times the cost at the smallest.
+
+    python -m benchmarks.multi_channel_events --channels 10 100 1000 5000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from cogs.punctuality_tracker import PunctualityTracker
+from utils import timeutil
+from utils.db_manager import DatabaseManager
+
+MAX_GROWTH = 1.3
+
+
+class FakeChannel:
+    def __init__(self, channel_id, guild):
+        self.id = channel_id
+        self.guild = guild
+        self.mention = f"<#{channel_id}>"
+
+    async def send(self, content=None, **kwargs):
+        return None
+
+
+class FakeBot:
+    def __init__(self):
+        self.channels = {}
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def dispatch(self, event, *args):
+        pass
+
+    async def wait_until_ready(self):
+        await asyncio.Event().wait()
+
+
+def make_member(user_id, guild):
+    return SimpleNamespace(
+        id=user_id, bot=False, guild=guild, display_name=f"user{user_id}", mention=f"<@{user_id}>"
+    )
+
+
+async def run(channel_count, events, db_path):
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    bot = FakeBot()
+    cog = PunctualityTracker(bot, db)
+    start = timeutil.now().replace(microsecond=0)
+
+    voice_channels = []
+    for index in range(channel_count):
+        guild = SimpleNamespace(id=1_000_000 + index // 10)
+        channel = FakeChannel(10_000_000 + index, guild)
+        announcements = FakeChannel(20_000_000 + index // 10, guild)
+        bot.channels[channel.id] = channel
+        bot.channels[announcements.id] = announcements
+        cog.meeting_channels.add(channel.id)
+        cog.announcement_channels[guild.id] = announcements.id
+        voice_channels.append(channel)
+
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    for index, channel in enumerate(voice_channels):
+        cog.cache_meeting(channel.id, index + 1, start, channel.guild.id)
+    # Give every meeting a handful of attendees before measuring
+    for index, channel in enumerate(voice_channels):
+        state = cog.meeting_cache[(channel.id, start.date())]
+        state.attendees.update(range(index * 5, index * 5 + 5))
+    per_meeting = sum(
+        stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename")
+    ) / channel_count
+    tracemalloc.stop()
+
+    # One join per meeting first, so the timed events don't include creating its digest
+    before = SimpleNamespace(channel=None)
+    for index, channel in enumerate(voice_channels):
+        member = make_member(40_000_000 + index, channel.guild)
+        await cog.on_voice_state_update(member, before, SimpleNamespace(channel=channel))
+
+    started = time.perf_counter()
+    for event in range(events):
+        channel = voice_channels[event % channel_count]
+        member = make_member(50_000_000 + event, channel.guild)
+        await cog.on_voice_state_update(member, before, SimpleNamespace(channel=channel))
+    elapsed = time.perf_counter() - started
+
+    await cog.cog_unload()
+    return elapsed / events * 1e6, per_meeting
+
+
+async def main(channel_counts, events, repeats):
+    runs = {count: [] for count in channel_counts}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Round-robin over the counts, so a slow patch on the machine hits them all alike
+        for index in range(repeats):
+            for count in channel_counts:
+                runs[count].append(await run(count, events, os.path.join(tmp, f"bench{count}_{index}.db")))
+
+    costs = []
+    print(f"{'channels':>9} {'us/event':>10} {'bytes/meeting':>14}")
+    for count in channel_counts:
+        per_event = min(per_event for per_event, _ in runs[count])
+        per_meeting = runs[count][0][1]
+        costs.append(per_event)
+        print(f"{count:>9} {per_event:>10.1f} {per_meeting:>14.0f}")
+
+    growth = costs[-1] / costs[0]
+    if growth > MAX_GROWTH:
+        print(f"FAIL: per-event cost grew {growth:.2f}x from {channel_counts[0]} to {channel_counts[-1]} channels")
+        return 1
+    print(f"ok: per-event cost grew {growth:.2f}x from {channel_counts[0]} to {channel_counts[-1]} channels")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=7)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.channels, args.events, args.repeats)))
@@ -0,0 +1,199 @@
+# benchmarks/query_plans.py
+"""Check that the hot queries use indexes on a large database.
+
+Builds a database with ``--meetings`` meetings and ``--per-meeting`` rows
+each, then prints ``EXPLAIN QUERY PLAN`` for the lookups the cog issues
+and exits non-zero if any of them scans a table. The join path is also
+run for real through a profiled DatabaseManager, and every statement it
+issues, including those of the triggers it fires, goes through
+assert_no_full_scan.
+
+    python -m benchmarks.query_plans --meetings 2000 --per-meeting 60
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+from utils.db_manager import DatabaseManager
+from utils.db_profiler import assert_no_full_scan
+
+
+HOT_QUERIES = {
+    "get_active_meeting": (
+        """
+    SELECT id, channel_id, guild_id, start_ts, description, status FROM meetings
+    WHERE channel_id = ? AND meeting_date = ?
+    ORDER BY start_ts DESC LIMIT 1
+    """,
+        (1, "2024-03-01"),
+    ),
+    "get_punctuality_report": (
+        """
+    SELECT p.user_id, u.user_name, p.join_ts, p.late_minutes, p.fee_amount
+    FROM punctuality p LEFT JOIN users u ON u.user_id = p.user_id
+    WHERE p.meeting_id = ?
+    ORDER BY p.late_minutes DESC
+    """,
+        (42,),
+    ),
+    "record_punctuality conflict check": (
+        "SELECT id FROM punctuality WHERE meeting_id = ? AND user_id = ?",
+        (42, 7),
+    ),
+    "get_all_meetings next page": (
+        """
+    SELECT id, channel_id, guild_id, start_ts, description, status FROM meetings
+    WHERE (?1 IS NULL OR guild_id = ?1 OR guild_id IS NULL) AND status != 'cancelled'
+      AND start_ts <= ?2 AND (start_ts, id) < (?2, ?3)
+    ORDER BY start_ts DESC, id DESC LIMIT 10
+    """,
+        (None, 1704099600, 500),
+    ),
+    "get_previous_attendees": (
+        """
+    SELECT user_id FROM punctuality
+    WHERE meeting_id = (
+        SELECT id FROM meetings
+        WHERE channel_id = ? AND start_ts < ? AND status = 'closed'
+        ORDER BY start_ts DESC LIMIT 1
+    )
+    """,
+        (1, 1704099600),
+    ),
+    "get_leaderboard": (
+        """
+    SELECT user_id, meetings, late_count, late_minutes, fees
+    FROM user_monthly_stats WHERE guild_id = ? AND month = ? AND late_minutes > 0
+    ORDER BY late_minutes DESC LIMIT 10
+    """,
+        (0, "2024-03"),
+    ),
+    "get_user_stats all time": (
+        """
+    SELECT SUM(meetings), SUM(late_count), SUM(late_minutes), SUM(fees)
+    FROM user_monthly_stats WHERE guild_id = ? AND user_id = ?
+    """,
+        (0, 7),
+    ),
+    "get_fee_summary totals": (
+        "SELECT attendances, late_count, late_minutes, fees FROM guild_monthly_stats WHERE guild_id = ? AND month = ?",
+        (0, "2024-03"),
+    ),
+    "get_loyalty latest meeting": (
+        """
+    SELECT l.seq, m.status FROM loyalty_meetings l LEFT JOIN meetings m ON m.id = l.meeting_id
+    WHERE l.guild_id = ? ORDER BY l.seq DESC LIMIT 1
+    """,
+        (0,),
+    ),
+    "get_loyalty": (
+        "SELECT * FROM loyalty_streaks WHERE guild_id = ? AND user_id = ?",
+        (0, 7),
+    ),
+    "get_loyalty_leaderboard current": (
+        """
+    SELECT * FROM loyalty_streaks
+    WHERE guild_id = ?1 AND current_streak > 0 AND last_seq >= ?2
+    ORDER BY current_streak DESC, best_streak DESC LIMIT 10
+    """,
+        (0, 1999),
+    ),
+    "get_loyalty_leaderboard best": (
+        """
+    SELECT * FROM loyalty_streaks
+    WHERE guild_id = ?1 AND best_streak > 0
+    ORDER BY best_streak DESC, current_streak DESC LIMIT 10
+    """,
+        (0,),
+    ),
+}
+
+
+# The join path, run through DatabaseManager: (name, call taking the db)
+HOT_PATH = (
+    ("get_active_meeting", lambda db: db.get_active_meeting(1, "2024-03-01")),
+    ("get_active_meeting open_only", lambda db: db.get_active_meeting(1, "2024-03-01", open_only=True)),
+    ("record_punctuality", lambda db: db.record_punctuality(42, 10_001, "new", datetime(2024, 3, 1, 9), 2, 400.0)),
+    ("record_punctuality duplicate", lambda db: db.record_punctuality(42, 7, "user7", datetime(2024, 3, 1, 9))),
+    (
+        "record_punctuality_batch",
+        lambda db: db.record_punctuality_batch(
+            [(43, user_id, f"user{user_id}", datetime(2024, 3, 1, 9), 0, 0) for user_id in range(10_002, 10_010)]
+        ),
+    ),
+    # A recurring rule's occurrence, then the same one again after a restart
+    ("create_meeting rule", lambda db: db.create_meeting(datetime(2024, 3, 2, 9), 1, None, 1, "scheduled", 5)),
+    ("create_meeting rule again", lambda db: db.create_meeting(datetime(2024, 3, 2, 9), 1, None, 1, "scheduled", 5)),
+)
+
+
+def populate(db_path, meetings, per_meeting):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO meetings (id, meeting_date, start_ts, channel_id) VALUES (?, ?, ?, ?)",
+        (
+            (i, f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}", 1704067200 + i * 3600, 1 + i % 5)
+            for i in range(1, meetings + 1)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO users (user_id, user_name) VALUES (?, ?)",
+        ((u, f"user{u}") for u in range(per_meeting)),
+    )
+    conn.executemany(
+        "INSERT INTO punctuality (meeting_id, user_id, join_ts, late_minutes, fee_amount) "
+        "VALUES (?, ?, ?, ?, 0)",
+        (
+            (m, u, 1704067200 + m * 3600 + u, u % 7)
+            for m in range(1, meetings + 1)
+            for u in range(per_meeting)
+        ),
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    return conn
+
+
+async def main(meetings, per_meeting):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "plans.db"))
+        await db.initialize()
+        await db.close()
+
+        conn = populate(db.db_path, meetings, per_meeting)
+        rows = conn.execute("SELECT COUNT(*) FROM punctuality").fetchone()[0]
+        print(f"punctuality rows: {rows}")
+
+        failed = False
+        for name, (sql, params) in HOT_QUERIES.items():
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+            scans = [step for step in plan if step.startswith("SCAN")]
+            failed |= bool(scans)
+            print(f"{'FAIL' if scans else 'ok  '} {name}: {' / '.join(plan)}")
+        conn.close()
+
+        db = DatabaseManager(db.db_path, profile=True)
+        await db.initialize()
+        for name, call in HOT_PATH:
+            with db.profiler.capture() as statements:
+                await call(db)
+            try:
+                assert_no_full_scan(db.db_path, statements)
+                print(f"ok   {name}: {len(statements)} statement(s)")
+            except AssertionError as e:
+                failed = True
+                print(f"FAIL {name}: {e}")
+        await db.close()
+        return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=2000)
+    parser.add_argument("--per-meeting", type=int, default=60)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.meetings, args.per_meeting)))
@@ -0,0 +1,113 @@
+# benchmarks/query_profile.py
+"""Cost of per-statement profiling, and what it reports.
+
+Runs the join path (a get_active_meeting lookup and a record_punctuality
+write per join) plus a report every ``--report-every`` joins, ``--joins``
+times into a new meeting, with profiling off and then on, alternating
+rounds. It prints the
+time per join each way and the statements with the most total time.
+Then it runs a deliberately unindexed query with a low slow-query
+threshold and checks that the slow-query log caught it with its plan.
+
+Exits non-zero if profiling added more than OVERHEAD_LIMIT_US per join,
+the profiler's call counts don't match the calls made, or the slow query
+was not logged with a full scan in its plan.
+
+    python -m benchmarks.query_profile --joins 2000
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from utils.db_manager import DatabaseManager
+from utils.db_profiler import ProfiledConnection, full_scans
+
+OVERHEAD_LIMIT_US = 100
+ROUNDS = 3
+
+
+async def workload(db, start, joins, report_every, offset):
+    """Seconds per join for ``joins`` lookups and writes into a new meeting"""
+    meeting_id = await db.create_meeting(start, 1, "standup", 1, "active")
+    started = time.perf_counter()
+    for i in range(joins):
+        await db.get_active_meeting(1, start.strftime("%Y-%m-%d"))
+        user_id = offset + i
+        await db.record_punctuality(
+            meeting_id, user_id, f"user{user_id}", start + timedelta(seconds=i), i % 5, i % 5 * 200.0
+        )
+        if i % report_every == 0:
+            await db.get_punctuality_report(meeting_id)
+    return (time.perf_counter() - started) / joins
+
+
+async def main(joins, report_every):
+    failures = []
+    start = datetime(2024, 3, 1, 9)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "profile.db")
+        plain = DatabaseManager(path)
+        await plain.initialize()
+        profiled = DatabaseManager(path, profile=True)
+        await profiled.initialize()
+        profiled.profiler.reset()
+
+        timings = {"off": [], "on": []}
+        offset = 0
+        for _ in range(ROUNDS):
+            for label, db in (("off", plain), ("on", profiled)):
+                timings[label].append(await workload(db, start, joins, report_every, offset))
+                offset += joins
+        off = statistics.median(timings["off"]) * 1e6
+        on = statistics.median(timings["on"]) * 1e6
+        print(f"per join: {off:.0f}us without profiling, {on:.0f}us with ({on - off:+.0f}us)")
+        if on - off > OVERHEAD_LIMIT_US:
+            failures.append(f"profiling added {on - off:.0f}us per join")
+
+        top = profiled.profiler.top(5)
+        print(f"{'calls':>7} {'total ms':>9} {'max ms':>7} {'rows':>7}  statement")
+        for stats in top:
+            print(f"{stats.calls:>7} {stats.seconds * 1000:>9.1f} {stats.max_seconds * 1000:>7.2f} "
+                  f"{stats.rows:>7}  {stats.sql[:80]}")
+        calls = {stats.sql: stats.calls for stats in profiled.profiler.top(100)}
+        lookups = sum(count for sql, count in calls.items() if "FROM main.meetings m" in sql)
+        inserts = sum(count for sql, count in calls.items() if sql.startswith("INSERT INTO punctuality"))
+        if lookups != joins * ROUNDS or inserts != joins * ROUNDS:
+            failures.append(f"profiler counted {lookups} lookups and {inserts} inserts for {joins * ROUNDS} joins")
+
+        # A slow statement lands in the slow-query log with its plan
+        profiler = profiled.profiler
+        profiler.slow_seconds = 0
+        conn = sqlite3.connect(path, factory=ProfiledConnection)
+        conn.profiler = profiler
+        conn.execute("SELECT COUNT(*) FROM punctuality WHERE fee_amount > ?", (100.0,)).fetchone()
+        conn.close()
+        slow = list(profiled.profiler.slow)
+        if not slow or not full_scans(slow[-1].plan):
+            failures.append(f"the unindexed query was not logged with a scan: {slow}")
+        else:
+            print(f"slow-query log: {slow[-1].sql} -> {' / '.join(slow[-1].plan)}")
+
+        await profiled.close()
+        await plain.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+    print("ok: statements timed at a small cost per join and slow ones logged with their plan")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--joins", type=int, default=2000)
+    parser.add_argument("--report-every", type=int, default=50)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.joins, args.report_every)))
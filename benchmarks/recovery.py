@@ -0,0 +1,109 @@
+# benchmarks/recovery.py
+"""Startup recovery time against a year of meeting history.
+
+Fills a database with ``--days`` of closed meetings (``--channels`` per day,
+``--attendees`` each) plus a handful of scheduled and active meetings, then
+times ``PunctualityTracker.recover_state``. Recovery should stay well under
+a second because only open meetings are read, through a partial index.
+
+    python -m benchmarks.recovery --days 365 --channels 20 --attendees 40
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.multi_channel_events import FakeBot
+from cogs.punctuality_tracker import PunctualityTracker
+from utils.db_manager import DatabaseManager
+from utils import timeutil
+
+
+def populate(db_path, days, channels, attendees):
+    conn = sqlite3.connect(db_path)
+    start = timeutil.now().replace(hour=9, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    meeting_id = 0
+    meetings = []
+    rows = []
+    for day in range(days):
+        when = start + timedelta(days=day)
+        for channel in range(channels):
+            meeting_id += 1
+            meetings.append(
+                (
+                    meeting_id,
+                    when.strftime("%Y-%m-%d"),
+                    timeutil.to_epoch(when),
+                    1000 + channel,
+                    1,
+                    "closed",
+                )
+            )
+            rows.extend(
+                (meeting_id, user, timeutil.to_epoch(when), user % 5, 0)
+                for user in range(attendees)
+            )
+
+    # A few meetings still open at "restart" time
+    now = timeutil.now().replace(microsecond=0)
+    for offset, status in ((-5, "active"), (30, "scheduled"), (90, "scheduled")):
+        meeting_id += 1
+        when = now + timedelta(minutes=offset)
+        meetings.append(
+            (
+                meeting_id,
+                when.strftime("%Y-%m-%d"),
+                timeutil.to_epoch(when),
+                1000 + meeting_id % channels,
+                1,
+                status,
+            )
+        )
+
+    conn.executemany(
+        "INSERT INTO meetings (id, meeting_date, start_ts, channel_id, guild_id, status) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        meetings,
+    )
+    conn.executemany(
+        "INSERT INTO users (user_id, user_name) VALUES (?, ?)",
+        ((user, f"user{user}") for user in range(attendees)),
+    )
+    conn.executemany(
+        "INSERT INTO punctuality (meeting_id, user_id, join_ts, late_minutes, fee_amount) "
+        "VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+    return len(meetings), len(rows)
+
+
+async def main(days, channels, attendees):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "recovery.db"))
+        await db.initialize()
+        meetings, rows = populate(db.db_path, days, channels, attendees)
+        print(f"history: {meetings} meetings, {rows} punctuality rows")
+
+        cog = PunctualityTracker(FakeBot(), db)
+        started = time.perf_counter()
+        await cog.recover_state()
+        elapsed = (time.perf_counter() - started) * 1000
+        print(
+            f"recover_state: {elapsed:.1f}ms, {len(cog.scheduler)} pending event(s), "
+            f"{len(cog.scheduled_meetings)} scheduled meeting(s)"
+        )
+        await cog.cog_unload()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--attendees", type=int, default=40)
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.channels, args.attendees))
@@ -0,0 +1,257 @@
+# benchmarks/recurring_meetings.py
+"""Recurring meeting rules expanded lazily, checked against brute force.
+
+Stores ``--rules`` rules with mixed patterns (daily, every n days,
+weekdays, day lists, every n weeks) and timezones, each in its own
+channel, plus per-rule and guild-wide skip dates. It times
+RuleBook.upcoming for the next ``--count`` meetings and compares every
+rule's occurrences over ``--days`` days with a day-by-day brute force,
+then checks a 09:00 rule across both daylight saving changes and a
+rule at a time the spring change skips.
+
+Finally it adds DUE_SOON rules starting shortly and loads every rule
+into the cog the way the bot does: only the rules starting within Config.RULE_LEAD_MINUTES may get a meetings row,
+and reloading (with or without the tracker's recovered state, as after
+a restart) must not create any again.
+
+Exits non-zero if upcoming takes longer than UPCOMING_LIMIT_MS, any
+occurrence differs from brute force, the daylight saving checks fail,
+rows are created ahead of the lead time, or a reload creates duplicates.
+
+    python -m benchmarks.recurring_meetings --rules 500 --days 120
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import pytz
+
+from attendance import MeetingRule
+from benchmarks.multi_channel_events import FakeBot
+from cogs.punctuality_tracker import PunctualityTracker
+from cogs.recurring_meetings import RecurringMeetings
+from config import Config
+from utils import timeutil
+from utils.db_manager import DatabaseManager
+from utils.recurrence import WEEKDAYS, Recurrence, RuleBook, parse_rrule
+
+UPCOMING_LIMIT_MS = 50
+DUE_SOON = 10
+PATTERNS = ("daily", "FREQ=DAILY;INTERVAL=3", "weekdays", "mon,wed,fri", "weekly", "biweekly",
+            "FREQ=WEEKLY;INTERVAL=3;BYDAY=TU,TH")
+TIMEZONES = ("UTC", "Europe/Berlin", "America/New_York", "Asia/Kolkata", "Australia/Sydney", Config.TIMEZONE)
+GUILDS = (1, 2, 3)
+
+
+def brute_force(rule, skips, after_ts, end_ts):
+    """Every occurrence in (after_ts, end_ts], testing each calendar day on its own"""
+    parts = dict(part.split("=") for part in rule.rrule.split(";"))
+    interval = int(parts["INTERVAL"])
+    first = date.fromisoformat(rule.first_date)
+    until = date.fromisoformat(rule.until_date) if rule.until_date else None
+    days = {WEEKDAYS.index(day) for day in parts["BYDAY"].split(",")} if "BYDAY" in parts else {first.weekday()}
+    first_monday = first - timedelta(days=first.weekday())
+    tz = pytz.timezone(rule.timezone)
+    hour, minute = map(int, rule.start_time.split(":"))
+
+    result = []
+    day = first
+    while True:
+        start_ts = int(tz.localize(datetime(day.year, day.month, day.day, hour, minute), is_dst=False).timestamp())
+        if start_ts > end_ts or (until and day > until):
+            return result
+        if parts["FREQ"] == "DAILY":
+            runs = (day - first).days % interval == 0
+        else:
+            monday = day - timedelta(days=day.weekday())
+            runs = day.weekday() in days and (monday - first_monday).days // 7 % interval == 0
+        if runs and start_ts > after_ts and day.isoformat() not in skips:
+            result.append(start_ts)
+        day += timedelta(days=1)
+
+
+def make_rules(count, today, rng):
+    """(rule fields, per-rule skip dates) for ``count`` rules, without ids"""
+    rules = []
+    for index in range(count):
+        timezone = TIMEZONES[index % len(TIMEZONES)]
+        first_date = today - timedelta(days=rng.randrange(0, 60))
+        until_date = first_date + timedelta(days=rng.randrange(20, 200)) if index % 7 == 0 else None
+        start_time = f"{rng.randrange(24):02d}:{rng.choice((0, 15, 30, 45)):02d}"
+        skips = {(today + timedelta(days=rng.randrange(60))).isoformat() for _ in range(index % 3)}
+        rules.append((
+            GUILDS[index % len(GUILDS)], 500 + index, parse_rrule(PATTERNS[index % len(PATTERNS)]),
+            start_time, timezone, first_date, until_date, f"rule {index}", skips,
+        ))
+    return rules
+
+
+def check_dst(failures):
+    """A 09:00 rule stays at 09:00 across both changes; a skipped time runs once, an hour later"""
+    for timezone, spring, autumn in (("America/New_York", "2026-03-08", "2026-11-01"),
+                                     ("Europe/Berlin", "2026-03-29", "2026-10-25")):
+        tz = pytz.timezone(timezone)
+        rule = MeetingRule(1, 1, 1, "FREQ=DAILY;INTERVAL=1", "09:00", timezone, "2026-01-01", None, None)
+        for change in (spring, autumn):
+            around = tz.localize(datetime.fromisoformat(change) - timedelta(days=3))
+            occurrences = Recurrence(rule).occurrences(int(around.timestamp()))
+            starts = [datetime.fromtimestamp(next(occurrences), tz) for _ in range(7)]
+            if any((start.hour, start.minute) != (9, 0) for start in starts) or \
+                    len({start.date() for start in starts}) != 7:
+                failures.append(f"{timezone} 09:00 rule around {change}: {[str(s) for s in starts]}")
+
+        # 02:30 does not exist on the spring change day
+        rule = rule._replace(start_time="02:30", rrule="FREQ=DAILY;INTERVAL=1")
+        change = date.fromisoformat(spring)
+        after = int(tz.localize(datetime(change.year, change.month, change.day) - timedelta(days=1)).timestamp())
+        occurrences = Recurrence(rule).occurrences(after)
+        starts = [datetime.fromtimestamp(next(occurrences), tz) for _ in range(3)]
+        if [start.date() for start in starts] != [change - timedelta(days=1), change, change + timedelta(days=1)] \
+                or (starts[1].hour, starts[1].minute) != (3, 30):
+            failures.append(f"{timezone} 02:30 rule around {spring}: {[str(s) for s in starts]}")
+
+
+async def wait_until_queued(cog, due, timeout=10):
+    """Wait until every due rule has been materialized and its following occurrence queued"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        queued = {event.key: event.payload for event in cog.scheduler.pending()}
+        if all(queued.get(rule_id, 0) > start_ts for rule_id, start_ts in due.items()):
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+def rule_rows(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT rule_id, start_ts FROM meetings WHERE rule_id IS NOT NULL").fetchall()
+    conn.close()
+    return sorted(rows)
+
+
+async def main(rule_count, days, count, seed):
+    failures = []
+    rng = random.Random(seed)
+    now = timeutil.now()
+    now_ts = timeutil.to_epoch(now)
+    end_ts = now_ts + days * 86400
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rules.db")
+        db = DatabaseManager(path)
+        await db.initialize()
+
+        specs = make_rules(rule_count, now.date(), rng)
+        holiday = now.date() + timedelta(days=5)
+        for guild_id, channel_id, rrule, start_time, timezone, first_date, until_date, description, skips in specs:
+            rule_id = await db.add_meeting_rule(
+                guild_id, channel_id, rrule, start_time, timezone, first_date, until_date, description
+            )
+            for skip_date in skips:
+                await db.set_rule_skip(guild_id, rule_id, date.fromisoformat(skip_date), reason="benchmark")
+        await db.set_rule_skip(GUILDS[0], 0, holiday, reason="holiday")
+        # Some daily rules starting within the lead time, so loading them creates meetings
+        for index in range(DUE_SOON):
+            soon = now + timedelta(minutes=5 + index * 50 // DUE_SOON)
+            await db.add_meeting_rule(
+                GUILDS[index % len(GUILDS)], 400 + index, "FREQ=DAILY;INTERVAL=1", f"{soon:%H:%M}",
+                Config.TIMEZONE, soon.date(), None, f"soon {index}",
+            )
+        if rule_rows(path):
+            failures.append("adding rules created meetings rows")
+
+        rules, skips = await db.get_meeting_rules()
+        book = RuleBook(rules, skips)
+        print(f"{len(book)} rules, {len(skips)} skip dates")
+
+        # The next meetings across every rule
+        timings = []
+        for _ in range(20):
+            started = time.perf_counter()
+            upcoming = book.upcoming(now_ts, count)
+            timings.append(time.perf_counter() - started)
+        upcoming_ms = statistics.median(timings) * 1000
+        print(f"upcoming({count}) over {len(book)} rules: {upcoming_ms:.2f}ms")
+        if upcoming_ms > UPCOMING_LIMIT_MS:
+            failures.append(f"upcoming took {upcoming_ms:.1f}ms")
+
+        # Every rule against brute force, including the guild-wide holiday
+        expected_all = []
+        mismatches = 0
+        for rule in rules:
+            skipped = book.skipped(rule)
+            expected = brute_force(rule, skipped, now_ts, end_ts)
+            actual = []
+            for start_ts in book.occurrences(rule.id, now_ts):
+                if start_ts > end_ts:
+                    break
+                actual.append(start_ts)
+            if actual != expected:
+                mismatches += 1
+                if mismatches <= 3:
+                    failures.append(f"rule {rule.id} ({rule.rrule} {rule.timezone}): {actual[:5]} != {expected[:5]}")
+            if rule.guild_id == GUILDS[0] and any(
+                datetime.fromtimestamp(ts, pytz.timezone(rule.timezone)).date() == holiday for ts in actual
+            ):
+                failures.append(f"rule {rule.id} runs on the guild's holiday {holiday}")
+            expected_all.extend((start_ts, rule.id) for start_ts in expected)
+        expected_all.sort()
+        if [(start_ts, rule.id) for start_ts, rule in upcoming] != expected_all[:count]:
+            failures.append("upcoming differs from the merged brute-force occurrences")
+        if mismatches:
+            failures.append(f"{mismatches} of {len(rules)} rules differ from brute force")
+        print(f"{len(expected_all)} occurrences over {days} days match brute force: {not mismatches}")
+
+        check_dst(failures)
+
+        # Materialize through the cog, then reload twice as after restarts
+        lead_ts = now_ts + Config.RULE_LEAD_MINUTES * 60
+        due = {
+            rule.id: start_ts for rule in rules
+            if (start_ts := book.next_occurrence(rule.id, now_ts)) is not None and start_ts <= lead_ts
+        }
+        counts = []
+        for recover in (False, False, True):
+            tracker = PunctualityTracker(FakeBot(), db)
+            if recover:
+                await tracker.recover_state()
+            cog = RecurringMeetings(tracker.bot, tracker)
+            await cog.load_rules()
+            if not await wait_until_queued(cog, due):
+                failures.append("due rules were not materialized in time")
+            counts.append(len(rule_rows(path)))
+            cog.scheduler.stop()
+            tracker.scheduler.stop()
+
+        created = rule_rows(path)
+        print(f"{len(due)} of {len(rules)} rules start within {Config.RULE_LEAD_MINUTES} min; "
+              f"meetings rows after load and reloads: {counts}")
+        if sorted(due.items()) != created:
+            failures.append(f"created {len(created)} rows for {len(due)} due occurrences")
+        if len(set(counts)) != 1:
+            failures.append(f"reloading created duplicate meetings: {counts}")
+        await db.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+    print("ok: rules expand lazily, match brute force and materialize each meeting once")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, default=500)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.rules, args.days, args.count, args.seed)))
@@ -0,0 +1,304 @@
+# benchmarks/replay.py
+"""Offline replay of synthetic voice-state traces through PunctualityTracker.
+
+Builds the cog against a fake bot, fake voice channels and fake members,
+then replays traces through ``on_voice_state_update`` -> ``handle_join`` ->
+write buffer -> ``DatabaseManager`` on a temporary database. Each event is
+dispatched as its own task, as discord.py does for listeners.
+
+Scenarios:
+    join_storm       everyone joins a handful of meeting channels at once
+    mute_churn       attendees toggle mute/deafen in the channel they are in
+    channel_hopping  members wander between meeting, idle and no channel
+    multi_day        a week of daily meetings with arrivals, churn and leaves
+
+Reports events/sec, p50/p99 handling latency and event-loop lag. Results
+can be saved as a baseline and later runs compared against it:
+
+    python -m benchmarks.replay --save
+    python -m benchmarks.replay --compare
+
+Baselines are machine specific; refresh the file on the machine you compare
+on before reviewing a change to the join path.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from benchmarks.db_event_loop_lag import measure_lag
+from benchmarks.multi_channel_events import FakeBot, FakeChannel, make_member
+from cogs.punctuality_tracker import PunctualityTracker
+from utils import timeutil
+from utils.db_manager import DatabaseManager
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "replay.json")
+
+# Metrics where a larger value is a regression, and the tolerated slack
+REGRESSION_METRICS = ("p50_ms", "p99_ms", "lag_p99_ms")
+REGRESSION_TOLERANCE = 0.5
+REGRESSION_FLOOR_MS = 2.0
+
+GUILD_ID = 1_000
+MEETING_CHANNELS = 4
+IDLE_CHANNELS = 2
+
+
+class SimulatedClock:
+    """Stand-in for timeutil.now that returns the replay's simulated wall clock"""
+
+    current = None
+
+    @classmethod
+    def now(cls):
+        return cls.current
+
+
+class World:
+    """Fake guild with meeting channels, idle channels and members"""
+
+    def __init__(self, members):
+        self.bot = FakeBot()
+        guild = SimpleNamespace(id=GUILD_ID)
+        self.meeting = [FakeChannel(10_000 + i, guild) for i in range(MEETING_CHANNELS)]
+        self.idle = [FakeChannel(20_000 + i, guild) for i in range(IDLE_CHANNELS)]
+        self.announcements = FakeChannel(30_000, guild)
+        for channel in (*self.meeting, *self.idle, self.announcements):
+            self.bot.channels[channel.id] = channel
+        self.members = [make_member(1_000_000 + i, guild) for i in range(members)]
+
+
+def state(channel, self_mute=False):
+    return SimpleNamespace(channel=channel, self_mute=self_mute)
+
+
+# Each scenario returns (days, bursts): the meeting dates to create and a
+# list of (timestamp, [(member, before, after), ...]) replayed in order
+
+
+def join_storm(world, rng, start):
+    bursts = []
+    members = list(world.members)
+    rng.shuffle(members)
+    for offset in range(0, len(members), 100):
+        when = start + timedelta(seconds=offset // 10)
+        bursts.append((when, [
+            (member, state(None), state(rng.choice(world.meeting)))
+            for member in members[offset:offset + 100]
+        ]))
+    return [start.date()], bursts
+
+
+def mute_churn(world, rng, start):
+    seats = {member.id: rng.choice(world.meeting) for member in world.members}
+    bursts = [(start, [(m, state(None), state(seats[m.id])) for m in world.members])]
+    for second in range(1, 21):
+        events = []
+        for member in rng.sample(world.members, len(world.members) // 2):
+            channel = seats[member.id]
+            muted = rng.random() < 0.5
+            events.append((member, state(channel, not muted), state(channel, muted)))
+        bursts.append((start + timedelta(seconds=second * 30), events))
+    return [start.date()], bursts
+
+
+def channel_hopping(world, rng, start):
+    places = {member.id: None for member in world.members}
+    choices = [None, *world.meeting, *world.idle]
+    bursts = []
+    for second in range(40):
+        events = []
+        for member in rng.sample(world.members, len(world.members) // 4):
+            before = places[member.id]
+            after = rng.choice([c for c in choices if c is not before])
+            places[member.id] = after
+            events.append((member, state(before), state(after)))
+        bursts.append((start + timedelta(seconds=second * 15), events))
+    return [start.date()], bursts
+
+
+def multi_day(world, rng, start, days=7):
+    bursts = []
+    dates = []
+    for day in range(days):
+        meeting_start = start + timedelta(days=day)
+        dates.append(meeting_start.date())
+        places = {}
+        arrivals = sorted(
+            ((rng.randint(-5, 30), member) for member in world.members if rng.random() < 0.8),
+            key=lambda arrival: arrival[0],
+        )
+        for minute in range(-5, 61):
+            events = []
+            for offset, member in arrivals:
+                if offset == minute:
+                    places[member.id] = rng.choice(world.meeting)
+                    events.append((member, state(None), state(places[member.id])))
+            for member_id, channel in list(places.items()):
+                roll = rng.random()
+                member = world.members[member_id - 1_000_000]
+                if roll < 0.05:
+                    events.append((member, state(channel), state(channel, True)))
+                elif roll < 0.06:
+                    events.append((member, state(channel), state(None)))
+                    del places[member_id]
+            if events:
+                bursts.append((meeting_start + timedelta(minutes=minute), events))
+    return dates, bursts
+
+
+SCENARIOS = {
+    "join_storm": join_storm,
+    "mute_churn": mute_churn,
+    "channel_hopping": channel_hopping,
+    "multi_day": multi_day,
+}
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+async def replay(name, members, seed, tmp):
+    world = World(members)
+    rng = random.Random(seed)
+    start = datetime(2024, 3, 4, 9, 0, 0)
+    dates, bursts = SCENARIOS[name](world, rng, start)
+
+    db_path = os.path.join(tmp, f"{name}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    cog = PunctualityTracker(world.bot, db)
+    cog.meeting_channels.update(channel.id for channel in world.meeting)
+    cog.announcement_channels[GUILD_ID] = world.announcements.id
+    for date in dates:
+        for channel in world.meeting:
+            await db.create_meeting(
+                datetime.combine(date, start.time()), channel.id, guild_id=GUILD_ID
+            )
+
+    latencies = []
+
+    async def handle(member, before, after):
+        # Time spent queued behind the rest of the burst shows up as loop lag
+        started = time.perf_counter()
+        await cog.on_voice_state_update(member, before, after)
+        latencies.append(time.perf_counter() - started)
+
+    stop = asyncio.Event()
+    lag = []
+    monitor = asyncio.create_task(measure_lag(stop, lag))
+    tasks = []
+    started = time.perf_counter()
+    for when, events in bursts:
+        SimulatedClock.current = when
+        for member, before, after in events:
+            tasks.append(asyncio.create_task(handle(member, before, after)))
+        # Let the burst run before moving the clock on
+        await asyncio.gather(*tasks)
+        tasks.clear()
+    await cog.write_buffer.flush()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    rows = sum(
+        count for count, *_ in [
+            await db.get_report_summary(meeting.id)
+            for meeting in await db.get_all_meetings(limit=len(dates) * MEETING_CHANNELS)
+        ]
+    )
+    await cog.cog_unload()
+
+    latencies.sort()
+    lag = sorted(lag) or [0.0]
+    return {
+        "events": len(latencies),
+        "rows": rows,
+        "events_per_sec": round(len(latencies) / elapsed),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "lag_mean_ms": round(statistics.mean(lag), 3),
+        "lag_p99_ms": round(percentile(lag, 0.99), 3),
+    }
+
+
+def compare(results, baseline):
+    """Print the change against the baseline; returns True if anything regressed"""
+    regressed = False
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in REGRESSION_METRICS:
+            old, new = previous[metric], result[metric]
+            # Ignore jitter of a couple of milliseconds on small figures
+            if new > old * (1 + REGRESSION_TOLERANCE) and new - old > REGRESSION_FLOOR_MS:
+                regressed = True
+                print(f"REGRESSION {name}.{metric}: {old} -> {new}")
+        if result["rows"] != previous["rows"]:
+            regressed = True
+            print(f"CHANGED {name}.rows: {previous['rows']} -> {result['rows']}")
+    return regressed
+
+
+async def main(args):
+    original = timeutil.now
+    timeutil.now = SimulatedClock.now
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = {}
+            print(f"{'scenario':<16} {'events':>7} {'rows':>6} {'events/s':>9} "
+                  f"{'p50 ms':>8} {'p99 ms':>8} {'lag ms':>8} {'lag p99':>8}")
+            for name in args.scenarios:
+                # Median of several runs keeps one noisy run from looking like a regression
+                runs = [await replay(name, args.members, args.seed, tmp) for _ in range(args.repeat)]
+                result = results[name] = {
+                    metric: statistics.median(run[metric] for run in runs) for metric in runs[0]
+                }
+                print(f"{name:<16} {result['events']:>7} {result['rows']:>6} "
+                      f"{result['events_per_sec']:>9} {result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f} "
+                      f"{result['lag_mean_ms']:>8.3f} {result['lag_p99_ms']:>8.3f}")
+    finally:
+        timeutil.now = original
+
+    if args.save:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as fp:
+            json.dump({"members": args.members, "seed": args.seed, "results": results}, fp, indent=2)
+            fp.write("\n")
+        print(f"Saved baseline to {BASELINE_PATH}")
+    elif args.compare:
+        with open(BASELINE_PATH) as fp:
+            baseline = json.load(fp)
+        if (baseline["members"], baseline["seed"]) != (args.members, args.seed):
+            print("Baseline was recorded with different --members/--seed; not comparing")
+            return 1
+        if compare(results, baseline["results"]):
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--members", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save", action="store_true", help="write results as the new baseline")
+    mode.add_argument("--compare", action="store_true", help="fail if results regress against the baseline")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,224 @@
+# benchmarks/report_cache.py
+"""Repeated !report and !meetings calls with the rendered-report cache.
+
+Stores a closed meeting of ``--members`` attendees (paged embeds), a closed
+one ten times that size (sent as a file) and a running one, then asks for
+each report ``--repeats`` times, counting DatabaseManager calls through
+the DB latency histograms. Between rounds it adds a late joiner to the
+running meeting (left in the write buffer), forgives the first meeting's
+fees (which must notify listeners like !refees apply does), re-evaluates
+fees with the writer's answer lost (the reply must say what a fresh
+preview finds) and starts a new meeting, and checks every cached answer
+against a fresh render.
+Finally it renders many meetings into a small cache to check the budget.
+
+Exits non-zero if a repeated request touched the database, a cached
+answer differs from a fresh one after a change, or the cache outgrew its
+budget.
+
+    python -m benchmarks.report_cache --members 150 --repeats 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+from benchmarks.multi_channel_events import FakeBot, FakeChannel
+from cogs.punctuality_tracker import PunctualityTracker
+from utils import timeutil
+from utils.db_manager import DatabaseManager
+from utils.fee_policy import calculate_fee
+from utils.metrics import DB_LATENCY
+from utils.report_cache import ReportCache
+from utils.writer_service import WriteOutcomeUnknown
+
+GUILD_ID = 1
+VOICE_ID = 10
+ANNOUNCEMENTS_ID = 11
+
+
+class FakeContext:
+    """Records what a command sends, flattened so answers can be compared"""
+
+    def __init__(self, guild):
+        self.id = 0
+        self.guild = guild
+        self.author = SimpleNamespace(voice=None)
+        self.sent = []
+
+    async def send(self, content=None, embed=None, file=None, **kwargs):
+        self.sent.append((
+            content,
+            embed and (embed.title, embed.description, embed.footer.text),
+            file and file.fp.read(),
+        ))
+
+    def take(self):
+        sent, self.sent = self.sent, []
+        return sent
+
+
+def db_calls():
+    return sum(histogram.count for histogram in DB_LATENCY.children.values())
+
+
+async def ask(cog, ctx, command, *args):
+    """Run a command; returns (answer, database calls, seconds)"""
+    calls = db_calls()
+    started = time.perf_counter()
+    await command.callback(cog, ctx, *args)
+    return ctx.take(), db_calls() - calls, time.perf_counter() - started
+
+
+async def main(members, repeats):
+    failures = []
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "reports.db"))
+        await db.initialize()
+        guild = SimpleNamespace(id=GUILD_ID, members=[], filesize_limit=25 * 1024 * 1024)
+        voice = FakeChannel(VOICE_ID, guild)
+        guild.voice_channels = [voice]
+        bot = FakeBot()
+        bot.channels = {VOICE_ID: voice, ANNOUNCEMENTS_ID: FakeChannel(ANNOUNCEMENTS_ID, guild)}
+        dispatched = []
+        bot.dispatch = lambda event, *args: dispatched.append(event)
+        cog = PunctualityTracker(bot, db)
+        cog.meeting_channels.add(VOICE_ID)
+        cog.announcement_channels[GUILD_ID] = ANNOUNCEMENTS_ID
+        ctx = FakeContext(guild)
+
+        now = timeutil.now().replace(microsecond=0)
+        meetings = {}
+        for label, days_ago, size, status in (
+            ("closed", 1, members, "closed"),
+            ("file", 2, members * 10, "closed"),
+            ("running", 0, members, "active"),
+        ):
+            start = now - timedelta(days=days_ago, minutes=30)
+            meeting_id = await db.create_meeting(start, VOICE_ID, label, GUILD_ID, status)
+            await db.record_punctuality_batch([
+                (meeting_id, user_id, f"user{user_id}", start + timedelta(seconds=user_id * 7),
+                 *calculate_fee(user_id * 7, 1, 200.0))
+                for user_id in range(1, size + 1)
+            ])
+            meetings[label] = (meeting_id, f"{start:%Y-%m-%d}")
+        cog.cache_meeting(VOICE_ID, meetings["running"][0], now - timedelta(minutes=30), GUILD_ID)
+
+        async def fresh(command, *args):
+            """The answer with an empty cache"""
+            cache, cog.report_cache = cog.report_cache, ReportCache()
+            answer, _, _ = await ask(cog, ctx, command, *args)
+            cog.report_cache = cache
+            return answer
+
+        async def check(label, command, *args):
+            """Ask once cold, then repeatedly; the repeats must match and skip the database"""
+            cold, cold_calls, cold_seconds = await ask(cog, ctx, command, *args)
+            warm_calls = 0
+            warm_seconds = 0.0
+            for _ in range(repeats):
+                answer, calls, seconds = await ask(cog, ctx, command, *args)
+                warm_calls += calls
+                warm_seconds += seconds
+                if answer != cold:
+                    failures.append(f"{label}: a repeated answer differs from the first")
+                    break
+            if warm_calls:
+                failures.append(f"{label}: {warm_calls} database calls over {repeats} repeats")
+            if cold != await fresh(command, *args):
+                failures.append(f"{label}: cached answer differs from a fresh render")
+            rows.append((label, cold_calls, cold_seconds * 1000, warm_calls, warm_seconds / repeats * 1000))
+
+        for label in ("closed", "file", "running"):
+            await check(f"report {label}", cog.get_report, meetings[label][1])
+        await check("meetings", cog.list_meetings, None)
+
+        # A late joiner still in the write buffer, as right after a join
+        running_id, today = meetings["running"]
+        cog.write_buffer.add(running_id, 99_999, "latecomer", now, 29, 29 * 200.0)
+        await check("report after join", cog.get_report, today)
+        if not any("latecomer" in embed[1] for _, embed, _ in await fresh(cog.get_report, today)):
+            failures.append("the late joiner is missing from the report")
+
+        # Forgiving fees rewrites the closed meeting's report
+        closed_id, closed_day = meetings["closed"]
+        await cog.forgive.callback(cog, ctx, closed_id)
+        ctx.take()
+        await check("report after forgive", cog.get_report, closed_day)
+        footer = (await fresh(cog.get_report, closed_day))[0][1][2]
+        if not footer.endswith("Total Fees: $0.00"):
+            failures.append(f"forgiven report still shows fees: {footer}")
+        if "fees_reevaluated" not in dispatched:
+            failures.append("forgiving did not dispatch fees_reevaluated for the loyalty cog")
+
+        # !refees apply whose answer never comes back: once committed, once not
+        file_id, file_day = meetings["file"]
+        reevaluate = db.reevaluate_fees
+        await db.add_fee_policy(GUILD_ID, (now - timedelta(days=3)).date(), 0, 5.0)
+        for commits, expected in ((False, "still finds"), (True, "nothing left to change")):
+            async def lost_answer(*args, **kwargs):
+                if commits:
+                    await reevaluate(*args, **kwargs)
+                raise WriteOutcomeUnknown("_reevaluate_fees")
+            db.reevaluate_fees = lost_answer
+            await check("report before refees", cog.get_report, file_day)
+            await cog.reevaluate_fees.callback(cog, ctx, file_day, file_day, "apply")
+            await cog.fee_task
+            reply = ctx.take()[-1][0]
+            if expected not in reply:
+                failures.append(f"refees with a lost answer replied {reply!r}, expected {expected!r}")
+            await check("report after refees", cog.get_report, file_day)
+        db.reevaluate_fees = reevaluate
+        
+        # A new meeting shows up in !meetings
+        await cog.start_meeting.callback(cog, ctx, description="standup")
+        ctx.take()
+        await check("meetings after start", cog.list_meetings, None)
+        if "standup" not in (await fresh(cog.list_meetings, None))[0][0]:
+            failures.append("the new meeting is missing from !meetings")
+
+        stats = cog.report_cache
+        print(f"cache: {stats.hits} hits, {stats.misses} misses, {len(stats)} entries, "
+              f"{stats.bytes / 1024:.0f} KiB, {stats.invalidations} invalidated")
+
+        # Many meetings into a small budget: least recently used go first
+        small = cog.report_cache = ReportCache(max_bytes=64 * 1024)
+        for days_ago in range(3, 43):
+            start = now - timedelta(days=days_ago)
+            meeting_id = await db.create_meeting(start, VOICE_ID, "old", GUILD_ID, "closed")
+            await db.record_punctuality_batch([
+                (meeting_id, user_id, f"user{user_id}", start, 0, 0) for user_id in range(1, 41)
+            ])
+            await ask(cog, ctx, cog.get_report, f"{start:%Y-%m-%d}")
+        if small.bytes > small.max_bytes:
+            failures.append(f"cache holds {small.bytes} bytes over a {small.max_bytes} budget")
+        if not small.evictions:
+            failures.append("nothing was evicted from the small cache")
+        print(f"small cache: {len(small)} entries, {small.bytes / 1024:.0f}/{small.max_bytes / 1024:.0f} KiB, "
+              f"{small.evictions} evicted")
+
+        await cog.cog_unload()
+
+    print(f"{'request':<22} {'cold calls':>10} {'cold ms':>8} {'repeat calls':>12} {'repeat ms':>9}")
+    for label, cold_calls, cold_ms, warm_calls, warm_ms in rows:
+        print(f"{label:<22} {cold_calls:>10} {cold_ms:>8.2f} {warm_calls:>12} {warm_ms:>9.3f}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+    print("ok: repeated reports skip the database and stay current")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=150)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.members, args.repeats)))
@@ -0,0 +1,182 @@
+# benchmarks/retention.py
+"""Archival and compaction while the bot keeps recording joins.
+
+Builds ``--days`` daily meetings of ``--members`` attendees ending today,
+plus an open meeting that keeps taking joins. One retention run then
+archives everything older than ``--retention-days`` while a writer task
+records a join every few milliseconds. It reports the join latency with
+and without archival running, the event-loop lag, and the hot database
+size before and after.
+
+Exits non-zero if a join waited longer than JOIN_P99_LIMIT_MS at p99, the
+hot file did not shrink, or reports, exports and rollups for archived
+months differ from before.
+
+    python -m benchmarks.retention --days 730 --members 300
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.db_event_loop_lag import measure_lag
+from config import Config
+from utils import timeutil
+from utils.db_manager import DatabaseManager
+from utils.retention import RetentionManager
+
+JOIN_P99_LIMIT_MS = 250
+JOIN_INTERVAL = 0.005
+GUILD_ID = 1
+
+
+def populate(db_path, first_day, days, members):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO meetings (id, meeting_date, start_ts, channel_id, guild_id, status) "
+        "VALUES (?, ?, ?, 1, ?, 'closed')",
+        (
+            (day + 1, (first_day + timedelta(days=day)).strftime("%Y-%m-%d"),
+             timeutil.to_epoch(first_day + timedelta(days=day)), GUILD_ID)
+            for day in range(days)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO users (user_id, user_name) VALUES (?, ?)",
+        ((user, f"member-{user}") for user in range(members)),
+    )
+    conn.execute(
+        """
+        WITH RECURSIVE member(user_id) AS (
+            SELECT 0 UNION ALL SELECT user_id + 1 FROM member WHERE user_id + 1 < ?
+        )
+        INSERT INTO punctuality (meeting_id, user_id, join_ts, late_minutes, fee_amount)
+        SELECT m.id, member.user_id, m.start_ts + (member.user_id * 7 + m.id) % 900,
+               (member.user_id * 7 + m.id) % 900 / 60, (member.user_id * 7 + m.id) % 900 / 60 * 200.0
+        FROM meetings m, member
+        """,
+        (members,),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def snapshot(db, first_day, last_day, old_month):
+    """Everything a user could see about archived history"""
+    old = await db.get_active_meeting(1, first_day.strftime("%Y-%m-%d"), open_only=False)
+    report = await db.get_punctuality_report(old.id) if old else None
+    return {
+        "report": report,
+        "summary": await db.get_report_summary(old.id) if old else None,
+        "exported": await db.count_attendance(first_day, last_day, GUILD_ID),
+        "streamed": await db.stream_attendance(
+            first_day, last_day, lambda rows: sum(1 for _ in rows), GUILD_ID
+        ),
+        "meetings": [m.id for m in await db.get_all_meetings(limit=25, before_id=old.id + 20)]
+        if old else None,
+        "leaderboard": await db.get_leaderboard(GUILD_ID, old_month),
+    }
+
+
+async def record_joins(db, meeting_id, stop, latencies):
+    """Record a join every JOIN_INTERVAL seconds until stopped"""
+    user_id = 1_000_000 + len(latencies)
+    while not stop.is_set():
+        started = time.perf_counter()
+        await db.record_punctuality(meeting_id, user_id, f"member-{user_id}", timeutil.now(), 0, 0)
+        latencies.append((time.perf_counter() - started) * 1000)
+        user_id += 1
+        await asyncio.sleep(JOIN_INTERVAL)
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples) or [0.0]
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+async def measure(db, meeting_id, work):
+    """Join latencies and loop lag while ``work`` runs; returns (result, joins, lag, seconds)"""
+    stop = asyncio.Event()
+    joins, lag = [], []
+    writer = asyncio.create_task(record_joins(db, meeting_id, stop, joins))
+    monitor = asyncio.create_task(measure_lag(stop, lag))
+    started = time.perf_counter()
+    result = await work()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(writer, monitor)
+    return result, joins, lag, elapsed
+
+
+async def main(days, members, retention_days, batch):
+    today = timeutil.now().replace(hour=9, minute=0, second=0, microsecond=0)
+    first_day = today - timedelta(days=days)
+    old_month = first_day.strftime("%Y-%m")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "retention.db"), archive_path=os.path.join(tmp, "archive"))
+        await db.initialize()
+        started = time.perf_counter()
+        populate(db.db_path, first_day, days, members)
+        live = await db.create_meeting(today, 1, "live", GUILD_ID)
+        await db.rebuild_rollups()
+        print(f"built {days * members} rows in {time.perf_counter() - started:.1f}s")
+
+        before = await snapshot(db, first_day, today, old_month)
+        hot_before = os.path.getsize(db.db_path)
+
+        retention = RetentionManager(db, retention_days=retention_days, batch_meetings=batch)
+        _, idle_joins, idle_lag, _ = await measure(db, live, lambda: asyncio.sleep(1))
+        (meetings, rows, freed), busy_joins, busy_lag, elapsed = await measure(
+            db, live, retention.run_once
+        )
+
+        after = await snapshot(db, first_day, today, old_month)
+        mismatches = await db.rebuild_rollups()
+        hot_after = os.path.getsize(db.db_path)
+        archive_bytes = sum(
+            os.path.getsize(os.path.join(tmp, "archive", name))
+            for name in os.listdir(os.path.join(tmp, "archive"))
+        )
+        await db.close()
+
+    print(f"archived {meetings} meetings ({rows} rows) before {retention.cutoff()} "
+          f"in {elapsed:.1f}s, freed {freed} pages")
+    print(f"hot db {hot_before / 1024 / 1024:.1f} MB -> {hot_after / 1024 / 1024:.1f} MB, "
+          f"archives {archive_bytes / 1024 / 1024:.1f} MB")
+    print(f"{'':<12} {'joins':>6} {'join p50':>9} {'join p99':>9} {'join max':>9} {'lag p99':>8}")
+    for label, joins, lag in (("idle", idle_joins, idle_lag), ("archiving", busy_joins, busy_lag)):
+        print(f"{label:<12} {len(joins):>6} {percentile(joins, 0.5):>7.2f}ms "
+              f"{percentile(joins, 0.99):>7.2f}ms {max(joins):>7.2f}ms {percentile(lag, 0.99):>6.2f}ms")
+
+    failures = []
+    for key in before:
+        if before[key] != after[key]:
+            failures.append(f"{key} differs after archival")
+    if not meetings:
+        failures.append("nothing was archived")
+    if mismatches:
+        failures.append(f"{mismatches} rollup rows out of sync after archival")
+    if hot_after >= hot_before:
+        failures.append("hot database did not shrink")
+    if percentile(busy_joins, 0.99) > JOIN_P99_LIMIT_MS:
+        failures.append(f"join p99 above {JOIN_P99_LIMIT_MS}ms while archiving")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+    print("ok: archived history reads the same and joins kept flowing")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--members", type=int, default=300)
+    parser.add_argument("--retention-days", type=int, default=90)
+    parser.add_argument("--batch", type=int, default=Config.ARCHIVE_BATCH_MEETINGS)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.days, args.members, args.retention_days, args.batch)))
@@ -0,0 +1,241 @@
+# benchmarks/row_models.py
+"""Per-row cost of the punctuality row layout: legacy TEXT tuples vs epoch models.
+
+Builds ``--meetings`` meetings attended by the same ``--members`` members in
+each layout and reports, per row:
+
+    fetch    reading one meeting's report rows from SQLite into model objects
+    parse    turning each row into a usable wall-clock join time
+    memory   bytes held by the models plus their join times
+    disk     bytes of the vacuumed database file
+
+The legacy layout stores the display name and an "HH:MM:SS" join time on
+every row and builds the previous dataclass model through
+``from_db_record``; the current one stores epoch seconds, keeps names in
+``users`` and builds AttendanceRecord NamedTuples.
+
+    python -m benchmarks.row_models --meetings 50 --members 2000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain
+
+from attendance import ATTENDANCE_COLUMNS, attendance_from_row
+from utils import timeutil
+
+MEETING_DATE = "2024-03-04"
+MEETING_START = datetime(2024, 3, 4, 9, 0, 0)
+
+@dataclass
+class LegacyAttendanceRecord:
+    """The attendance model before epoch storage, kept here for comparison"""
+
+    id: int = None
+    meeting_id: int = None
+    user_id: int = None
+    user_name: str = None
+    join_time: str = None
+    leave_time: str = None
+    late_minutes: int = 0
+    fee_amount: float = 0.0
+
+    @classmethod
+    def from_db_record(cls, record):
+        if not record:
+            return None
+        return cls(
+            id=record[0],
+            meeting_id=record[1],
+            user_id=record[2],
+            user_name=record[3],
+            join_time=record[4],
+            leave_time=record[5] if len(record) > 5 else None,
+            late_minutes=record[6] if len(record) > 6 else 0,
+            fee_amount=record[7] if len(record) > 7 else 0.0,
+        )
+
+
+LEGACY_SCHEMA = """
+CREATE TABLE punctuality (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    meeting_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    user_name TEXT NOT NULL,
+    join_time TEXT NOT NULL,
+    late_minutes INTEGER DEFAULT 0,
+    fee_amount REAL DEFAULT 0
+);
+CREATE UNIQUE INDEX idx_punctuality_meeting_user ON punctuality (meeting_id, user_id);
+CREATE INDEX idx_punctuality_meeting_late ON punctuality (meeting_id, late_minutes DESC);
+"""
+
+CURRENT_SCHEMA = """
+CREATE TABLE users (user_id INTEGER PRIMARY KEY, user_name TEXT NOT NULL);
+CREATE TABLE punctuality (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    meeting_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    join_ts INTEGER NOT NULL,
+    late_minutes INTEGER NOT NULL DEFAULT 0,
+    fee_amount REAL NOT NULL DEFAULT 0,
+    leave_ts INTEGER,
+    attended_seconds INTEGER
+);
+CREATE UNIQUE INDEX idx_punctuality_meeting_user ON punctuality (meeting_id, user_id);
+CREATE INDEX idx_punctuality_meeting_late ON punctuality (meeting_id, late_minutes DESC);
+"""
+
+LEGACY_REPORT = """
+SELECT id, meeting_id, user_id, user_name, join_time, NULL, late_minutes, fee_amount
+FROM punctuality WHERE meeting_id = 1
+ORDER BY late_minutes DESC
+"""
+
+CURRENT_REPORT = f"""
+SELECT {ATTENDANCE_COLUMNS}
+FROM punctuality p LEFT JOIN users u ON u.user_id = p.user_id
+WHERE p.meeting_id = 1
+ORDER BY p.late_minutes DESC
+"""
+
+
+def build(path, meetings, members):
+    """Create both layouts with the same attendance; returns {layout: connection}"""
+    start_ts = timeutil.to_epoch(MEETING_START)
+    joins = [
+        (meeting_id, user_id, (user_id * 7 + meeting_id * 13) % 3600)
+        for meeting_id in range(1, meetings + 1)
+        for user_id in range(members)
+    ]
+
+    legacy = sqlite3.connect(os.path.join(path, "legacy.db"))
+    legacy.executescript(LEGACY_SCHEMA)
+    legacy.executemany(
+        "INSERT INTO punctuality (meeting_id, user_id, user_name, join_time, late_minutes, fee_amount) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (meeting_id, user_id, f"member-{user_id}", f"09:{offset // 60:02d}:{offset % 60:02d}",
+             offset // 60, offset // 60 * 200.0)
+            for meeting_id, user_id, offset in joins
+        ),
+    )
+
+    current = sqlite3.connect(os.path.join(path, "current.db"))
+    current.executescript(CURRENT_SCHEMA)
+    current.executemany(
+        "INSERT INTO users (user_id, user_name) VALUES (?, ?)",
+        ((user_id, f"member-{user_id}") for user_id in range(members)),
+    )
+    current.executemany(
+        "INSERT INTO punctuality (meeting_id, user_id, join_ts, late_minutes, fee_amount) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (
+            (meeting_id, user_id, start_ts + offset, offset // 60, offset // 60 * 200.0)
+            for meeting_id, user_id, offset in joins
+        ),
+    )
+
+    for conn in (legacy, current):
+        conn.commit()
+        conn.execute("VACUUM")
+    return {"legacy": legacy, "current": current}, len(joins)
+
+
+def fetch(layout, conn):
+    cursor = conn.cursor()
+    if layout == "legacy":
+        return [
+            LegacyAttendanceRecord.from_db_record(row) for row in cursor.execute(LEGACY_REPORT)
+        ]
+    return list(map(attendance_from_row, cursor.execute(CURRENT_REPORT)))
+
+
+def parse(layout, rows):
+    """The wall-clock join time of every row, as the cog and reports need it"""
+    if layout == "legacy":
+        return [
+            datetime.strptime(f"{MEETING_DATE} {row.join_time}", "%Y-%m-%d %H:%M:%S")
+            for row in rows
+        ]
+    return [row.join_time for row in rows]
+
+
+def held_bytes(rows, times):
+    """Size of every distinct object the models and join times keep alive"""
+    objects = chain(
+        rows,
+        times,
+        *(vars(row).values() if hasattr(row, "__dict__") else row for row in rows),
+        (vars(row) for row in rows if hasattr(row, "__dict__")),
+    )
+    seen = set()
+    total = 0
+    for obj in objects:
+        if id(obj) not in seen:
+            seen.add(id(obj))
+            total += sys.getsizeof(obj)
+    return total
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def measure(layout, conn, total_rows, repeat):
+    fetched = fetch(layout, conn)
+    rows = len(fetched)
+    fetch_s = best_of(lambda: fetch(layout, conn), repeat)
+    parse_s = best_of(lambda: parse(layout, fetched), repeat)
+    del fetched
+
+    held = fetch(layout, conn)
+    memory = held_bytes(held, parse(layout, held))
+
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    return {
+        "fetch_us": fetch_s / rows * 1e6,
+        "parse_us": parse_s / rows * 1e6,
+        "memory_b": memory / rows,
+        "disk_b": os.path.getsize(path) / total_rows,
+    }
+
+
+def main(meetings, members, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        connections, total_rows = build(tmp, meetings, members)
+        results = {
+            layout: measure(layout, conn, total_rows, repeat)
+            for layout, conn in connections.items()
+        }
+        for conn in connections.values():
+            conn.close()
+
+    print(f"{meetings} meetings x {members} members, per-row cost (best of {repeat})")
+    print(f"{'layout':<8} {'fetch us':>9} {'parse us':>9} {'memory B':>9} {'disk B':>8}")
+    for layout, result in results.items():
+        print(f"{layout:<8} {result['fetch_us']:>9.3f} {result['parse_us']:>9.3f} "
+              f"{result['memory_b']:>9.1f} {result['disk_b']:>8.1f}")
+    legacy, current = results["legacy"], results["current"]
+    for metric in ("fetch_us", "parse_us", "memory_b", "disk_b"):
+        change = current[metric] / legacy[metric] - 1 if legacy[metric] else 0.0
+        print(f"  {metric:<9} {change * 100:+6.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=50)
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.meetings, args.members, args.repeat)
@@ -0,0 +1,309 @@
+# benchmarks/sessions.py
+"""Attendance sessions: cost of voice events and accuracy of time attended.
+
+Drives ``on_voice_state_update`` directly (one coroutine step per event, no
+event loop) and reports, per event kind, the mean cost and the memory
+allocated beyond what stepping an empty coroutine costs. Mute, deafen and
+stream toggles must allocate nothing.
+
+It then replays a scripted meeting with leaves and rejoins on a simulated
+clock, ends it through the expiry event and checks the stored minutes and
+early leavers: only those leaving before the meeting's planned length.
+A second meeting runs past midnight and is ended by !endmeeting. A third
+is started with !startmeeting while one is scheduled later that day; a
+join must land on the started meeting. Last, it runs !shutdown during a
+meeting and checks the time attended so far was saved.
+
+    python -m benchmarks.sessions --events 100000
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from benchmarks.multi_channel_events import FakeBot, FakeChannel, make_member
+from cogs.punctuality_tracker import PunctualityTracker
+from utils import timeutil
+from utils.db_manager import DatabaseManager
+
+GUILD = SimpleNamespace(id=1)
+START = datetime(2024, 3, 4, 9, 0, 0)
+
+
+class SimulatedClock:
+    current = START
+
+    @classmethod
+    def now(cls):
+        return cls.current
+
+
+def state(channel, self_mute=False):
+    return SimpleNamespace(channel=channel, self_mute=self_mute)
+
+
+def step(coro):
+    """Run a coroutine that never suspends to completion"""
+    try:
+        coro.send(None)
+    except StopIteration:
+        pass
+
+
+async def noop(member, before, after):
+    return None
+
+
+def measure(handler, events):
+    """(mean ns per event, bytes allocated at peak per event) for ``events``"""
+    started = time.perf_counter_ns()
+    for member, before, after in events:
+        step(handler(member, before, after))
+    elapsed = time.perf_counter_ns() - started
+
+    # Peak over a single event, so transient allocations show up; the median
+    # ignores one-off interpreter warm-up
+    tracemalloc.start()
+    peaks = []
+    for member, before, after in events[:1000]:
+        coro = handler(member, before, after)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        step(coro)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        del coro
+    tracemalloc.stop()
+    return elapsed / len(events), statistics.median(peaks)
+
+
+def build(db, meeting_id=1, start=START):
+    bot = FakeBot()
+    cog = PunctualityTracker(bot, db)
+    channel = FakeChannel(10, GUILD)
+    other = FakeChannel(11, GUILD)
+    announcements = FakeChannel(12, GUILD)
+    for fake in (channel, other, announcements):
+        bot.channels[fake.id] = fake
+    cog.meeting_channels.add(channel.id)
+    cog.announcement_channels[GUILD.id] = announcements.id
+    cog.cache_meeting(channel.id, meeting_id, start, GUILD.id)
+    return cog, channel, other
+
+
+def event_costs(cog, channel, other, count):
+    members = [make_member(1000 + i, GUILD) for i in range(1000)]
+    seated = [(m, state(channel), state(channel, True)) for m in members]
+    toggles = (seated * (count // len(seated) + 1))[:count]
+    # Leaves to a non-meeting channel and back again, alternating
+    moves = []
+    for i in range(count):
+        member = members[i % len(members)]
+        if (i // len(members)) % 2 == 0:
+            moves.append((member, state(channel), state(other)))
+        else:
+            moves.append((member, state(other), state(channel)))
+    idle = [(m, state(other), state(other, True)) for m in members] * (count // len(members))
+
+    # Everyone is recorded already, so rejoins take the duplicate path
+    meeting = cog.meeting_cache[(channel.id, START.date())]
+    meeting.attendees.update(m.id for m in members)
+    for member in members:
+        meeting.open_session(member.id, meeting.start_ts)
+
+    results = {"empty coroutine": measure(noop, toggles)}
+    results["mute toggle"] = measure(cog.on_voice_state_update, toggles)
+    results["idle channel"] = measure(cog.on_voice_state_update, idle)
+    results["leave/rejoin"] = measure(cog.on_voice_state_update, moves)
+    return results
+
+
+async def scripted_meeting(cog, channel, other):
+    """Scripted visits; returns the stored (user_id, minutes, left early) per member"""
+    alice, bob, carol, dave = (make_member(user_id, GUILD) for user_id in (1, 2, 3, 4))
+    script = [
+        (-5, alice, None, channel),    # early, counted from the start
+        (2, dave, None, channel),
+        (5, bob, None, channel),
+        (10, alice, channel, None),
+        (12, carol, None, channel),
+        (15, bob, channel, other),     # leaves for good
+        (20, alice, None, channel),
+        (25, carol, channel, channel),  # mute toggle
+        (31, dave, channel, None),     # after the 30 minute meeting: not early
+    ]
+    for minute, member, before, after in script:
+        SimulatedClock.current = START + timedelta(minutes=minute)
+        await cog.on_voice_state_update(member, state(before), state(after))
+
+    SimulatedClock.current = START + timedelta(minutes=35)
+    await cog.handle_scheduled_event(
+        SimpleNamespace(key=1, kind="expiry", payload=(channel.id, GUILD.id, START, None))
+    )
+    report = await cog.db.get_punctuality_report(1)
+    return sorted(
+        (record.user_id, record.minutes_attended, record.leave_ts is not None) for record in report
+    )
+
+
+async def overnight_meeting(db_path):
+    """A meeting from 23:50 ended by !endmeeting at 00:15; returns (user_id, minutes, left early)"""
+    start = datetime(2024, 3, 4, 23, 50)
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    meeting_id = await db.create_meeting(start, 10, guild_id=GUILD.id)
+    cog, channel, _ = build(db, meeting_id, start)
+    cog.scheduler.schedule(
+        meeting_id, "expiry", start + timedelta(minutes=120), (channel.id, GUILD.id, start, None)
+    )
+    erin, frank = make_member(5, GUILD), make_member(6, GUILD)
+    script = [
+        (0, erin, None, channel),
+        (0, frank, None, channel),
+        (15, erin, channel, None),     # past midnight
+        (20, erin, None, channel),
+        (22, frank, channel, None),    # before !endmeeting: early
+    ]
+    for minute, member, before, after in script:
+        SimulatedClock.current = start + timedelta(minutes=minute)
+        await cog.on_voice_state_update(member, state(before), state(after))
+
+    SimulatedClock.current = start + timedelta(minutes=25)
+    ctx = FakeChannel(13, SimpleNamespace(id=GUILD.id, voice_channels=[channel]))
+    ctx.author = SimpleNamespace(voice=None)
+    await cog.end_meeting.callback(cog, ctx)
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if cog.meeting_cache.get((channel.id, start.date())) is None:
+            break
+    report = await db.get_punctuality_report(meeting_id)
+    await cog.cog_unload()
+    return sorted(
+        (record.user_id, record.minutes_attended, record.leave_ts is not None) for record in report
+    )
+
+
+async def start_over_schedule(db_path):
+    """!schedule 60, then !startmeeting and a join; returns the stored (meeting status, user_id) rows"""
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    cog, channel, _ = build(db)
+    cog.meeting_cache.clear()  # no meeting until the commands create them
+    ctx = FakeChannel(13, SimpleNamespace(id=GUILD.id, voice_channels=[channel]))
+    ctx.author = SimpleNamespace(voice=None)
+
+    SimulatedClock.current = START
+    await cog.schedule_meeting.callback(cog, ctx, "60")
+    SimulatedClock.current = START + timedelta(minutes=5)
+    await cog.start_meeting.callback(cog, ctx)
+    SimulatedClock.current = START + timedelta(minutes=7)
+    await cog.on_voice_state_update(make_member(7, GUILD), state(None), state(channel))
+    await cog.cog_unload()
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT m.status, p.user_id FROM punctuality p JOIN meetings m ON m.id = p.meeting_id"
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+class ClosingBot(FakeBot):
+    """Unloads its cogs on close(), as discord.py's Bot.close does"""
+
+    def __init__(self):
+        super().__init__()
+        self.cogs = []
+
+    async def close(self):
+        for cog in self.cogs:
+            await cog.cog_unload()
+
+
+async def shutdown_keeps_sessions(db_path):
+    """Stored (user_id, attended_seconds) after !shutdown during a meeting"""
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    meeting_id = await db.create_meeting(START, 10, guild_id=GUILD.id)
+    cog, channel, _ = build(db, meeting_id)
+    cog.bot = ClosingBot()
+    cog.bot.channels = {channel.id: channel}
+    cog.bot.cogs.append(cog)
+
+    SimulatedClock.current = START + timedelta(minutes=2)
+    await cog.on_voice_state_update(make_member(1, GUILD), state(None), state(channel))
+    SimulatedClock.current = START + timedelta(minutes=12)
+    await cog.shutdown.callback(cog, FakeChannel(13, GUILD))
+
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    stored = [(user_id, seconds) for user_id, seconds, _ in await db.get_sessions(meeting_id)]
+    await db.close()
+    return stored
+
+
+async def main(count):
+    original = timeutil.now
+    timeutil.now = SimulatedClock.now
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseManager(os.path.join(tmp, "sessions.db"))
+            await db.initialize()
+            await db.create_meeting(START, 10, guild_id=GUILD.id)
+
+            cog, channel, other = build(db)
+            costs = event_costs(cog, channel, other, count)
+
+            cog, channel, other = build(db)
+            stored = await scripted_meeting(cog, channel, other)
+            summary = await db.get_report_summary(1)
+            await cog.write_buffer.close()
+            await db.close()
+
+            overnight = await overnight_meeting(os.path.join(tmp, "overnight.db"))
+            started_early = await start_over_schedule(os.path.join(tmp, "start.db"))
+            after_shutdown = await shutdown_keeps_sessions(os.path.join(tmp, "shutdown.db"))
+    finally:
+        timeutil.now = original
+
+    print(f"{'event':<16} {'ns/event':>9} {'peak alloc B':>13}")
+    for label, (ns, peak) in costs.items():
+        print(f"{label:<16} {ns:>9.0f} {peak:>13.0f}")
+    print(f"stored sessions (user, minutes, left early): {stored}, summary {tuple(summary)}")
+    print(f"overnight meeting ended by !endmeeting: {overnight}")
+
+    expected = [(1, 25, False), (2, 10, True), (3, 23, False), (4, 29, False)]
+    failures = []
+    baseline = costs["empty coroutine"][1]
+    for label in ("mute toggle", "idle channel"):
+        if costs[label][1] > baseline:
+            failures.append(f"{label} allocated {costs[label][1] - baseline:.0f} B per event")
+    if stored != expected:
+        failures.append(f"stored sessions {stored} != {expected}")
+    if overnight != [(5, 20, False), (6, 22, True)]:
+        failures.append(f"overnight sessions {overnight} != [(5, 20, False), (6, 22, True)]")
+    if started_early != [("active", 7)]:
+        failures.append(f"join after !startmeeting over a scheduled meeting stored {started_early}")
+    if after_shutdown != [(1, 600)]:
+        failures.append(f"sessions stored by !shutdown {after_shutdown} != [(1, 600)]")
+    if summary[2] != 1:
+        failures.append(f"{summary[2]} early leavers in the summary, expected 1")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+    print("ok: toggles allocate nothing and time attended adds up")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.events)))
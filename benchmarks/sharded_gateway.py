@@ -0,0 +1,273 @@
+# benchmarks/sharded_gateway.py
+"""Sharded bot processes writing through one writer process.
+
+Starts ``writer.py`` on a Unix socket, registers a meeting channel with a
+running meeting and a scheduled one in each of ``--guilds`` guilds, then
+starts ``--shards`` shard processes. Each shard loads the cog against a
+fake gateway that delivers only its own guilds' voice events: every member
+joins twice (a duplicated gateway event), every third member also leaves
+and rejoins, and the running meeting is then ended through its expiry
+event. Finally a shard-style client rebuilds the rollups with a timeout
+far shorter than the rebuild takes, then archives one finished meeting
+through the writer and reads its report straight away.
+
+Exits non-zero unless every process exits cleanly, each meeting was
+scheduled by exactly one shard, the database holds exactly one
+punctuality row per member and meeting, each with its time attended,
+the rebuild still returns its result, and the archived meeting's report
+is unchanged.
+
+    python -m benchmarks.sharded_gateway --shards 3 --guilds 12 --members 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WRITER_START_TIMEOUT = 30
+
+
+def shard_of(guild_id, shards):
+    """The shard Discord's gateway routes a guild to"""
+    return (guild_id >> 22) % shards
+
+
+def voice(channel):
+    return SimpleNamespace(channel=channel, self_mute=False)
+
+
+async def run_shard(shard, shards, members):
+    """One shard process: replay the gateway's events for this shard's guilds"""
+    from benchmarks.multi_channel_events import FakeBot, FakeChannel, make_member
+    from cogs.punctuality_tracker import PunctualityTracker
+    from utils.db_manager import DatabaseManager
+
+    db = DatabaseManager()
+    await db.warm_up()
+    bot = FakeBot()
+    bot.shard_count, bot.shard_ids = shards, [shard]
+    cog = PunctualityTracker(bot, db)
+    await cog.cog_load()
+
+    # The fake gateway only routes this shard's guilds here
+    channels = []
+    for channel_id, guild_id in await db.get_meeting_channels():
+        if shard_of(guild_id, shards) != shard:
+            continue
+        guild = SimpleNamespace(id=guild_id)
+        channel = FakeChannel(channel_id, guild)
+        bot.channels[channel_id] = channel
+        announcements = cog.announcement_channels.get(guild_id)
+        if announcements:
+            bot.channels[announcements] = FakeChannel(announcements, guild)
+        channels.append(channel)
+
+    started = time.perf_counter()
+    for channel in channels:
+        for user_id in range(1, members + 1):
+            member = make_member(user_id, channel.guild)
+            await cog.on_voice_state_update(member, voice(None), voice(channel))
+            await cog.on_voice_state_update(member, voice(None), voice(channel))
+            if user_id % 3 == 0:
+                await cog.on_voice_state_update(member, voice(channel), voice(None))
+                await cog.on_voice_state_update(member, voice(None), voice(channel))
+    await cog.write_buffer.flush()
+    elapsed = time.perf_counter() - started
+
+    scheduled = sorted({event.key for event in cog.scheduler.pending()})
+    for event in cog.scheduler.pending():
+        if event.kind == "expiry":
+            await cog.handle_scheduled_event(event)
+    await cog.cog_unload()
+
+    print(json.dumps({
+        "shard": shard,
+        "channels": len(channels),
+        "scheduled": scheduled,
+        "seconds": elapsed,
+    }))
+    return 0
+
+
+async def seed(socket_path, guilds):
+    """Register every guild's channels and meetings through the writer"""
+    from utils import timeutil
+    from utils.db_manager import DatabaseManager
+
+    db = DatabaseManager(writer_socket=socket_path)
+    now = timeutil.now().replace(microsecond=0)
+    running, scheduled = [], []
+    for index in range(guilds):
+        # Snowflake-like ids spread over the shards like real guilds
+        guild_id = (1_000 + index * 7919) << 22 | index
+        channel_id = 10_000 + index
+        await db.add_meeting_channel(guild_id, channel_id)
+        await db.set_announcement_channel(guild_id, 20_000 + index)
+        running.append(
+            (await db.create_meeting(now - timedelta(minutes=5), channel_id, "running", guild_id), guild_id)
+        )
+        scheduled.append(
+            (await db.create_meeting(now + timedelta(hours=2), 30_000 + index, "later", guild_id, "scheduled"),
+             guild_id)
+        )
+    await db.close()
+    return running, scheduled
+
+
+async def read_archived(socket_path, meeting_id):
+    """A meeting's report rows before and right after the writer archives it, and what was moved"""
+    from utils import timeutil
+    from utils.db_manager import DatabaseManager
+
+    db = DatabaseManager(writer_socket=socket_path, read_pool_size=1)
+    before = await db.get_punctuality_report(meeting_id)
+    moved = await db.archive_meetings(timeutil.now().date() + timedelta(days=1), limit=1)
+    after = await db.get_punctuality_report(meeting_id)
+    await db.close()
+    return before, moved, after
+
+
+async def slow_maintenance(socket_path):
+    """rebuild_rollups through the writer with a 1ms client timeout; maintenance jobs wait it out"""
+    from utils.db_manager import DatabaseManager
+
+    db = DatabaseManager(writer_socket=socket_path, read_pool_size=1)
+    db._remote.timeout = 0.001
+    try:
+        return await db.rebuild_rollups()
+    finally:
+        await db.close()
+
+
+def wait_for_socket(process, socket_path):
+    deadline = time.monotonic() + WRITER_START_TIMEOUT
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("database writer did not start")
+        time.sleep(0.05)
+
+
+def main(shards, guilds, members):
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "writer.sock")
+        db_path = os.path.join(tmp, "sharded.db")
+        env = dict(
+            os.environ,
+            DATABASE_PATH=db_path,
+            DB_WRITER_SOCKET=socket_path,
+            ARCHIVE_PATH=os.path.join(tmp, "archive"),
+            LOG_PATH=os.path.join(tmp, "logs"),
+            RETENTION_DAYS="0",
+            METRICS_PORT="0",
+        )
+        os.environ.update(env)
+
+        writer = subprocess.Popen([sys.executable, "writer.py"], cwd=REPO, env=env)
+        try:
+            wait_for_socket(writer, socket_path)
+            running, scheduled = asyncio.run(seed(socket_path, guilds))
+
+            started = time.perf_counter()
+            processes = [
+                subprocess.Popen(
+                    [sys.executable, "-m", "benchmarks.sharded_gateway", "--role", "shard",
+                     "--shard", str(shard), "--shards", str(shards), "--members", str(members)],
+                    cwd=REPO, env=env, stdout=subprocess.PIPE, text=True,
+                )
+                for shard in range(shards)
+            ]
+            results = []
+            for shard, process in enumerate(processes):
+                output, _ = process.communicate()
+                if process.returncode:
+                    failures.append(f"shard {shard} exited with {process.returncode}")
+                    continue
+                results.append(json.loads(output.strip().splitlines()[-1]))
+            elapsed = time.perf_counter() - started
+
+            conn = sqlite3.connect(db_path)
+            rows = conn.execute(
+                "SELECT meeting_id, user_id, attended_seconds FROM punctuality"
+            ).fetchall()
+            statuses = dict(conn.execute("SELECT id, status FROM meetings"))
+            conn.close()
+
+            rebuilt = asyncio.run(slow_maintenance(socket_path))
+            # Readers in other processes must see the archive file as soon as the hot rows are gone
+            before, moved, after = asyncio.run(read_archived(socket_path, running[0][0]))
+        finally:
+            writer.send_signal(signal.SIGTERM)
+            writer.wait()
+        if writer.returncode:
+            failures.append(f"writer exited with {writer.returncode}")
+
+    print(f"{'shard':>5} {'guilds':>7} {'scheduled':>10} {'join s':>7}")
+    for result in results:
+        print(f"{result['shard']:>5} {result['channels']:>7} {len(result['scheduled']):>10} "
+              f"{result['seconds']:>7.2f}")
+    print(f"{len(rows)} rows from {shards} shard(s) in {elapsed:.1f}s")
+
+    # Every open meeting is scheduled by the one shard that owns its guild
+    expected_owner = {
+        meeting_id: shard_of(guild_id, shards) for meeting_id, guild_id in running + scheduled
+    }
+    owners = {}
+    for result in results:
+        for meeting_id in result["scheduled"]:
+            if meeting_id in owners:
+                failures.append(f"meeting {meeting_id} scheduled by shards {owners[meeting_id]} "
+                                f"and {result['shard']}")
+            owners[meeting_id] = result["shard"]
+    if len(results) == shards and owners != expected_owner:
+        failures.append("meetings were not scheduled by exactly their guild's shard")
+
+    # Exactly one row per member and running meeting, none for scheduled ones
+    expected_rows = {(meeting_id, user_id) for meeting_id, _ in running for user_id in range(1, members + 1)}
+    stored = [(meeting_id, user_id) for meeting_id, user_id, _ in rows]
+    if len(stored) != len(set(stored)):
+        failures.append(f"{len(stored) - len(set(stored))} duplicated rows")
+    if set(stored) != expected_rows:
+        failures.append(f"{len(expected_rows - set(stored))} rows lost, "
+                        f"{len(set(stored) - expected_rows)} unexpected")
+    if any(seconds is None for _, _, seconds in rows):
+        failures.append("rows without time attended")
+    if any(statuses[meeting_id] != "closed" for meeting_id, _ in running):
+        failures.append("running meetings were not closed")
+
+    print(f"archived meeting {running[0][0]} ({moved}): report rows {len(before)} before, {len(after)} after")
+    if not moved or moved[0] != 1:
+        failures.append(f"archiving meeting {running[0][0]} moved {moved}")
+    if after != before:
+        failures.append("the archived meeting's report changed for a reader in another process")
+    if rebuilt != 0:
+        failures.append(f"rebuild_rollups past the client timeout returned {rebuilt}, expected 0")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        return 1
+    print("ok: every join stored once through the shared writer")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--role", choices=("parent", "shard"), default="parent")
+    parser.add_argument("--shard", type=int, default=0)
+    parser.add_argument("--shards", type=int, default=3)
+    parser.add_argument("--guilds", type=int, default=12)
+    parser.add_argument("--members", type=int, default=200)
+    args = parser.parse_args()
+    if args.role == "shard":
+        sys.exit(asyncio.run(run_shard(args.shard, args.shards, args.members)))
+    sys.exit(main(args.shards, args.guilds, args.members))
@@ -0,0 +1,139 @@
+import discord
+from discord.ext import commands
+import logging
+from config import Config
+from utils.loyalty import attendance_rate, earned_badges, live_streak
+from utils.writer_service import WriteOutcomeUnknown
+
+LEADERBOARDS = {
+    "current": "🔥 **Longest running on-time streaks**",
+    "best": "🏅 **Best on-time streaks ever**",
+    "attendance": "📅 **Best attendance**",
+}
+
+
+class LoyaltyTracker(commands.Cog):
+    """Loyalty streaks (on-time meetings in a row), attendance rate and badges
+
+    Streaks are updated by a database trigger as punctuality rows are
+    written, one upsert per join, so the commands only read a row or a
+    leaderboard. Uses the punctuality tracker's database and write buffer.
+    """
+
+    def __init__(self, bot, tracker):
+        self.bot = bot
+        self.tracker = tracker
+        self.db = tracker.db
+        self.logger = logging.getLogger('discord_bot')
+
+    async def reply(self, ctx, content=None, **kwargs):
+        return await self.tracker.reply(ctx, content, **kwargs)
+
+    @commands.Cog.listener()
+    async def on_fees_reevaluated(self, guild_id, result):
+        """Lateness changed in past meetings; streaks can't be patched row by row, so rebuild them"""
+        if not result.rows_changed:
+            return
+        try:
+            mismatches = await self.db.rebuild_loyalty()
+        except WriteOutcomeUnknown:
+            self.logger.error(f"Lost track of the loyalty rebuild for guild {guild_id}; run !rebuildloyalty to check")
+            return
+        if mismatches is not None:
+            self.logger.info(
+                f"Rebuilt loyalty streaks after fee re-evaluation in guild {guild_id}: "
+                f"{mismatches} row(s) changed"
+            )
+
+    @commands.command(name="streak")
+    async def streak(self, ctx, member: discord.Member = None):
+        """Show on-time streak, attendance and badges for you or another member
+
+        Args:
+            member: Optional member (defaults to you)
+        """
+        member = member or ctx.author
+        # Streaks only see flushed rows
+        await self.tracker.write_buffer.flush()
+        streak, latest_seq, latest_open = await self.db.get_loyalty(ctx.guild.id, member.id)
+        if streak is None:
+            await self.reply(ctx, f"{member.display_name} hasn't attended any tracked meetings yet.")
+            return
+
+        live = live_streak(streak, latest_seq, latest_open)
+        held = latest_seq - streak.first_seq + 1
+        lines = [
+            f"🔥 **Loyalty for {member.display_name}**",
+            f"Current streak: {live} on-time meeting(s) in a row (best {streak.best_streak})",
+            f"On time: {streak.on_time}/{streak.attended} "
+            f"({streak.on_time / streak.attended * 100:.0f}%)",
+            f"Attendance: {streak.attended} of {held} meeting(s) "
+            f"({attendance_rate(streak, latest_seq) * 100:.0f}%)",
+        ]
+        badges = earned_badges(streak, latest_seq, latest_open)
+        if badges:
+            lines.append(f"Badges: {', '.join(badges)}")
+        await self.reply(ctx, "\n".join(lines))
+
+    @commands.command(name="loyalty")
+    async def loyalty(self, ctx, board: str = "current"):
+        """Show the loyalty leaderboard
+
+        Args:
+            board: current (default) for running streaks, best for all-time
+                streaks, or attendance for attendance rate
+        """
+        board = board.lower()
+        if board not in LEADERBOARDS:
+            await self.reply(ctx, f"❌ Unknown leaderboard. Use one of: {', '.join(LEADERBOARDS)}")
+            return
+
+        await self.tracker.write_buffer.flush()
+        streaks, latest_seq, latest_open = await self.db.get_loyalty_leaderboard(ctx.guild.id, board)
+        if not streaks:
+            await self.reply(ctx, "No streaks to show yet.")
+            return
+
+        lines = [LEADERBOARDS[board], ""]
+        for rank, streak in enumerate(streaks, 1):
+            if board == "current":
+                detail = f"{live_streak(streak, latest_seq, latest_open)} in a row"
+            elif board == "best":
+                detail = f"best {streak.best_streak} in a row"
+            else:
+                detail = (
+                    f"{attendance_rate(streak, latest_seq) * 100:.0f}% "
+                    f"({streak.attended}/{latest_seq - streak.first_seq + 1})"
+                )
+            lines.append(f"{rank}. <@{streak.user_id}> - {detail}")
+        if board == "attendance":
+            lines.append(f"\nMembers with at least {Config.LOYALTY_MIN_MEETINGS} meetings")
+
+        await self.reply(ctx, "\n".join(lines), allowed_mentions=discord.AllowedMentions.none())
+
+    @commands.command(name="rebuildloyalty")
+    @commands.has_permissions(administrator=True)
+    async def rebuild_loyalty(self, ctx):
+        """Recompute loyalty streaks from the full attendance history and check them"""
+        await self.tracker.write_buffer.flush()
+        try:
+            mismatches = await self.db.rebuild_loyalty()
+        except WriteOutcomeUnknown:
+            await self.reply(ctx, "⚠️ Lost contact with the database writer; the rebuild may still have finished. Run `!rebuildloyalty` again to check.")
+            return
+        if mismatches is None:
+            await self.reply(ctx, "❌ Failed to rebuild loyalty streaks. Check logs for details.")
+        elif mismatches:
+            await self.reply(ctx, f"⚠️ Rebuilt loyalty streaks; {mismatches} row(s) were out of sync and have been fixed")
+        else:
+            await self.reply(ctx, "✅ Rebuilt loyalty streaks; they matched the attendance history")
+
+
+async def setup(bot):
+    """Extension entry point; load after cogs.punctuality_tracker, whose database it shares"""
+    tracker = bot.get_cog("PunctualityTracker")
+    if tracker is None:
+        raise commands.ExtensionFailed(
+            "cogs.loyalty_tracker", RuntimeError("cogs.punctuality_tracker must be loaded first")
+        )
+    await bot.add_cog(LoyaltyTracker(bot, tracker))
@@ -1,100 +1,470 @@
-from discord.ext import commands, tasks
+import discord
+from discord.ext import commands
 from datetime import datetime, timedelta
+import io
 import logging
+import math
+import tempfile
+import time
+import asyncio
+from functools import partial
 from config import Config
+from utils import metrics, timeutil
 from utils.db_manager import DatabaseManager
+from utils.dm_fanout import DMFanout
+from utils.export import EXPORT_FORMATS, export_filename, write_export
+from utils.fee_policy import FeeSchedule, calculate_fee
+from utils.meeting_state import MeetingState
+from utils.notifier import Notifier
+from utils.report_cache import ReportCache
+from utils.reports import (
+    MEETINGS_HEADER,
+    PUNCTUALITY_HEADER,
+    format_meeting_row,
+    format_punctuality_row,
+    paginate,
+    write_table,
+)
+from utils.retention import RetentionManager
+from utils.scheduler import EventScheduler
+from utils.write_buffer import PunctualityWriteBuffer
+from utils.writer_service import WriteOutcomeUnknown
 
 class PunctualityTracker(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, db=None):
         self.bot = bot
-        self.db = DatabaseManager()
+        self.db = db or DatabaseManager()
+        self.write_buffer = PunctualityWriteBuffer(self.db, on_written=self.forget_reports)
+        self.report_cache = ReportCache()
         self.logger = logging.getLogger('discord_bot')
-        self.active_meetings = {}  # channel_id -> meeting_id
-        self.scheduled_meetings = {}  # channel_id -> (meeting_id, scheduled_meeting_datetime, description)
-        self.tracked_users = set()  # Set of user_ids who have been tracked for the current meeting
-        self.check_scheduled_meetings.start()
+        self.meeting_channels = set()  # voice channel ids tracked across all guilds
+        self.announcement_channels = {}  # guild_id -> announcement text channel id
+        self.reminder_audiences = {}  # guild_id -> (reminder role id or None, remind previous attendees)
+        self.scheduled_meetings = {}  # channel_id -> (meeting_id, scheduled_meeting_datetime, description, guild_id)
+        self.meeting_cache = {}  # (channel_id, date) -> MeetingState or None
+        self.meeting_cache_date = None
+        self.meeting_cache_days = {}  # date -> keys to check when that date is rolled
+        self.meeting_cache_generation = 0
+        self.meeting_cache_hits = 0
+        self.meeting_cache_misses = 0
+        self.replaced_sessions = {}  # meeting_id -> session rows of a meeting replaced before it ended
+        self.fee_schedule = FeeSchedule()
+        self.fee_task = None
+        self.scheduler = EventScheduler(self.handle_scheduled_event)
+        self.notifier = Notifier()
+        self.dm_fanout = DMFanout()
+        self.dm_tasks = set()
+        self.retention = RetentionManager(self.db)
+        self.retention_task = None
+        self.metrics_server = None
+        self.lag_monitor = None
+        # Bound once so the join path pays a dict lookup, not a label resolution
+        self.join_latency = {
+            outcome: metrics.JOIN_LATENCY.labels(outcome)
+            for outcome in ("recorded", "duplicate", "no_meeting")
+        }
+        self.joins_seen = metrics.JOINS.labels()
     
-    def cog_unload(self):
-        self.check_scheduled_meetings.cancel()
+    async def cog_load(self):
+        # All only read, so they can share the reader pool
+        await asyncio.gather(self.load_channel_config(), self.recover_state(), self.load_fee_policies())
+        self.lag_monitor = asyncio.create_task(
+            metrics.monitor_loop_lag(Config.METRICS_LAG_INTERVAL_SECONDS)
+        )
+        # With a shared writer process, that process runs retention instead
+        if Config.RETENTION_DAYS > 0 and self.db.writer_socket is None:
+            self.retention_task = asyncio.create_task(self.retention.run_forever())
+        if Config.METRICS_PORT:
+            try:
+                self.metrics_server = metrics.MetricsServer(Config.METRICS_HOST, self.metrics_port)
+                await self.metrics_server.start()
+            except OSError as e:
+                self.metrics_server = None
+                self.logger.error(f"Could not start metrics endpoint: {e}")
+    
+    async def cog_unload(self):
+        if self.lag_monitor is not None:
+            self.lag_monitor.cancel()
+        if self.retention_task is not None:
+            self.retention_task.cancel()
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        self.scheduler.stop()
+        for task in self.dm_tasks:
+            task.cancel()
+        if self.fee_task is not None:
+            # A re-evaluation is one writer transaction; let it finish
+            await asyncio.gather(self.fee_task, return_exceptions=True)
+        # Pending joins first: sessions are stored on their punctuality rows
+        await self.write_buffer.close()
+        await self.save_sessions()
+        await self.notifier.close()
+        await self.db.close()
+    
+    @property
+    def metrics_port(self):
+        """Config.METRICS_PORT, offset by the first shard id so shard processes don't collide"""
+        shard_ids = getattr(self.bot, "shard_ids", None)
+        return Config.METRICS_PORT + (min(shard_ids) if shard_ids else 0)
+    
+    def owns_guild(self, guild_id):
+        """Whether this process runs the shard that receives the guild's events
+        
+        Discord routes a guild to shard ``(guild_id >> 22) % shard_count``.
+        Rows without a guild (from before multi-guild support) belong to
+        shard 0. An unsharded bot owns every guild.
+        """
+        shard_count = getattr(self.bot, "shard_count", None)
+        if not shard_count:
+            return True
+        shard_ids = getattr(self.bot, "shard_ids", None)
+        if shard_ids is None:
+            return True
+        shard_id = (guild_id >> 22) % shard_count if guild_id else 0
+        return shard_id in shard_ids
+    
+    async def load_channel_config(self):
+        """Load meeting and announcement channels of this shard's guilds from the database"""
+        self.meeting_channels = {
+            channel_id
+            for channel_id, guild_id in await self.db.get_meeting_channels()
+            if self.owns_guild(guild_id)
+        }
+        self.announcement_channels = {
+            guild_id: channel_id
+            for guild_id, channel_id in await self.db.get_announcement_channels()
+            if self.owns_guild(guild_id)
+        }
+        self.reminder_audiences = {
+            guild_id: (role_id, bool(remind_previous))
+            for guild_id, role_id, remind_previous in await self.db.get_reminder_audiences()
+            if self.owns_guild(guild_id)
+        }
+        
+        # Keep honouring the single-channel env configuration
+        if Config.MEETING_CHANNEL_ID:
+            self.meeting_channels.add(Config.MEETING_CHANNEL_ID)
+        
+        self.logger.info(
+            f"Tracking {len(self.meeting_channels)} meeting channel(s) "
+            f"across {len(self.announcement_channels)} configured guild(s)"
+        )
+    
+    async def load_fee_policies(self):
+        """Load the stored fee policies used to price joins"""
+        self.fee_schedule = FeeSchedule(*await self.db.get_fee_policies())
+    
+    async def save_sessions(self):
+        """Store time attended so far for meetings still running, so a restart can resume it"""
+        now_ts = timeutil.to_epoch(timeutil.now())
+        for state in list(self.meeting_cache.values()):
+            if state is not None and (state.present or state.attended):
+                await self.db.record_sessions(state.meeting_id, state.end_sessions(now_ts))
+                self.forget_reports([state.meeting_id])
+    
+    async def recover_state(self):
+        """Rebuild scheduler and meeting cache from open meetings after a (re)start"""
+        started = time.perf_counter()
+        now = timeutil.now()
+        # Other shards schedule their own guilds' meetings
+        open_meetings = [
+            (meeting, attendees)
+            for meeting, attendees in await self.db.get_open_meetings()
+            if self.owns_guild(meeting.guild_id)
+        ]
+        
+        for meeting, attendees in open_meetings:
+            meeting_id, channel_id, guild_id, _, description, status = meeting
+            meeting_time = meeting.start
+            self.cache_meeting(channel_id, meeting_id, meeting_time, guild_id)
+            state = self.meeting_cache.get((channel_id, meeting_time.date()))
+            if state and state.meeting_id == meeting_id:
+                state.attendees.update(attendees)
+                # Time attended before a restart, saved by cog_unload
+                for user_id, seconds, leave_ts in await self.db.get_sessions(meeting_id):
+                    state.restore_session(user_id, seconds, leave_ts)
+            
+            if status == "scheduled":
+                self.scheduled_meetings[channel_id] = (meeting_id, meeting_time, description, guild_id)
+                # Only remind if the reminder would not have gone out before the restart
+                self.schedule_meeting_events(
+                    meeting_id,
+                    channel_id,
+                    guild_id,
+                    meeting_time,
+                    description,
+                    late_reminder=meeting_time - now > timedelta(minutes=Config.REMINDER_MINUTES),
+                )
+            else:
+                self.scheduler.schedule(
+                    meeting_id,
+                    "expiry",
+                    meeting_time + timedelta(minutes=Config.MEETING_DURATION_MINUTES),
+                    (channel_id, guild_id, meeting_time, description),
+                )
+        
+        elapsed = (time.perf_counter() - started) * 1000
+        self.logger.info(f"Recovered {len(open_meetings)} open meeting(s) in {elapsed:.1f}ms")
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        await self.reconcile_voice_channels()
+    
+    async def reconcile_voice_channels(self):
+        """Record members already sitting in meeting channels, e.g. joins missed while offline
+        
+        Every missing member is queued at once and written in a single batch.
+        """
+        now = timeutil.now()
+        today = now.date()
+        queued = 0
+        
+        for channel_id in list(self.meeting_channels):
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                continue
+            meeting = self.running_meeting(channel_id, today)
+            if not meeting or meeting.start_time > now:
+                continue
+            
+            now_ts = timeutil.to_epoch(now)
+            for member in channel.members:
+                if member.bot:
+                    continue
+                meeting.open_session(member.id, now_ts)
+                if member.id in meeting.attendees:
+                    continue
+                meeting.attendees.add(member.id)
+                late_minutes, fee_amount = self.price_join(member, meeting.start_time, now)
+                queued += self.write_buffer.add(
+                    meeting.meeting_id,
+                    member.id,
+                    member.display_name,
+                    now,
+                    late_minutes,
+                    fee_amount
+                )
+        
+        if queued:
+            await self.write_buffer.flush()
+            self.logger.info(f"Recorded {queued} member(s) already present in meeting channels")
+    
+    async def reply(self, ctx, content=None, **kwargs):
+        """Answer a command through the notifier so replies overtake queued digests"""
+        return await self.notifier.send(ctx, content, Notifier.COMMAND, **kwargs)
+    
+    def get_announcement_channel(self, guild_id):
+        """Return the guild's announcement channel, falling back to the env setting"""
+        channel_id = self.announcement_channels.get(guild_id, Config.ANNOUNCEMENT_CHANNEL_ID)
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            self.logger.error(f"Announcement channel {channel_id} for guild {guild_id} not found")
+        return channel
+    
+    def resolve_meeting_channel(self, ctx):
+        """Pick the meeting channel a command applies to
+        
+        The invoking admin's current voice channel wins if it is a meeting
+        channel; otherwise the guild's first configured meeting channel.
+        """
+        voice = getattr(ctx.author, "voice", None)
+        if voice and voice.channel and voice.channel.id in self.meeting_channels:
+            return voice.channel
+        
+        for channel in ctx.guild.voice_channels:
+            if channel.id in self.meeting_channels:
+                return channel
+        return None
     
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
-        # Skip bot updates
-        if member.bot:
+        # Mute/deafen/stream toggles keep the same channel: nothing to do
+        if before.channel == after.channel or member.bot:
             return
         
-        meeting_channel_id = Config.MEETING_CHANNEL_ID
+        if before.channel is not None and before.channel.id in self.meeting_channels:
+            self.handle_leave(member, before.channel)
         
-        # Only care about joining the meeting channel
-        if after.channel and after.channel.id == meeting_channel_id:
-            # Skip if this user has already been tracked for the current meeting
-            if member.id in self.tracked_users:
-                return
-                
-            await self.handle_join(member, after.channel)
+        channel = after.channel
+        if channel is None or channel.id not in self.meeting_channels:
+            return
+        
+        joins = self.joins_seen
+        joins.value += 1
+        if joins.value % metrics.JOIN_SAMPLE_EVERY:
+            await self.handle_join(member, channel)
+        else:
+            started = time.perf_counter()
+            outcome = await self.handle_join(member, channel)
+            self.join_latency[outcome].observe(time.perf_counter() - started)
+    
+    async def get_cached_meeting(self, channel_id, date, guild_id=None):
+        """Return the MeetingState for a channel's meeting on a date, or None
+
+        Served from memory after the first lookup; entries are replaced by
+        cache_meeting whenever a meeting is created and dropped at midnight.
+        """
+        key = (channel_id, date)
+        if key in self.meeting_cache:
+            self.meeting_cache_hits += 1
+            return self.meeting_cache[key]
+        
+        self.meeting_cache_misses += 1
+        generation = self.meeting_cache_generation
+        date_str = date.strftime("%Y-%m-%d")
+        meeting = await self.db.get_active_meeting(channel_id, date_str, open_only=True)
+        
+        entry = None
+        if meeting:
+            entry = MeetingState(meeting.id, guild_id, channel_id, meeting.start)
+        
+        # Don't overwrite an entry stored by cache_meeting while we were waiting
+        if generation == self.meeting_cache_generation:
+            self._roll_meeting_cache(date)
+            self._store_meeting(key, entry)
+        return entry
+    
+    def cache_meeting(self, channel_id, meeting_id, start_time, guild_id=None):
+        """Update the cache after a meeting row is created
+        
+        The new meeting gets fresh attendance state; the state of the
+        meeting it replaces is evicted along with the old entry.
+        """
+        key = (channel_id, start_time.date())
+        current = self.meeting_cache.get(key)
+        
+        # Mirror get_active_meeting: the latest start time on the date wins
+        if current is None or start_time >= current.start_time:
+            if current is not None and current.meeting_id != meeting_id:
+                # The replaced meeting stops seeing leaves; close its visits now
+                # and keep the totals for its expiry to write
+                self.replaced_sessions[current.meeting_id] = current.end_sessions(
+                    timeutil.to_epoch(timeutil.now())
+                )
+            self._roll_meeting_cache(timeutil.now().date())
+            self._store_meeting(key, MeetingState(meeting_id, guild_id, channel_id, start_time))
+        self.meeting_cache_generation += 1
+    
+    def close_meeting(self, channel_id, date, meeting_id=None):
+        """Evict a channel's meeting state so further joins on that date are ignored
+        
+        With meeting_id, only close if that meeting is still the channel's current one.
+        """
+        key = (channel_id, date)
+        current = self.meeting_cache.get(key)
+        if meeting_id is not None and current is not None and current.meeting_id != meeting_id:
+            return
+        self._store_meeting(key, None)
+        self.meeting_cache_generation += 1
+    
+    def _store_meeting(self, key, entry):
+        self.meeting_cache[key] = entry
+        self.meeting_cache_days.setdefault(key[1], set()).add(key)
+
+    def _roll_meeting_cache(self, date):
+        """Drop entries for past days once the date moves forward
+        
+        Only the past days' keys are visited, however many channels are
+        cached. Meetings still running past midnight keep their state until
+        their expiry closes them; they are checked again on the next roll.
+        """
+        if self.meeting_cache_date is None or date > self.meeting_cache_date:
+            for day in [day for day in self.meeting_cache_days if day < date]:
+                for key in self.meeting_cache_days.pop(day):
+                    if self.meeting_cache.get(key) is None:
+                        self.meeting_cache.pop(key, None)
+                    else:
+                        self.meeting_cache_days.setdefault(date, set()).add(key)
+            self.meeting_cache_date = date
+    
+    def running_meeting(self, channel_id, today):
+        """The cached state of the channel's meeting today, or of yesterday's if it is still running"""
+        meeting = self.meeting_cache.get((channel_id, today))
+        if meeting is None:
+            meeting = self.meeting_cache.get((channel_id, today - timedelta(days=1)))
+        return meeting
+    
+    def price_join(self, member, start_time, join_time):
+        """Return (late_minutes, fee_amount) for a member joining at join_time
+        
+        Uses the guild's fee policy for the meeting's date and the member's
+        role override, if any.
+        """
+        schedule = self.fee_schedule
+        policy = schedule.policy_for(member.guild.id, start_time.date())
+        roles = ()
+        if policy.id in schedule.overrides:
+            roles = [role.id for role in member.roles]
+        return calculate_fee((join_time - start_time).total_seconds(), *schedule.terms_for(policy, roles))
     
     async def handle_join(self, member, voice_channel):
-        """Handle a member joining the meeting channel"""
-        now = datetime.now()
+        """Handle a member joining the meeting channel
+        
+        Returns the outcome (recorded, duplicate or no_meeting) for metrics.
+        """
+        now = timeutil.now()
         channel_id = voice_channel.id
-        today = now.strftime("%Y-%m-%d")
+        today = now.date()
         
-        # Check if there's an active meeting for this channel today
-        meeting = self.db.get_active_meeting(channel_id, today)
+        # Check if there's an active meeting for this channel today, or one
+        # from yesterday still running past midnight
+        meeting = await self.get_cached_meeting(channel_id, today, member.guild.id)
+        if meeting is None:
+            meeting = self.running_meeting(channel_id, today)
         
         if not meeting:
             # No active meeting, we won't track this join
             self.logger.info(f"No active meeting found for channel {channel_id} on {today}")
-            return
+            return "no_meeting"
         
-        meeting_id = meeting[0]
-        start_time_str = meeting[2]
+        meeting.open_session(member.id, timeutil.to_epoch(now))
         
-        # Parse the start time
-        start_time = datetime.strptime(f"{today} {start_time_str}", "%Y-%m-%d %H:%M:%S")
+        # Skip if this user has already been tracked for this meeting
+        if member.id in meeting.attendees:
+            return "duplicate"
+        meeting.attendees.add(member.id)
+        meeting_id = meeting.meeting_id
         
-        # Calculate lateness
-        time_diff = now - start_time
-        late_minutes = max(0, int(time_diff.total_seconds() / 60) - Config.GRACE_PERIOD_MINUTES)
+        late_minutes, fee_amount = self.price_join(member, meeting.start_time, now)
         
-        # Calculate fee if late
-        fee_amount = 0
-        if late_minutes > 0:
-            fee_amount = late_minutes * Config.FEE_PER_MINUTE
-        
-        # Record punctuality
-        self.db.record_punctuality(
+        # Queue punctuality for the next batched write. A second voice-state
+        # event racing this one finds the pending row and stops here.
+        queued = self.write_buffer.add(
             meeting_id,
             member.id,
             member.display_name,
-            now.strftime("%H:%M:%S"),
+            now,
             late_minutes,
             fee_amount
         )
         
-        # Add to tracked users
-        self.tracked_users.add(member.id)
+        if not queued:
+            return "duplicate"
         
         # Get the announcement channel for notifications
-        announcement_channel = self.bot.get_channel(Config.ANNOUNCEMENT_CHANNEL_ID)
+        announcement_channel = self.get_announcement_channel(member.guild.id)
         if not announcement_channel:
-            self.logger.error(f"Announcement channel {Config.ANNOUNCEMENT_CHANNEL_ID} not found")
-            return
+            return "recorded"
             
-        # Notify if late
+        # Add to the meeting's join digest, which is sent once and edited as people arrive
         if late_minutes > 0:
-            try:
-                await announcement_channel.send(
-                    f"⏰ {member.mention} joined {late_minutes} minute(s) late. "
-                    f"Fee: ${fee_amount:.2f}"
-                )
-            except Exception as e:
-                self.logger.error(f"Error sending late notification: {e}")
+            line = f"⏰ {member.mention} joined {late_minutes} minute(s) late. Fee: ${fee_amount:.2f}"
         else:
-            try:
-                await announcement_channel.send(f"✅ {member.mention} joined on time")
-            except Exception as e:
-                self.logger.error(f"Error sending on-time notification: {e}")
+            line = f"✅ {member.mention} joined on time"
+        self.notifier.add_to_digest(
+            meeting_id,
+            announcement_channel,
+            f"👥 **Attendance - meeting at {meeting.start_time.strftime('%H:%M')}**",
+            line,
+        )
+        return "recorded"
+    
+    def handle_leave(self, member, voice_channel):
+        """Close the member's visit to a meeting channel; totals are written when the meeting ends"""
+        now = timeutil.now()
+        meeting = self.running_meeting(voice_channel.id, now.date())
+        if meeting is not None:
+            meeting.close_session(member.id, timeutil.to_epoch(now))
     
     @commands.command(name="schedule")
     @commands.has_permissions(administrator=True)
@@ -107,51 +477,50 @@ class PunctualityTracker(commands.Cog):
                 if minutes_from_now < 1:
                     raise ValueError()
             except ValueError:
-                await ctx.send("❌ Please provide a positive number of minutes (e.g. `!schedule 6`)")
+                await self.reply(ctx, "❌ Please provide a positive number of minutes (e.g. `!schedule 6`)")
                 return
 
             # Calculate meeting time
-            now = datetime.now()
+            now = timeutil.now()
             meeting_time = now + timedelta(minutes=minutes_from_now)
             
             # Get meeting voice channel
-            voice_channel = self.bot.get_channel(Config.MEETING_CHANNEL_ID)
+            voice_channel = self.resolve_meeting_channel(ctx)
             if not voice_channel:
-                await ctx.send("❌ Error: Meeting voice channel not found!")
-                self.logger.error(f"Voice channel {Config.MEETING_CHANNEL_ID} not found")
+                await self.reply(ctx, "❌ Error: No meeting voice channel configured! Use `!addchannel` first")
+                self.logger.error(f"No meeting channel configured for guild {ctx.guild.id}")
                 return
                 
             # Get announcement text channel
-            announcement_channel = self.bot.get_channel(Config.ANNOUNCEMENT_CHANNEL_ID)
+            announcement_channel = self.get_announcement_channel(ctx.guild.id)
             if not announcement_channel:
-                await ctx.send("❌ Error: Announcement text channel not found!")
-                self.logger.error(f"Announcement channel {Config.ANNOUNCEMENT_CHANNEL_ID} not found")
+                await self.reply(ctx, "❌ Error: Announcement text channel not found!")
                 return
                 
             # Check if there's already a scheduled meeting
             if voice_channel.id in self.scheduled_meetings:
-                await ctx.send("❌ There is already a scheduled meeting for this channel. Please cancel it first with `!cancelmeeting`")
+                await self.reply(ctx, "❌ There is already a scheduled meeting for this channel. Please cancel it first with `!cancelmeeting`")
                 return
 
             # Create database record
-            meeting_id = self.db.create_meeting(
-                meeting_date=meeting_time.strftime("%Y-%m-%d"),
-                start_time=meeting_time.strftime("%H:%M:%S"),
+            meeting_id = await self.db.create_meeting(
+                start=meeting_time.replace(microsecond=0),
                 channel_id=voice_channel.id,
-                description=description
+                description=description,
+                guild_id=ctx.guild.id,
+                status="scheduled"
             )
 
             if not meeting_id:
-                await ctx.send("❌ Failed to create meeting record")
+                await self.reply(ctx, "❌ Failed to create meeting record")
                 return
-
-            # Store scheduled meeting with its ID
-            self.scheduled_meetings[voice_channel.id] = (meeting_id, meeting_time, description)
+            self.add_scheduled_meeting(meeting_id, voice_channel.id, ctx.guild.id, meeting_time, description)
             
             # Send confirmation to user and announcement to the text channel
-            await ctx.send(f"✅ Meeting scheduled to start in {minutes_from_now} minutes")
+            await self.reply(ctx, f"✅ Meeting scheduled to start in {minutes_from_now} minutes")
             try:
-                await announcement_channel.send(
+                await self.notifier.send(
+                    announcement_channel,
                     f"📅 **New meeting scheduled** to start in {minutes_from_now} minutes "
                     f"({meeting_time.strftime('%H:%M')})\n"
                     f"*{description or 'No description provided'}*"
@@ -159,79 +528,162 @@ class PunctualityTracker(commands.Cog):
                 self.logger.info(f"Meeting scheduled for {meeting_time} in channel {voice_channel.id}")
             except Exception as e:
                 self.logger.error(f"Error sending meeting announcement: {e}")
-                await ctx.send("⚠️ Scheduled the meeting but couldn't send announcement to the channel")
+                await self.reply(ctx, "⚠️ Scheduled the meeting but couldn't send announcement to the channel")
             
         except Exception as e:
             self.logger.error(f"Schedule error: {str(e)}")
-            await ctx.send("❌ Error scheduling meeting")
+            await self.reply(ctx, "❌ Error scheduling meeting")
             
     @commands.command(name="cancelmeeting")
     @commands.has_permissions(administrator=True)
     async def cancel_meeting(self, ctx):
         """Cancel a scheduled meeting"""
-        voice_channel_id = Config.MEETING_CHANNEL_ID
+        voice_channel = self.resolve_meeting_channel(ctx)
         
-        if voice_channel_id not in self.scheduled_meetings:
-            await ctx.send("❌ No meeting is currently scheduled")
+        if not voice_channel or voice_channel.id not in self.scheduled_meetings:
+            await self.reply(ctx, "❌ No meeting is currently scheduled")
             return
             
-        _, meeting_time, description = self.scheduled_meetings[voice_channel_id]
-        del self.scheduled_meetings[voice_channel_id]
+        meeting_id, meeting_time, description, _ = self.scheduled_meetings.pop(voice_channel.id)
+        self.scheduler.cancel(meeting_id)
+        self.close_meeting(voice_channel.id, meeting_time.date())
+        await self.db.set_meeting_status(meeting_id, "cancelled")
+        self.forget_meetings(voice_channel.id, ctx.guild.id)
         
-        await ctx.send(f"✅ Scheduled meeting for {meeting_time.strftime('%H:%M')} has been cancelled")
+        await self.reply(ctx, f"✅ Scheduled meeting for {meeting_time.strftime('%H:%M')} has been cancelled")
         
         # Notify the announcement channel
-        announcement_channel = self.bot.get_channel(Config.ANNOUNCEMENT_CHANNEL_ID)
+        announcement_channel = self.get_announcement_channel(ctx.guild.id)
         if announcement_channel:
             try:
-                await announcement_channel.send(f"🚫 The meeting scheduled for {meeting_time.strftime('%H:%M')} has been cancelled")
+                await self.notifier.send(announcement_channel, f"🚫 The meeting scheduled for {meeting_time.strftime('%H:%M')} has been cancelled")
             except Exception as e:
                 self.logger.error(f"Error sending cancellation notice: {e}")
 
+    @commands.command(name="endmeeting")
+    @commands.has_permissions(administrator=True)
+    async def end_meeting(self, ctx):
+        """End the running meeting now; members who left before this count as leaving early"""
+        voice_channel = self.resolve_meeting_channel(ctx)
+        now = timeutil.now()
+        meeting = self.running_meeting(voice_channel.id, now.date()) if voice_channel else None
+        if not meeting or meeting.start_time > now or self.scheduler.get(meeting.meeting_id, "expiry") is None:
+            await self.reply(ctx, "❌ No meeting is currently running")
+            return
+
+        meeting.end_ts = timeutil.to_epoch(now)
+        # The expiry event writes everyone's time and closes the meeting
+        self.scheduler.reschedule(meeting.meeting_id, "expiry", now)
+        await self.reply(ctx, f"✅ The meeting that started at {meeting.start_time.strftime('%H:%M')} has ended")
+
+    @commands.command(name="reschedule")
+    @commands.has_permissions(administrator=True)
+    async def reschedule_meeting(self, ctx, minutes: str):
+        """Move the scheduled meeting to X minutes from now"""
+        try:
+            minutes_from_now = int(minutes)
+            if minutes_from_now < 1:
+                raise ValueError()
+        except ValueError:
+            await self.reply(ctx, "❌ Please provide a positive number of minutes (e.g. `!reschedule 10`)")
+            return
+        
+        voice_channel = self.resolve_meeting_channel(ctx)
+        if not voice_channel or voice_channel.id not in self.scheduled_meetings:
+            await self.reply(ctx, "❌ No meeting is currently scheduled")
+            return
+        
+        meeting_id, old_time, description, guild_id = self.scheduled_meetings[voice_channel.id]
+        meeting_time = timeutil.now() + timedelta(minutes=minutes_from_now)
+        
+        updated = await self.db.update_meeting_start(meeting_id, meeting_time.replace(microsecond=0))
+        if not updated:
+            await self.reply(ctx, "❌ Failed to update meeting record")
+            return
+        self.forget_meetings(voice_channel.id, guild_id)
+        
+        self.scheduled_meetings[voice_channel.id] = (meeting_id, meeting_time, description, guild_id)
+        self.scheduler.cancel(meeting_id)
+        
+        # Re-key the cached state, keeping anyone who already joined early
+        previous = self.meeting_cache.pop((voice_channel.id, old_time.date()), None)
+        self.cache_meeting(voice_channel.id, meeting_id, meeting_time.replace(microsecond=0), guild_id)
+        current = self.meeting_cache.get((voice_channel.id, meeting_time.date()))
+        if previous and current and previous.meeting_id == current.meeting_id:
+            current.attendees = previous.attendees
+            current.present, current.attended, current.left = (
+                previous.present, previous.attended, previous.left
+            )
+        self.schedule_meeting_events(meeting_id, voice_channel.id, guild_id, meeting_time, description)
+        
+        await self.reply(ctx, f"✅ Meeting moved to {meeting_time.strftime('%H:%M')}")
+        announcement_channel = self.get_announcement_channel(ctx.guild.id)
+        if announcement_channel:
+            try:
+                await self.notifier.send(
+                    announcement_channel,
+                    f"📅 The meeting scheduled for {old_time.strftime('%H:%M')} "
+                    f"has been moved to {meeting_time.strftime('%H:%M')}"
+                )
+            except Exception as e:
+                self.logger.error(f"Error sending reschedule notice: {e}")
+    
     @commands.command(name="startmeeting")
     @commands.has_permissions(administrator=True)
     async def start_meeting(self, ctx, *, description=None):
         """Start a meeting immediately for punctuality tracking"""
-        now = datetime.now()
-        voice_channel_id = Config.MEETING_CHANNEL_ID
+        now = timeutil.now()
+        voice_channel = self.resolve_meeting_channel(ctx)
+        if not voice_channel:
+            await self.reply(ctx, "❌ Error: No meeting voice channel configured! Use `!addchannel` first")
+            return
+        voice_channel_id = voice_channel.id
         
         # Create meeting record
-        meeting_id = self.db.create_meeting(
-            now.strftime("%Y-%m-%d"),
-            now.strftime("%H:%M:%S"),
+        meeting_id = await self.db.create_meeting(
+            now.replace(microsecond=0),
             voice_channel_id,
-            description
+            description,
+            ctx.guild.id
         )
         
         if meeting_id:
-            # Clear tracked users for the new meeting
-            self.tracked_users.clear()
-            
-            # Store active meeting
-            self.active_meetings[voice_channel_id] = meeting_id
-            
-            # Cancel any scheduled meeting for this channel
-            if voice_channel_id in self.scheduled_meetings:
-                del self.scheduled_meetings[voice_channel_id]
+            self.forget_meetings(voice_channel_id, ctx.guild.id)
+            # Cancel any scheduled meeting for this channel. Evict its state first:
+            # starting later the same day, it would otherwise stay the cached one
+            scheduled = self.scheduled_meetings.pop(voice_channel_id, None)
+            if scheduled:
+                self.scheduler.cancel(scheduled[0])
+                self.close_meeting(voice_channel_id, scheduled[1].date(), scheduled[0])
+            # Store active meeting with fresh attendance state
+            self.cache_meeting(voice_channel_id, meeting_id, now.replace(microsecond=0), ctx.guild.id)
+            if scheduled:
+                await self.db.set_meeting_status(scheduled[0], "cancelled")
+            self.scheduler.schedule(
+                meeting_id,
+                "expiry",
+                now + timedelta(minutes=Config.MEETING_DURATION_MINUTES),
+                (voice_channel_id, ctx.guild.id, now, description),
+            )
             
             # Announce meeting start to the text channel
-            announcement_channel = self.bot.get_channel(Config.ANNOUNCEMENT_CHANNEL_ID)
+            announcement_channel = self.get_announcement_channel(ctx.guild.id)
             if announcement_channel:
                 desc_text = f" - {description}" if description else ""
                 try:
-                    await announcement_channel.send(
+                    await self.notifier.send(
+                        announcement_channel,
                         f"🔔 **MEETING STARTED** at {now.strftime('%H:%M:%S')}{desc_text}\n"
-                        f"Grace period: {Config.GRACE_PERIOD_MINUTES} minutes\n"
-                        f"Late fee: ₦{Config.FEE_PER_MINUTE:.2f} per minute"
+                        f"Late fees: {self.fee_terms_on(ctx.guild.id, now.date())}"
                     )
                 except Exception as e:
                     self.logger.error(f"Error announcing meeting start: {e}")
-                    await ctx.send("⚠️ Started meeting but couldn't send announcement to the channel")
+                    await self.reply(ctx, "⚠️ Started meeting but couldn't send announcement to the channel")
             
-            await ctx.send(f"✅ Meeting started. Punctuality tracking is active.")
+            await self.reply(ctx, f"✅ Meeting started. Punctuality tracking is active.")
             self.logger.info(f"Meeting started at {now} in channel {voice_channel_id}")
         else:
-            await ctx.send("❌ Failed to start meeting. Check logs for details.")
+            await self.reply(ctx, "❌ Failed to start meeting. Check logs for details.")
     
     @commands.command(name="report")
     @commands.has_permissions(administrator=True)
@@ -241,139 +693,985 @@ class PunctualityTracker(commands.Cog):
         Args:
             date: Optional date in YYYY-MM-DD format (defaults to today)
         """
-        channel_id = Config.MEETING_CHANNEL_ID
+        voice_channel = self.resolve_meeting_channel(ctx)
+        if not voice_channel:
+            await self.reply(ctx, "❌ Error: No meeting voice channel configured! Use `!addchannel` first")
+            return
+        channel_id = voice_channel.id
         
         try:
             if not date:
-                date = datetime.now().strftime("%Y-%m-%d")
+                date = timeutil.now().strftime("%Y-%m-%d")
+            
+            # Buffered joins first: writing them drops the cached pages of their meetings
+            await self.write_buffer.flush()
             
             # Get meeting for the date
-            meeting = self.db.get_active_meeting(channel_id, date)
+            generation = self.report_cache.generation
+            meeting = self.report_cache.get(("meeting", channel_id, date))
+            if meeting is None:
+                meeting = await self.db.get_active_meeting(channel_id, date)
+                if meeting:
+                    self.report_cache.put(
+                        ("meeting", channel_id, date), meeting, (("channel", channel_id),), generation
+                    )
             
             if not meeting:
-                await ctx.send(f"No meetings found for {date}")
+                await self.reply(ctx, f"No meetings found for {date}")
                 return
             
-            meeting_id = meeting[0]
-            meeting_time = meeting[2]
-            meeting_desc = meeting[3] or "Regular Meeting"
-            
-            # Get punctuality report
-            records = self.db.get_punctuality_report(meeting_id)
-            
-            if not records:
-                await ctx.send(f"No punctuality records found for meeting on {date}")
-                return
+            pages = self.cached_report(meeting.id)
+            if pages is None:
+                generation = self.report_cache.generation
+                pages = await self.render_report(meeting, date)
+                if not pages:
+                    await self.reply(ctx, f"No punctuality records found for meeting on {date}")
+                    return
+                self.cache_report(meeting.id, pages, generation)
             
-            # Format report
-            report = f"📊 **Punctuality Report - {date} {meeting_time}**\n"
-            report += f"**Meeting: {meeting_desc}**\n\n"
-            report += "| Name | Join Time | Late (min) | Fee |\n"
-            report += "|------|-----------|------------|-----|\n"
-            
-            total_fees = 0
-            for record in records:
-                name, join_time, late_min, fee = record
-                status = "🔴 LATE" if late_min > 0 else "🟢 ON TIME"
-                report += f"| {name} | {join_time} | {late_min} {status} | ${fee:.2f} |\n"
-                total_fees += fee
-            
-            report += f"\n**Total Fees: ${total_fees:.2f}**"
-            
-            await ctx.send(report)
+            for page in pages:
+                if page[0] == "file":
+                    _, content, data, filename = page
+                    await self.reply(ctx, content, file=discord.File(io.BytesIO(data), filename=filename))
+                else:
+                    _, title, description, footer = page
+                    embed = discord.Embed(title=title, description=description)
+                    embed.set_footer(text=footer)
+                    await self.reply(ctx, embed=embed)
             
         except Exception as e:
             self.logger.error(f"Error generating report: {e}")
-            await ctx.send("An error occurred while retrieving the report.")
+            await self.reply(ctx, "An error occurred while retrieving the report.")
     
-    @commands.command(name="meetings")
-    @commands.has_permissions(administrator=True)
-    async def list_meetings(self, ctx):
-        """List recent meetings"""
-        meetings = self.db.get_all_meetings()
+    async def render_report(self, meeting, date):
+        """Render a meeting's report as the pages !report sends; [] if it has no records
         
-        if not meetings:
-            await ctx.send("No meetings found in the database.")
-            return
+        A page is ("embed", title, description, footer) or, for reports
+        too long to page through, ("file", content, data, filename).
+        """
+        meeting_id = meeting.id
+        meeting_time = meeting.start.strftime("%H:%M:%S")
+        meeting_desc = meeting.description or "Regular Meeting"
         
-        report = "📅 **Recent Meetings**\n\n"
-        report += "| Date | Time | Description |\n"
-        report += "|------|------|-------------|\n"
+        # Size the report up front; rows themselves are streamed
+        count, total_fees, early_leavers = await self.db.get_report_summary(meeting_id)
+        if not count:
+            return []
         
-        for meeting in meetings:
-            meeting_id, date, time, desc = meeting
-            description = desc or "Regular Meeting"
-            report += f"| {date} | {time} | {description} |\n"
+        title = f"📊 Punctuality Report - {date} {meeting_time}"
+        left_early = f" • {early_leavers} left early" if early_leavers else ""
+        rows = self.db.iter_punctuality_report(meeting_id)
+        page_count = math.ceil(count / Config.REPORT_ROWS_PER_PAGE)
         
-        report += f"\nUse `!report YYYY-MM-DD` to get punctuality report for a specific date."
+        if page_count > Config.REPORT_MAX_EMBED_PAGES:
+            # Too long to page through in chat: attach the whole table as a
+            # file, kept in memory so it can be cached and sent again
+            fp = io.BytesIO()
+            await write_table(rows, format_punctuality_row, fp, PUNCTUALITY_HEADER)
+            return [(
+                "file",
+                f"**{title}**\n**Meeting: {meeting_desc}**\n"
+                f"{count} attendees{left_early} - **Total Fees: ${total_fees:.2f}**",
+                fp.getvalue(),
+                f"punctuality_{date}_{meeting_id}.md",
+            )]
         
-        await ctx.send(report)
+        pages = []
+        async for page in paginate(
+            rows, format_punctuality_row, Config.REPORT_ROWS_PER_PAGE, PUNCTUALITY_HEADER
+        ):
+            pages.append((
+                "embed",
+                title,
+                f"**Meeting: {meeting_desc}**\n\n{page}",
+                f"Page {len(pages) + 1}/{page_count}{left_early} • Total Fees: ${total_fees:.2f}",
+            ))
+        return pages
+    
+    def cached_report(self, meeting_id):
+        """A meeting's rendered report pages from the cache, or None unless all of them are there"""
+        page_count = self.report_cache.get(("report", meeting_id, 0))
+        if page_count is None:
+            return None
+        pages = []
+        for number in range(1, page_count + 1):
+            page = self.report_cache.get(("report", meeting_id, number))
+            if page is None:
+                return None
+            pages.append(page)
+        return pages
+    
+    def cache_report(self, meeting_id, pages, generation):
+        # Page 0 holds the page count
+        tags = (("meeting", meeting_id),)
+        self.report_cache.put(("report", meeting_id, 0), len(pages), tags, generation)
+        for number, page in enumerate(pages, 1):
+            self.report_cache.put(("report", meeting_id, number), page, tags, generation)
+    
+    def forget_reports(self, meeting_ids):
+        """Drop cached reports of meetings whose rows, time attended or fees changed"""
+        self.report_cache.invalidate(*(("meeting", meeting_id) for meeting_id in meeting_ids))
+    
+    def forget_meetings(self, channel_id, guild_id):
+        """Drop cached meeting lookups and lists after a meeting is added, moved or cancelled"""
+        self.report_cache.invalidate(("channel", channel_id), ("guild", guild_id))
     
-    @tasks.loop(minutes=1)
-    async def check_scheduled_meetings(self):
-        """Check for upcoming meetings and send reminders"""
-        now = datetime.now()
+    @commands.command(name="export")
+    @commands.has_permissions(administrator=True)
+    async def export(self, ctx, start: str, end: str, fmt: str = "csv"):
+        """Export attendance for meetings between two dates as a file
         
-        for voice_channel_id, (meeting_id, meeting_time, description) in list(self.scheduled_meetings.items()):
-            time_diff = meeting_time - now
-            minutes_until_meeting = time_diff.total_seconds() / 60
+        Args:
+            start: First date in YYYY-MM-DD format
+            end: Last date in YYYY-MM-DD format (inclusive)
+            fmt: csv (default) or jsonl
+        """
+        fmt = fmt.lower()
+        if fmt not in EXPORT_FORMATS:
+            await self.reply(ctx, f"❌ Unknown format `{fmt}`. Use one of: {', '.join(EXPORT_FORMATS)}")
+            return
+        try:
+            first = datetime.strptime(start, "%Y-%m-%d")
+            last = datetime.strptime(end, "%Y-%m-%d")
+        except ValueError:
+            await self.reply(ctx, "❌ Invalid date format. Use YYYY-MM-DD")
+            return
+        if last < first:
+            await self.reply(ctx, "❌ The end date is before the start date")
+            return
+        range_end = last + timedelta(days=1)
+        
+        try:
+            await self.write_buffer.flush()
+            count = await self.db.count_attendance(first, range_end, ctx.guild.id)
+            if count is None:
+                await self.reply(ctx, "❌ Failed to export attendance. Check logs for details.")
+                return
+            if not count:
+                await self.reply(ctx, f"No attendance recorded between {start} and {end}")
+                return
             
-            # Get the announcement channel for sending messages
-            announcement_channel = self.bot.get_channel(Config.ANNOUNCEMENT_CHANNEL_ID)
-            if not announcement_channel:
-                self.logger.error(f"Announcement channel {Config.ANNOUNCEMENT_CHANNEL_ID} not found")
-                continue
+            # Rows stream from a reader thread into the spooled file, which
+            # moves to disk once it outgrows EXPORT_SPOOL_BYTES
+            started = time.perf_counter()
+            compress = count > Config.EXPORT_COMPRESS_ROWS
+            with tempfile.SpooledTemporaryFile(max_size=Config.EXPORT_SPOOL_BYTES) as fp:
+                written = await self.db.stream_attendance(
+                    first,
+                    range_end,
+                    partial(write_export, fp=fp, fmt=fmt, compress=compress),
+                    ctx.guild.id,
+                )
+                if written is None:
+                    await self.reply(ctx, "❌ Failed to export attendance. Check logs for details.")
+                    return
                 
-            # Send reminder at configured time before meeting
-            if minutes_until_meeting <= Config.REMINDER_MINUTES and minutes_until_meeting > 0:
-                desc_text = f" - {description}" if description else ""
-                try:
-                    await announcement_channel.send(
-                        f"⏰ **REMINDER:** Meeting starts in {int(minutes_until_meeting)} minutes{desc_text}! "
-                        f"Please join the voice channel on time to avoid late fees."
+                size = fp.tell()
+                self.logger.info(
+                    f"Exported {written} attendance rows ({size} bytes) for guild {ctx.guild.id} "
+                    f"in {time.perf_counter() - started:.2f}s"
+                )
+                if size > ctx.guild.filesize_limit:
+                    await self.reply(
+                        ctx,
+                        f"❌ The export is {size / 1024 / 1024:.1f} MB, over this server's "
+                        f"{ctx.guild.filesize_limit / 1024 / 1024:.0f} MB upload limit. "
+                        "Try a shorter date range."
                     )
-                    self.logger.info(f"Sent reminder for meeting at {meeting_time}")
-                except Exception as e:
-                    self.logger.error(f"Error sending reminder: {e}")
+                    return
                 
-                # Clear tracked users when reminder is sent
-                self.tracked_users.clear()
+                fp.seek(0)
+                await self.reply(
+                    ctx,
+                    f"📦 {written} attendance records from {start} to {end}",
+                    file=discord.File(fp, filename=export_filename(start, end, fmt, compress)),
+                )
+        except Exception as e:
+            self.logger.error(f"Error exporting attendance: {e}")
+            await self.reply(ctx, "An error occurred while exporting attendance.")
+    
+    @commands.command(name="meetings")
+    @commands.has_permissions(administrator=True)
+    async def list_meetings(self, ctx, before: int = None):
+        """List recent meetings
+        
+        Args:
+            before: Optional meeting ID; lists the meetings older than it
+        """
+        key = ("meetings", ctx.guild.id, before)
+        content = self.report_cache.get(key)
+        if content is None:
+            generation = self.report_cache.generation
+            meetings = await self.db.get_all_meetings(
+                limit=Config.MEETINGS_PAGE_SIZE, guild_id=ctx.guild.id, before_id=before
+            )
             
-            # If meeting time has passed (within 1 minute), announce meeting start
-            elif minutes_until_meeting <= 0 and minutes_until_meeting > -2:  # Expanded window to catch meetings
-                desc_text = f" - {description}" if description else ""
-                try:
-                    await announcement_channel.send(
-                        f"🔔 **MEETING STARTED** at {meeting_time.strftime('%H:%M:%S')}{desc_text}\n"
-                        f"Grace period: {Config.GRACE_PERIOD_MINUTES} minutes\n"
-                        f"Late fee: ${Config.FEE_PER_MINUTE:.2f} per minute"
-                    )
-                    self.logger.info(f"Auto-started meeting at {meeting_time}")
-                except Exception as e:
-                    self.logger.error(f"Error auto-starting meeting: {e}")
-                
-                # Store active meeting ID
-                self.active_meetings[voice_channel_id] = meeting_id
-                
-                # Clear tracked users for the new meeting
-                self.tracked_users.clear()
-                
-                # Remove from scheduled meetings
-                del self.scheduled_meetings[voice_channel_id]
+            if not meetings:
+                await self.reply(ctx, "No meetings found in the database.")
+                return
             
-            # Clean up very old scheduled meetings (more than 10 minutes past)
-            elif minutes_until_meeting < -10:
-                self.logger.warning(f"Removing stale scheduled meeting from {meeting_time}")
+            lines = ["📅 **Recent Meetings**", "", *MEETINGS_HEADER]
+            lines.extend(format_meeting_row(meeting) for meeting in meetings)
+            lines.append("")
+            if len(meetings) == Config.MEETINGS_PAGE_SIZE:
+                lines.append(f"Use `!meetings {meetings[-1].id}` to see older meetings.")
+            lines.append("Use `!report YYYY-MM-DD` to get punctuality report for a specific date.")
+            content = "\n".join(lines)
+            self.report_cache.put(key, content, (("guild", ctx.guild.id),), generation)
+        
+        await self.reply(ctx, content)
+    
+    @staticmethod
+    def parse_month(month):
+        """Validate a YYYY-MM month, defaulting to the current one; returns None if invalid"""
+        if not month:
+            return timeutil.now().strftime("%Y-%m")
+        try:
+            return datetime.strptime(month, "%Y-%m").strftime("%Y-%m")
+        except ValueError:
+            return None
+    
+    @commands.command(name="leaderboard")
+    async def leaderboard(self, ctx, month: str = None):
+        """Show the most punctual and the latest members for a month
+        
+        Args:
+            month: Optional month in YYYY-MM format (defaults to this month)
+        """
+        month = self.parse_month(month)
+        if not month:
+            await self.reply(ctx, "❌ Invalid month format. Use YYYY-MM")
+            return
+        
+        # Rollups only see flushed rows
+        await self.write_buffer.flush()
+        most_on_time, most_late = await self.db.get_leaderboard(ctx.guild.id, month)
+        if not most_on_time:
+            await self.reply(ctx, f"No attendance recorded for {month}")
+            return
+        
+        lines = [f"🏆 **Leaderboard - {month}**", "", "**Most punctual**"]
+        for rank, (user_id, meetings, late_count, _, _) in enumerate(most_on_time, 1):
+            lines.append(f"{rank}. <@{user_id}> - on time {meetings - late_count}/{meetings}")
+        if most_late:
+            lines.extend(["", "**Latest arrivals**"])
+            for rank, (user_id, _, late_count, late_minutes, fees) in enumerate(most_late, 1):
+                lines.append(
+                    f"{rank}. <@{user_id}> - {late_minutes} min over {late_count} meetings (${fees:.2f})"
+                )
+        
+        await self.reply(ctx, "\n".join(lines), allowed_mentions=discord.AllowedMentions.none())
+    
+    @commands.command(name="fees")
+    @commands.has_permissions(administrator=True)
+    async def fees(self, ctx, month: str):
+        """Show fee totals and the top fee payers for a month
+        
+        Args:
+            month: Month in YYYY-MM format
+        """
+        month = self.parse_month(month)
+        if not month:
+            await self.reply(ctx, "❌ Invalid month format. Use YYYY-MM")
+            return
+        
+        await self.write_buffer.flush()
+        totals, payers = await self.db.get_fee_summary(ctx.guild.id, month)
+        if not totals:
+            await self.reply(ctx, f"No attendance recorded for {month}")
+            return
+        
+        attendances, late_count, late_minutes, total_fees = totals
+        lines = [
+            f"💰 **Fees - {month}**",
+            f"{late_count} late arrivals out of {attendances} attendances, "
+            f"{late_minutes} minutes late in total",
+            f"**Total Fees: ${total_fees:.2f}**",
+        ]
+        if payers:
+            lines.append("")
+            for user_id, minutes, user_fees in payers:
+                lines.append(f"<@{user_id}> - {minutes} min - ${user_fees:.2f}")
+        
+        await self.reply(ctx, "\n".join(lines), allowed_mentions=discord.AllowedMentions.none())
+    
+    def guild_policy_ids(self, guild_id):
+        return [
+            policy.id
+            for versions in (self.fee_schedule.policies.get(guild_id, ()), self.fee_schedule.policies.get(0, ()))
+            for policy in versions
+        ]
+    
+    def member_override_roles(self, guild):
+        """(user_id, role_id) pairs for the guild's members holding a role with a fee override"""
+        roles = self.fee_schedule.override_roles(self.guild_policy_ids(guild.id))
+        if not roles:
+            return []
+        return [
+            (member.id, role.id)
+            for member in guild.members
+            for role in member.roles
+            if role.id in roles
+        ]
+    
+    @staticmethod
+    def format_fee_terms(grace_minutes, fee_per_minute, max_fee):
+        cap = f", capped at ${max_fee:.2f}" if max_fee is not None else ""
+        return f"{grace_minutes} min grace, ${fee_per_minute:.2f}/min{cap}"
+    
+    def fee_terms_on(self, guild_id, meeting_date):
+        """The guild's fee terms for a meeting on ``meeting_date``, as !feepolicy shows them"""
+        policy = self.fee_schedule.policy_for(guild_id, meeting_date)
+        return self.format_fee_terms(policy.grace_minutes, policy.fee_per_minute, policy.max_fee)
+    
+    @staticmethod
+    def format_fee_changes(result):
+        lines = [
+            f"{result.rows_changed} record(s) in {result.meetings_changed} meeting(s) change; "
+            f"fees ${result.fees_before:.2f} → ${result.fees_after:.2f}"
+        ]
+        for change in result.changes:
+            lines.append(
+                f"• meeting {change.meeting_id} <@{change.user_id}>: {change.old_late_minutes} min "
+                f"${change.old_fee:.2f} → {change.new_late_minutes} min ${change.new_fee:.2f}"
+            )
+        return "\n".join(lines)
+    
+    @commands.command(name="feepolicy")
+    @commands.has_permissions(administrator=True)
+    async def fee_policy(self, ctx):
+        """Show this server's fee policy versions, newest first"""
+        versions = self.fee_schedule.policies.get(ctx.guild.id, [])
+        current = self.fee_schedule.policy_for(ctx.guild.id, timeutil.now().date())
+        lines = [
+            "💸 **Fee policy**",
+            f"In effect: {self.format_fee_terms(current.grace_minutes, current.fee_per_minute, current.max_fee)}",
+        ]
+        for override in self.fee_schedule.overrides.get(current.id, {}).values():
+            terms = self.fee_schedule.terms_for(current, [override.role_id])
+            lines.append(f"  <@&{override.role_id}>: {self.format_fee_terms(*terms)}")
+        if versions:
+            lines.append("")
+            for policy in reversed(versions):
+                lines.append(
+                    f"#{policy.id} from {policy.effective_from}: "
+                    f"{self.format_fee_terms(policy.grace_minutes, policy.fee_per_minute, policy.max_fee)}"
+                )
+        await self.reply(ctx, "\n".join(lines), allowed_mentions=discord.AllowedMentions.none())
+    
+    @commands.command(name="setfeepolicy")
+    @commands.has_permissions(administrator=True)
+    async def set_fee_policy(
+        self, ctx, effective_from: str, grace_minutes: int, fee_per_minute: float, max_fee: float = None
+    ):
+        """Add a fee policy version for meetings from a date on
+        
+        Role overrides carry over from the policy it replaces. Fees already
+        recorded only change with !refees.
+        
+        Args:
+            effective_from: First meeting date it applies to, YYYY-MM-DD
+            grace_minutes: Minutes late before fees start
+            fee_per_minute: Fee per minute late
+            max_fee: Optional cap on the fee for one meeting
+        """
+        try:
+            start = datetime.strptime(effective_from, "%Y-%m-%d").date()
+        except ValueError:
+            await self.reply(ctx, "❌ Invalid date format. Use YYYY-MM-DD")
+            return
+        if grace_minutes < 0 or fee_per_minute < 0 or (max_fee is not None and max_fee < 0):
+            await self.reply(ctx, "❌ Grace period, fee and cap can't be negative")
+            return
+        
+        replaced = self.fee_schedule.policy_for(ctx.guild.id, start)
+        overrides = [
+            (o.role_id, o.grace_minutes, o.fee_per_minute, o.max_fee)
+            for o in self.fee_schedule.overrides.get(replaced.id, {}).values()
+        ]
+        policy_id = await self.db.add_fee_policy(
+            ctx.guild.id, start, grace_minutes, fee_per_minute, max_fee,
+            note=f"set by {ctx.author}", overrides=overrides,
+        )
+        if policy_id is None:
+            await self.reply(ctx, "❌ Failed to save the fee policy")
+            return
+        await self.load_fee_policies()
+        await self.reply(
+            ctx,
+            f"✅ Fee policy #{policy_id} from {start}: "
+            f"{self.format_fee_terms(grace_minutes, fee_per_minute, max_fee)}. "
+            f"Use `!refees` to apply it to fees already recorded."
+        )
+    
+    @commands.command(name="feerole")
+    @commands.has_permissions(administrator=True)
+    async def fee_role(
+        self, ctx, role: discord.Role, grace_minutes: str, fee_per_minute: float = None, max_fee: float = None
+    ):
+        """Give a role its own fee terms from today on, or `off` to remove them
+        
+        Usage: !feerole @Role <grace minutes> [fee per minute] [cap] | !feerole @Role off
+        Omitted values follow the server's policy.
+        """
+        today = timeutil.now().date()
+        current = self.fee_schedule.policy_for(ctx.guild.id, today)
+        overrides = {
+            o.role_id: (o.role_id, o.grace_minutes, o.fee_per_minute, o.max_fee)
+            for o in self.fee_schedule.overrides.get(current.id, {}).values()
+        }
+        if grace_minutes.lower() == "off":
+            if overrides.pop(role.id, None) is None:
+                await self.reply(ctx, f"{role.name} has no fee override")
+                return
+        else:
+            try:
+                grace = int(grace_minutes)
+            except ValueError:
+                await self.reply(ctx, "❌ Grace minutes must be a whole number, or `off`")
+                return
+            overrides[role.id] = (role.id, grace, fee_per_minute, max_fee)
+        
+        policy_id = await self.db.add_fee_policy(
+            ctx.guild.id, today, current.grace_minutes, current.fee_per_minute, current.max_fee,
+            note=f"{role.name} override changed by {ctx.author}", overrides=list(overrides.values()),
+        )
+        if policy_id is None:
+            await self.reply(ctx, "❌ Failed to save the fee policy")
+            return
+        await self.load_fee_policies()
+        await self.reply(ctx, f"✅ Fee policy #{policy_id} from {today} updates {role.name}'s terms")
+    
+    @commands.command(name="forgive")
+    @commands.has_permissions(administrator=True)
+    async def forgive(self, ctx, meeting_id: int, *, reason=None):
+        """Waive every fee of a finished meeting
+        
+        Args:
+            meeting_id: ID of the meeting (see !meetings)
+            reason: Optional note kept with the waiver
+        """
+        meeting = await self.db.get_meeting(meeting_id)
+        if meeting is None or meeting.guild_id not in (ctx.guild.id, None):
+            await self.reply(ctx, f"❌ Meeting {meeting_id} not found")
+            return
+        if meeting.status in ("scheduled", "active"):
+            await self.reply(ctx, "❌ The meeting hasn't ended yet")
+            return
+        
+        if not await self.db.waive_meeting_fees(meeting_id, reason):
+            await self.reply(ctx, "❌ Failed to waive the meeting's fees")
+            return
+        await self.write_buffer.flush()
+        day = meeting.start.date()
+        try:
+            result = await self.db.reevaluate_fees(
+                ctx.guild.id, day, day + timedelta(days=1), self.member_override_roles(ctx.guild), meeting_id
+            )
+        except WriteOutcomeUnknown:
+            self.forget_reports((meeting_id,))
+            await self.reply(
+                ctx, f"⚠️ Fees were waived, but it is unknown whether they were recomputed; check with `!refees {day} {day}`"
+            )
+            return
+        if result is None:
+            await self.reply(ctx, "❌ Fees were waived but could not be recomputed; run `!refees` for that day")
+            return
+        self.forget_reports(result.meeting_ids)
+        # Same as !refees apply, so listeners such as the loyalty cog catch up
+        self.bot.dispatch("fees_reevaluated", ctx.guild.id, result)
+        await self.reply(
+            ctx,
+            f"✅ Forgave meeting {meeting_id}: ${result.fees_before:.2f} in fees waived",
+        )
+    
+    @commands.command(name="refees")
+    @commands.has_permissions(administrator=True)
+    async def reevaluate_fees(self, ctx, start: str, end: str, mode: str = "preview"):
+        """Recompute lateness and fees between two dates under the stored policies
+        
+        Args:
+            start: First date in YYYY-MM-DD format
+            end: Last date in YYYY-MM-DD format (inclusive)
+            mode: preview (default) lists what would change; apply writes it
+        """
+        mode = mode.lower()
+        if mode not in ("preview", "apply"):
+            await self.reply(ctx, "❌ Mode must be `preview` or `apply`")
+            return
+        try:
+            first = datetime.strptime(start, "%Y-%m-%d").date()
+            last = datetime.strptime(end, "%Y-%m-%d").date()
+        except ValueError:
+            await self.reply(ctx, "❌ Invalid date format. Use YYYY-MM-DD")
+            return
+        if last < first:
+            await self.reply(ctx, "❌ The end date is before the start date")
+            return
+        member_roles = self.member_override_roles(ctx.guild)
+        
+        if mode == "preview":
+            await self.write_buffer.flush()
+            result = await self.db.preview_fee_reevaluation(
+                ctx.guild.id, first, last + timedelta(days=1), member_roles
+            )
+            if result is None:
+                await self.reply(ctx, "❌ Failed to re-evaluate fees. Check logs for details.")
+                return
+            await self.reply(
+                ctx,
+                f"🔎 **Fee re-evaluation preview, {first} to {last}**\n{self.format_fee_changes(result)}"
+                + ("\nRun again with `apply` to save it." if result.rows_changed else ""),
+                allowed_mentions=discord.AllowedMentions.none(),
+            )
+            return
+        
+        if self.fee_task is not None and not self.fee_task.done():
+            await self.reply(ctx, "⏳ A fee re-evaluation is already running")
+            return
+        
+        async def apply():
+            await self.write_buffer.flush()
+            try:
+                result = await self.db.reevaluate_fees(ctx.guild.id, first, last + timedelta(days=1), member_roles)
+            except WriteOutcomeUnknown:
+                await self.reply(
+                    ctx,
+                    "⚠️ Lost contact with the database writer; it may have re-evaluated the fees. "
+                    + await self.confirm_fee_reevaluation(ctx.guild, first, last, member_roles),
+                )
+                return
+            if result is None:
+                await self.reply(ctx, "❌ Failed to re-evaluate fees; nothing was changed.")
+                return
+            self.forget_reports(result.meeting_ids)
+            # Lateness may have changed too; the loyalty cog rebuilds its streaks
+            self.bot.dispatch("fees_reevaluated", ctx.guild.id, result)
+            await self.reply(
+                ctx,
+                f"✅ **Fees re-evaluated, {first} to {last}**\n{self.format_fee_changes(result)}",
+                allowed_mentions=discord.AllowedMentions.none(),
+            )
+        
+        # Runs in the background; the command returns right away
+        self.fee_task = asyncio.create_task(apply())
+        await self.reply(ctx, f"⏳ Re-evaluating fees from {first} to {last}…")
+    
+    async def confirm_fee_reevaluation(self, guild, first, last, member_roles):
+        """After an apply with an unknown outcome, say what a fresh preview finds
+        
+        Any report may be stale either way, so the cache is cleared.
+        """
+        self.report_cache.clear()
+        result = await self.db.preview_fee_reevaluation(guild.id, first, last + timedelta(days=1), member_roles)
+        if result is None:
+            return f"Run `!refees {first} {last}` to check."
+        if result.rows_changed:
+            return (
+                f"A preview still finds {result.rows_changed} row(s) to change, so it did not complete "
+                f"(or is still running); check again with `!refees {first} {last}`."
+            )
+        return "A preview finds nothing left to change, so the fees are up to date. Run `!rebuildloyalty` to update streaks."
+    
+    @commands.command(name="mystats")
+    async def my_stats(self, ctx):
+        """Show your punctuality for this month and overall"""
+        month = timeutil.now().strftime("%Y-%m")
+        await self.write_buffer.flush()
+        this_month, all_time = await self.db.get_user_stats(ctx.guild.id, ctx.author.id, month)
+        if not all_time:
+            await self.reply(ctx, "You haven't attended any tracked meetings yet.")
+            return
+        
+        lines = [f"📈 **Stats for {ctx.author.display_name}**"]
+        for label, stats in ((month, this_month), ("All time", all_time)):
+            if not stats:
+                lines.append(f"**{label}:** no meetings")
+                continue
+            meetings, late_count, late_minutes, fees = stats
+            lines.append(
+                f"**{label}:** {meetings} meetings, late {late_count} times "
+                f"({late_minutes} min), fees ${fees:.2f}"
+            )
+        
+        await self.reply(ctx, "\n".join(lines))
+    
+    @commands.command(name="rebuildstats")
+    @commands.has_permissions(administrator=True)
+    async def rebuild_stats(self, ctx):
+        """Recompute the leaderboard/fee rollups from raw attendance records"""
+        await self.write_buffer.flush()
+        started = time.perf_counter()
+        try:
+            mismatches = await self.db.rebuild_rollups()
+        except WriteOutcomeUnknown:
+            await self.reply(ctx, "⚠️ Lost contact with the database writer; the rebuild may still have finished. Run `!rebuildstats` again to check.")
+            return
+        elapsed = time.perf_counter() - started
+        
+        if mismatches is None:
+            await self.reply(ctx, "❌ Failed to rebuild stats. Check logs for details.")
+            return
+        
+        self.logger.info(f"Rebuilt rollups in {elapsed:.2f}s, {mismatches} rows corrected")
+        if mismatches:
+            await self.reply(ctx, f"⚠️ Stats rebuilt in {elapsed:.2f}s; {mismatches} rows were out of sync and have been corrected.")
+        else:
+            await self.reply(ctx, f"✅ Stats rebuilt in {elapsed:.2f}s; everything was already consistent.")
+    
+    @commands.command(name="archive")
+    @commands.has_permissions(administrator=True)
+    async def archive(self, ctx):
+        """Archive meetings past the retention period now and show storage use"""
+        if Config.RETENTION_DAYS <= 0:
+            await self.reply(ctx, "❌ Archiving is disabled (RETENTION_DAYS is 0).")
+            return
+        
+        await self.write_buffer.flush()
+        try:
+            meetings, rows, freed = await self.retention.run_once()
+        except WriteOutcomeUnknown:
+            await self.reply(ctx, "⚠️ Lost contact with the database writer; some meetings may have been archived. Run `!archive` again to finish.")
+            return
+        stats = await self.db.get_storage_stats()
+        if stats is None:
+            await self.reply(ctx, "❌ Failed to read storage stats. Check logs for details.")
+            return
+        
+        hot_bytes, free_bytes, archives = stats
+        lines = [
+            f"🗄️ Archived {meetings} meetings ({rows} records) dated before "
+            f"{self.retention.cutoff():%Y-%m-%d}; freed {freed} pages.",
+            f"**Hot database:** {hot_bytes / 1024 / 1024:.1f} MB ({free_bytes / 1024 / 1024:.1f} MB free)",
+        ]
+        for year, path, year_meetings, year_rows, _ in archives:
+            lines.append(f"**{year}:** {year_meetings} meetings, {year_rows} records in `{path}`")
+        await self.reply(ctx, "\n".join(lines))
+    
+    def add_scheduled_meeting(self, meeting_id, channel_id, guild_id, meeting_time, description):
+        """Track a newly created scheduled meeting and queue its reminder, start and expiry"""
+        self.forget_meetings(channel_id, guild_id)
+        self.scheduled_meetings[channel_id] = (meeting_id, meeting_time, description, guild_id)
+        self.cache_meeting(channel_id, meeting_id, meeting_time.replace(microsecond=0), guild_id)
+        self.schedule_meeting_events(meeting_id, channel_id, guild_id, meeting_time, description)
+    
+    def schedule_meeting_events(
+        self, meeting_id, channel_id, guild_id, meeting_time, description, late_reminder=True
+    ):
+        """Queue the reminder, start and expiry events for a scheduled meeting
+        
+        With late_reminder, a meeting already inside the reminder window gets
+        its reminder right away instead of none at all.
+        """
+        payload = (channel_id, guild_id, meeting_time, description)
+        
+        now = timeutil.now()
+        reminder_time = meeting_time - timedelta(minutes=Config.REMINDER_MINUTES)
+        if late_reminder:
+            reminder_time = max(reminder_time, now)
+        if now <= reminder_time < meeting_time:
+            self.scheduler.schedule(meeting_id, "reminder", reminder_time, payload)
+        self.scheduler.schedule(meeting_id, "start", meeting_time, payload)
+        self.scheduler.schedule(
+            meeting_id,
+            "expiry",
+            meeting_time + timedelta(minutes=Config.MEETING_DURATION_MINUTES),
+            payload,
+        )
+    
+    async def expected_attendees(self, guild_id, channel_id, meeting_time):
+        """Members who should get a DM reminder, per the guild's reminder audience
+        
+        Bots and members already in the meeting channel are left out.
+        """
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return []
+        role_id, remind_previous = self.reminder_audiences.get(guild_id, (None, False))
+        members = {}
+        if role_id is not None:
+            role = guild.get_role(role_id)
+            if role is not None:
+                members.update((member.id, member) for member in role.members)
+        if remind_previous:
+            for user_id in await self.db.get_previous_attendees(channel_id, meeting_time):
+                member = members.get(user_id) or guild.get_member(user_id)
+                if member is not None:
+                    members[user_id] = member
+        
+        channel = self.bot.get_channel(channel_id)
+        present = {member.id for member in getattr(channel, "members", ())}
+        return [member for member in members.values() if not member.bot and member.id not in present]
+    
+    async def send_dm_reminders(self, meeting_id, channel_id, guild_id, meeting_time, desc_text):
+        """DM the meeting's expected attendees a reminder"""
+        started = time.perf_counter()
+        members = await self.expected_attendees(guild_id, channel_id, meeting_time)
+        if not members:
+            return
+        channel = self.bot.get_channel(channel_id)
+        where = f" in {channel.mention}" if channel else ""
+        content = (
+            f"⏰ Meeting{desc_text} starts at {meeting_time:%H:%M}{where}. "
+            f"Join on time to avoid late fees."
+        )
+        sent, unreachable, failed = await self.dm_fanout.send_all(members, content)
+        self.logger.info(
+            f"DM reminders for meeting {meeting_id}: {sent} sent, {unreachable} unreachable, "
+            f"{failed} failed in {time.perf_counter() - started:.1f}s"
+        )
+    
+    async def handle_scheduled_event(self, event):
+        """Fire a reminder, start or expiry event from the scheduler"""
+        meeting_id = event.key
+        voice_channel_id, guild_id, meeting_time, description = event.payload
+        desc_text = f" - {description}" if description else ""
+        
+        if event.kind == "expiry":
+            # The meeting is over; stop tracking joins and free its attendance state
+            state = self.meeting_cache.get((voice_channel_id, meeting_time.date()))
+            if state is not None and state.meeting_id == meeting_id:
+                sessions = state.end_sessions(timeutil.to_epoch(timeutil.now()))
+            else:
+                sessions = self.replaced_sessions.pop(meeting_id, None)
+            self.close_meeting(voice_channel_id, meeting_time.date(), meeting_id)
+            self.notifier.close_digest(meeting_id)
+            if sessions:
+                # Punctuality rows may still be buffered; they must exist to be updated
+                await self.write_buffer.flush()
+                await self.db.record_sessions(meeting_id, sessions)
+                self.forget_reports([meeting_id])
+            await self.db.set_meeting_status(meeting_id, "closed")
+            self.logger.info(f"Closed meeting {meeting_id} in channel {voice_channel_id}")
+            return
+        
+        # Get the announcement channel for sending messages
+        announcement_channel = self.get_announcement_channel(guild_id)
+        
+        if event.kind == "reminder":
+            minutes_until_meeting = round((meeting_time - timeutil.now()).total_seconds() / 60)
+            if guild_id in self.reminder_audiences:
+                # Runs on its own so hundreds of DMs never hold up the scheduler
+                task = asyncio.create_task(
+                    self.send_dm_reminders(meeting_id, voice_channel_id, guild_id, meeting_time, desc_text)
+                )
+                self.dm_tasks.add(task)
+                task.add_done_callback(self.dm_tasks.discard)
+            if not announcement_channel:
+                return
+            try:
+                await self.notifier.send(
+                    announcement_channel,
+                    f"⏰ **REMINDER:** Meeting starts in {minutes_until_meeting} minutes{desc_text}! "
+                    f"Please join the voice channel on time to avoid late fees."
+                )
+                self.logger.info(f"Sent reminder for meeting at {meeting_time}")
+            except Exception as e:
+                self.logger.error(f"Error sending reminder: {e}")
+        
+        elif event.kind == "start":
+            # Remove from scheduled meetings
+            scheduled = self.scheduled_meetings.get(voice_channel_id)
+            if scheduled and scheduled[0] == meeting_id:
                 del self.scheduled_meetings[voice_channel_id]
+            await self.db.set_meeting_status(meeting_id, "active")
+            
+            if not announcement_channel:
+                return
+            try:
+                await self.notifier.send(
+                    announcement_channel,
+                    f"🔔 **MEETING STARTED** at {meeting_time.strftime('%H:%M:%S')}{desc_text}\n"
+                    f"Late fees: {self.fee_terms_on(guild_id, meeting_time.date())}"
+                )
+                self.logger.info(f"Auto-started meeting at {meeting_time}")
+            except Exception as e:
+                self.logger.error(f"Error auto-starting meeting: {e}")
+    
+    @commands.command(name="addchannel")
+    @commands.has_permissions(administrator=True)
+    async def add_channel(self, ctx, channel: discord.VoiceChannel):
+        """Track punctuality in a voice channel of this server"""
+        if not await self.db.add_meeting_channel(ctx.guild.id, channel.id):
+            await self.reply(ctx, "❌ Failed to save the meeting channel")
+            return
+        
+        self.meeting_channels.add(channel.id)
+        await self.reply(ctx, f"✅ {channel.mention} is now a meeting channel")
+        self.logger.info(f"Added meeting channel {channel.id} in guild {ctx.guild.id}")
+    
+    @commands.command(name="removechannel")
+    @commands.has_permissions(administrator=True)
+    async def remove_channel(self, ctx, channel: discord.VoiceChannel):
+        """Stop tracking punctuality in a voice channel"""
+        if not await self.db.remove_meeting_channel(channel.id):
+            await self.reply(ctx, f"❌ {channel.mention} is not a meeting channel")
+            return
+        
+        self.meeting_channels.discard(channel.id)
+        scheduled = self.scheduled_meetings.pop(channel.id, None)
+        if scheduled:
+            self.scheduler.cancel(scheduled[0])
+            await self.db.set_meeting_status(scheduled[0], "cancelled")
+            self.forget_meetings(channel.id, ctx.guild.id)
+        self.meeting_cache = {
+            key: state for key, state in self.meeting_cache.items() if key[0] != channel.id
+        }
+        self.meeting_cache_generation += 1
+        await self.reply(ctx, f"✅ {channel.mention} is no longer a meeting channel")
+        self.logger.info(f"Removed meeting channel {channel.id} in guild {ctx.guild.id}")
+    
+    @commands.command(name="setannouncements")
+    @commands.has_permissions(administrator=True)
+    async def set_announcements(self, ctx, channel: discord.TextChannel):
+        """Post this server's meeting notifications in a text channel"""
+        if not await self.db.set_announcement_channel(ctx.guild.id, channel.id):
+            await self.reply(ctx, "❌ Failed to save the announcement channel")
+            return
+        
+        self.announcement_channels[ctx.guild.id] = channel.id
+        await self.reply(ctx, f"✅ Meeting notifications will be posted in {channel.mention}")
+    
+    @commands.command(name="dmreminders")
+    @commands.has_permissions(administrator=True)
+    async def dm_reminders(self, ctx, audience: str, role: discord.Role = None):
+        """DM reminders before meetings to a role, last meeting's attendees, both, or off
+        
+        Usage: !dmreminders role @Role | previous | both @Role | off
+        """
+        audience = audience.lower()
+        if audience not in ("role", "previous", "both", "off") or (audience in ("role", "both")) != (role is not None):
+            await self.reply(ctx, "❌ Usage: `!dmreminders role @Role`, `previous`, `both @Role` or `off`")
+            return
+        
+        role_id = role.id if role is not None else None
+        remind_previous = audience in ("previous", "both")
+        if not await self.db.set_reminder_audience(ctx.guild.id, role_id, remind_previous):
+            await self.reply(ctx, "❌ Failed to save the reminder setting")
+            return
+        
+        if audience == "off":
+            self.reminder_audiences.pop(ctx.guild.id, None)
+            await self.reply(ctx, "✅ DM reminders are off")
+            return
+        self.reminder_audiences[ctx.guild.id] = (role_id, remind_previous)
+        who = [role.mention] if role is not None else []
+        if remind_previous:
+            who.append("the previous meeting's attendees")
+        await self.reply(ctx, f"✅ {' and '.join(who)} will get a DM {Config.REMINDER_MINUTES} minutes before meetings")
+    
+    @commands.command(name="channels")
+    @commands.has_permissions(administrator=True)
+    async def list_channels(self, ctx):
+        """List this server's meeting and announcement channels"""
+        meeting_channels = [
+            channel.mention for channel in ctx.guild.voice_channels if channel.id in self.meeting_channels
+        ]
+        announcement_channel = self.bot.get_channel(
+            self.announcement_channels.get(ctx.guild.id, Config.ANNOUNCEMENT_CHANNEL_ID)
+        )
+        await self.reply(ctx, 
+            f"🎙️ Meeting channels: {', '.join(meeting_channels) or 'none'}\n"
+            f"📢 Announcements: {announcement_channel.mention if announcement_channel else 'not set'}"
+        )
+    
+    @commands.command(name="cachestats")
+    @commands.has_permissions(administrator=True)
+    async def cache_stats(self, ctx):
+        """Show active-meeting and report cache counters"""
+        lookups = self.meeting_cache_hits + self.meeting_cache_misses
+        hit_rate = self.meeting_cache_hits / lookups * 100 if lookups else 0
+        reports = self.report_cache
+        report_lookups = reports.hits + reports.misses
+        report_hit_rate = reports.hits / report_lookups * 100 if report_lookups else 0
+        await self.reply(ctx, 
+            f"🗂️ Meeting cache: {self.meeting_cache_hits} hits, {self.meeting_cache_misses} misses "
+            f"({hit_rate:.1f}% hit rate), {len(self.meeting_cache)} entries\n"
+            f"📄 Report cache: {reports.hits} hits, {reports.misses} misses "
+            f"({report_hit_rate:.1f}% hit rate), {len(reports)} entries, "
+            f"{reports.bytes / 1024:.0f}/{reports.max_bytes / 1024:.0f} KiB, "
+            f"{reports.evictions} evicted, {reports.invalidations} invalidated"
+        )
+    
+    @commands.command(name="stats")
+    @commands.has_permissions(administrator=True)
+    async def stats(self, ctx):
+        """Show request counts and latency percentiles from the metrics registry"""
+        lines = ["📊 **Runtime metrics**", "```", f"{'metric':<34} {'count':>7} {'p50':>8} {'p99':>8}"]
+        for metric in metrics.REGISTRY.metrics.values():
+            if metric.kind != "histogram":
+                continue
+            for values, histogram in sorted(metric.children.items()):
+                count = histogram.count
+                if not count:
+                    continue
+                name = metric.name.replace("discord_bot_", "").replace("_seconds", "")
+                if values:
+                    name = f"{name}:{','.join(values)}"
+                lines.append(
+                    f"{name[:34]:<34} {count:>7} "
+                    f"{self.format_seconds(histogram.quantile(0.5)):>8} "
+                    f"{self.format_seconds(histogram.quantile(0.99)):>8}"
+                )
+        lines.append("```")
+        
+        lines.append(f"Joins: {self.joins_seen.value}")
+        errors = sum(counter.value for counter in metrics.DISCORD_ERRORS.children.values())
+        lines.append(f"Discord API errors: {errors}")
+        if self.metrics_server is not None:
+            lines.append(f"Prometheus: `http://{Config.METRICS_HOST}:{self.metrics_port}/metrics`")
+        
+        await self.reply(ctx, "\n".join(lines))
+
+    @commands.command(name="querystats")
+    @commands.has_permissions(administrator=True)
+    async def query_stats(self, ctx):
+        """Show the statements with the most database time and the latest slow ones"""
+        profiler = self.db.profiler
+        if profiler is None:
+            await self.reply(ctx, "Query profiling is off; set DB_PROFILE=true to turn it on.")
+            return
+
+        lines = ["🐢 **Database statements by total time**", "```", f"{'calls':>7} {'total':>9} {'max':>8} {'rows':>8}  statement"]
+        for stats in profiler.top(8):
+            lines.append(
+                f"{stats.calls:>7} {stats.seconds * 1000:>7.0f}ms {stats.max_seconds * 1000:>6.1f}ms "
+                f"{stats.rows:>8}  {stats.sql[:70]}"
+            )
+        lines.append("```")
+
+        slow = list(profiler.slow)[-3:]
+        lines.append(f"Slow queries (over {profiler.slow_seconds * 1000:g}ms): {len(profiler.slow)} logged")
+        for query in reversed(slow):
+            plan = " / ".join(query.plan) or "n/a"
+            lines.append(f"• {query.seconds * 1000:.0f}ms `{query.sql[:120]}`\n  plan: `{plan[:200]}`")
+        if self.db.writer_socket is not None:
+            lines.append("Writes run in the writer process and are profiled there.")
+
+        await self.reply(ctx, "\n".join(lines)[:2000])
+
+    @staticmethod
+    def format_seconds(seconds):
+        """Render a bucket bound for display"""
+        if seconds == float("inf"):
+            return "slow"
+        if seconds < 1:
+            return f"<{seconds * 1000:g}ms"
+        return f"<{seconds:g}s"
     
     @commands.command(name="shutdown")
     @commands.has_permissions(administrator=True)
     async def shutdown(self, ctx):
         """Shut down the bot"""
-        await ctx.send("Shutting down the bot... 👋")
+        await self.reply(ctx, "Shutting down the bot... 👋")
         self.logger.info("Bot is shutting down...")
-        await self.bot.close()  # Shut down the bot
+        # Unloads this cog, whose cog_unload saves sessions and closes the database
+        await self.bot.close()
+
 
-    @check_scheduled_meetings.before_loop
-    async def before_check_scheduled_meetings(self):
-        await self.bot.wait_until_ready()
\ No newline at end of file
+async def setup(bot):
+    """Extension entry point: prepare the database and load the tracker"""
+    db = DatabaseManager()
+    # Connections open while migrations run; nothing reads until both finish
+    await asyncio.gather(db.initialize(), db.warm_up())
+    await bot.add_cog(PunctualityTracker(bot, db))
@@ -0,0 +1,293 @@
+import discord
+from discord.ext import commands
+import logging
+import typing
+from datetime import date, datetime, timedelta
+import pytz
+from config import Config
+from utils import timeutil
+from utils.recurrence import RuleBook, describe_rrule, parse_rrule
+from utils.scheduler import EventScheduler
+
+UPCOMING_MAX = 25
+
+
+class RecurringMeetings(commands.Cog):
+    """Recurring meetings (daily standups and the like) with skip dates
+
+    Rules are expanded lazily: only each rule's next occurrence is queued,
+    on a scheduler of its own, and its meetings row is created
+    Config.RULE_LEAD_MINUTES before it starts. From then on it is an
+    ordinary scheduled meeting of the punctuality tracker, with its
+    reminder, start and expiry.
+    """
+
+    def __init__(self, bot, tracker):
+        self.bot = bot
+        self.tracker = tracker
+        self.db = tracker.db
+        self.rules = RuleBook()
+        self.scheduler = EventScheduler(self.materialize)
+        self.logger = logging.getLogger('discord_bot')
+
+    async def cog_load(self):
+        await self.load_rules()
+
+    async def cog_unload(self):
+        self.scheduler.stop()
+
+    async def reply(self, ctx, content=None, **kwargs):
+        return await self.tracker.reply(ctx, content, **kwargs)
+
+    async def load_rules(self):
+        """(Re)load this shard's rules and queue each one's next occurrence"""
+        rules, skips = await self.db.get_meeting_rules()
+        self.rules = RuleBook([rule for rule in rules if self.tracker.owns_guild(rule.guild_id)], skips)
+        for event in self.scheduler.pending():
+            if event.key not in self.rules.rules:
+                self.scheduler.cancel(event.key)
+        now_ts = timeutil.to_epoch(timeutil.now())
+        for rule_id in self.rules.rules:
+            self.queue_next(rule_id, now_ts)
+        self.logger.info(f"Loaded {len(self.rules)} recurring meeting rule(s)")
+
+    def queue_next(self, rule_id, after_ts):
+        """Queue creating the meeting of the rule's first occurrence after ``after_ts``; returns its start"""
+        start_ts = self.rules.next_occurrence(rule_id, after_ts)
+        if start_ts is None:
+            self.scheduler.cancel(rule_id)
+            return None
+        when = timeutil.from_epoch(start_ts) - timedelta(minutes=Config.RULE_LEAD_MINUTES)
+        self.scheduler.schedule(rule_id, "materialize", when, start_ts)
+        return start_ts
+
+    async def materialize(self, event):
+        """Create the meeting for a rule's occurrence, then queue the one after it"""
+        rule_id, start_ts = event.key, event.payload
+        rule = self.rules.get(rule_id)
+        if rule is None:
+            return
+        try:
+            await self.create_occurrence(rule, start_ts)
+        finally:
+            if self.rules.get(rule_id) is not None:
+                self.queue_next(rule_id, start_ts)
+
+    async def create_occurrence(self, rule, start_ts):
+        """Create and schedule the meeting of one occurrence; returns its id, or None if there is nothing to do"""
+        meeting_time = timeutil.from_epoch(start_ts)
+        scheduled = self.tracker.scheduled_meetings.get(rule.channel_id)
+        if scheduled is not None:
+            if scheduled[1] != meeting_time:
+                self.logger.warning(
+                    f"Skipped rule {rule.id}'s meeting at {meeting_time}: channel {rule.channel_id} "
+                    f"already has meeting {scheduled[0]} scheduled"
+                )
+            return None
+
+        meeting_id = await self.db.create_meeting(
+            meeting_time, rule.channel_id, rule.description, rule.guild_id, "scheduled", rule.id
+        )
+        if not meeting_id:
+            # Created before a restart (and recovered from the database), or failed
+            return None
+        self.tracker.add_scheduled_meeting(
+            meeting_id, rule.channel_id, rule.guild_id, meeting_time, rule.description
+        )
+        self.logger.info(f"Created meeting {meeting_id} at {meeting_time} from rule {rule.id}")
+
+        announcement_channel = self.tracker.get_announcement_channel(rule.guild_id)
+        if announcement_channel:
+            try:
+                await self.tracker.notifier.send(
+                    announcement_channel,
+                    f"📅 **Meeting scheduled** for {meeting_time:%H:%M} "
+                    f"(repeats {describe_rrule(rule.rrule, rule.first_date)})\n"
+                    f"*{rule.description or 'No description provided'}*"
+                )
+            except Exception as e:
+                self.logger.error(f"Error announcing recurring meeting: {e}")
+        return meeting_id
+
+    def format_rule(self, rule):
+        tz = "" if rule.timezone == Config.TIMEZONE else f" {rule.timezone}"
+        until = f" until {rule.until_date}" if rule.until_date else ""
+        return (
+            f"#{rule.id} {describe_rrule(rule.rrule, rule.first_date)} at {rule.start_time}{tz}{until} "
+            f"in <#{rule.channel_id}>"
+        )
+
+    @commands.command(name="addrule")
+    @commands.has_permissions(administrator=True)
+    async def add_rule(self, ctx, pattern: str, start_time: str, *, description=None):
+        """Add a recurring meeting in this server's meeting channel
+
+        Args:
+            pattern: daily, weekdays, weekly, biweekly, days such as
+                mon,wed,fri, or an RRULE such as FREQ=WEEKLY;INTERVAL=2;BYDAY=TU
+            start_time: HH:MM
+            description: Optional; may start with a timezone such as
+                Europe/Berlin (default Config.TIMEZONE) and until=YYYY-MM-DD
+        """
+        try:
+            rrule = parse_rrule(pattern)
+            datetime.strptime(start_time, "%H:%M")
+        except ValueError as e:
+            await self.reply(ctx, f"❌ {e}. Use e.g. `!addrule weekdays 09:30 Standup`")
+            return
+
+        timezone = Config.TIMEZONE
+        until_date = None
+        words = (description or "").split()
+        while words:
+            if words[0] in pytz.all_timezones_set:
+                timezone = words.pop(0)
+            elif words[0].startswith("until="):
+                try:
+                    until_date = date.fromisoformat(words.pop(0)[len("until="):])
+                except ValueError:
+                    await self.reply(ctx, "❌ Invalid until date. Use until=YYYY-MM-DD")
+                    return
+            else:
+                break
+        description = " ".join(words) or None
+
+        voice_channel = self.tracker.resolve_meeting_channel(ctx)
+        if not voice_channel:
+            await self.reply(ctx, "❌ Error: No meeting voice channel configured! Use `!addchannel` first")
+            return
+
+        first_date = datetime.now(pytz.timezone(timezone)).date()
+        rule_id = await self.db.add_meeting_rule(
+            ctx.guild.id, voice_channel.id, rrule, start_time, timezone, first_date, until_date, description
+        )
+        if not rule_id:
+            await self.reply(ctx, "❌ Failed to save the recurring meeting")
+            return
+        await self.load_rules()
+
+        rule = self.rules.get(rule_id)
+        next_ts = self.rules.next_occurrence(rule_id, timeutil.to_epoch(timeutil.now()))
+        next_text = f"{timeutil.from_epoch(next_ts):%a %Y-%m-%d %H:%M}" if next_ts else "none"
+        await self.reply(ctx, f"✅ Added recurring meeting {self.format_rule(rule)}\nNext: {next_text}")
+
+    @commands.command(name="rules")
+    @commands.has_permissions(administrator=True)
+    async def list_rules(self, ctx):
+        """List this server's recurring meetings and upcoming skip dates"""
+        now_ts = timeutil.to_epoch(timeutil.now())
+        today = timeutil.now().strftime("%Y-%m-%d")
+        rules = [r.rule for r in self.rules.rules.values() if r.rule.guild_id == ctx.guild.id]
+        if not rules:
+            await self.reply(ctx, "No recurring meetings. Add one with `!addrule`.")
+            return
+
+        lines = ["🔁 **Recurring meetings**"]
+        for rule in rules:
+            next_ts = self.rules.next_occurrence(rule.id, now_ts)
+            next_text = f"next {timeutil.from_epoch(next_ts):%a %Y-%m-%d %H:%M}" if next_ts else "ended"
+            lines.append(f"{self.format_rule(rule)} - {rule.description or 'no description'} ({next_text})")
+
+        skips = sorted(
+            (skip_date, rule_id)
+            for (guild_id, rule_id), dates in self.rules.skips.items()
+            if guild_id == ctx.guild.id
+            for skip_date in dates
+            if skip_date >= today
+        )
+        if skips:
+            lines.append("")
+            lines.append("⏭️ **Skipped dates**")
+            for skip_date, rule_id in skips[:20]:
+                lines.append(f"{skip_date}: {'every rule' if rule_id == 0 else f'rule #{rule_id}'}")
+        await self.reply(ctx, "\n".join(lines))
+
+    @commands.command(name="removerule")
+    @commands.has_permissions(administrator=True)
+    async def remove_rule(self, ctx, rule_id: int):
+        """Stop a recurring meeting; a meeting it already scheduled still takes place"""
+        if not await self.db.remove_meeting_rule(ctx.guild.id, rule_id):
+            await self.reply(ctx, f"❌ No recurring meeting #{rule_id} in this server")
+            return
+        await self.load_rules()
+        await self.reply(
+            ctx, f"✅ Removed recurring meeting #{rule_id}. Cancel an already scheduled one with `!cancelmeeting`."
+        )
+
+    async def update_skip(self, ctx, day, rule_id, skipped, reason=None):
+        try:
+            skip_date = date.fromisoformat(day)
+        except ValueError:
+            await self.reply(ctx, "❌ Invalid date format. Please use YYYY-MM-DD")
+            return False
+        rule = self.rules.get(rule_id) if rule_id else None
+        if rule_id and (rule is None or rule.guild_id != ctx.guild.id):
+            await self.reply(ctx, f"❌ No recurring meeting #{rule_id} in this server")
+            return False
+        if not await self.db.set_rule_skip(ctx.guild.id, rule_id or 0, skip_date, skipped, reason):
+            await self.reply(ctx, "❌ Nothing to change")
+            return False
+        await self.load_rules()
+        return True
+
+    @commands.command(name="skipdate")
+    @commands.has_permissions(administrator=True)
+    async def skip_date(self, ctx, day: str, rule_id: typing.Optional[int] = None, *, reason=None):
+        """Skip a date (e.g. a holiday) for one recurring meeting, or for all of them
+
+        Args:
+            day: YYYY-MM-DD
+            rule_id: Optional rule number from !rules (default: every rule)
+            reason: Optional note
+        """
+        if await self.update_skip(ctx, day, rule_id, True, reason):
+            which = f"recurring meeting #{rule_id}" if rule_id else "every recurring meeting"
+            await self.reply(
+                ctx, f"✅ Skipping {day} for {which}. A meeting already scheduled stays; use `!cancelmeeting` for it."
+            )
+
+    @commands.command(name="unskipdate")
+    @commands.has_permissions(administrator=True)
+    async def unskip_date(self, ctx, day: str, rule_id: typing.Optional[int] = None):
+        """Stop skipping a date set with !skipdate"""
+        if await self.update_skip(ctx, day, rule_id, False):
+            await self.reply(ctx, f"✅ {day} is no longer skipped")
+
+    @commands.command(name="upcoming")
+    async def upcoming(self, ctx, count: int = 10):
+        """Show this server's next meetings, recurring and one-off"""
+        count = max(1, min(count, UPCOMING_MAX))
+        now = timeutil.now()
+        now_ts = timeutil.to_epoch(now)
+        items = [
+            (start_ts, rule.channel_id, rule.description, f"rule #{rule.id}")
+            for start_ts, rule in self.rules.upcoming(now_ts, count, ctx.guild.id)
+        ]
+        # Scheduled meetings not already listed as a rule's occurrence
+        listed = {(channel_id, start_ts) for start_ts, channel_id, _, _ in items}
+        for channel_id, (meeting_id, meeting_time, description, guild_id) in self.tracker.scheduled_meetings.items():
+            start_ts = timeutil.to_epoch(meeting_time.replace(microsecond=0))
+            if guild_id == ctx.guild.id and meeting_time > now and (channel_id, start_ts) not in listed:
+                items.append((start_ts, channel_id, description, f"meeting #{meeting_id}"))
+        items.sort()
+        if not items:
+            await self.reply(ctx, "No upcoming meetings.")
+            return
+
+        lines = ["📆 **Upcoming meetings**"]
+        for start_ts, channel_id, description, source in items[:count]:
+            lines.append(
+                f"{timeutil.from_epoch(start_ts):%a %Y-%m-%d %H:%M} <#{channel_id}> "
+                f"{description or 'Meeting'} ({source})"
+            )
+        await self.reply(ctx, "\n".join(lines), allowed_mentions=discord.AllowedMentions.none())
+
+
+async def setup(bot):
+    """Extension entry point; load after cogs.punctuality_tracker, which runs the meetings it creates"""
+    tracker = bot.get_cog("PunctualityTracker")
+    if tracker is None:
+        raise commands.ExtensionFailed(
+            "cogs.recurring_meetings", RuntimeError("cogs.punctuality_tracker must be loaded first")
+        )
+    await bot.add_cog(RecurringMeetings(bot, tracker))
@@ -1,17 +1,77 @@
-from decouple import config
+from decouple import Csv, config
 
 
 class Config:
     TOKEN = config("DISCORD_TOKEN")
     PREFIX = config("COMMAND_PREFIX", "!")
-    MEETING_CHANNEL_ID = int(config("MEETING_CHANNEL_ID"))
-    ANNOUNCEMENT_CHANNEL_ID = int(config("ANNOUNCEMENT_CHANNEL_ID"))
+    # Legacy single-channel setup; per-guild channels live in the database
+    MEETING_CHANNEL_ID = int(config("MEETING_CHANNEL_ID", "0"))
+    ANNOUNCEMENT_CHANNEL_ID = int(config("ANNOUNCEMENT_CHANNEL_ID", "0"))
     REMINDER_MINUTES = int(config("REMINDER_MINUTES", "15"))
+    # How long joins are tracked after a meeting starts
+    MEETING_DURATION_MINUTES = int(config("MEETING_DURATION_MINUTES", "120"))
+    # Planned length of a meeting (unless !endmeeting ends it sooner); leaving before it counts as leaving early
+    MEETING_LENGTH_MINUTES = int(config("MEETING_LENGTH_MINUTES", "30"))
+    # Recurring meetings get their meetings row (and reminders) this long before they start
+    RULE_LEAD_MINUTES = int(config("RULE_LEAD_MINUTES", "60"))
+    # Wall-clock timezone for meeting times; stored timestamps are UTC epoch seconds
+    TIMEZONE = config("TIMEZONE", "UTC")
     GRACE_PERIOD_MINUTES = int(config("GRACE_PERIOD_MINUTES", "1"))
     FEE_PER_MINUTE = float(
         config("FEE_PER_MINUTE", "200")
     )  # Fee amount per minute late
+    DIGEST_DEBOUNCE_SECONDS = float(config("DIGEST_DEBOUNCE_SECONDS", "2"))
+    # DM reminders: messages in flight, new sends per second, tries per
+    # member and first retry delay. A first DM costs two requests (open the
+    # DM channel, then send), so 20/s stays under the global 50 requests/s.
+    REMINDER_DM_CONCURRENCY = int(config("REMINDER_DM_CONCURRENCY", "8"))
+    REMINDER_DM_RATE = float(config("REMINDER_DM_RATE", "20"))
+    REMINDER_DM_ATTEMPTS = int(config("REMINDER_DM_ATTEMPTS", "5"))
+    REMINDER_DM_BACKOFF_SECONDS = float(config("REMINDER_DM_BACKOFF_SECONDS", "1"))
+    REPORT_CHUNK_SIZE = int(config("REPORT_CHUNK_SIZE", "200"))
+    REPORT_ROWS_PER_PAGE = int(config("REPORT_ROWS_PER_PAGE", "40"))
+    REPORT_MAX_EMBED_PAGES = int(config("REPORT_MAX_EMBED_PAGES", "5"))
+    MEETINGS_PAGE_SIZE = int(config("MEETINGS_PAGE_SIZE", "10"))
+    # Meetings a member needs before attendance-rate rankings and badges count them
+    LOYALTY_MIN_MEETINGS = int(config("LOYALTY_MIN_MEETINGS", "5"))
+    # Memory budget for rendered !report and !meetings pages
+    REPORT_CACHE_BYTES = int(config("REPORT_CACHE_BYTES", str(16 * 1024 * 1024)))
+    # !export keeps this much in memory before spilling to a temp file,
+    # and gzips exports of more than EXPORT_COMPRESS_ROWS rows
+    EXPORT_SPOOL_BYTES = int(config("EXPORT_SPOOL_BYTES", str(4 * 1024 * 1024)))
+    EXPORT_COMPRESS_ROWS = int(config("EXPORT_COMPRESS_ROWS", "5000"))
     DATABASE_PATH = config("DATABASE_PATH", "attendance.db")
+    DB_READ_POOL_SIZE = int(config("DB_READ_POOL_SIZE", "4"))
+    # Per-statement timing (see utils.db_profiler); statements slower than
+    # DB_SLOW_QUERY_MS are logged with their query plan
+    DB_PROFILE = config("DB_PROFILE", default=False, cast=bool)
+    DB_SLOW_QUERY_MS = float(config("DB_SLOW_QUERY_MS", "100"))
+    DB_SLOW_QUERY_KEEP = int(config("DB_SLOW_QUERY_KEEP", "50"))
+    # Sharded deployments: every bot process sends its writes to the one
+    # writer process (writer.py) listening on this Unix socket. Empty means
+    # the process writes to the database itself.
+    DB_WRITER_SOCKET = config("DB_WRITER_SOCKET", "")
+    DB_WRITER_TIMEOUT_SECONDS = float(config("DB_WRITER_TIMEOUT_SECONDS", "10"))
+    # SHARD_COUNT 0 runs a single unsharded bot; otherwise this process runs
+    # SHARD_IDS (comma separated) of SHARD_COUNT, or all of them if empty
+    SHARD_COUNT = int(config("SHARD_COUNT", "0"))
+    SHARD_IDS = config("SHARD_IDS", default="", cast=Csv(int))
+    # Closed meetings older than RETENTION_DAYS (rounded down to a month)
+    # move to per-year SQLite files in ARCHIVE_PATH; 0 disables archival
+    RETENTION_DAYS = int(config("RETENTION_DAYS", "365"))
+    ARCHIVE_PATH = config("ARCHIVE_PATH", "archive")
+    RETENTION_INTERVAL_HOURS = float(config("RETENTION_INTERVAL_HOURS", "24"))
+    ARCHIVE_BATCH_MEETINGS = int(config("ARCHIVE_BATCH_MEETINGS", "10"))
+    VACUUM_STEP_PAGES = int(config("VACUUM_STEP_PAGES", "500"))
+    WRITE_FLUSH_INTERVAL_MS = int(config("WRITE_FLUSH_INTERVAL_MS", "250"))
+    WRITE_BATCH_SIZE = int(config("WRITE_BATCH_SIZE", "50"))
     LOG_PATH = config("LOG_PATH", "logs")
+    LOG_LEVEL = config("LOG_LEVEL", "INFO")
+    LOG_RETENTION_DAYS = int(config("LOG_RETENTION_DAYS", "14"))
+    LOG_JSON = config("LOG_JSON", default=False, cast=bool)  # one JSON object per line
+    # Prometheus endpoint; set METRICS_PORT to 0 to disable it
+    METRICS_HOST = config("METRICS_HOST", "127.0.0.1")
+    METRICS_PORT = int(config("METRICS_PORT", "9108"))
+    METRICS_LAG_INTERVAL_SECONDS = float(config("METRICS_LAG_INTERVAL_SECONDS", "0.5"))
 
 
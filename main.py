@@ -5,11 +5,11 @@ import asyncio
 import logging
 from config import Config
 from utils.logger import setup_logger
-from utils.db_manager import DatabaseManager
-from cogs.punctuality_tracker import PunctualityTracker
 
-# Set up logging
-setup_logger()
+# Set up logging; shard processes share the log directory, so each gets its own file
+setup_logger(
+    file_name=f"bot-shards-{'-'.join(map(str, Config.SHARD_IDS))}.log" if Config.SHARD_IDS else "bot.log"
+)
 logger = logging.getLogger("discord_bot")
 
 # Initialize bot with intents
@@ -18,19 +18,37 @@ intents.voice_states = True
 intents.members = True
 intents.message_content = True
 
-bot = commands.Bot(command_prefix=Config.PREFIX, intents=intents)
+if Config.SHARD_COUNT:
+    # One process per group of shards; writes go through the writer process
+    # (writer.py) named by DB_WRITER_SOCKET, which all of them share
+    bot = commands.AutoShardedBot(
+        command_prefix=Config.PREFIX,
+        intents=intents,
+        shard_count=Config.SHARD_COUNT,
+        shard_ids=Config.SHARD_IDS or None,
+    )
+else:
+    bot = commands.Bot(command_prefix=Config.PREFIX, intents=intents)
+
+
+@bot.event
+async def setup_hook():
+    # Runs once before connecting to the gateway, unlike on_ready which fires
+    # again on every reconnect. The cog module (and the database layer) is
+    # only imported here, and it prepares the schema, opens connections and
+    # recovers scheduled meetings before the first event arrives.
+    await bot.load_extension("cogs.punctuality_tracker")
+    logger.info("Punctuality tracker cog loaded")
+    # Shares the punctuality tracker's database, so it loads second
+    await bot.load_extension("cogs.loyalty_tracker")
+    logger.info("Loyalty tracker cog loaded")
+    await bot.load_extension("cogs.recurring_meetings")
+    logger.info("Recurring meetings cog loaded")
 
 
 @bot.event
 async def on_ready():
     logger.info(f"Bot is ready! Logged in as {bot.user.name}")
-    # Initialize database
-    db = DatabaseManager()
-    db.initialize()
-
-    # Load cogs
-    await bot.add_cog(PunctualityTracker(bot))
-    logger.info("Punctuality tracker cog loaded")
 
 
 async def main():
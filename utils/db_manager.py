@@ -1,210 +1,1952 @@
+import asyncio
+import json
+import os
 import sqlite3
 import logging
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from attendance import (
+    ATTENDANCE_COLUMNS,
+    MEETING_COLUMNS,
+    FeeReevaluation,
+    attendance_from_row,
+    fee_change_from_row,
+    fee_override_from_row,
+    fee_policy_from_row,
+    loyalty_streak_from_row,
+    meeting_from_row,
+    meeting_rule_from_row,
+    rule_skip_from_row,
+)
 from config import Config
+from utils import timeutil
+from utils.db_profiler import ProfiledConnection, QueryProfiler
+from utils.metrics import DB_LATENCY
+from utils.migrations import (
+    GUILD_ROLLUP_SELECT,
+    PUNCTUALITY_LATE_INDEX,
+    ROLLUP_UPDATE_TRIGGER,
+    USER_ROLLUP_SELECT,
+    apply_migrations,
+    current_version,
+    upgrade_archive,
+)
+from utils.loyalty import replay
+from utils.writer_service import WriteOutcomeUnknown, WriterClient
+
+
+# Display names change; keep the latest without rewriting unchanged rows
+USER_UPSERT = """
+    INSERT INTO users (user_id, user_name) VALUES (?, ?)
+    ON CONFLICT (user_id) DO UPDATE SET user_name = excluded.user_name
+    WHERE user_name IS NOT excluded.user_name
+    """
+
+
+MAX_INTEGER = 2**63 - 1
+
+# Meetings in a start_ts range for one guild (plus meetings from before
+# per-guild tracking); parameters are (start_ts, end_ts, guild_id)
+ATTENDANCE_RANGE = """
+    m.start_ts >= ?1 AND m.start_ts < ?2 AND m.status != 'cancelled'
+    AND (?3 IS NULL OR m.guild_id = ?3 OR m.guild_id IS NULL)
+    """
+
+# Every punctuality row of a guild's meetings in [:start_ts, :end_ts) (or of
+# meeting :meeting_id alone) with its
+# recorded and its re-evaluated lateness and fee, in one set-based pass. Each
+# meeting uses the guild's latest policy in effect on its date, else guild
+# 0's, else :grace/:rate; members get their most lenient role override
+# (:member_roles is a JSON list of [user_id, role_id]). Waived meetings cost
+# nothing. Archived months are left out. Keep in step with calculate_fee.
+# Both CTEs are MATERIALIZED so the policy lookup runs once per meeting and
+# the override lookup uses an index, not once per row.
+FEE_EVALUATION = """
+    WITH scope AS MATERIALIZED (
+        SELECT s.id, s.start_ts, s.guild_id, s.month, s.policy_id,
+               COALESCE(f.grace_minutes, :grace) AS grace_minutes,
+               CASE WHEN s.waived THEN 0.0 ELSE COALESCE(f.fee_per_minute, :rate) END AS fee_per_minute,
+               f.max_fee, s.waived
+        FROM (
+            SELECT m.id, m.start_ts, COALESCE(m.guild_id, 0) AS guild_id,
+                   substr(m.meeting_date, 1, 7) AS month,
+                   (SELECT f.id FROM fee_policies f
+                    WHERE f.guild_id IN (COALESCE(m.guild_id, 0), 0) AND f.effective_from <= m.meeting_date
+                    ORDER BY f.guild_id = 0, f.effective_from DESC, f.id DESC LIMIT 1) AS policy_id,
+                   EXISTS (SELECT 1 FROM fee_waivers w WHERE w.meeting_id = m.id) AS waived
+            FROM meetings m
+            WHERE m.start_ts >= :start_ts AND m.start_ts < :end_ts
+              AND (m.guild_id = :guild_id OR m.guild_id IS NULL)
+              AND (:meeting_id IS NULL OR m.id = :meeting_id)
+              AND m.meeting_date >= (SELECT COALESCE(MAX(archived_before), '') FROM archives)
+        ) s
+        LEFT JOIN fee_policies f ON f.id = s.policy_id
+    ),
+    overrides AS MATERIALIZED (
+        SELECT policy_id, user_id, grace_minutes, fee_per_minute, max_fee FROM (
+            SELECT r.policy_id, CAST(json_extract(mr.value, '$[0]') AS INTEGER) AS user_id,
+                   r.grace_minutes, r.fee_per_minute, r.max_fee,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY r.policy_id, json_extract(mr.value, '$[0]')
+                       ORDER BY COALESCE(r.fee_per_minute, 1e308), -COALESCE(r.grace_minutes, 0), r.role_id
+                   ) AS preference
+            FROM json_each(:member_roles) mr
+            JOIN fee_policy_roles r ON r.role_id = json_extract(mr.value, '$[1]')
+        )
+        WHERE preference = 1
+    ),
+    lateness AS (
+        SELECT p.id, p.meeting_id, s.guild_id, s.month, p.user_id,
+               p.late_minutes AS old_late_minutes, p.fee_amount AS old_fee,
+               MAX(0, (p.join_ts - s.start_ts) / 60
+                      - COALESCE(o.grace_minutes, s.grace_minutes)) AS new_late_minutes,
+               CASE WHEN s.waived THEN 0.0 ELSE COALESCE(o.fee_per_minute, s.fee_per_minute) END AS rate,
+               COALESCE(o.max_fee, s.max_fee, 1e308) AS cap
+        FROM scope s
+        JOIN punctuality p ON p.meeting_id = s.id
+        LEFT JOIN overrides o ON o.policy_id = s.policy_id AND o.user_id = p.user_id
+    )
+    SELECT id, meeting_id, guild_id, month, user_id, old_late_minutes, old_fee, new_late_minutes,
+           MIN(new_late_minutes * rate, cap) AS new_fee
+    FROM lateness
+    """
+
+# Rows of a fee evaluation whose lateness or fee differs from the recorded one
+FEE_CHANGED = "new_late_minutes != old_late_minutes OR new_fee != old_fee"
+
+# Per-member rollup differences of the changed rows in temp.fee_evaluation
+FEE_DELTAS = """
+    CREATE TEMP TABLE fee_deltas AS
+    SELECT guild_id, month, user_id,
+           SUM(new_late_minutes > 0) - SUM(old_late_minutes > 0) AS late_count_delta,
+           SUM(new_late_minutes - old_late_minutes) AS late_minutes_delta,
+           SUM(new_fee - old_fee) AS fees_delta
+    FROM temp.fee_evaluation WHERE changed
+    GROUP BY guild_id, month, user_id
+    """
+
+# Apply the differences in temp.fee_deltas to a rollup table
+ROLLUP_DELTA_UPDATE = """
+    UPDATE {table} SET
+        late_count = late_count + d.late_count_delta,
+        late_minutes = late_minutes + d.late_minutes_delta,
+        fees = fees + d.fees_delta
+    FROM (
+        SELECT {key}, SUM(late_count_delta) AS late_count_delta,
+               SUM(late_minutes_delta) AS late_minutes_delta, SUM(fees_delta) AS fees_delta
+        FROM temp.fee_deltas GROUP BY {key}
+    ) d
+    WHERE {match}
+    """
+
+
+# ORDER BY for each loyalty leaderboard; ?2 is the guild's latest meeting seq
+LOYALTY_ORDERS = {
+    "current": "current_streak DESC, best_streak DESC",
+    "best": "best_streak DESC, current_streak DESC",
+    "attendance": "CAST(attended AS REAL) / (?2 - first_seq + 1) DESC, attended DESC",
+}
+
+# Loyalty schema version; databases upgraded past it are backfilled from history
+LOYALTY_MIGRATION = 11
 
 
 class DatabaseManager:
-    def __init__(self, db_path=Config.DATABASE_PATH):
+    """Async facade over SQLite.
+
+    All writes go through one long-lived WAL-mode connection owned by a
+    dedicated writer thread; reads run on a small pool of query-only
+    connections. Every public method is awaitable so callers on the event
+    loop never block on disk I/O.
+
+    Old meetings can be moved to per-year archive files. Reader connections
+    attach every archive as ``archive_<year>``, and report queries look
+    there for meetings that are no longer in the hot tables.
+
+    With ``writer_socket`` set, write jobs are sent to the writer process
+    serving that socket (see utils.writer_service) instead of running on a
+    local writer thread; reads stay local.
+
+    With ``profile`` on, every statement this process runs is timed by
+    ``self.profiler`` (a utils.db_profiler.QueryProfiler).
+    """
+
+    # Write jobs a WriterService will run for remote DatabaseManagers
+    REMOTE_WRITES = frozenset({
+        "_initialize",
+        "_create_meeting",
+        "_update_meeting_start",
+        "_set_meeting_status",
+        "_record_punctuality",
+        "_record_punctuality_batch",
+        "_record_sessions",
+        "_add_meeting_channel",
+        "_remove_meeting_channel",
+        "_set_announcement_channel",
+        "_set_reminder_audience",
+        "_add_fee_policy",
+        "_waive_meeting_fees",
+        "_reevaluate_fees",
+        "_add_meeting_rule",
+        "_remove_meeting_rule",
+        "_set_rule_skip",
+        "_rebuild_loyalty",
+        "_rebuild_rollups",
+        "_archive_meetings",
+        "_incremental_vacuum",
+    })
+
+    # Remote writes that may run for minutes over the full history: they wait
+    # for their answer, and raise WriteOutcomeUnknown if it never comes
+    REMOTE_MAINTENANCE = frozenset({
+        "_initialize",
+        "_reevaluate_fees",
+        "_rebuild_loyalty",
+        "_rebuild_rollups",
+        "_archive_meetings",
+        "_incremental_vacuum",
+    })
+
+    def __init__(
+        self,
+        db_path=Config.DATABASE_PATH,
+        read_pool_size=Config.DB_READ_POOL_SIZE,
+        archive_path=Config.ARCHIVE_PATH,
+        writer_socket=Config.DB_WRITER_SOCKET,
+        profile=Config.DB_PROFILE,
+    ):
         self.db_path = db_path
+        self.read_pool_size = read_pool_size
+        self.archive_path = archive_path
+        self.writer_socket = writer_socket or None
+        self._remote = WriterClient(writer_socket) if writer_socket else None
+        self.profiler = QueryProfiler() if profile else None
+        # year -> archive file; replaced, never mutated, so readers can use a snapshot
+        self._archives = {}
+        self._archive_generation = 0
         self.logger = logging.getLogger("discord_bot")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._readers = ThreadPoolExecutor(
+            max_workers=read_pool_size, thread_name_prefix="db-reader"
+        )
+        self._write_conn = None
+        self._local = threading.local()
+        self._read_conns = []
+        self._read_conns_lock = threading.Lock()
 
-    def initialize(self):
-        """Initialize the database with necessary tables"""
+    def _connect(self):
+        factory = sqlite3.Connection if self.profiler is None else ProfiledConnection
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=factory)
+        if self.profiler is not None:
+            conn.profiler = self.profiler
+        conn.execute("PRAGMA busy_timeout = 5000")
+        return conn
+
+    def _writer_conn(self):
+        """Return the writer connection, opening it on first use (writer thread only)"""
+        if self._write_conn is None:
+            conn = self._connect()
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            # Bulk jobs such as fee re-evaluation keep their temp tables off disk
+            # and rewrite most pages of a large table without spilling the cache
+            conn.execute("PRAGMA temp_store = MEMORY")
+            conn.execute("PRAGMA cache_size = -65536")
+            self._write_conn = conn
+        return self._write_conn
+
+    def _reader_conn(self):
+        """Return this reader thread's query-only connection, with current archives attached"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            self._local.attached = []
+            self._local.archive_generation = 0
+            with self._read_conns_lock:
+                self._read_conns.append(conn)
+        if self._remote is not None:
+            self._check_archives(conn)
+        if self._local.archive_generation != self._archive_generation:
+            self._attach_archives(conn)
+        return conn
+
+    def _check_archives(self, conn):
+        """Pick up archive files the writer process has published since the last look
+
+        Rows of the archives table are never deleted, so their count is the
+        writer's archive generation; checking it is one lookup per query.
+        """
+        if conn.execute("SELECT COUNT(*) FROM archives").fetchone()[0] != len(self._archives):
+            self._load_archives(conn)
+
+    def _attach_archives(self, conn):
+        generation, archives = self._archive_generation, self._archives
+        for schema in self._local.attached:
+            conn.execute(f"DETACH DATABASE {schema}")
+        attached = []
+        # Newest first: recent history is what reports ask for most
+        for year in sorted(archives, reverse=True):
+            try:
+                conn.execute(f"ATTACH DATABASE ? AS archive_{year}", (archives[year],))
+                attached.append(f"archive_{year}")
+            except sqlite3.Error as e:
+                self.logger.error(f"Could not attach archive {archives[year]}: {e}")
+        self._local.attached = attached
+        self._local.archive_generation = generation
+
+    def _meeting_schema(self, cursor, meeting_id):
+        """Name of the attached database holding a meeting (reader threads only)"""
+        for schema in ("main", *self._local.attached):
+            cursor.execute(f"SELECT 1 FROM {schema}.meetings WHERE id = ?", (meeting_id,))
+            if cursor.fetchone():
+                return schema
+        return "main"
+
+    def _range_schemas(self):
+        """Archives oldest first, then the hot tables (reader threads only)"""
+        return [*reversed(self._local.attached), "main"]
+
+    async def _write(self, func, *args):
+        if self._remote is None:
+            return await self._run(self._writer, func, *args)
+        started = time.perf_counter()
+        maintenance = func.__name__ in self.REMOTE_MAINTENANCE
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            return await self._remote.call(func.__name__, args, wait=maintenance)
+        except WriteOutcomeUnknown:
+            if maintenance:
+                raise
+            # Plain writes time out like a failed write; the client logged it
+            return None
+        finally:
+            DB_LATENCY.labels(func.__name__.lstrip("_")).observe(time.perf_counter() - started)
 
-            # Create meetings table
-            cursor.execute(
-                """
-            CREATE TABLE IF NOT EXISTS meetings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                meeting_date TEXT NOT NULL,
-                start_time TEXT NOT NULL,
-                channel_id INTEGER NOT NULL,
-                description TEXT
-            )
-            """
-            )
+    async def _read(self, func, *args):
+        if self._remote is None:
+            return await self._run(self._readers, func, *args)
+        return await self._run(self._readers, self._read_archived, func, *args, name=func.__name__)
 
-            # Create punctuality table - simplified to only track lateness
-            cursor.execute(
-                """
-            CREATE TABLE IF NOT EXISTS punctuality (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                meeting_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                user_name TEXT NOT NULL,
-                join_time TEXT NOT NULL,
-                late_minutes INTEGER DEFAULT 0,
-                fee_amount REAL DEFAULT 0,
-                FOREIGN KEY (meeting_id) REFERENCES meetings (id)
-            )
-            """
-            )
+    def _read_archived(self, func, *args):
+        """Run a read, again if the writer process published an archive file meanwhile
 
-            conn.commit()
-            self.logger.info("Database initialized successfully")
+        The query may have run after the archived rows left the hot tables
+        but before this reader attached their new file.
+        """
+        while True:
+            result = func(*args)
+            generation = self._local.archive_generation
+            self._reader_conn()
+            if self._local.archive_generation == generation:
+                return result
+
+    async def _run(self, executor, func, *args, name=None):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        finally:
+            DB_LATENCY.labels((name or func.__name__).lstrip("_")).observe(time.perf_counter() - started)
+
+    async def initialize(self):
+        """Initialize the database with necessary tables"""
+        await self._write(self._initialize)
+
+    def _initialize(self):
+        conn = self._writer_conn()
+        try:
+            previous = current_version(conn)
+            version = apply_migrations(conn, self.logger)
+            self._enable_incremental_vacuum(conn)
+            self._load_archives(conn)
+            self._upgrade_archives(conn)
+            if previous < LOYALTY_MIGRATION <= version:
+                self._rebuild_loyalty()
+            self.logger.info(f"Database initialized successfully (schema version {version})")
         except sqlite3.Error as e:
             self.logger.error(f"Database initialization error: {e}")
-        finally:
-            if conn:
+
+    def _enable_incremental_vacuum(self, conn):
+        """Switch to auto_vacuum=INCREMENTAL so archival can hand pages back to the OS
+
+        Existing databases need one full VACUUM for the setting to take
+        effect; it runs here, before the bot starts handling events.
+        """
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return
+        started = time.perf_counter()
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        self.logger.info(
+            f"Enabled incremental vacuum in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+    def _load_archives(self, conn):
+        archives = dict(conn.execute("SELECT year, path FROM archives"))
+        if archives != self._archives:
+            self._archives = archives
+            self._archive_generation += 1
+
+    def _upgrade_archives(self, conn):
+        """Give archive files written by older versions the current columns"""
+        for year, path in self._archives.items():
+            schema = f"archive_{year}"
+            try:
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+            except sqlite3.Error as e:
+                self.logger.error(f"Could not open archive {path}: {e}")
+                continue
+            try:
+                upgrade_archive(conn, schema)
+                conn.commit()
+            finally:
+                conn.execute(f"DETACH DATABASE {schema}")
+
+    async def warm_up(self):
+        """Open the writer and reader connections ahead of the first query"""
+        writer = self._remote.connect() if self._remote else self._write(self._writer_conn)
+        await asyncio.gather(
+            writer, *(self._read(self._reader_conn) for _ in range(self.read_pool_size))
+        )
+
+    async def close(self):
+        """Close all connections and stop the worker threads"""
+        if self._remote is not None:
+            await self._remote.close()
+        else:
+            await self._write(self._close_writer)
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._read_conns_lock:
+            for conn in self._read_conns:
                 conn.close()
+            self._read_conns.clear()
+
+    def _close_writer(self):
+        if self._write_conn is not None:
+            self._write_conn.close()
+            self._write_conn = None
+
+    async def create_meeting(
+        self,
+        start,
+        channel_id,
+        description=None,
+        guild_id=None,
+        status="active",
+        rule_id=None,
+    ):
+        """Create a new meeting record
 
-    def create_meeting(self, meeting_date, start_time, channel_id, description=None):
-        """Create a new meeting record"""
+        Args:
+            start: Wall-clock start time (naive datetime in Config.TIMEZONE)
+            status: "scheduled" for meetings that start later, "active" for
+                meetings that are already running
+            rule_id: The recurring rule this is an occurrence of; each
+                occurrence is created once, so this returns None if it
+                already exists
+        """
+        return await self._write(
+            self._create_meeting,
+            start,
+            channel_id,
+            description,
+            guild_id,
+            status,
+            rule_id,
+        )
+
+    def _create_meeting(self, start, channel_id, description, guild_id, status, rule_id=None):
+        conn = self._writer_conn()
         try:
-            conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
 
             cursor.execute(
                 """
-            INSERT INTO meetings (meeting_date, start_time, channel_id, description)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO meetings (meeting_date, start_ts, channel_id, description, guild_id, status, rule_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (rule_id, start_ts) WHERE rule_id IS NOT NULL DO NOTHING
             """,
-                (meeting_date, start_time, channel_id, description),
+                (
+                    start.strftime("%Y-%m-%d"),
+                    timeutil.to_epoch(start),
+                    channel_id,
+                    description,
+                    guild_id,
+                    status,
+                    rule_id,
+                ),
             )
 
-            meeting_id = cursor.lastrowid
             conn.commit()
+            if cursor.rowcount == 0:
+                self.logger.info(f"Meeting of rule {rule_id} at {start} already exists")
+                return None
+            meeting_id = cursor.lastrowid
             self.logger.info(f"Created meeting record with ID: {meeting_id}")
             return meeting_id
         except sqlite3.Error as e:
+            conn.rollback()
             self.logger.error(f"Error creating meeting: {e}")
             return None
-        finally:
-            if conn:
-                conn.close()
 
-    def record_punctuality(
+    async def update_meeting_start(self, meeting_id, start):
+        """Move a meeting to a new wall-clock start time"""
+        return await self._write(self._update_meeting_start, meeting_id, start)
+
+    def _update_meeting_start(self, meeting_id, start):
+        conn = self._writer_conn()
+        try:
+            cursor = conn.execute(
+                "UPDATE meetings SET meeting_date = ?, start_ts = ? WHERE id = ?",
+                (start.strftime("%Y-%m-%d"), timeutil.to_epoch(start), meeting_id),
+            )
+            conn.commit()
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error updating meeting {meeting_id}: {e}")
+            return False
+
+    async def set_meeting_status(self, meeting_id, status):
+        """Move a meeting to scheduled, active, closed or cancelled"""
+        return await self._write(self._set_meeting_status, meeting_id, status)
+
+    def _set_meeting_status(self, meeting_id, status):
+        conn = self._writer_conn()
+        try:
+            cursor = conn.execute(
+                "UPDATE meetings SET status = ? WHERE id = ?", (status, meeting_id)
+            )
+            conn.commit()
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error setting status of meeting {meeting_id}: {e}")
+            return False
+
+    async def get_open_meetings(self):
+        """Get every scheduled or active meeting, for rebuilding state after a restart
+
+        Returns (Meeting, attendee_ids) pairs where attendee_ids is the set
+        of users already recorded for the meeting.
+        """
+        return await self._read(self._get_open_meetings)
+
+    def _get_open_meetings(self):
+        try:
+            cursor = self._reader_conn().cursor()
+            cursor.execute(
+                f"""
+            SELECT {MEETING_COLUMNS}, group_concat(p.user_id)
+            FROM meetings m
+            LEFT JOIN punctuality p ON p.meeting_id = m.id
+            WHERE m.status IN ('scheduled', 'active')
+            GROUP BY m.id
+            ORDER BY m.start_ts
+            """
+            )
+            return [
+                (
+                    meeting_from_row(row[:6]),
+                    {int(user_id) for user_id in row[6].split(",")} if row[6] else set(),
+                )
+                for row in cursor.fetchall()
+            ]
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting open meetings: {e}")
+            return []
+
+    async def record_punctuality(
         self, meeting_id, user_id, user_name, join_time, late_minutes=0, fee_amount=0
     ):
-        """Record a user's punctuality for a meeting"""
+        """Record a user's punctuality for a meeting
+
+        join_time is a wall-clock datetime in Config.TIMEZONE.
+        """
+        return await self._write(
+            self._record_punctuality,
+            meeting_id,
+            user_id,
+            user_name,
+            join_time,
+            late_minutes,
+            fee_amount,
+        )
+
+    def _record_punctuality(
+        self, meeting_id, user_id, user_name, join_time, late_minutes, fee_amount
+    ):
+        conn = self._writer_conn()
         try:
-            conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
 
-            # Check if this user already has a record for this meeting
+            cursor.execute(USER_UPSERT, (user_id, user_name))
             cursor.execute(
                 """
-            SELECT id FROM punctuality 
-            WHERE meeting_id = ? AND user_id = ?
+            INSERT INTO punctuality (meeting_id, user_id, join_ts, late_minutes, fee_amount)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (meeting_id, user_id) DO NOTHING
             """,
-                (meeting_id, user_id),
+                (meeting_id, user_id, timeutil.to_epoch(join_time), late_minutes, fee_amount),
             )
 
-            existing = cursor.fetchone()
-
-            if existing:
+            conn.commit()
+            if cursor.rowcount == 0:
                 self.logger.info(
                     f"User {user_name} already has a punctuality record for meeting {meeting_id}"
                 )
-                return existing[0]
-
-            cursor.execute(
-                """
-            INSERT INTO punctuality (meeting_id, user_id, user_name, join_time, late_minutes, fee_amount)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-                (meeting_id, user_id, user_name, join_time, late_minutes, fee_amount),
-            )
+                return None
 
-            conn.commit()
             self.logger.info(
                 f"Recorded punctuality for user {user_name} in meeting {meeting_id}"
             )
             return cursor.lastrowid
         except sqlite3.Error as e:
+            conn.rollback()
             self.logger.error(f"Error recording punctuality: {e}")
             return None
-        finally:
-            if conn:
-                conn.close()
 
-    def get_active_meeting(self, channel_id, meeting_date=None):
-        """Get the active meeting for a channel on a specific date"""
+    async def record_punctuality_batch(self, rows):
+        """Record many punctuality rows in a single transaction
+
+        Args:
+            rows: Iterable of (meeting_id, user_id, user_name, join_time,
+                late_minutes, fee_amount) tuples; join_time is a wall-clock
+                datetime in Config.TIMEZONE
+
+        Returns:
+            Number of rows inserted, or None if the transaction failed
+        """
+        return await self._write(self._record_punctuality_batch, rows)
+
+    def _record_punctuality_batch(self, rows):
+        conn = self._writer_conn()
         try:
-            conn = sqlite3.connect(self.db_path)
+            rows = list(rows)
             cursor = conn.cursor()
 
-            if meeting_date:
+            cursor.executemany(USER_UPSERT, [(row[1], row[2]) for row in rows])
+            # Members who already have a record for the meeting are skipped
+            cursor.executemany(
+                """
+            INSERT INTO punctuality (meeting_id, user_id, join_ts, late_minutes, fee_amount)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (meeting_id, user_id) DO NOTHING
+            """,
+                [
+                    (meeting_id, user_id, timeutil.to_epoch(join_time), late, fee)
+                    for meeting_id, user_id, _, join_time, late, fee in rows
+                ],
+            )
+
+            conn.commit()
+            # rowcount excludes the rollup rows written by triggers
+            written = cursor.rowcount
+            self.logger.info(f"Recorded {written} punctuality row(s) in one batch")
+            return written
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error recording punctuality batch: {e}")
+            return None
+
+    async def record_sessions(self, meeting_id, sessions):
+        """Store each member's time in a meeting in a single transaction
+
+        Args:
+            sessions: Iterable of (user_id, attended_seconds, leave_ts);
+                leave_ts is None unless the member left before the meeting ended
+
+        Returns:
+            Number of punctuality rows updated, or None if the transaction failed
+        """
+        return await self._write(self._record_sessions, meeting_id, sessions)
+
+    def _record_sessions(self, meeting_id, sessions):
+        conn = self._writer_conn()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+            UPDATE punctuality SET attended_seconds = ?, leave_ts = ?
+            WHERE meeting_id = ? AND user_id = ?
+            """,
+                [
+                    (seconds, leave_ts, meeting_id, user_id)
+                    for user_id, seconds, leave_ts in sessions
+                ],
+            )
+            conn.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error recording sessions for meeting {meeting_id}: {e}")
+            return None
+
+    async def get_sessions(self, meeting_id):
+        """Stored (user_id, attended_seconds, leave_ts) of a meeting, for members that have them"""
+        return await self._read(self._get_sessions, meeting_id)
+
+    def _get_sessions(self, meeting_id):
+        try:
+            cursor = self._reader_conn().cursor()
+            cursor.execute(
+                """
+            SELECT user_id, attended_seconds, leave_ts FROM punctuality
+            WHERE meeting_id = ? AND attended_seconds IS NOT NULL
+            """,
+                (meeting_id,),
+            )
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting sessions for meeting {meeting_id}: {e}")
+            return []
+
+    async def get_active_meeting(self, channel_id, meeting_date=None, open_only=False):
+        """Get the latest Meeting for a channel on a specific date ("YYYY-MM-DD")
+
+        Cancelled meetings are never returned; with open_only, closed
+        meetings are skipped as well. Without open_only, the archive for the
+        date's year is searched when the hot tables have no match.
+        """
+        if not meeting_date:
+            meeting_date = timeutil.now().strftime("%Y-%m-%d")
+        return await self._read(
+            self._get_active_meeting, channel_id, meeting_date, open_only
+        )
+
+    def _get_active_meeting(self, channel_id, meeting_date, open_only):
+        try:
+            cursor = self._reader_conn().cursor()
+            schemas = ["main"]
+            # Only closed meetings are archived, so open lookups stay on the hot tables
+            archive = f"archive_{meeting_date[:4]}"
+            if not open_only and archive in self._local.attached:
+                schemas.append(archive)
+
+            for schema in schemas:
                 cursor.execute(
-                    """
-                SELECT id, meeting_date, start_time, description FROM meetings
-                WHERE channel_id = ? AND meeting_date = ?
-                ORDER BY start_time DESC LIMIT 1
+                    f"""
+                SELECT {MEETING_COLUMNS} FROM {schema}.meetings m
+                WHERE m.channel_id = ? AND m.meeting_date = ?
+                  AND m.status != 'cancelled' AND (? = 0 OR m.status != 'closed')
+                ORDER BY m.start_ts DESC LIMIT 1
                 """,
-                    (channel_id, meeting_date),
+                    (channel_id, meeting_date, int(open_only)),
+                )
+                meeting = cursor.fetchone()
+                if meeting:
+                    return meeting_from_row(meeting)
+            return None
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting active meeting: {e}")
+            return None
+
+    async def get_meeting(self, meeting_id):
+        """Get a Meeting by id from the hot tables, or None"""
+        return await self._read(self._get_meeting, meeting_id)
+
+    def _get_meeting(self, meeting_id):
+        try:
+            cursor = self._reader_conn().cursor()
+            cursor.execute(f"SELECT {MEETING_COLUMNS} FROM meetings m WHERE m.id = ?", (meeting_id,))
+            meeting = cursor.fetchone()
+            return meeting_from_row(meeting) if meeting else None
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting meeting {meeting_id}: {e}")
+            return None
+
+    async def get_punctuality_report(self, meeting_id):
+        """Get punctuality report for a meeting as AttendanceRecords"""
+        return await self._read(self._get_punctuality_report, meeting_id)
+
+    def _get_punctuality_report(self, meeting_id):
+        try:
+            cursor = self._reader_conn().cursor()
+            schema = self._meeting_schema(cursor, meeting_id)
+            cursor.execute(
+                f"""
+            SELECT {ATTENDANCE_COLUMNS}
+            FROM {schema}.punctuality p LEFT JOIN main.users u ON u.user_id = p.user_id
+            WHERE p.meeting_id = ?
+            ORDER BY p.late_minutes DESC
+            """,
+                (meeting_id,),
+            )
+
+            return list(map(attendance_from_row, cursor))
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting punctuality report: {e}")
+            return []
+
+    async def get_report_summary(self, meeting_id):
+        """Get (attendee_count, total_fees, early_leavers) for a meeting without loading its rows"""
+        return await self._read(self._get_report_summary, meeting_id)
+
+    def _get_report_summary(self, meeting_id):
+        try:
+            cursor = self._reader_conn().cursor()
+            schema = self._meeting_schema(cursor, meeting_id)
+            cursor.execute(
+                f"""
+            SELECT COUNT(*), COALESCE(SUM(fee_amount), 0), COUNT(leave_ts)
+            FROM {schema}.punctuality WHERE meeting_id = ?
+            """,
+                (meeting_id,),
+            )
+            return cursor.fetchone()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting report summary: {e}")
+            return (0, 0, 0)
+
+    async def iter_punctuality_report(self, meeting_id, chunk_size=Config.REPORT_CHUNK_SIZE):
+        """Stream a meeting's punctuality rows, latest arrivals first
+
+        Rows are fetched chunk by chunk with keyset pagination on
+        (late_minutes, id), so memory use does not depend on meeting size.
+        Yields AttendanceRecords.
+        """
+        after = None
+        while True:
+            rows, after = await self._read(
+                self._get_punctuality_chunk, meeting_id, after, chunk_size
+            )
+            for row in rows:
+                yield row
+            if len(rows) < chunk_size:
+                return
+
+    def _get_punctuality_chunk(self, meeting_id, after, chunk_size):
+        try:
+            cursor = self._reader_conn().cursor()
+            schema = self._meeting_schema(cursor, meeting_id)
+            if after is None:
+                cursor.execute(
+                    f"""
+                SELECT p.id, {ATTENDANCE_COLUMNS}
+                FROM {schema}.punctuality p LEFT JOIN main.users u ON u.user_id = p.user_id
+                WHERE p.meeting_id = ?
+                ORDER BY p.late_minutes DESC, p.id DESC
+                LIMIT ?
+                """,
+                    (meeting_id, chunk_size),
                 )
             else:
-                # Get today's date
-                from datetime import datetime
+                cursor.execute(
+                    f"""
+                SELECT p.id, {ATTENDANCE_COLUMNS}
+                FROM {schema}.punctuality p LEFT JOIN main.users u ON u.user_id = p.user_id
+                WHERE p.meeting_id = ? AND (p.late_minutes, p.id) < (?, ?)
+                ORDER BY p.late_minutes DESC, p.id DESC
+                LIMIT ?
+                """,
+                    (meeting_id, *after, chunk_size),
+                )
+            rows = cursor.fetchall()
+            if not rows:
+                return [], after
+            # The keyset for the next chunk is (late_minutes, id) of the last row
+            last = rows[-1]
+            return [attendance_from_row(row[1:]) for row in rows], (last[4], last[0])
+        except sqlite3.Error as e:
+            self.logger.error(f"Error streaming punctuality report: {e}")
+            return [], after
+
+    async def get_all_meetings(self, limit=10, guild_id=None, before_id=None):
+        """Get a page of meetings, newest first, optionally restricted to one guild
 
-                today = datetime.now().strftime("%Y-%m-%d")
+        Returns Meetings, archived ones included. Meetings recorded before
+        per-guild tracking have no guild and are included for every guild.
+        Pass the id of the last meeting on the previous page as before_id to
+        fetch the next page.
+        """
+        return await self._read(self._get_all_meetings, limit, guild_id, before_id)
 
+    def _get_all_meetings(self, limit, guild_id, before_id):
+        try:
+            cursor = self._reader_conn().cursor()
+            bound = (MAX_INTEGER, MAX_INTEGER)
+            if before_id is not None:
+                schema = self._meeting_schema(cursor, before_id)
                 cursor.execute(
-                    """
-                SELECT id, meeting_date, start_time, description FROM meetings
-                WHERE channel_id = ? AND meeting_date = ?
-                ORDER BY start_time DESC LIMIT 1
+                    f"SELECT start_ts, id FROM {schema}.meetings WHERE id = ?", (before_id,)
+                )
+                bound = cursor.fetchone() or bound
+
+            # Take a page from the hot tables and from each archive, then merge
+            meetings = []
+            for schema in ("main", *self._local.attached):
+                cursor.execute(
+                    f"""
+                SELECT {MEETING_COLUMNS}
+                FROM {schema}.meetings m
+                WHERE (?1 IS NULL OR m.guild_id = ?1 OR m.guild_id IS NULL)
+                  AND m.status != 'cancelled'
+                  -- The plain bound lets SQLite seek the index; the row value breaks ties
+                  AND m.start_ts <= ?2 AND (m.start_ts, m.id) < (?2, ?3)
+                ORDER BY m.start_ts DESC, m.id DESC
+                LIMIT ?4
                 """,
-                    (channel_id, today),
+                    (guild_id, *bound, limit),
                 )
+                meetings.extend(map(meeting_from_row, cursor))
+            meetings.sort(key=lambda meeting: (meeting.start_ts, meeting.id), reverse=True)
+            return meetings[:limit]
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting meetings list: {e}")
+            return []
 
-            meeting = cursor.fetchone()
-            return meeting
+    async def count_attendance(self, start, end, guild_id=None):
+        """Count punctuality rows for meetings starting in [start, end) (wall-clock datetimes)"""
+        return await self._read(
+            self._count_attendance, timeutil.to_epoch(start), timeutil.to_epoch(end), guild_id
+        )
+
+    def _count_attendance(self, start_ts, end_ts, guild_id):
+        try:
+            cursor = self._reader_conn().cursor()
+            total = 0
+            for schema in self._range_schemas():
+                cursor.execute(
+                    f"""
+                SELECT COUNT(*) FROM {schema}.meetings m
+                JOIN {schema}.punctuality p ON p.meeting_id = m.id
+                WHERE {ATTENDANCE_RANGE}
+                """,
+                    (start_ts, end_ts, guild_id),
+                )
+                total += cursor.fetchone()[0]
+            return total
         except sqlite3.Error as e:
-            self.logger.error(f"Error getting active meeting: {e}")
+            self.logger.error(f"Error counting attendance: {e}")
             return None
-        finally:
-            if conn:
-                conn.close()
 
-    def get_punctuality_report(self, meeting_id):
-        """Get punctuality report for a meeting"""
+    async def stream_attendance(self, start, end, consume, guild_id=None):
+        """Feed attendance for meetings starting in [start, end) to ``consume`` on a reader thread
+
+        ``consume`` receives the open cursor and iterates it, so rows are
+        stepped out of SQLite one at a time and never held in a list. Rows
+        are (meeting_id, start_ts, channel_id, description, user_id,
+        user_name, join_ts, late_minutes, fee_amount, leave_ts,
+        attended_seconds), ordered by meeting start, archives first. Returns
+        what ``consume`` returns, or None on a database error.
+        """
+        return await self._read(
+            self._stream_attendance,
+            timeutil.to_epoch(start),
+            timeutil.to_epoch(end),
+            consume,
+            guild_id,
+        )
+
+    def _stream_attendance(self, start_ts, end_ts, consume, guild_id):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            conn = self._reader_conn()
+
+            def rows():
+                # Archives hold older meetings than the hot tables, so chaining
+                # the per-schema queries keeps the overall start order
+                for schema in self._range_schemas():
+                    yield from conn.execute(
+                        f"""
+                    SELECT m.id, m.start_ts, m.channel_id, m.description,
+                           p.user_id, u.user_name, p.join_ts, p.late_minutes, p.fee_amount,
+                           p.leave_ts, p.attended_seconds
+                    FROM {schema}.meetings m
+                    JOIN {schema}.punctuality p ON p.meeting_id = m.id
+                    LEFT JOIN main.users u ON u.user_id = p.user_id
+                    WHERE {ATTENDANCE_RANGE}
+                    ORDER BY m.start_ts, m.id, p.user_id
+                    """,
+                        (start_ts, end_ts, guild_id),
+                    )
 
+            return consume(rows())
+        except sqlite3.Error as e:
+            self.logger.error(f"Error streaming attendance: {e}")
+            return None
+
+    async def get_meeting_channels(self):
+        """Get every configured meeting channel as (channel_id, guild_id) rows"""
+        return await self._read(self._get_meeting_channels)
+
+    def _get_meeting_channels(self):
+        try:
+            cursor = self._reader_conn().cursor()
+            cursor.execute("SELECT channel_id, guild_id FROM meeting_channels")
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting meeting channels: {e}")
+            return []
+
+    async def get_announcement_channels(self):
+        """Get (guild_id, announcement_channel_id) for every configured guild"""
+        return await self._read(self._get_announcement_channels)
+
+    def _get_announcement_channels(self):
+        try:
+            cursor = self._reader_conn().cursor()
             cursor.execute(
                 """
-            SELECT user_name, join_time, late_minutes, fee_amount
-            FROM punctuality WHERE meeting_id = ?
-            ORDER BY late_minutes DESC
+            SELECT guild_id, announcement_channel_id FROM guild_settings
+            WHERE announcement_channel_id IS NOT NULL
+            """
+            )
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting announcement channels: {e}")
+            return []
+
+    async def add_meeting_channel(self, guild_id, channel_id):
+        """Register a voice channel as a meeting channel for a guild"""
+        return await self._write(self._add_meeting_channel, guild_id, channel_id)
+
+    def _add_meeting_channel(self, guild_id, channel_id):
+        conn = self._writer_conn()
+        try:
+            conn.execute(
+                """
+            INSERT INTO meeting_channels (channel_id, guild_id) VALUES (?, ?)
+            ON CONFLICT (channel_id) DO UPDATE SET guild_id = excluded.guild_id
             """,
-                (meeting_id,),
+                (channel_id, guild_id),
             )
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error adding meeting channel: {e}")
+            return False
+
+    async def remove_meeting_channel(self, channel_id):
+        """Stop treating a voice channel as a meeting channel"""
+        return await self._write(self._remove_meeting_channel, channel_id)
 
-            punctuality_records = cursor.fetchall()
-            return punctuality_records
+    def _remove_meeting_channel(self, channel_id):
+        conn = self._writer_conn()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM meeting_channels WHERE channel_id = ?", (channel_id,)
+            )
+            conn.commit()
+            return cursor.rowcount > 0
         except sqlite3.Error as e:
-            self.logger.error(f"Error getting punctuality report: {e}")
+            conn.rollback()
+            self.logger.error(f"Error removing meeting channel: {e}")
+            return False
+
+    async def set_announcement_channel(self, guild_id, channel_id):
+        """Set the text channel a guild's meeting notifications are posted to"""
+        return await self._write(self._set_announcement_channel, guild_id, channel_id)
+
+    def _set_announcement_channel(self, guild_id, channel_id):
+        conn = self._writer_conn()
+        try:
+            conn.execute(
+                """
+            INSERT INTO guild_settings (guild_id, announcement_channel_id) VALUES (?, ?)
+            ON CONFLICT (guild_id) DO UPDATE SET announcement_channel_id = excluded.announcement_channel_id
+            """,
+                (guild_id, channel_id),
+            )
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error setting announcement channel: {e}")
+            return False
+
+    async def get_reminder_audiences(self):
+        """Get (guild_id, reminder_role_id, remind_previous) for guilds with DM reminders on"""
+        return await self._read(self._get_reminder_audiences)
+
+    def _get_reminder_audiences(self):
+        try:
+            cursor = self._reader_conn().cursor()
+            cursor.execute(
+                """
+            SELECT guild_id, reminder_role_id, remind_previous FROM guild_settings
+            WHERE reminder_role_id IS NOT NULL OR remind_previous
+            """
+            )
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting reminder audiences: {e}")
+            return []
+
+    async def set_reminder_audience(self, guild_id, role_id, remind_previous):
+        """Choose who gets a DM before a guild's meetings; (None, False) turns DMs off"""
+        return await self._write(self._set_reminder_audience, guild_id, role_id, remind_previous)
+
+    def _set_reminder_audience(self, guild_id, role_id, remind_previous):
+        conn = self._writer_conn()
+        try:
+            conn.execute(
+                """
+            INSERT INTO guild_settings (guild_id, reminder_role_id, remind_previous) VALUES (?, ?, ?)
+            ON CONFLICT (guild_id) DO UPDATE SET
+                reminder_role_id = excluded.reminder_role_id,
+                remind_previous = excluded.remind_previous
+            """,
+                (guild_id, role_id, int(remind_previous)),
+            )
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error setting reminder audience: {e}")
+            return False
+
+    async def get_previous_attendees(self, channel_id, before):
+        """User ids recorded at the channel's last closed meeting starting before ``before``"""
+        return await self._read(self._get_previous_attendees, channel_id, timeutil.to_epoch(before))
+
+    def _get_previous_attendees(self, channel_id, before_ts):
+        try:
+            cursor = self._reader_conn().cursor()
+            cursor.execute(
+                """
+            SELECT user_id FROM punctuality
+            WHERE meeting_id = (
+                SELECT id FROM meetings
+                WHERE channel_id = ? AND start_ts < ? AND status = 'closed'
+                ORDER BY start_ts DESC LIMIT 1
+            )
+            """,
+                (channel_id, before_ts),
+            )
+            return [user_id for user_id, in cursor]
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting previous attendees: {e}")
             return []
+
+    async def get_leaderboard(self, guild_id, month, limit=10):
+        """Get a guild's most punctual and latest members for a month from the rollups
+
+        Returns (most_on_time, most_late), each a list of
+        (user_id, meetings, late_count, late_minutes, fees) rows.
+        """
+        return await self._read(self._get_leaderboard, guild_id, month, limit)
+
+    def _get_leaderboard(self, guild_id, month, limit):
+        try:
+            cursor = self._reader_conn().cursor()
+            cursor.execute(
+                """
+            SELECT user_id, meetings, late_count, late_minutes, fees
+            FROM user_monthly_stats WHERE guild_id = ? AND month = ?
+            ORDER BY meetings - late_count DESC, late_minutes ASC
+            LIMIT ?
+            """,
+                (guild_id, month, limit),
+            )
+            most_on_time = cursor.fetchall()
+            cursor.execute(
+                """
+            SELECT user_id, meetings, late_count, late_minutes, fees
+            FROM user_monthly_stats WHERE guild_id = ? AND month = ? AND late_minutes > 0
+            ORDER BY late_minutes DESC
+            LIMIT ?
+            """,
+                (guild_id, month, limit),
+            )
+            return most_on_time, cursor.fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting leaderboard: {e}")
+            return [], []
+
+    async def get_fee_summary(self, guild_id, month, limit=10):
+        """Get a guild's fee totals for a month and its top fee payers
+
+        Returns ((attendances, late_count, late_minutes, fees) or None,
+        [(user_id, late_minutes, fees), ...]).
+        """
+        return await self._read(self._get_fee_summary, guild_id, month, limit)
+
+    def _get_fee_summary(self, guild_id, month, limit):
+        try:
+            cursor = self._reader_conn().cursor()
+            cursor.execute(
+                """
+            SELECT attendances, late_count, late_minutes, fees
+            FROM guild_monthly_stats WHERE guild_id = ? AND month = ?
+            """,
+                (guild_id, month),
+            )
+            totals = cursor.fetchone()
+            cursor.execute(
+                """
+            SELECT user_id, late_minutes, fees
+            FROM user_monthly_stats WHERE guild_id = ? AND month = ? AND fees > 0
+            ORDER BY fees DESC
+            LIMIT ?
+            """,
+                (guild_id, month, limit),
+            )
+            return totals, cursor.fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting fee summary: {e}")
+            return None, []
+
+    async def get_user_stats(self, guild_id, user_id, month):
+        """Get one member's rollup for a month and across all months
+
+        Each result is (meetings, late_count, late_minutes, fees) or None.
+        """
+        return await self._read(self._get_user_stats, guild_id, user_id, month)
+
+    def _get_user_stats(self, guild_id, user_id, month):
+        try:
+            cursor = self._reader_conn().cursor()
+            cursor.execute(
+                """
+            SELECT meetings, late_count, late_minutes, fees
+            FROM user_monthly_stats WHERE guild_id = ? AND month = ? AND user_id = ?
+            """,
+                (guild_id, month, user_id),
+            )
+            this_month = cursor.fetchone()
+            cursor.execute(
+                """
+            SELECT SUM(meetings), SUM(late_count), SUM(late_minutes), SUM(fees)
+            FROM user_monthly_stats WHERE guild_id = ? AND user_id = ?
+            """,
+                (guild_id, user_id),
+            )
+            all_time = cursor.fetchone()
+            return this_month, all_time if all_time and all_time[0] else None
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting user stats: {e}")
+            return None, None
+
+    async def rebuild_rollups(self):
+        """Recompute the monthly rollups from raw punctuality rows
+
+        Returns the number of rollup rows that differed from the recomputed
+        values (0 means the incremental rollups were consistent), or None
+        if the rebuild failed. Months already moved to the archives are left
+        as they are, since their raw rows are no longer in the hot tables.
+        With a remote writer, raises WriteOutcomeUnknown if the answer is lost.
+        """
+        return await self._write(self._rebuild_rollups)
+
+    def _rebuild_rollups(self):
+        conn = self._writer_conn()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT substr(COALESCE(MAX(archived_before), ''), 1, 7) FROM archives")
+            first_month = cursor.fetchone()[0]
+            mismatches = 0
+            for table, select, key, totals in (
+                ("user_monthly_stats", USER_ROLLUP_SELECT, "guild_id, month, user_id", "meetings"),
+                ("guild_monthly_stats", GUILD_ROLLUP_SELECT, "guild_id, month", "attendances"),
+            ):
+                fresh = f"temp.fresh_{table}"
+                cursor.execute(f"DROP TABLE IF EXISTS {fresh}")
+                cursor.execute(f"CREATE TABLE {fresh} AS SELECT * FROM {table} WHERE 0")
+                cursor.execute(f"INSERT INTO {fresh} {select}")
+                cursor.execute(f"DELETE FROM {fresh} WHERE month < ?", (first_month,))
+
+                # Rows whose key is missing, extra or holds different totals;
+                # fees are compared to the cent so float summation order doesn't count
+                columns = f"{key}, {totals}, late_count, late_minutes, ROUND(fees, 2)"
+                cursor.execute(
+                    f"""
+                SELECT COUNT(*) FROM (
+                    SELECT {key} FROM (
+                        SELECT {columns} FROM {table} WHERE month >= ?1
+                        EXCEPT SELECT {columns} FROM {fresh}
+                    )
+                    UNION
+                    SELECT {key} FROM (
+                        SELECT {columns} FROM {fresh}
+                        EXCEPT SELECT {columns} FROM {table} WHERE month >= ?1
+                    )
+                )
+                """,
+                    (first_month,),
+                )
+                mismatches += cursor.fetchone()[0]
+
+                cursor.execute(f"DELETE FROM {table} WHERE month >= ?", (first_month,))
+                cursor.execute(f"INSERT INTO {table} SELECT * FROM {fresh}")
+                cursor.execute(f"DROP TABLE {fresh}")
+            conn.commit()
+            return mismatches
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error rebuilding rollups: {e}")
+            return None
+
+    async def get_loyalty(self, guild_id, user_id):
+        """Get a member's streak state in a guild
+
+        Returns (LoyaltyStreak or None, latest_seq, latest_open): the seq of
+        the guild's newest meeting with attendance and whether it is still
+        open, which utils.loyalty needs to tell if a streak is broken.
+        """
+        return await self._read(self._get_loyalty, guild_id, user_id)
+
+    def _get_loyalty(self, guild_id, user_id):
+        try:
+            cursor = self._reader_conn().cursor()
+            latest_seq, latest_open = self._loyalty_latest(cursor, guild_id)
+            cursor.execute(
+                "SELECT * FROM loyalty_streaks WHERE guild_id = ? AND user_id = ?", (guild_id, user_id)
+            )
+            row = cursor.fetchone()
+            return (loyalty_streak_from_row(row) if row else None), latest_seq, latest_open
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting loyalty for user {user_id}: {e}")
+            return None, 0, False
+
+    async def get_loyalty_leaderboard(self, guild_id, order="current", limit=10):
+        """Get a guild's top members by live streak, best streak or attendance rate
+
+        ``order`` is a key of LOYALTY_ORDERS. Live streaks leave out members
+        who missed a meeting since; attendance needs
+        Config.LOYALTY_MIN_MEETINGS meetings. Returns (LoyaltyStreaks,
+        latest_seq, latest_open) as get_loyalty does.
+        """
+        return await self._read(self._get_loyalty_leaderboard, guild_id, order, limit)
+
+    def _get_loyalty_leaderboard(self, guild_id, order, limit):
+        try:
+            cursor = self._reader_conn().cursor()
+            latest_seq, latest_open = self._loyalty_latest(cursor, guild_id)
+            alive_from = latest_seq - (1 if latest_open else 0)
+            conditions = {
+                "current": "current_streak > 0 AND last_seq >= ?3",
+                "best": "best_streak > 0",
+                "attendance": "attended >= ?4",
+            }
+            cursor.execute(
+                f"""
+            SELECT * FROM loyalty_streaks
+            WHERE guild_id = ?1 AND {conditions[order]}
+            ORDER BY {LOYALTY_ORDERS[order]}
+            LIMIT ?5
+            """,
+                (guild_id, latest_seq, alive_from, Config.LOYALTY_MIN_MEETINGS, limit),
+            )
+            return list(map(loyalty_streak_from_row, cursor)), latest_seq, latest_open
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting loyalty leaderboard: {e}")
+            return [], 0, False
+
+    def _loyalty_latest(self, cursor, guild_id):
+        """(seq of the guild's newest meeting with attendance, whether it is still open)"""
+        cursor.execute(
+            """
+        SELECT l.seq, m.status FROM loyalty_meetings l LEFT JOIN meetings m ON m.id = l.meeting_id
+        WHERE l.guild_id = ? ORDER BY l.seq DESC LIMIT 1
+        """,
+            (guild_id,),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return 0, False
+        return row[0], row[1] in ("scheduled", "active")
+
+    async def rebuild_loyalty(self):
+        """Recompute every loyalty streak from the full punctuality history
+
+        Archived rows are read too. Returns the number of stored streak and
+        meeting rows that differed from the recomputed ones (0 means the
+        incremental state was consistent), or None if the rebuild failed.
+        The writer is held for the whole replay. With a remote writer, raises
+        WriteOutcomeUnknown if the answer is lost.
+        """
+        return await self._write(self._rebuild_loyalty)
+
+    def _rebuild_loyalty(self):
+        conn = self._writer_conn()
+        attached = []
+        try:
+            started = time.perf_counter()
+            for year, path in sorted(self._archives.items()):
+                conn.execute(f"ATTACH DATABASE ? AS archive_{year}", (path,))
+                attached.append(f"archive_{year}")
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            history = " UNION ALL ".join(
+                f"""
+            SELECT p.id, p.meeting_id, COALESCE(m.guild_id, 0) AS guild_id, p.user_id, p.late_minutes
+            FROM {schema}.punctuality p JOIN {schema}.meetings m ON m.id = p.meeting_id
+            """
+                for schema in (*attached, "main")
+            )
+            cursor.execute(
+                f"SELECT meeting_id, guild_id, user_id, late_minutes FROM ({history}) ORDER BY id"
+            )
+            meetings, streaks = replay(cursor)
+
+            cursor.execute("DROP TABLE IF EXISTS temp.fresh_loyalty_meetings")
+            cursor.execute("DROP TABLE IF EXISTS temp.fresh_loyalty_streaks")
+            cursor.execute("CREATE TEMP TABLE fresh_loyalty_meetings AS SELECT * FROM loyalty_meetings WHERE 0")
+            cursor.execute("CREATE TEMP TABLE fresh_loyalty_streaks AS SELECT * FROM loyalty_streaks WHERE 0")
+            cursor.executemany(
+                "INSERT INTO temp.fresh_loyalty_meetings VALUES (?, ?, ?)",
+                ((meeting_id, guild_id, seq) for meeting_id, (guild_id, seq) in meetings.items()),
+            )
+            cursor.executemany(
+                "INSERT INTO temp.fresh_loyalty_streaks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((guild_id, user_id, *state) for (guild_id, user_id), state in streaks.items()),
+            )
+
+            # Rows whose key is missing, extra or holds different values
+            mismatches = 0
+            for table, key in (
+                ("loyalty_meetings", "meeting_id"),
+                ("loyalty_streaks", "guild_id, user_id"),
+            ):
+                fresh = f"temp.fresh_{table}"
+                cursor.execute(
+                    f"""
+                SELECT COUNT(*) FROM (
+                    SELECT {key} FROM (SELECT * FROM main.{table} EXCEPT SELECT * FROM {fresh})
+                    UNION
+                    SELECT {key} FROM (SELECT * FROM {fresh} EXCEPT SELECT * FROM main.{table})
+                )
+                """
+                )
+                mismatches += cursor.fetchone()[0]
+                cursor.execute(f"DELETE FROM main.{table}")
+                cursor.execute(f"INSERT INTO main.{table} SELECT * FROM {fresh}")
+                cursor.execute(f"DROP TABLE {fresh}")
+            conn.commit()
+            self.logger.info(
+                f"Rebuilt loyalty streaks of {len(streaks)} member(s) over {len(meetings)} meeting(s) "
+                f"in {(time.perf_counter() - started) * 1000:.0f}ms; {mismatches} row(s) differed"
+            )
+            return mismatches
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error rebuilding loyalty streaks: {e}")
+            return None
         finally:
-            if conn:
-                conn.close()
+            for schema in attached:
+                conn.execute(f"DETACH DATABASE {schema}")
+
+    async def get_meeting_rules(self):
+        """Get every active recurring meeting rule and every skip date as (rules, skips)"""
+        return await self._read(self._get_meeting_rules)
+
+    def _get_meeting_rules(self):
+        try:
+            conn = self._reader_conn()
+            rules = list(map(meeting_rule_from_row, conn.execute(
+                """
+            SELECT id, guild_id, channel_id, rrule, start_time, timezone, first_date, until_date, description
+            FROM meeting_rules WHERE active = 1 ORDER BY id
+            """
+            )))
+            skips = list(map(rule_skip_from_row, conn.execute(
+                """
+            SELECT guild_id, rule_id, skip_date, reason
+            FROM meeting_rule_skips ORDER BY guild_id, skip_date, rule_id
+            """
+            )))
+            return rules, skips
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting meeting rules: {e}")
+            return [], []
+
+    async def add_meeting_rule(
+        self, guild_id, channel_id, rrule, start_time, timezone, first_date, until_date=None, description=None
+    ):
+        """Store a recurring meeting rule
+
+        ``rrule`` is normalized by utils.recurrence.parse_rrule,
+        ``start_time`` is "HH:MM" on ``timezone``'s clock and the dates are
+        dates. Returns the rule id, or None on error.
+        """
+        return await self._write(
+            self._add_meeting_rule,
+            guild_id,
+            channel_id,
+            rrule,
+            start_time,
+            timezone,
+            first_date.strftime("%Y-%m-%d"),
+            until_date.strftime("%Y-%m-%d") if until_date else None,
+            description,
+        )
+
+    def _add_meeting_rule(
+        self, guild_id, channel_id, rrule, start_time, timezone, first_date, until_date, description
+    ):
+        conn = self._writer_conn()
+        try:
+            cursor = conn.execute(
+                """
+            INSERT INTO meeting_rules
+                (guild_id, channel_id, rrule, start_time, timezone, first_date, until_date, description)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (guild_id, channel_id, rrule, start_time, timezone, first_date, until_date, description),
+            )
+            conn.commit()
+            self.logger.info(f"Stored meeting rule {cursor.lastrowid} ({rrule} at {start_time}) for guild {guild_id}")
+            return cursor.lastrowid
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error adding meeting rule: {e}")
+            return None
+
+    async def remove_meeting_rule(self, guild_id, rule_id):
+        """Stop a guild's recurring rule; meetings it already created stay. Returns whether it was active"""
+        return await self._write(self._remove_meeting_rule, guild_id, rule_id)
+
+    def _remove_meeting_rule(self, guild_id, rule_id):
+        conn = self._writer_conn()
+        try:
+            cursor = conn.execute(
+                "UPDATE meeting_rules SET active = 0 WHERE id = ? AND guild_id = ? AND active = 1",
+                (rule_id, guild_id),
+            )
+            conn.commit()
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error removing meeting rule: {e}")
+            return False
+
+    async def set_rule_skip(self, guild_id, rule_id, skip_date, skipped=True, reason=None):
+        """Skip (or stop skipping) a date for one rule, or for all of a guild's rules with rule_id 0
+
+        ``skip_date`` is a date on the rules' clocks. Returns whether
+        anything changed.
+        """
+        return await self._write(
+            self._set_rule_skip, guild_id, rule_id, skip_date.strftime("%Y-%m-%d"), skipped, reason
+        )
 
-    def get_all_meetings(self, limit=10):
-        """Get list of meetings"""
+    def _set_rule_skip(self, guild_id, rule_id, skip_date, skipped, reason):
+        conn = self._writer_conn()
+        try:
+            if skipped:
+                cursor = conn.execute(
+                    """
+                INSERT INTO meeting_rule_skips (guild_id, rule_id, skip_date, reason) VALUES (?, ?, ?, ?)
+                ON CONFLICT (guild_id, rule_id, skip_date) DO UPDATE SET reason = excluded.reason
+                """,
+                    (guild_id, rule_id, skip_date, reason),
+                )
+            else:
+                cursor = conn.execute(
+                    "DELETE FROM meeting_rule_skips WHERE guild_id = ? AND rule_id = ? AND skip_date = ?",
+                    (guild_id, rule_id, skip_date),
+                )
+            conn.commit()
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error updating skip date: {e}")
+            return False
+
+    async def get_fee_policies(self):
+        """Get every stored fee policy and role override as (policies, overrides)"""
+        return await self._read(self._get_fee_policies)
+
+    def _get_fee_policies(self):
+        try:
+            conn = self._reader_conn()
+            policies = list(map(fee_policy_from_row, conn.execute(
+                """
+            SELECT id, guild_id, effective_from, grace_minutes, fee_per_minute, max_fee, note
+            FROM fee_policies ORDER BY guild_id, effective_from, id
+            """
+            )))
+            overrides = list(map(fee_override_from_row, conn.execute(
+                """
+            SELECT policy_id, role_id, grace_minutes, fee_per_minute, max_fee
+            FROM fee_policy_roles ORDER BY policy_id, role_id
+            """
+            )))
+            return policies, overrides
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting fee policies: {e}")
+            return [], []
+
+    async def add_fee_policy(
+        self, guild_id, effective_from, grace_minutes, fee_per_minute, max_fee=None, note=None, overrides=()
+    ):
+        """Store a new policy version for a guild (0 for the default of every guild)
+
+        ``effective_from`` is a date; ``overrides`` are (role_id,
+        grace_minutes, fee_per_minute, max_fee) tuples where None inherits
+        the policy's value. Returns the policy id, or None on error.
+        """
+        return await self._write(
+            self._add_fee_policy,
+            guild_id,
+            effective_from.strftime("%Y-%m-%d"),
+            grace_minutes,
+            fee_per_minute,
+            max_fee,
+            note,
+            [list(override) for override in overrides],
+        )
+
+    def _add_fee_policy(self, guild_id, effective_from, grace_minutes, fee_per_minute, max_fee, note, overrides):
+        conn = self._writer_conn()
         try:
-            conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
+            cursor.execute(
+                """
+            INSERT INTO fee_policies (guild_id, effective_from, grace_minutes, fee_per_minute, max_fee, note)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                (guild_id, effective_from, grace_minutes, fee_per_minute, max_fee, note),
+            )
+            policy_id = cursor.lastrowid
+            cursor.executemany(
+                """
+            INSERT INTO fee_policy_roles (policy_id, role_id, grace_minutes, fee_per_minute, max_fee)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+                [(policy_id, *override) for override in overrides],
+            )
+            conn.commit()
+            self.logger.info(f"Stored fee policy {policy_id} for guild {guild_id} from {effective_from}")
+            return policy_id
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error adding fee policy: {e}")
+            return None
+
+    async def waive_meeting_fees(self, meeting_id, reason=None):
+        """Mark a meeting as forgiven; fees drop to 0 when it is re-evaluated"""
+        return await self._write(self._waive_meeting_fees, meeting_id, reason)
 
+    def _waive_meeting_fees(self, meeting_id, reason):
+        conn = self._writer_conn()
+        try:
+            conn.execute(
+                """
+            INSERT INTO fee_waivers (meeting_id, reason) VALUES (?, ?)
+            ON CONFLICT (meeting_id) DO UPDATE SET reason = excluded.reason
+            """,
+                (meeting_id, reason),
+            )
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error waiving meeting fees: {e}")
+            return False
+
+    def _fee_evaluation_params(self, guild_id, start, end, member_roles, meeting_id):
+        return {
+            "guild_id": guild_id,
+            "meeting_id": meeting_id,
+            "start_ts": timeutil.to_epoch(datetime(start.year, start.month, start.day)),
+            "end_ts": timeutil.to_epoch(datetime(end.year, end.month, end.day)),
+            "member_roles": json.dumps(member_roles),
+            "grace": Config.GRACE_PERIOD_MINUTES,
+            "rate": Config.FEE_PER_MINUTE,
+        }
+
+    def _summarize_fee_evaluation(self, cursor, source, params, sample):
+        """Summary and largest changes of a fee evaluation ``source`` with a ``changed`` column"""
+        cursor.execute(
+            f"""
+        SELECT COUNT(*) FILTER (WHERE changed), COUNT(DISTINCT meeting_id) FILTER (WHERE changed),
+               COALESCE(SUM(old_fee), 0), COALESCE(SUM(new_fee), 0)
+        FROM {source}
+        """,
+            params,
+        )
+        rows_changed, meetings_changed, fees_before, fees_after = cursor.fetchone()
+        changes = []
+        if rows_changed and sample:
             cursor.execute(
+                f"""
+            SELECT meeting_id, user_id, old_late_minutes, old_fee, new_late_minutes, new_fee
+            FROM {source}
+            WHERE changed
+            ORDER BY ABS(new_fee - old_fee) DESC, meeting_id, user_id
+            LIMIT :sample
+            """,
+                {**params, "sample": sample},
+            )
+            changes = list(map(fee_change_from_row, cursor))
+        return FeeReevaluation(rows_changed, meetings_changed, fees_before, fees_after, changes)
+
+    async def preview_fee_reevaluation(
+        self, guild_id, start, end, member_roles=(), meeting_id=None, sample=10
+    ):
+        """Dry run of reevaluate_fees: what would change, without writing anything"""
+        return await self._read(
+            self._preview_fee_reevaluation,
+            guild_id,
+            start,
+            end,
+            [list(pair) for pair in member_roles],
+            meeting_id,
+            sample,
+        )
+
+    def _preview_fee_reevaluation(self, guild_id, start, end, member_roles, meeting_id, sample):
+        try:
+            params = self._fee_evaluation_params(guild_id, start, end, member_roles, meeting_id)
+            source = f"(SELECT *, {FEE_CHANGED} AS changed FROM ({FEE_EVALUATION}))"
+            return self._summarize_fee_evaluation(self._reader_conn().cursor(), source, params, sample)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error previewing fee re-evaluation: {e}")
+            return None
+
+    async def reevaluate_fees(self, guild_id, start, end, member_roles=(), meeting_id=None, sample=10):
+        """Recompute lateness and fees of a guild's meetings from ``start`` up to ``end`` under the stored policies
+
+        ``start`` and ``end`` are dates (``end`` exclusive); ``meeting_id``
+        narrows the range to one meeting. ``member_roles`` holds (user_id,
+        role_id) pairs for role overrides. Everything happens in one
+        transaction on the writer. Meetings in archived months keep their
+        fees. Returns a FeeReevaluation, or None on error; with a remote
+        writer, raises WriteOutcomeUnknown if the answer is lost.
+        """
+        result = await self._write(
+            self._reevaluate_fees,
+            guild_id,
+            start,
+            end,
+            [list(pair) for pair in member_roles],
+            meeting_id,
+            sample,
+        )
+        if result is None:
+            return None
+        # From the writer process it arrives as nested lists
+        rows_changed, meetings_changed, fees_before, fees_after, changes, meeting_ids = result
+        return FeeReevaluation(
+            rows_changed,
+            meetings_changed,
+            fees_before,
+            fees_after,
+            list(map(fee_change_from_row, changes)),
+            tuple(meeting_ids),
+        )
+
+    def _reevaluate_fees(self, guild_id, start, end, member_roles, meeting_id, sample):
+        conn = self._writer_conn()
+        try:
+            started = time.perf_counter()
+            params = self._fee_evaluation_params(guild_id, start, end, member_roles, meeting_id)
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            # Evaluate once; the summary, the update and the rollups all read this table
+            cursor.execute(
+                f"""
+            CREATE TEMP TABLE fee_evaluation AS
+            SELECT *, {FEE_CHANGED} AS changed FROM ({FEE_EVALUATION})
+            """,
+                params,
+            )
+            cursor.execute(
+                "CREATE INDEX temp.idx_fee_evaluation_member ON fee_evaluation (guild_id, month, user_id) WHERE changed"
+            )
+            result = self._summarize_fee_evaluation(cursor, "temp.fee_evaluation", params, sample)
+            if result.rows_changed:
+                cursor.execute("SELECT DISTINCT meeting_id FROM temp.fee_evaluation WHERE changed")
+                result = result._replace(meeting_ids=[row[0] for row in cursor])
+                # The rollup trigger would run two UPDATEs per changed row; drop it
+                # for this transaction and apply the summed differences instead
+                cursor.execute("DROP TRIGGER trg_punctuality_rollup_update")
+                # Rewriting most of the table is cheaper with the lateness index rebuilt afterwards
+                cursor.execute("SELECT COALESCE(MAX(id), 0) FROM punctuality")
+                rebuild_index = result.rows_changed > cursor.fetchone()[0] // 4
+                if rebuild_index:
+                    cursor.execute("DROP INDEX idx_punctuality_meeting_late")
+                cursor.execute(
+                    """
+                UPDATE punctuality SET late_minutes = c.new_late_minutes, fee_amount = c.new_fee
+                FROM temp.fee_evaluation c WHERE punctuality.id = c.id AND c.changed
                 """
-            SELECT id, meeting_date, start_time, description
-            FROM meetings
-            ORDER BY meeting_date DESC, start_time DESC
+                )
+                if rebuild_index:
+                    cursor.execute(PUNCTUALITY_LATE_INDEX)
+                cursor.execute(FEE_DELTAS)
+                for table, key in (
+                    ("user_monthly_stats", ("guild_id", "month", "user_id")),
+                    ("guild_monthly_stats", ("guild_id", "month")),
+                ):
+                    cursor.execute(
+                        ROLLUP_DELTA_UPDATE.format(
+                            table=table,
+                            key=", ".join(key),
+                            match=" AND ".join(f"{table}.{column} = d.{column}" for column in key),
+                        )
+                    )
+                cursor.execute(ROLLUP_UPDATE_TRIGGER)
+            conn.commit()
+            self.logger.info(
+                f"Re-evaluated fees for guild {guild_id} from {start} to {end}: "
+                f"{result.rows_changed} row(s) changed in {(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+            return result
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.logger.error(f"Error re-evaluating fees: {e}")
+            return None
+        finally:
+            conn.execute("DROP TABLE IF EXISTS temp.fee_evaluation")
+            conn.execute("DROP TABLE IF EXISTS temp.fee_deltas")
+
+    async def archive_meetings(self, cutoff, limit=Config.ARCHIVE_BATCH_MEETINGS):
+        """Move up to ``limit`` finished meetings dated before ``cutoff`` to the archives
+
+        ``cutoff`` is a date; meetings go to one archive file per year and
+        their attendance rows go with them. Rollups stay in the hot database.
+        Each call is one short job on the writer thread, so call it until it
+        moves nothing. Returns (meetings, rows) moved, or None on error; with
+        a remote writer, raises WriteOutcomeUnknown if the answer is lost.
+        """
+        return await self._write(self._archive_meetings, cutoff, limit)
+
+    def _archive_meetings(self, cutoff, limit):
+        conn = self._writer_conn()
+        cutoff_date = cutoff.strftime("%Y-%m-%d")
+        cutoff_ts = timeutil.to_epoch(datetime(cutoff.year, cutoff.month, cutoff.day))
+        try:
+            candidates = conn.execute(
+                """
+            SELECT id, CAST(substr(meeting_date, 1, 4) AS INTEGER) FROM meetings
+            WHERE start_ts < ? AND meeting_date < ? AND status IN ('closed', 'cancelled')
+            ORDER BY start_ts, id
             LIMIT ?
             """,
-                (limit,),
+                (cutoff_ts, cutoff_date, limit),
+            ).fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error selecting meetings to archive: {e}")
+            return None
+
+        by_year = {}
+        for meeting_id, year in candidates:
+            by_year.setdefault(year, []).append(meeting_id)
+
+        moved_meetings = moved_rows = 0
+        for year, meeting_ids in by_year.items():
+            moved = self._archive_year(conn, year, meeting_ids, cutoff_date)
+            if moved is None:
+                return None
+            moved_meetings += len(meeting_ids)
+            moved_rows += moved
+        return moved_meetings, moved_rows
+
+    def _archive_year(self, conn, year, meeting_ids, cutoff_date):
+        """Copy meetings into archive_<year>, commit, then delete them from the hot tables"""
+        schema = f"archive_{year}"
+        path = self._archives.get(year) or os.path.join(self.archive_path, f"attendance_{year}.db")
+        ids = ",".join("?" * len(meeting_ids))
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+        except (OSError, sqlite3.Error) as e:
+            self.logger.error(f"Could not open archive {path}: {e}")
+            return None
+
+        try:
+            conn.execute(f"PRAGMA {schema}.journal_mode = WAL")
+            upgrade_archive(conn, schema)
+            conn.execute(
+                f"""
+            INSERT OR REPLACE INTO {schema}.meetings
+            SELECT id, meeting_date, channel_id, description, guild_id, status, start_ts
+            FROM main.meetings WHERE id IN ({ids})
+            """,
+                meeting_ids,
+            )
+            rows = conn.execute(
+                f"""
+            INSERT OR REPLACE INTO {schema}.punctuality
+            SELECT id, meeting_id, user_id, join_ts, late_minutes, fee_amount,
+                   leave_ts, attended_seconds
+            FROM main.punctuality WHERE meeting_id IN ({ids})
+            """,
+                meeting_ids,
+            ).rowcount
+            # Publish the file with the copy, so a writer process's readers can
+            # see it in the archives table before any hot row is deleted
+            conn.execute(
+                "INSERT INTO archives (year, path, archived_before) VALUES (?, ?, '') ON CONFLICT (year) DO NOTHING",
+                (year, path),
             )
+            # The copy is durable before anything leaves the hot tables; a
+            # crash in between leaves duplicates that the next run replaces
+            conn.commit()
 
-            meetings = cursor.fetchall()
-            return meetings
+            if year not in self._archives:
+                # In-process readers attach the new file before their next query
+                self._archives = {**self._archives, year: path}
+                self._archive_generation += 1
+
+            conn.execute(f"DELETE FROM main.punctuality WHERE meeting_id IN ({ids})", meeting_ids)
+            conn.execute(f"DELETE FROM main.meetings WHERE id IN ({ids})", meeting_ids)
+            conn.execute(
+                """
+            INSERT INTO archives (year, path, meetings, rows, archived_before)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (year) DO UPDATE SET
+                meetings = meetings + excluded.meetings,
+                rows = rows + excluded.rows,
+                archived_before = MAX(archived_before, excluded.archived_before)
+            """,
+                (year, path, len(meeting_ids), rows, cutoff_date),
+            )
+            conn.commit()
+            return rows
         except sqlite3.Error as e:
-            self.logger.error(f"Error getting meetings list: {e}")
-            return []
+            conn.rollback()
+            self.logger.error(f"Error archiving meetings to {path}: {e}")
+            return None
         finally:
-            if conn:
-                conn.close()
+            conn.execute(f"DETACH DATABASE {schema}")
+
+    async def incremental_vacuum(self, pages=Config.VACUUM_STEP_PAGES):
+        """Hand up to ``pages`` free pages back to the filesystem
+
+        Returns (pages freed, free pages left), or None on error.
+        """
+        return await self._write(self._incremental_vacuum, pages)
+
+    def _incremental_vacuum(self, pages):
+        conn = self._writer_conn()
+        try:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+            remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if before and not remaining:
+                # In WAL mode the file only shrinks once the pages are checkpointed
+                conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+            return before - remaining, remaining
+        except sqlite3.Error as e:
+            self.logger.error(f"Error running incremental vacuum: {e}")
+            return None
+
+    async def get_storage_stats(self):
+        """Size of the hot database and the archive registry
+
+        Returns (hot_bytes, free_bytes, archives) where archives are
+        (year, path, meetings, rows, archived_before) rows, or None on error.
+        """
+        return await self._read(self._get_storage_stats)
+
+    def _get_storage_stats(self):
+        try:
+            cursor = self._reader_conn().cursor()
+            page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+            pages = cursor.execute("PRAGMA page_count").fetchone()[0]
+            free = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            cursor.execute(
+                "SELECT year, path, meetings, rows, archived_before FROM archives ORDER BY year"
+            )
+            return pages * page_size, free * page_size, cursor.fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting storage stats: {e}")
+            return None
@@ -0,0 +1,298 @@
+# utils/db_profiler.py
+"""Opt-in per-statement profiling for DatabaseManager connections.
+
+Python's sqlite3 has a trace callback but no profile callback, so
+profiled connections hand out cursors that time each statement
+themselves: from execute() until its last row is read, or until the
+cursor runs another statement or is dropped. That includes the caller's
+work between rows, such as building row models. Statements run by triggers
+count towards the statement that fired them. Plain connections are used
+when profiling is off, so it costs nothing then.
+"""
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from config import Config
+
+# Statements EXPLAIN QUERY PLAN can describe
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "REPLACE", "UPDATE", "DELETE")
+# Plan steps that read a subquery, CTE or constant rather than a table
+NOT_A_TABLE = ("SCAN CONSTANT ROW", "SCAN (subquery", "SCAN CTE ")
+
+WRITE_TARGET = re.compile(
+    r"^\s*(?:WITH\b.*?\)\s*)?(INSERT|REPLACE|UPDATE|DELETE)\b(?:\s+OR\s+\w+)?\s+(?:INTO\s+|FROM\s+)?([\w.]+)",
+    re.IGNORECASE | re.DOTALL,
+)
+TRIGGER_EVENT = re.compile(r"\b(?:BEFORE|AFTER|INSTEAD\s+OF)\s+(INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+TRIGGER_BODY = re.compile(r"\bBEGIN\b(.*)\bEND\s*$", re.IGNORECASE | re.DOTALL)
+ROW_REFERENCE = re.compile(r"\b(?:NEW|OLD)\.\w+", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats(NamedTuple):
+    sql: str
+    calls: int
+    seconds: float
+    max_seconds: float
+    rows: int
+
+
+class SlowQuery(NamedTuple):
+    sql: str
+    params: str
+    seconds: float
+    rows: int
+    plan: tuple
+    at: float  # epoch seconds
+
+
+class QueryProfiler:
+    """Per-statement timing and row counts, plus a log of slow statements
+
+    Statements are grouped by their text with whitespace collapsed, so
+    every call of a DatabaseManager query lands in one entry. Ones taking
+    ``slow_ms`` or longer are logged at WARNING with their parameters and
+    EXPLAIN QUERY PLAN, and the last ``keep_slow`` are kept in ``slow``.
+    Shared by the writer and reader threads.
+    """
+
+    def __init__(self, slow_ms=Config.DB_SLOW_QUERY_MS, keep_slow=Config.DB_SLOW_QUERY_KEEP):
+        self.slow_seconds = slow_ms / 1000
+        self.slow = deque(maxlen=keep_slow)
+        self._stats = {}  # statement -> [calls, seconds, max_seconds, rows]
+        self._keys = {}  # raw SQL -> statement
+        self._captured = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger("discord_bot")
+
+    def record(self, conn, sql, params, seconds, rows):
+        key = self._keys.get(sql)
+        if key is None:
+            key = self._keys[sql] = WHITESPACE.sub(" ", sql).strip()
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = [0, 0.0, 0.0, 0]
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+            stats[3] += rows
+            if self._captured is not None:
+                self._captured.append((sql, params))
+        if seconds >= self.slow_seconds:
+            plan = explain(conn, sql, params)
+            shown = repr(params)
+            if len(shown) > 200:
+                shown = shown[:200] + "..."
+            self.slow.append(SlowQuery(key, shown, seconds, rows, plan, time.time()))
+            self.logger.warning(
+                f"Slow query ({seconds * 1000:.0f}ms, {rows} rows): {key} "
+                f"params={shown} plan: {' / '.join(plan) or 'n/a'}"
+            )
+
+    def top(self, limit=10):
+        """The ``limit`` statements with the most total time, as QueryStats"""
+        with self._lock:
+            stats = [QueryStats(sql, *values) for sql, values in self._stats.items()]
+        return sorted(stats, key=lambda s: s.seconds, reverse=True)[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+        self.slow.clear()
+
+    @contextmanager
+    def capture(self):
+        """Collect (sql, params) of every statement finished inside the block, on any thread"""
+        statements = []
+        with self._lock:
+            self._captured = statements
+        try:
+            yield statements
+        finally:
+            with self._lock:
+                self._captured = None
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor that reports each statement to its connection's profiler"""
+
+    _pending = None  # [sql, params, started, rows] of a query whose rows are still being read
+
+    def execute(self, sql, parameters=()):
+        self.finish()
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        self._pending = [sql, parameters, started, 0]
+        if self.description is None:
+            self._pending[3] = max(self.rowcount, 0)
+            self.finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self.finish()
+        # Explain with the first row of parameters, when there is a list to look at
+        sample = seq_of_parameters[0] if isinstance(seq_of_parameters, (list, tuple)) and seq_of_parameters else None
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._pending = [sql, sample, started, max(self.rowcount, 0)]
+        self.finish()
+        return self
+
+    def executescript(self, sql_script):
+        self.finish()
+        started = time.perf_counter()
+        super().executescript(sql_script)
+        self._pending = [sql_script, None, started, 0]
+        self.finish()
+        return self
+
+    # Reading rows only counts them; the clock is read once more in finish()
+
+    def fetchone(self):
+        row = super().fetchone()
+        self._fetched(0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._fetched(len(rows), done=True)
+        return rows
+
+    def __next__(self):
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self.finish()
+            raise
+        if self._pending is not None:
+            self._pending[3] += 1
+        return row
+
+    def close(self):
+        self.finish()
+        super().close()
+
+    def __del__(self):
+        self.finish()
+
+    def _fetched(self, rows, done=False):
+        if self._pending is None:
+            return
+        self._pending[3] += rows
+        if done or not rows:
+            self.finish()
+
+    def finish(self):
+        """Report the current statement, if any"""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, params, started, rows = pending
+            self.connection.profiler.record(self.connection, sql, params, time.perf_counter() - started, rows)
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose cursors report to ``profiler``; set it right after connecting"""
+
+    profiler = None
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    # sqlite3.Connection's shortcuts open a plain cursor, so route them through ours
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def explain(conn, sql, params=None):
+    """EXPLAIN QUERY PLAN details of a statement, or () if it can't be explained"""
+    if not sql.lstrip().upper().startswith(EXPLAINABLE):
+        return ()
+    try:
+        # A plain cursor, so explaining isn't profiled itself
+        cursor = sqlite3.Cursor(conn)
+        return tuple(row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params or ()))
+    except sqlite3.Error:
+        return ()
+
+
+def full_scans(plan):
+    """Plan steps that read a whole table or index"""
+    return [step for step in plan if step.startswith("SCAN ") and not step.startswith(NOT_A_TABLE)]
+
+
+def trigger_statements(conn, sql, seen=None):
+    """Statements of the triggers a write fires, with NEW/OLD columns as NULL
+
+    EXPLAIN QUERY PLAN of a write leaves its triggers out, so they are
+    explained on their own. Follows triggers fired by trigger bodies.
+    """
+    match = WRITE_TARGET.match(sql)
+    if match is None:
+        return []
+    verb, table = match.group(1).upper(), match.group(2).split(".")[-1]
+    events = {"UPDATE" if verb == "UPDATE" else "DELETE" if verb == "DELETE" else "INSERT"}
+    if verb in ("INSERT", "REPLACE") and re.search(r"\bON\s+CONFLICT\b.*\bDO\s+UPDATE\b", sql, re.I | re.S):
+        events.add("UPDATE")
+    if verb == "REPLACE" or re.match(r"\s*INSERT\s+OR\s+REPLACE\b", sql, re.I):
+        events.add("DELETE")
+
+    seen = set() if seen is None else seen
+    statements = []
+    for name, trigger_sql in conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (table,)
+    ):
+        event = TRIGGER_EVENT.search(trigger_sql)
+        body = TRIGGER_BODY.search(trigger_sql)
+        if name in seen or event is None or body is None or event.group(1).upper() not in events:
+            continue
+        seen.add(name)
+        for statement in body.group(1).split(";"):
+            if statement.strip():
+                statement = ROW_REFERENCE.sub("NULL", statement)
+                statements.append((name, statement))
+                statements.extend(trigger_statements(conn, statement, seen))
+    return statements
+
+
+def assert_no_full_scan(db_path, statements):
+    """Fail if any of ``statements`` (from QueryProfiler.capture) or the triggers they fire scans a table
+
+    Plans are taken on a fresh connection to ``db_path``. Raises
+    AssertionError listing each offending statement and plan step.
+    """
+    conn = sqlite3.connect(db_path)
+    problems = []
+    try:
+        checked = set()
+        for sql, params in statements:
+            if sql in checked:
+                continue
+            checked.add(sql)
+            for step in full_scans(explain(conn, sql, params)):
+                problems.append(f"{WHITESPACE.sub(' ', sql).strip()}\n    {step}")
+            for trigger, statement in trigger_statements(conn, sql):
+                for step in full_scans(explain(conn, statement)):
+                    problems.append(f"trigger {trigger}: {WHITESPACE.sub(' ', statement).strip()}\n    {step}")
+    finally:
+        conn.close()
+    if problems:
+        raise AssertionError("Full table scans:\n" + "\n".join(problems))
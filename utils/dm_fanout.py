@@ -0,0 +1,111 @@
+# utils/dm_fanout.py
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+import discord
+from config import Config
+from utils.metrics import DISCORD_ERRORS, DISCORD_LATENCY
+
+
+class DMFanout:
+    """Sends one direct message to many members without tripping Discord's rate limits.
+
+    A fixed set of workers share the recipients, so at most ``concurrency``
+    messages are in flight, and new sends start no faster than ``rate`` per
+    second to stay under the global limit. A DM touches routes shared by
+    every recipient (opening the DM channel) and member.send doesn't say
+    which one answered, so any 429 pauses every worker until the reset
+    its headers announce. Server errors and dropped connections are
+    retried with jittered exponential backoff. Members who don't accept
+    DMs are skipped without retrying.
+    """
+
+    def __init__(
+        self,
+        concurrency=Config.REMINDER_DM_CONCURRENCY,
+        rate=Config.REMINDER_DM_RATE,
+        attempts=Config.REMINDER_DM_ATTEMPTS,
+        backoff=Config.REMINDER_DM_BACKOFF_SECONDS,
+    ):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.attempts = attempts
+        self.backoff = backoff
+        self.logger = logging.getLogger("discord_bot")
+        self._next_slot = 0.0  # monotonic time the next send may start
+        self._paused_until = 0.0
+        self.rate_limited = 0
+
+    async def send_all(self, recipients, content):
+        """DM ``content`` to every recipient; returns (sent, unreachable, failed) counts"""
+        recipients = list(recipients)
+        pending = iter(recipients)
+        outcomes = Counter()
+
+        async def worker():
+            for recipient in pending:
+                outcomes[await self._deliver(recipient, content)] += 1
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(recipients)))))
+        return outcomes["sent"], outcomes["unreachable"], outcomes["failed"]
+
+    async def _wait_turn(self):
+        now = time.monotonic()
+        slot = max(now, self._next_slot, self._paused_until)
+        self._next_slot = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+        # A pause may have started while this send was waiting for its slot
+        while (remaining := self._paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(remaining)
+
+    async def _deliver(self, recipient, content):
+        for attempt in range(self.attempts):
+            await self._wait_turn()
+            started = time.perf_counter()
+            try:
+                await recipient.send(content)
+                return "sent"
+            except (discord.Forbidden, discord.NotFound):
+                # DMs closed or the account is gone; retrying won't help
+                return "unreachable"
+            except discord.RateLimited as e:
+                self._pause(e.retry_after)
+                delay = 0
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    self._pause(self._retry_after(e))
+                    delay = 0
+                elif e.status >= 500:
+                    delay = self._backoff(attempt)
+                else:
+                    DISCORD_ERRORS.labels("dm").inc()
+                    self.logger.error(f"Error sending DM to {recipient.id}: {e}")
+                    return "failed"
+            except (OSError, asyncio.TimeoutError):
+                delay = self._backoff(attempt)
+            finally:
+                DISCORD_LATENCY.labels("dm").observe(time.perf_counter() - started)
+            await asyncio.sleep(delay)
+
+        DISCORD_ERRORS.labels("dm").inc()
+        self.logger.error(f"Giving up on DM to {recipient.id} after {self.attempts} attempts")
+        return "failed"
+
+    def _backoff(self, attempt):
+        return self.backoff * 2**attempt * random.uniform(0.5, 1.5)
+
+    def _retry_after(self, error):
+        """Seconds until the bucket behind a 429 resets, from its headers"""
+        headers = getattr(error.response, "headers", None) or {}
+        return float(
+            headers.get("X-RateLimit-Reset-After") or headers.get("Retry-After") or self.backoff
+        )
+
+    def _pause(self, seconds):
+        """Hold every worker's next send until ``seconds`` from now"""
+        self.rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._next_slot = max(self._next_slot, self._paused_until)
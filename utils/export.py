@@ -0,0 +1,72 @@
+# utils/export.py
+"""Bulk attendance export as CSV or JSON Lines.
+
+``write_export`` consumes rows straight off a database cursor and writes
+them to a binary file object one at a time, optionally gzip-compressed,
+so memory use does not depend on how many rows are exported. It is
+blocking and meant to run on a database reader thread via
+``DatabaseManager.stream_attendance``.
+"""
+import csv
+import gzip
+import io
+import json
+from utils.timeutil import from_epoch
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+EXPORT_COLUMNS = (
+    "meeting_id",
+    "meeting_start",
+    "channel_id",
+    "description",
+    "user_id",
+    "user_name",
+    "join_time",
+    "late_minutes",
+    "fee_amount",
+    "leave_time",
+    "minutes_attended",
+)
+
+
+def export_filename(start_date, end_date, fmt, compress):
+    return f"attendance_{start_date}_{end_date}.{fmt}" + (".gz" if compress else "")
+
+
+def write_export(rows, fp, fmt="csv", compress=False):
+    """Write (meeting_id, start_ts, channel_id, description, user_id, user_name,
+    join_ts, late_minutes, fee_amount, leave_ts, attended_seconds) rows to
+    ``fp``; returns the row count
+    """
+    binary = gzip.GzipFile(fileobj=fp, mode="wb", mtime=0) if compress else fp
+    text = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+    count = 0
+    meeting_id = meeting_start = None
+    try:
+        if fmt == "csv":
+            writer = csv.writer(text)
+            writer.writerow(EXPORT_COLUMNS)
+            emit = writer.writerow
+        else:
+            def emit(row):
+                text.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n")
+
+        for row in rows:
+            # Rows arrive grouped by meeting; convert each start time once
+            if row[0] != meeting_id:
+                meeting_id, meeting_start = row[0], str(from_epoch(row[1]))
+            emit((
+                meeting_id, meeting_start, row[2], row[3], row[4], row[5],
+                str(from_epoch(row[6])), row[7], row[8],
+                str(from_epoch(row[9])) if row[9] is not None else None,
+                row[10] // 60 if row[10] is not None else None,
+            ))
+            count += 1
+    finally:
+        # Leave fp open for the caller to rewind and upload
+        text.flush()
+        text.detach()
+        if compress:
+            binary.close()
+    return count
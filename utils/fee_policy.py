@@ -0,0 +1,84 @@
+# utils/fee_policy.py
+from attendance import FeePolicy
+from config import Config
+
+
+def default_policy():
+    """The policy from the environment, used until a guild stores one"""
+    return FeePolicy(
+        None, 0, "0000-00-00", Config.GRACE_PERIOD_MINUTES, Config.FEE_PER_MINUTE, None, None
+    )
+
+
+def calculate_fee(late_seconds, grace_minutes, fee_per_minute, max_fee=None):
+    """Return (late_minutes, fee_amount) for arriving ``late_seconds`` after the start
+
+    Matches the SQL in DatabaseManager's fee re-evaluation, so recorded
+    fees and re-evaluated ones agree.
+    """
+    late_minutes = max(0, int(late_seconds / 60) - grace_minutes)
+    if late_minutes == 0:
+        return 0, 0
+    fee_amount = late_minutes * fee_per_minute
+    if max_fee is not None:
+        fee_amount = min(fee_amount, max_fee)
+    return late_minutes, fee_amount
+
+
+class FeeSchedule:
+    """Fee policies of every guild, for pricing joins as they happen
+
+    Built from DatabaseManager.get_fee_policies(); rebuild it after
+    adding a policy.
+    """
+
+    def __init__(self, policies=(), overrides=()):
+        self.policies = {}  # guild_id -> [FeePolicy] by effective_from, id
+        for policy in sorted(policies, key=lambda p: (p.effective_from, p.id)):
+            self.policies.setdefault(policy.guild_id, []).append(policy)
+        self.overrides = {}  # policy_id -> {role_id: FeeOverride}
+        for override in overrides:
+            self.overrides.setdefault(override.policy_id, {})[override.role_id] = override
+
+    def policy_for(self, guild_id, date):
+        """The policy in effect for a guild's meeting on ``date``"""
+        day = date.strftime("%Y-%m-%d")
+        for versions in (self.policies.get(guild_id or 0), self.policies.get(0)):
+            for policy in reversed(versions or ()):
+                if policy.effective_from <= day:
+                    return policy
+        return default_policy()
+
+    def terms_for(self, policy, role_ids=()):
+        """(grace_minutes, fee_per_minute, max_fee) under ``policy`` for a member with ``role_ids``
+
+        With several matching role overrides the lowest fee per minute wins.
+        """
+        grace, rate, cap = policy.grace_minutes, policy.fee_per_minute, policy.max_fee
+        overrides = self.overrides.get(policy.id)
+        if not overrides:
+            return grace, rate, cap
+        matching = [overrides[role_id] for role_id in role_ids if role_id in overrides]
+        if not matching:
+            return grace, rate, cap
+        best = min(
+            matching,
+            key=lambda o: (
+                o.fee_per_minute if o.fee_per_minute is not None else float("inf"),
+                -(o.grace_minutes or 0),
+                o.role_id,
+            ),
+        )
+        return (
+            best.grace_minutes if best.grace_minutes is not None else grace,
+            best.fee_per_minute if best.fee_per_minute is not None else rate,
+            best.max_fee if best.max_fee is not None else cap,
+        )
+
+    def override_roles(self, policy_ids):
+        """Role ids with an override in any of ``policy_ids``"""
+        return {
+            role_id
+            for policy_id in policy_ids
+            for role_id in self.overrides.get(policy_id, {})
+        }
@@ -1,37 +1,112 @@
 # utils/logger.py
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime
 from config import Config
 
 
-def setup_logger():
-    if not os.path.exists(Config.LOG_PATH):
-        os.makedirs(Config.LOG_PATH)
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Set once the pipeline is running so repeated setup_logger calls are no-ops
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line for log shippers"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class LoopQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records untouched; the writer thread does all the formatting
+
+    The stock QueueHandler formats and copies each record so it can be
+    pickled, which is wasted work on the event loop for an in-process queue.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def setup_logger(
+    log_path=Config.LOG_PATH,
+    retention_days=Config.LOG_RETENTION_DAYS,
+    json_format=Config.LOG_JSON,
+    console=True,
+    file_name="bot.log",
+):
+    """Route the "discord_bot" logger through a queue to a background writer thread
+
+    Logging calls only enqueue the record; a QueueListener thread formats it
+    and writes to a log file that rotates at midnight, keeping
+    ``retention_days`` old files, and to the console. Safe to call more
+    than once. Processes sharing ``log_path`` need their own ``file_name``,
+    since each one rotates its file.
+    """
+    global _listener
 
     logger = logging.getLogger("discord_bot")
-    logger.setLevel(logging.INFO)
+    if _listener is not None:
+        return logger
 
-    # Create file handler
-    log_file = os.path.join(
-        Config.LOG_PATH, f'bot_{datetime.now().strftime("%Y-%m-%d")}.log'
-    )
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(logging.INFO)
+    if not os.path.exists(log_path):
+        os.makedirs(log_path)
+    logger.setLevel(Config.LOG_LEVEL)
 
-    # Create console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
 
-    # Create formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    # Rotated files are named bot.log.YYYY-MM-DD
+    file_handler = logging.handlers.TimedRotatingFileHandler(
+        os.path.join(log_path, file_name),
+        when="midnight",
+        backupCount=retention_days,
+        encoding="utf-8",
     )
     file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
+    handlers = [file_handler]
 
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
 
+    records = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    logger.addHandler(LoopQueueHandler(records))
+    # Records already go to our handlers; don't repeat them through the root logger
+    logger.propagate = False
+
+    _listener.start()
+    atexit.register(stop_logger)
     return logger
+
+
+def stop_logger():
+    """Write out queued records and stop the writer thread"""
+    global _listener
+
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+
+    logger = logging.getLogger("discord_bot")
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+    _listener = None
@@ -0,0 +1,93 @@
+# utils/loyalty.py
+"""Loyalty streaks, attendance rate and badges.
+
+Streak state is kept up to date by a trigger on punctuality inserts (see
+utils.migrations.LOYALTY_INSERT_TRIGGER), one upsert per row. ``replay``
+applies the same rules to the whole history, for the initial backfill
+and for checking the incremental state.
+"""
+from config import Config
+
+# (emoji, name, test) where test takes (live streak, LoyaltyStreak, attendance rate)
+BADGES = (
+    ("🔥", "On a roll", lambda live, streak, rate: live >= 5),
+    ("🏅", "Ten in a row", lambda live, streak, rate: streak.best_streak >= 10),
+    ("👑", "Fifty in a row", lambda live, streak, rate: streak.best_streak >= 50),
+    (
+        "🎯",
+        "Never missed",
+        lambda live, streak, rate: rate == 1 and streak.attended >= Config.LOYALTY_MIN_MEETINGS,
+    ),
+    (
+        "⏰",
+        "Early bird",
+        lambda live, streak, rate: streak.attended >= Config.LOYALTY_MIN_MEETINGS
+        and streak.on_time >= 0.9 * streak.attended,
+    ),
+)
+
+
+def replay(rows):
+    """Streak state from punctuality history
+
+    ``rows`` are (meeting_id, guild_id, user_id, late_minutes) in the order
+    they were inserted. Returns (meetings, streaks): meeting_id ->
+    (guild_id, seq) and (guild_id, user_id) -> [current_streak,
+    best_streak, on_time, attended, first_seq, last_seq].
+    """
+    meetings = {}
+    latest = {}  # guild_id -> highest seq handed out
+    streaks = {}
+    for meeting_id, guild_id, user_id, late_minutes in rows:
+        meeting = meetings.get(meeting_id)
+        if meeting is None:
+            seq = latest[guild_id] = latest.get(guild_id, 0) + 1
+            meeting = meetings[meeting_id] = (guild_id, seq)
+        guild_id, seq = meeting
+        on_time = int(late_minutes == 0)
+
+        state = streaks.get((guild_id, user_id))
+        if state is None:
+            streaks[guild_id, user_id] = [on_time, on_time, on_time, 1, seq, seq]
+            continue
+        current, best, on_time_count, attended, first_seq, last_seq = state
+        # A meeting numbered before the last one seen leaves the streak alone
+        if seq > last_seq:
+            if not on_time:
+                current = 0
+            elif seq == last_seq + 1:
+                current += 1
+            else:
+                current = 1
+        state[:] = (
+            current,
+            max(best, current),
+            on_time_count + on_time,
+            attended + 1,
+            min(first_seq, seq),
+            max(last_seq, seq),
+        )
+    return meetings, streaks
+
+
+def live_streak(streak, latest_seq, latest_open):
+    """The streak as it stands: 0 once the member has missed a meeting since
+
+    The guild's newest meeting doesn't count as missed while it is still
+    open.
+    """
+    if streak.last_seq >= latest_seq - (1 if latest_open else 0):
+        return streak.current_streak
+    return 0
+
+
+def attendance_rate(streak, latest_seq):
+    """Share of the guild's meetings attended since the member's first one"""
+    held = latest_seq - streak.first_seq + 1
+    return min(1.0, streak.attended / held) if held > 0 else 0.0
+
+
+def earned_badges(streak, latest_seq, latest_open):
+    live = live_streak(streak, latest_seq, latest_open)
+    rate = attendance_rate(streak, latest_seq)
+    return [f"{emoji} {name}" for emoji, name, test in BADGES if test(live, streak, rate)]
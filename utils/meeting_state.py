@@ -0,0 +1,87 @@
+# utils/meeting_state.py
+from config import Config
+from utils.timeutil import to_epoch
+
+
+class MeetingState:
+    """In-memory attendance state for one meeting on one voice channel.
+
+    Instances live in PunctualityTracker's meeting cache and are dropped
+    with the cache entry when the meeting is replaced, cancelled or the
+    day rolls over, so memory stays proportional to live meetings.
+
+    Besides who has been recorded, it accumulates each member's time in
+    the channel: ``present`` holds the epoch second a member's current
+    visit started, ``attended`` the seconds of finished visits and ``left``
+    the time of the latest leave. Time before the meeting start does not
+    count. ``end_ts`` is when the meeting is over, Config.MEETING_LENGTH_MINUTES
+    after the start unless it is ended sooner; leaving before then is
+    leaving early. ``end_sessions`` turns this into the rows written when
+    joins stop being tracked.
+    """
+
+    __slots__ = (
+        "meeting_id",
+        "guild_id",
+        "channel_id",
+        "start_time",
+        "start_ts",
+        "end_ts",
+        "attendees",
+        "present",
+        "attended",
+        "left",
+    )
+
+    def __init__(self, meeting_id, guild_id, channel_id, start_time):
+        self.meeting_id = meeting_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.start_time = start_time
+        self.start_ts = to_epoch(start_time)
+        self.end_ts = self.start_ts + Config.MEETING_LENGTH_MINUTES * 60
+        self.attendees = set()  # user_ids already recorded for this meeting
+        self.present = {}  # user_id -> epoch second the current visit started
+        self.attended = {}  # user_id -> seconds from finished visits
+        self.left = {}  # user_id -> epoch second of the latest leave
+
+    def open_session(self, user_id, ts):
+        """Start timing a member's visit; a member already present keeps their visit"""
+        if user_id not in self.present:
+            self.present[user_id] = ts
+
+    def close_session(self, user_id, ts):
+        """Add a finished visit to the member's total"""
+        joined = self.present.pop(user_id, None)
+        if joined is None:
+            return
+        seconds = max(0, ts - max(joined, self.start_ts))
+        self.attended[user_id] = self.attended.get(user_id, 0) + seconds
+        self.left[user_id] = ts
+
+    def restore_session(self, user_id, seconds, leave_ts):
+        """Seed totals saved before a restart"""
+        self.attended[user_id] = seconds
+        if leave_ts is not None:
+            self.left[user_id] = leave_ts
+
+    def end_sessions(self, ts):
+        """Close every open visit at ``ts``; returns (user_id, attended_seconds, leave_ts) rows
+
+        leave_ts is only set for members who left early: it is None for
+        those still present at ``ts`` or gone only once ``end_ts`` passed.
+        """
+        for user_id in list(self.present):
+            self.close_session(user_id, ts)
+        end = min(ts, self.end_ts)
+        left = self.left
+        return [
+            (user_id, seconds, left[user_id] if left.get(user_id, end) < end else None)
+            for user_id, seconds in self.attended.items()
+        ]
+
+    def __repr__(self):
+        return (
+            f"MeetingState(meeting_id={self.meeting_id}, channel_id={self.channel_id}, "
+            f"attendees={len(self.attendees)}, present={len(self.present)})"
+        )
@@ -0,0 +1,216 @@
+# utils/metrics.py
+import asyncio
+import logging
+from bisect import bisect_left
+
+
+# Latency buckets in seconds, from sub-millisecond handler work up to slow API calls
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+class Counter:
+    """Monotonic counter"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and two additions"""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket it falls in"""
+        total = self.count
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metric:
+    """A named family of counters or histograms, one child per label value tuple"""
+
+    def __init__(self, name, help_text, kind, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.label_names = labels
+        self.buckets = buckets
+        self.children = {}
+        self._default = None if labels else self.labels()
+
+    def labels(self, *values):
+        """Return the child for these label values; callers on hot paths should keep it"""
+        child = self.children.get(values)
+        if child is None:
+            child = Counter() if self.kind == "counter" else Histogram(self.buckets)
+            self.children[values] = child
+        return child
+
+    # Unlabelled metrics can be used directly
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def _label_text(self, values, extra=""):
+        pairs = [f'{name}="{value}"' for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self.children.items()):
+            if self.kind == "counter":
+                lines.append(f"{self.name}{self._label_text(values)} {child.value}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), child.counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{self._label_text(values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(values)} {child.sum}")
+            lines.append(f"{self.name}_count{self._label_text(values)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Metric(name, help_text, "counter", labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Metric(name, help_text, "histogram", labels, buckets))
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        """All metrics in Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+DB_LATENCY = REGISTRY.histogram(
+    "discord_bot_db_seconds", "Time for a DatabaseManager call, including executor queueing", ("method",)
+)
+# Only one join in JOIN_SAMPLE_EVERY is timed and broken down by outcome:
+# two clock reads cost more than the rest of the join path's instrumentation.
+# The total is still counted exactly.
+JOIN_SAMPLE_EVERY = 16
+JOIN_LATENCY = REGISTRY.histogram(
+    "discord_bot_handle_join_seconds", "Time spent in handle_join, sampled", ("outcome",)
+)
+JOINS = REGISTRY.counter("discord_bot_joins_total", "Voice joins into meeting channels")
+DISCORD_LATENCY = REGISTRY.histogram(
+    "discord_bot_discord_api_seconds", "Outbound Discord message calls", ("call",)
+)
+DISCORD_ERRORS = REGISTRY.counter(
+    "discord_bot_discord_api_errors_total", "Outbound Discord message calls that failed", ("call",)
+)
+SCHEDULER_DELAY = REGISTRY.histogram(
+    "discord_bot_scheduler_delay_seconds", "How late scheduled events fire", ("kind",)
+)
+SCHEDULER_HANDLER = REGISTRY.histogram(
+    "discord_bot_scheduler_handler_seconds", "Time spent handling a scheduled event", ("kind",)
+)
+REPORT_CACHE = REGISTRY.counter(
+    "discord_bot_report_cache_total", "Rendered report cache lookups, evictions and invalidations", ("event",)
+)
+LOOP_LAG = REGISTRY.histogram(
+    "discord_bot_event_loop_lag_seconds", "Extra delay of a periodic wakeup on the event loop"
+)
+
+
+async def monitor_loop_lag(interval):
+    """Sample event-loop lag every ``interval`` seconds until cancelled"""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        LOOP_LAG.observe(max(0.0, loop.time() - expected))
+
+
+class MetricsServer:
+    """Minimal HTTP endpoint serving REGISTRY at /metrics"""
+
+    def __init__(self, host, port, registry=REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self.logger = logging.getLogger("discord_bot")
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Drain the headers; the request body is never used
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.registry.render().encode()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status, body, content_type = "404 Not Found", b"not found\n", "text/plain"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            self.logger.debug(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
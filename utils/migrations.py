@@ -0,0 +1,616 @@
+# utils/migrations.py
+"""Ordered schema migrations.
+
+Each entry is (version, description, statements). ``apply_migrations``
+runs every step newer than the version recorded in ``schema_version``,
+one transaction per step, so existing databases are upgraded in place.
+A statement may also be a callable taking the connection, for steps that
+need Python-side help.
+"""
+import sqlite3
+from datetime import datetime
+from utils.timeutil import to_epoch
+
+
+# Full recomputation of the monthly rollups from raw punctuality rows; used
+# for the initial backfill and by DatabaseManager.rebuild_rollups
+USER_ROLLUP_SELECT = """
+        SELECT COALESCE(m.guild_id, 0), substr(m.meeting_date, 1, 7), p.user_id,
+               COUNT(*), SUM(p.late_minutes > 0), SUM(p.late_minutes), SUM(p.fee_amount)
+        FROM punctuality p JOIN meetings m ON m.id = p.meeting_id
+        GROUP BY 1, 2, 3
+        """
+
+GUILD_ROLLUP_SELECT = """
+        SELECT COALESCE(m.guild_id, 0), substr(m.meeting_date, 1, 7),
+               COUNT(*), SUM(p.late_minutes > 0), SUM(p.late_minutes), SUM(p.fee_amount)
+        FROM punctuality p JOIN meetings m ON m.id = p.meeting_id
+        GROUP BY 1, 2
+        """
+
+# Serves reports ordered by lateness; fee re-evaluation rebuilds it after bulk changes
+PUNCTUALITY_LATE_INDEX = """
+        CREATE INDEX IF NOT EXISTS idx_punctuality_meeting_late
+        ON punctuality (meeting_id, late_minutes DESC)
+        """
+
+# Rollups are updated in the same transaction as the punctuality write.
+# Meetings recorded before per-guild tracking count as guild 0.
+ROLLUP_INSERT_TRIGGER = """
+        CREATE TRIGGER IF NOT EXISTS trg_punctuality_rollup_insert
+        AFTER INSERT ON punctuality
+        BEGIN
+            INSERT INTO user_monthly_stats
+                (guild_id, month, user_id, meetings, late_count, late_minutes, fees)
+            SELECT COALESCE(m.guild_id, 0), substr(m.meeting_date, 1, 7), NEW.user_id,
+                   1, NEW.late_minutes > 0, NEW.late_minutes, NEW.fee_amount
+            FROM meetings m WHERE m.id = NEW.meeting_id
+            ON CONFLICT (guild_id, month, user_id) DO UPDATE SET
+                meetings = meetings + 1,
+                late_count = late_count + excluded.late_count,
+                late_minutes = late_minutes + excluded.late_minutes,
+                fees = fees + excluded.fees;
+
+            INSERT INTO guild_monthly_stats
+                (guild_id, month, attendances, late_count, late_minutes, fees)
+            SELECT COALESCE(m.guild_id, 0), substr(m.meeting_date, 1, 7),
+                   1, NEW.late_minutes > 0, NEW.late_minutes, NEW.fee_amount
+            FROM meetings m WHERE m.id = NEW.meeting_id
+            ON CONFLICT (guild_id, month) DO UPDATE SET
+                attendances = attendances + 1,
+                late_count = late_count + excluded.late_count,
+                late_minutes = late_minutes + excluded.late_minutes,
+                fees = fees + excluded.fees;
+        END
+        """
+
+ROLLUP_UPDATE_TRIGGER = """
+        CREATE TRIGGER IF NOT EXISTS trg_punctuality_rollup_update
+        AFTER UPDATE OF late_minutes, fee_amount ON punctuality
+        BEGIN
+            UPDATE user_monthly_stats SET
+                late_count = late_count - (OLD.late_minutes > 0) + (NEW.late_minutes > 0),
+                late_minutes = late_minutes - OLD.late_minutes + NEW.late_minutes,
+                fees = fees - OLD.fee_amount + NEW.fee_amount
+            WHERE (guild_id, month) = (
+                SELECT COALESCE(guild_id, 0), substr(meeting_date, 1, 7)
+                FROM meetings WHERE id = NEW.meeting_id
+            ) AND user_id = NEW.user_id;
+
+            UPDATE guild_monthly_stats SET
+                late_count = late_count - (OLD.late_minutes > 0) + (NEW.late_minutes > 0),
+                late_minutes = late_minutes - OLD.late_minutes + NEW.late_minutes,
+                fees = fees - OLD.fee_amount + NEW.fee_amount
+            WHERE (guild_id, month) = (
+                SELECT COALESCE(guild_id, 0), substr(meeting_date, 1, 7)
+                FROM meetings WHERE id = NEW.meeting_id
+            );
+        END
+        """
+
+# Loyalty streaks, also updated in the punctuality write's transaction.
+# Each guild's meetings are numbered (seq) in the order their first
+# attendance row arrives; a streak continues only into the next number.
+# utils.loyalty.replay applies the same rules to rebuild from history.
+LOYALTY_NEXT_STREAK = """
+                CASE
+                    WHEN excluded.last_seq <= last_seq THEN current_streak
+                    WHEN excluded.on_time = 0 THEN 0
+                    WHEN excluded.last_seq = last_seq + 1 THEN current_streak + 1
+                    ELSE 1
+                END"""
+
+LOYALTY_INSERT_TRIGGER = f"""
+        CREATE TRIGGER IF NOT EXISTS trg_punctuality_loyalty_insert
+        AFTER INSERT ON punctuality
+        BEGIN
+            INSERT INTO loyalty_meetings (meeting_id, guild_id, seq)
+            SELECT m.id, COALESCE(m.guild_id, 0), 1 + COALESCE(
+                (SELECT MAX(l.seq) FROM loyalty_meetings l WHERE l.guild_id = COALESCE(m.guild_id, 0)), 0
+            )
+            FROM meetings m
+            WHERE m.id = NEW.meeting_id
+              AND NOT EXISTS (SELECT 1 FROM loyalty_meetings l WHERE l.meeting_id = NEW.meeting_id);
+
+            INSERT INTO loyalty_streaks
+                (guild_id, user_id, current_streak, best_streak, on_time, attended, first_seq, last_seq)
+            SELECT l.guild_id, NEW.user_id, NEW.late_minutes = 0, NEW.late_minutes = 0,
+                   NEW.late_minutes = 0, 1, l.seq, l.seq
+            FROM loyalty_meetings l WHERE l.meeting_id = NEW.meeting_id
+            ON CONFLICT (guild_id, user_id) DO UPDATE SET
+                current_streak = {LOYALTY_NEXT_STREAK},
+                best_streak = MAX(best_streak, {LOYALTY_NEXT_STREAK}),
+                on_time = on_time + excluded.on_time,
+                attended = attended + 1,
+                first_seq = MIN(first_seq, excluded.first_seq),
+                last_seq = MAX(last_seq, excluded.last_seq);
+        END
+        """
+
+def register_local_epoch(conn):
+    """SQL function local_epoch('YYYY-MM-DD HH:MM:SS') -> Unix seconds in Config.TIMEZONE"""
+
+    def local_epoch(text):
+        if text is None:
+            return None
+        return to_epoch(datetime.strptime(text, "%Y-%m-%d %H:%M:%S"))
+
+    conn.create_function("local_epoch", 1, local_epoch, deterministic=True)
+
+
+# Tables of a per-year archive file (see DatabaseManager.archive_meetings).
+# Same columns as the hot tables, without rollup triggers or AUTOINCREMENT.
+ARCHIVE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.meetings (
+        id INTEGER PRIMARY KEY,
+        meeting_date TEXT NOT NULL,
+        channel_id INTEGER NOT NULL,
+        description TEXT,
+        guild_id INTEGER,
+        status TEXT NOT NULL,
+        start_ts INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS {schema}.idx_meetings_channel_date
+    ON meetings (channel_id, meeting_date, start_ts)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS {schema}.idx_meetings_start
+    ON meetings (start_ts, id)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.punctuality (
+        id INTEGER PRIMARY KEY,
+        meeting_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        join_ts INTEGER NOT NULL,
+        late_minutes INTEGER NOT NULL DEFAULT 0,
+        fee_amount REAL NOT NULL DEFAULT 0,
+        leave_ts INTEGER,
+        attended_seconds INTEGER
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS {schema}.idx_punctuality_meeting_user
+    ON punctuality (meeting_id, user_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS {schema}.idx_punctuality_meeting_late
+    ON punctuality (meeting_id, late_minutes DESC)
+    """,
+]
+
+# Columns added to the hot tables after archives were introduced; archive
+# files created earlier get them from upgrade_archive
+ARCHIVE_ADDED_COLUMNS = [
+    ("punctuality", "leave_ts", "INTEGER"),
+    ("punctuality", "attended_seconds", "INTEGER"),
+]
+
+
+def upgrade_archive(conn, schema):
+    """Create or bring up to date the tables of an attached archive file"""
+    for statement in ARCHIVE_SCHEMA:
+        conn.execute(statement.format(schema=schema))
+    for table, column, declaration in ARCHIVE_ADDED_COLUMNS:
+        columns = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {column} {declaration}")
+
+
+MIGRATIONS = [
+    (
+        1,
+        "Base meetings and punctuality tables",
+        [
+            """
+        CREATE TABLE IF NOT EXISTS meetings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            meeting_date TEXT NOT NULL,
+            start_time TEXT NOT NULL,
+            channel_id INTEGER NOT NULL,
+            description TEXT
+        )
+        """,
+            """
+        CREATE TABLE IF NOT EXISTS punctuality (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            meeting_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            user_name TEXT NOT NULL,
+            join_time TEXT NOT NULL,
+            late_minutes INTEGER DEFAULT 0,
+            fee_amount REAL DEFAULT 0,
+            FOREIGN KEY (meeting_id) REFERENCES meetings (id)
+        )
+        """,
+        ],
+    ),
+    (
+        2,
+        "Lookup indexes and one punctuality row per member per meeting",
+        [
+            # Older databases may hold duplicates from the check-then-insert race
+            """
+        DELETE FROM punctuality
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM punctuality GROUP BY meeting_id, user_id
+        )
+        """,
+            """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_punctuality_meeting_user
+        ON punctuality (meeting_id, user_id)
+        """,
+            """
+        CREATE INDEX IF NOT EXISTS idx_punctuality_meeting_late
+        ON punctuality (meeting_id, late_minutes DESC)
+        """,
+            """
+        CREATE INDEX IF NOT EXISTS idx_meetings_channel_date
+        ON meetings (channel_id, meeting_date, start_time)
+        """,
+            """
+        CREATE INDEX IF NOT EXISTS idx_meetings_date
+        ON meetings (meeting_date, start_time)
+        """,
+        ],
+    ),
+    (
+        3,
+        "Per-guild meeting channels and announcement settings",
+        [
+            "ALTER TABLE meetings ADD COLUMN guild_id INTEGER",
+            """
+        CREATE TABLE IF NOT EXISTS meeting_channels (
+            channel_id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL
+        )
+        """,
+            """
+        CREATE INDEX IF NOT EXISTS idx_meeting_channels_guild
+        ON meeting_channels (guild_id)
+        """,
+            """
+        CREATE INDEX IF NOT EXISTS idx_meetings_guild_date
+        ON meetings (guild_id, meeting_date, start_time)
+        """,
+            """
+        CREATE TABLE IF NOT EXISTS guild_settings (
+            guild_id INTEGER PRIMARY KEY,
+            announcement_channel_id INTEGER
+        )
+        """,
+        ],
+    ),
+    (
+        4,
+        "Durable meeting status and scheduled start",
+        [
+            # Meetings from before status tracking are treated as finished
+            "ALTER TABLE meetings ADD COLUMN status TEXT NOT NULL DEFAULT 'closed'",
+            "ALTER TABLE meetings ADD COLUMN scheduled_for TEXT",
+            "UPDATE meetings SET scheduled_for = meeting_date || ' ' || start_time",
+            """
+        CREATE INDEX IF NOT EXISTS idx_meetings_open
+        ON meetings (status) WHERE status IN ('scheduled', 'active')
+        """,
+        ],
+    ),
+    (
+        5,
+        "Monthly lateness and fee rollups maintained by triggers",
+        [
+            """
+        CREATE TABLE IF NOT EXISTS user_monthly_stats (
+            guild_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            meetings INTEGER NOT NULL DEFAULT 0,
+            late_count INTEGER NOT NULL DEFAULT 0,
+            late_minutes INTEGER NOT NULL DEFAULT 0,
+            fees REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (guild_id, month, user_id)
+        ) WITHOUT ROWID
+        """,
+            """
+        CREATE INDEX IF NOT EXISTS idx_user_monthly_stats_user
+        ON user_monthly_stats (guild_id, user_id, month)
+        """,
+            """
+        CREATE TABLE IF NOT EXISTS guild_monthly_stats (
+            guild_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            attendances INTEGER NOT NULL DEFAULT 0,
+            late_count INTEGER NOT NULL DEFAULT 0,
+            late_minutes INTEGER NOT NULL DEFAULT 0,
+            fees REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (guild_id, month)
+        ) WITHOUT ROWID
+        """,
+            ROLLUP_INSERT_TRIGGER,
+            ROLLUP_UPDATE_TRIGGER,
+            f"INSERT INTO user_monthly_stats {USER_ROLLUP_SELECT}",
+            f"INSERT INTO guild_monthly_stats {GUILD_ROLLUP_SELECT}",
+        ],
+    ),
+    (
+        6,
+        "Epoch timestamps and a users table",
+        [
+            """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY,
+            user_name TEXT NOT NULL
+        )
+        """,
+            # The most recently recorded display name wins
+            """
+        INSERT OR REPLACE INTO users (user_id, user_name)
+        SELECT user_id, user_name FROM punctuality
+        WHERE id IN (SELECT MAX(id) FROM punctuality GROUP BY user_id)
+        """,
+            # Existing times are naive wall-clock text in Config.TIMEZONE
+            register_local_epoch,
+            "ALTER TABLE meetings ADD COLUMN start_ts INTEGER",
+            """
+        UPDATE meetings
+        SET start_ts = local_epoch(COALESCE(scheduled_for, meeting_date || ' ' || start_time))
+        """,
+            """
+        CREATE TABLE punctuality_v6 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            meeting_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            join_ts INTEGER NOT NULL,
+            late_minutes INTEGER NOT NULL DEFAULT 0,
+            fee_amount REAL NOT NULL DEFAULT 0,
+            FOREIGN KEY (meeting_id) REFERENCES meetings (id)
+        )
+        """,
+            # join_time was stored without a date; a join more than 12 hours
+            # before the start belongs to the next day (meetings past midnight)
+            """
+        INSERT INTO punctuality_v6 (id, meeting_id, user_id, join_ts, late_minutes, fee_amount)
+        SELECT p.id, p.meeting_id, p.user_id,
+               local_epoch(m.meeting_date || ' ' || p.join_time)
+                   + CASE WHEN local_epoch(m.meeting_date || ' ' || p.join_time) < m.start_ts - 43200
+                          THEN 86400 ELSE 0 END,
+               COALESCE(p.late_minutes, 0), COALESCE(p.fee_amount, 0)
+        FROM punctuality p JOIN meetings m ON m.id = p.meeting_id
+        """,
+            "DROP TABLE punctuality",
+            "ALTER TABLE punctuality_v6 RENAME TO punctuality",
+            """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_punctuality_meeting_user
+        ON punctuality (meeting_id, user_id)
+        """,
+            PUNCTUALITY_LATE_INDEX,
+            ROLLUP_INSERT_TRIGGER,
+            ROLLUP_UPDATE_TRIGGER,
+            "DROP INDEX IF EXISTS idx_meetings_channel_date",
+            "DROP INDEX IF EXISTS idx_meetings_date",
+            "DROP INDEX IF EXISTS idx_meetings_guild_date",
+            "ALTER TABLE meetings DROP COLUMN start_time",
+            "ALTER TABLE meetings DROP COLUMN scheduled_for",
+            """
+        CREATE INDEX IF NOT EXISTS idx_meetings_channel_date
+        ON meetings (channel_id, meeting_date, start_ts)
+        """,
+            """
+        CREATE INDEX IF NOT EXISTS idx_meetings_start
+        ON meetings (start_ts, id)
+        """,
+            """
+        CREATE INDEX IF NOT EXISTS idx_meetings_guild_start
+        ON meetings (guild_id, start_ts, id)
+        """,
+        ],
+    ),
+    (
+        7,
+        "Registry of per-year archive files",
+        [
+            # archived_before: meetings dated before this (YYYY-MM-01) have
+            # been moved out of the hot tables
+            """
+        CREATE TABLE IF NOT EXISTS archives (
+            year INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            meetings INTEGER NOT NULL DEFAULT 0,
+            rows INTEGER NOT NULL DEFAULT 0,
+            archived_before TEXT NOT NULL
+        )
+        """,
+        ],
+    ),
+    (
+        8,
+        "Attendance sessions: last leave and time in the meeting",
+        [
+            # Both are written once, when the meeting ends. leave_ts stays
+            # NULL for members still in the channel at the end.
+            "ALTER TABLE punctuality ADD COLUMN leave_ts INTEGER",
+            "ALTER TABLE punctuality ADD COLUMN attended_seconds INTEGER",
+        ],
+    ),
+    (
+        9,
+        "Who gets a DM reminder before a guild's meetings",
+        [
+            # Members of reminder_role_id and/or, with remind_previous, the
+            # attendees of the channel's previous meeting
+            "ALTER TABLE guild_settings ADD COLUMN reminder_role_id INTEGER",
+            "ALTER TABLE guild_settings ADD COLUMN remind_previous INTEGER NOT NULL DEFAULT 0",
+        ],
+    ),
+    (
+        10,
+        "Versioned fee policies, role overrides and waived meetings",
+        [
+            # Policies are never edited: a change is a new row. A meeting uses
+            # its guild's latest policy in effect on its date, else guild 0's,
+            # else Config.GRACE_PERIOD_MINUTES / FEE_PER_MINUTE.
+            """
+        CREATE TABLE IF NOT EXISTS fee_policies (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL DEFAULT 0,
+            effective_from TEXT NOT NULL,
+            grace_minutes INTEGER NOT NULL,
+            fee_per_minute REAL NOT NULL,
+            max_fee REAL,
+            note TEXT,
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+        """,
+            """
+        CREATE INDEX IF NOT EXISTS idx_fee_policies_guild
+        ON fee_policies (guild_id, effective_from, id)
+        """,
+            """
+        CREATE TABLE IF NOT EXISTS fee_policy_roles (
+            policy_id INTEGER NOT NULL REFERENCES fee_policies (id),
+            role_id INTEGER NOT NULL,
+            grace_minutes INTEGER,
+            fee_per_minute REAL,
+            max_fee REAL,
+            PRIMARY KEY (policy_id, role_id)
+        )
+        """,
+            """
+        CREATE TABLE IF NOT EXISTS fee_waivers (
+            meeting_id INTEGER PRIMARY KEY REFERENCES meetings (id),
+            reason TEXT,
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+        """,
+        ],
+    ),
+    (
+        11,
+        "Loyalty streaks maintained by a trigger",
+        [
+            # Rows stay when meetings are archived, like the rollups.
+            # DatabaseManager fills both tables from history after this step.
+            """
+        CREATE TABLE IF NOT EXISTS loyalty_meetings (
+            meeting_id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            UNIQUE (guild_id, seq)
+        )
+        """,
+            """
+        CREATE TABLE IF NOT EXISTS loyalty_streaks (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            current_streak INTEGER NOT NULL,
+            best_streak INTEGER NOT NULL,
+            on_time INTEGER NOT NULL,
+            attended INTEGER NOT NULL,
+            first_seq INTEGER NOT NULL,
+            last_seq INTEGER NOT NULL,
+            PRIMARY KEY (guild_id, user_id)
+        ) WITHOUT ROWID
+        """,
+            """
+        CREATE INDEX IF NOT EXISTS idx_loyalty_streaks_current
+        ON loyalty_streaks (guild_id, current_streak DESC)
+        """,
+            """
+        CREATE INDEX IF NOT EXISTS idx_loyalty_streaks_best
+        ON loyalty_streaks (guild_id, best_streak DESC)
+        """,
+            LOYALTY_INSERT_TRIGGER,
+        ],
+    ),
+    (
+        12,
+        "Recurring meeting rules with skip dates",
+        [
+            # Occurrences are expanded in memory (utils.recurrence); a
+            # meetings row is only created shortly before each one starts
+            """
+        CREATE TABLE IF NOT EXISTS meeting_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            rrule TEXT NOT NULL,
+            start_time TEXT NOT NULL,
+            timezone TEXT NOT NULL,
+            first_date TEXT NOT NULL,
+            until_date TEXT,
+            description TEXT,
+            active INTEGER NOT NULL DEFAULT 1,
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+        """,
+            """
+        CREATE INDEX IF NOT EXISTS idx_meeting_rules_guild
+        ON meeting_rules (guild_id, active)
+        """,
+            # rule_id 0 skips the date for every rule of the guild
+            """
+        CREATE TABLE IF NOT EXISTS meeting_rule_skips (
+            guild_id INTEGER NOT NULL,
+            rule_id INTEGER NOT NULL,
+            skip_date TEXT NOT NULL,
+            reason TEXT,
+            PRIMARY KEY (guild_id, rule_id, skip_date)
+        ) WITHOUT ROWID
+        """,
+            "ALTER TABLE meetings ADD COLUMN rule_id INTEGER",
+            # One meeting per occurrence, however often it is materialized
+            """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_meetings_rule_start
+        ON meetings (rule_id, start_ts) WHERE rule_id IS NOT NULL
+        """,
+        ],
+    ),
+]
+
+
+def current_version(conn):
+    """Return the schema version recorded in the database (0 if none)"""
+    conn.execute(
+        """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+    """
+    )
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn, logger):
+    """Bring the schema up to date; returns the resulting version"""
+    version = current_version(conn)
+
+    for step, description, statements in MIGRATIONS:
+        if step <= version:
+            continue
+
+        try:
+            conn.execute("BEGIN")
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (step, description),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+        version = step
+        logger.info(f"Applied schema migration {step}: {description}")
+
+    return version
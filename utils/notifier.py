@@ -0,0 +1,196 @@
+# utils/notifier.py
+import asyncio
+import collections
+import itertools
+import logging
+import time
+from config import Config
+from utils.metrics import DISCORD_ERRORS, DISCORD_LATENCY
+
+
+# Discord rejects messages longer than this
+MESSAGE_LIMIT = 2000
+
+
+class Digest:
+    """Join notifications for one meeting, rendered into a single message that is edited in place"""
+
+    __slots__ = ("channel", "header", "lines", "message", "pending", "rendered")
+
+    def __init__(self, channel, header):
+        self.channel = channel
+        self.header = header
+        self.lines = []
+        self.message = None  # the Discord message currently being edited
+        self.pending = False  # a flush is already queued
+        self.rendered = 0  # number of lines already shown in the message
+
+
+class Notifier:
+    """Outbound message queue with priorities and per-meeting join digests.
+
+    Every destination channel gets its own priority queue drained by one
+    worker, so a backlog in one guild never delays another and, within a
+    channel, command replies and meeting notices overtake digest updates.
+    Join notifications are debounced into one digest message per meeting
+    that is edited as more people arrive, instead of one message per join.
+    """
+
+    COMMAND = 0
+    MEETING = 1
+    DIGEST = 2
+
+    def __init__(self, debounce=Config.DIGEST_DEBOUNCE_SECONDS):
+        self.debounce = debounce
+        self.logger = logging.getLogger("discord_bot")
+        self._seq = itertools.count()
+        self._queues = {}  # channel_id -> asyncio.PriorityQueue
+        self._workers = {}  # channel_id -> drain task
+        self._digests = {}  # meeting_id -> Digest
+        # Pending digests as (due time, digest), due in order since the debounce is
+        # fixed; one timer drains them however many meetings are running
+        self._due = collections.deque()
+        self._timer = None
+        self.api_calls = 0
+
+    async def send(self, destination, content=None, priority=MEETING, **kwargs):
+        """Queue a message and wait until it is sent; errors propagate to the caller
+
+        Extra keyword arguments (embed, file, ...) are passed to ``send``.
+        """
+        future = asyncio.get_running_loop().create_future()
+
+        async def job():
+            started = time.perf_counter()
+            try:
+                self.api_calls += 1
+                message = await destination.send(content, **kwargs)
+                if not future.done():
+                    future.set_result(message)
+            except Exception as e:
+                DISCORD_ERRORS.labels("send").inc()
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                DISCORD_LATENCY.labels("send").observe(time.perf_counter() - started)
+
+        self._enqueue(destination, priority, job)
+        return await future
+
+    def add_to_digest(self, meeting_id, channel, header, line):
+        """Add a line to a meeting's digest; the message is updated after the debounce delay"""
+        digest = self._digests.get(meeting_id)
+        if digest is None or digest.channel.id != channel.id:
+            digest = self._digests[meeting_id] = Digest(channel, header)
+        digest.lines.append(line)
+
+        if not digest.pending:
+            digest.pending = True
+            loop = asyncio.get_running_loop()
+            self._due.append((loop.time() + self.debounce, digest))
+            if self._timer is None:
+                self._timer = loop.call_later(self.debounce, self._flush_due)
+
+    def close_digest(self, meeting_id):
+        """Forget a meeting's digest once the meeting is over"""
+        digest = self._digests.pop(meeting_id, None)
+        if digest is not None and digest.pending:
+            # Let the queued flush still publish the last lines
+            self._enqueue(digest.channel, self.DIGEST, lambda: self._flush_digest(digest))
+
+    def _flush_due(self):
+        """Queue the flush of every digest whose debounce is over, then wait for the next one"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        # The timer was set for the first one; the loop may fire it a hair early
+        _, digest = self._due.popleft()
+        self._queue_digest_flush(digest)
+        while self._due and self._due[0][0] <= now:
+            _, digest = self._due.popleft()
+            self._queue_digest_flush(digest)
+        self._timer = loop.call_at(self._due[0][0], self._flush_due) if self._due else None
+
+    def _queue_digest_flush(self, digest):
+        self._enqueue(digest.channel, self.DIGEST, lambda: self._flush_digest(digest))
+
+    async def _flush_digest(self, digest):
+        if not digest.pending:
+            return
+        digest.pending = False
+
+        # Start a fresh message when the current one would overflow
+        content = self._render(digest)
+        if len(content) > MESSAGE_LIMIT and digest.message is not None:
+            digest.lines = digest.lines[digest.rendered:]
+            digest.message = None
+            digest.rendered = 0
+            content = self._render(digest)
+        while len(content) > MESSAGE_LIMIT and len(digest.lines) > 1:
+            # A single burst larger than one message: split it
+            overflow = digest.lines[len(digest.lines) // 2:]
+            digest.lines = digest.lines[:len(digest.lines) // 2]
+            await self._publish(digest, self._render(digest))
+            digest.lines = overflow
+            digest.message = None
+            digest.rendered = 0
+            content = self._render(digest)
+
+        await self._publish(digest, content)
+
+    async def _publish(self, digest, content):
+        call = "send" if digest.message is None else "edit"
+        started = time.perf_counter()
+        try:
+            self.api_calls += 1
+            if digest.message is None:
+                digest.message = await digest.channel.send(content)
+            else:
+                await digest.message.edit(content=content)
+            digest.rendered = len(digest.lines)
+        except Exception as e:
+            DISCORD_ERRORS.labels(call).inc()
+            self.logger.error(f"Error sending join digest: {e}")
+        finally:
+            DISCORD_LATENCY.labels(call).observe(time.perf_counter() - started)
+
+    @staticmethod
+    def _render(digest):
+        return "\n".join([digest.header, *digest.lines])
+
+    def _enqueue(self, destination, priority, job):
+        channel = getattr(destination, "channel", destination)
+        key = channel.id
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.PriorityQueue()
+        queue.put_nowait((priority, next(self._seq), job))
+
+        if key not in self._workers:
+            self._workers[key] = asyncio.get_running_loop().create_task(self._drain(key, queue))
+
+    async def _drain(self, key, queue):
+        try:
+            while not queue.empty():
+                _, _, job = queue.get_nowait()
+                await job()
+        except Exception as e:
+            self.logger.error(f"Error delivering notification: {e}")
+        finally:
+            del self._workers[key]
+            if queue.empty():
+                self._queues.pop(key, None)
+            else:
+                self._workers[key] = asyncio.get_running_loop().create_task(self._drain(key, queue))
+
+    async def close(self):
+        """Publish every pending digest and wait for queued messages to go out"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._due.clear()
+        for digest in self._digests.values():
+            if digest.pending:
+                self._enqueue(digest.channel, self.DIGEST, lambda d=digest: self._flush_digest(d))
+        self._digests.clear()
+        while self._workers:
+            await asyncio.gather(*self._workers.values(), return_exceptions=True)
@@ -0,0 +1,189 @@
+# utils/recurrence.py
+"""Recurring meeting rules, expanded lazily into occurrences.
+
+Rules use a small RRULE subset: FREQ=DAILY or FREQ=WEEKLY, an optional
+INTERVAL and, for weekly rules, BYDAY. Each occurrence is the rule's
+HH:MM on its own timezone's clock, so a 09:00 standup stays at 09:00
+across daylight saving changes. Nothing is stored per occurrence; the
+generators below produce the next ones on demand, as epoch seconds.
+"""
+import heapq
+import itertools
+from datetime import date, datetime, timedelta
+
+import pytz
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+DAY_NAMES = {
+    "mon": "MO", "tue": "TU", "wed": "WE", "thu": "TH", "fri": "FR", "sat": "SA", "sun": "SU",
+}
+SHORTHANDS = {
+    "daily": "FREQ=DAILY",
+    "weekdays": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+    "weekly": "FREQ=WEEKLY",
+    "biweekly": "FREQ=WEEKLY;INTERVAL=2",
+}
+
+
+def parse_rrule(text):
+    """Normalized RRULE for a shorthand, a day list or an RRULE
+
+    Accepts daily, weekdays, weekly, biweekly, day lists such as
+    ``mon,wed,fri``, or ``FREQ=...;INTERVAL=...;BYDAY=...``. Raises
+    ValueError for anything else.
+    """
+    text = text.strip()
+    if text.lower() in SHORTHANDS:
+        text = SHORTHANDS[text.lower()]
+    elif all(day in DAY_NAMES for day in text.lower().split(",")):
+        text = "FREQ=WEEKLY;BYDAY=" + ",".join(DAY_NAMES[day] for day in text.lower().split(","))
+
+    parts = {}
+    for part in text.upper().removeprefix("RRULE:").split(";"):
+        name, _, value = part.partition("=")
+        if name not in ("FREQ", "INTERVAL", "BYDAY") or not value or name in parts:
+            raise ValueError(f"Unsupported rule part: {part}")
+        parts[name] = value
+    freq = parts.get("FREQ")
+    if freq not in ("DAILY", "WEEKLY"):
+        raise ValueError("FREQ must be DAILY or WEEKLY")
+    interval = int(parts.get("INTERVAL", "1"))
+    if interval < 1:
+        raise ValueError("INTERVAL must be positive")
+    days = parts.get("BYDAY", "")
+    if days and (freq != "WEEKLY" or any(day not in WEEKDAYS for day in days.split(","))):
+        raise ValueError("BYDAY takes MO..SU and needs FREQ=WEEKLY")
+
+    rule = f"FREQ={freq};INTERVAL={interval}"
+    if days:
+        rule += ";BYDAY=" + ",".join(sorted(set(days.split(",")), key=WEEKDAYS.index))
+    return rule
+
+
+def describe_rrule(rrule, first_date=None):
+    """Short human wording for a normalized rule, such as every weekday or every 2 weeks on Tu"""
+    parts = dict(part.split("=") for part in rrule.split(";"))
+    interval = int(parts["INTERVAL"])
+    if parts["FREQ"] == "DAILY":
+        return "every day" if interval == 1 else f"every {interval} days"
+    days = parts.get("BYDAY", "").split(",") if "BYDAY" in parts else []
+    if not days and first_date:
+        days = [WEEKDAYS[date.fromisoformat(first_date).weekday()]]
+    if days == ["MO", "TU", "WE", "TH", "FR"] and interval == 1:
+        return "every weekday"
+    names = ", ".join(day.title() for day in days)
+    every = "every week" if interval == 1 else f"every {interval} weeks"
+    return f"{every} on {names}" if names else every
+
+
+class Recurrence:
+    """A MeetingRule compiled for expansion"""
+
+    __slots__ = ("rule", "tz", "start", "first", "until", "daily", "interval", "weekdays", "week_zero")
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.tz = pytz.timezone(rule.timezone)
+        hour, minute = map(int, rule.start_time.split(":"))
+        self.start = (hour, minute)
+        self.first = date.fromisoformat(rule.first_date)
+        self.until = date.fromisoformat(rule.until_date) if rule.until_date else None
+        parts = dict(part.split("=") for part in rule.rrule.split(";"))
+        self.daily = parts["FREQ"] == "DAILY"
+        self.interval = int(parts.get("INTERVAL", "1"))
+        if "BYDAY" in parts:
+            self.weekdays = frozenset(WEEKDAYS.index(day) for day in parts["BYDAY"].split(","))
+        else:
+            self.weekdays = frozenset((self.first.weekday(),))
+        # Monday of the first week; weekly intervals count from it
+        self.week_zero = self.first - timedelta(days=self.first.weekday())
+
+    def dates(self, since):
+        """Dates on the rule's clock it runs on, from ``since`` onwards, lazily"""
+        day = max(since, self.first)
+        if self.daily:
+            offset = (day - self.first).days % self.interval
+            if offset:
+                day += timedelta(days=self.interval - offset)
+            step = timedelta(days=self.interval)
+            while self.until is None or day <= self.until:
+                yield day
+                day += step
+            return
+
+        while self.until is None or day <= self.until:
+            week = (day - self.week_zero).days // 7
+            if week % self.interval:
+                # Jump to the Monday of the next week the rule runs in
+                day = self.week_zero + timedelta(weeks=week + self.interval - week % self.interval)
+                continue
+            if day.weekday() in self.weekdays:
+                yield day
+            day += timedelta(days=1)
+
+    def epoch(self, day):
+        """Start of the occurrence on ``day`` as Unix seconds
+
+        A time skipped by a daylight saving change lands an hour later; a
+        repeated one is taken in standard time.
+        """
+        moment = datetime(day.year, day.month, day.day, *self.start)
+        return int(self.tz.localize(moment, is_dst=False).timestamp())
+
+    def occurrences(self, after_ts, skips=frozenset()):
+        """Start times (Unix seconds) after ``after_ts``, leaving out ``skips`` dates, lazily"""
+        since = datetime.fromtimestamp(after_ts, self.tz).date()
+        for day in self.dates(since):
+            if day.isoformat() in skips:
+                continue
+            start_ts = self.epoch(day)
+            if start_ts > after_ts:
+                yield start_ts
+
+
+class RuleBook:
+    """Active recurring rules of every guild with their skip dates
+
+    Built from DatabaseManager.get_meeting_rules(); rebuild it after a
+    rule or skip date changes.
+    """
+
+    def __init__(self, rules=(), skips=()):
+        self.rules = {rule.id: Recurrence(rule) for rule in rules}
+        self.skips = {}  # (guild_id, rule_id) -> {YYYY-MM-DD}; rule_id 0 for the whole guild
+        for skip in skips:
+            self.skips.setdefault((skip.guild_id, skip.rule_id), set()).add(skip.skip_date)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def get(self, rule_id):
+        recurrence = self.rules.get(rule_id)
+        return recurrence.rule if recurrence else None
+
+    def skipped(self, rule):
+        """Dates ``rule`` doesn't run on: its own skips and its guild's"""
+        own = self.skips.get((rule.guild_id, rule.id), set())
+        guild = self.skips.get((rule.guild_id, 0), set())
+        return own | guild if own and guild else own or guild
+
+    def occurrences(self, rule_id, after_ts):
+        recurrence = self.rules[rule_id]
+        return recurrence.occurrences(after_ts, self.skipped(recurrence.rule))
+
+    def next_occurrence(self, rule_id, after_ts):
+        """Start of the rule's first occurrence after ``after_ts``, or None once it has ended"""
+        return next(self.occurrences(rule_id, after_ts), None)
+
+    def upcoming(self, after_ts, count, guild_id=None):
+        """The next ``count`` (start_ts, MeetingRule) across rules, in start order
+
+        Merges one lazy generator per rule, so the work grows with the
+        number of rules plus ``count``, not with how far ahead they reach.
+        """
+        streams = [
+            zip(self.occurrences(rule_id, after_ts), itertools.repeat(recurrence.rule))
+            for rule_id, recurrence in self.rules.items()
+            if guild_id is None or recurrence.rule.guild_id == guild_id
+        ]
+        return list(itertools.islice(heapq.merge(*streams, key=lambda item: (item[0], item[1].id)), count))
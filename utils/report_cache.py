@@ -0,0 +1,112 @@
+# utils/report_cache.py
+import sys
+from collections import OrderedDict
+from config import Config
+from utils.metrics import REPORT_CACHE
+
+
+class ReportCache:
+    """LRU cache of rendered reports within a memory budget.
+
+    Entries are tagged, e.g. with ("meeting", meeting_id), and dropped
+    together when something under a tag changes: new punctuality rows,
+    time attended or fees for a meeting, a new or cancelled meeting for a
+    channel or guild. Nothing expires on its own, so a closed meeting's
+    report stays until it is the least recently used entry and the cache
+    is over budget.
+
+    A render reads the database across several awaits, so take
+    ``generation`` before it and pass it to put(): if anything was
+    invalidated meanwhile the result may be stale and is not stored.
+    """
+
+    def __init__(self, max_bytes=Config.REPORT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size, tags)
+        self._tagged = {}  # tag -> set of keys
+        self.bytes = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._events = {
+            event: REPORT_CACHE.labels(event) for event in ("hit", "miss", "eviction", "invalidation")
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """The cached value for ``key``, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            self._events["miss"].inc()
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self._events["hit"].inc()
+        return entry[0]
+
+    def put(self, key, value, tags=(), generation=None):
+        """Cache ``value`` under ``key``; it is dropped when any of ``tags`` is invalidated
+
+        Returns False, storing nothing, if the value is over budget or
+        ``generation`` is no longer current.
+        """
+        if generation is not None and generation != self.generation:
+            return False
+        self._discard(key)
+        size = self.size_of(value)
+        if size > self.max_bytes:
+            return False
+        self._entries[key] = (value, size, tags)
+        self.bytes += size
+        for tag in tags:
+            self._tagged.setdefault(tag, set()).add(key)
+        while self.bytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+            self._events["eviction"].inc()
+        return True
+
+    def invalidate(self, *tags):
+        """Drop every entry carrying one of ``tags``; returns how many were dropped"""
+        self.generation += 1
+        dropped = 0
+        for tag in tags:
+            for key in self._tagged.pop(tag, ()):
+                dropped += self._discard(key)
+        self.invalidations += dropped
+        self._events["invalidation"].inc(dropped)
+        return dropped
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+        self._tagged.clear()
+        self.bytes = 0
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return 0
+        _, size, tags = entry
+        self.bytes -= size
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+        return 1
+
+    @staticmethod
+    def size_of(value):
+        """Rough size of a rendered value: its strings and bytes plus container overhead"""
+        if isinstance(value, (str, bytes)):
+            return sys.getsizeof(value)
+        if isinstance(value, (tuple, list)):
+            return sys.getsizeof(value) + sum(ReportCache.size_of(item) for item in value)
+        return sys.getsizeof(value)
@@ -0,0 +1,62 @@
+# utils/reports.py
+"""Formatting helpers for punctuality and meeting reports.
+
+Reports are built page by page from streamed rows; each page is joined
+once from a list of lines rather than grown with repeated ``+=``.
+"""
+
+PUNCTUALITY_HEADER = (
+    "| Name | Join Time | Late (min) | Attended (min) | Fee |",
+    "|------|-----------|------------|----------------|-----|",
+)
+
+MEETINGS_HEADER = (
+    "| ID | Date | Time | Description |",
+    "|----|------|------|-------------|",
+)
+
+
+def format_punctuality_row(record):
+    late_min = record.late_minutes
+    status = "🔴 LATE" if late_min > 0 else "🟢 ON TIME"
+    name = record.user_name or f"<@{record.user_id}>"
+    # Time in the meeting is only known once the meeting has ended
+    attended = record.minutes_attended
+    attended = "-" if attended is None else str(attended)
+    if record.leave_ts is not None:
+        attended = f"{attended} 🚪 LEFT {record.leave_time:%H:%M}"
+    return (
+        f"| {name} | {record.join_time:%H:%M:%S} | {late_min} {status} "
+        f"| {attended} | ${record.fee_amount:.2f} |"
+    )
+
+
+def format_meeting_row(meeting):
+    start = meeting.start
+    return f"| {meeting.id} | {start:%Y-%m-%d} | {start:%H:%M:%S} | {meeting.description or 'Regular Meeting'} |"
+
+
+async def paginate(rows, format_row, rows_per_page, header=()):
+    """Group an async iterable of rows into page strings of at most rows_per_page rows"""
+    lines = list(header)
+    count = 0
+    async for row in rows:
+        lines.append(format_row(row))
+        count += 1
+        if count == rows_per_page:
+            yield "\n".join(lines)
+            lines = list(header)
+            count = 0
+    if count:
+        yield "\n".join(lines)
+
+
+async def write_table(rows, format_row, fp, header=()):
+    """Stream every row into a binary file object as one table; returns the row count"""
+    for line in header:
+        fp.write(f"{line}\n".encode())
+    count = 0
+    async for row in rows:
+        fp.write(f"{format_row(row)}\n".encode())
+        count += 1
+    return count
@@ -0,0 +1,86 @@
+# utils/retention.py
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from config import Config
+from utils import timeutil
+
+
+class RetentionManager:
+    """Moves old meetings to the yearly archives and compacts the hot database.
+
+    Meetings are archived by whole months: everything dated before the
+    first day of the month RETENTION_DAYS ago. Each batch of meetings is a
+    separate writer job, so punctuality writes queue between batches rather
+    than behind the whole run. Free pages are then released a few hundred
+    at a time with incremental vacuum.
+    """
+
+    # Give startup (rebuilds, catch-up events) a head start before the first run
+    STARTUP_DELAY = 300
+
+    def __init__(
+        self,
+        db,
+        retention_days=Config.RETENTION_DAYS,
+        interval_hours=Config.RETENTION_INTERVAL_HOURS,
+        batch_meetings=Config.ARCHIVE_BATCH_MEETINGS,
+        vacuum_pages=Config.VACUUM_STEP_PAGES,
+    ):
+        self.db = db
+        self.retention_days = retention_days
+        self.interval = interval_hours * 3600
+        self.batch_meetings = batch_meetings
+        self.vacuum_pages = vacuum_pages
+        self.logger = logging.getLogger("discord_bot")
+        self._lock = asyncio.Lock()
+
+    def cutoff(self, today=None):
+        """First day of the month that is RETENTION_DAYS before today"""
+        today = today or timeutil.now().date()
+        return (today - timedelta(days=self.retention_days)).replace(day=1)
+
+    async def run_once(self, today=None):
+        """Archive everything past retention, then vacuum; returns (meetings, rows, pages_freed)"""
+        async with self._lock:
+            started = time.perf_counter()
+            cutoff = self.cutoff(today)
+            meetings = rows = 0
+            while True:
+                moved = await self.db.archive_meetings(cutoff, self.batch_meetings)
+                if not moved or not moved[0]:
+                    break
+                meetings += moved[0]
+                rows += moved[1]
+                # Let queued joins and reads in before the next batch
+                await asyncio.sleep(0)
+
+            freed = 0
+            while True:
+                step = await self.db.incremental_vacuum(self.vacuum_pages)
+                if not step or not step[0]:
+                    break
+                freed += step[0]
+                if not step[1]:
+                    break
+                await asyncio.sleep(0)
+
+            if meetings or freed:
+                self.logger.info(
+                    f"Retention: archived {meetings} meetings ({rows} rows) before {cutoff}, "
+                    f"freed {freed} pages in {time.perf_counter() - started:.1f}s"
+                )
+            return meetings, rows, freed
+
+    async def run_forever(self):
+        """Run retention every RETENTION_INTERVAL_HOURS until cancelled"""
+        await asyncio.sleep(self.STARTUP_DELAY)
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Retention run failed: {e}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,175 @@
+# utils/scheduler.py
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from utils import timeutil
+from utils.metrics import SCHEDULER_DELAY, SCHEDULER_HANDLER
+
+
+class ScheduledEvent:
+    """A timed event waiting in the scheduler's heap"""
+
+    __slots__ = ("when", "seq", "key", "kind", "payload", "cancelled")
+
+    def __init__(self, when, seq, key, kind, payload):
+        self.when = when
+        self.seq = seq
+        self.key = key
+        self.kind = kind
+        self.payload = payload
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.when, self.seq) < (other.when, other.seq)
+
+    def __repr__(self):
+        return f"ScheduledEvent(kind={self.kind!r}, key={self.key!r}, when={self.when})"
+
+
+class EventScheduler:
+    """Priority-queue scheduler that sleeps until the next deadline.
+
+    Events are identified by (key, kind); scheduling the same pair again
+    replaces the earlier event. Cancellation marks the event and leaves it
+    in the heap (lazy deletion), so schedule/cancel/reschedule are all
+    O(log n). A single ``loop.call_at`` timer is armed for the earliest
+    event, and each event is handed to ``dispatch`` exactly once.
+    """
+
+    # Allow this much wall-clock skew before a timer is considered early
+    EARLY_TOLERANCE = 0.002
+
+    def __init__(self, dispatch):
+        self.dispatch = dispatch  # async callable taking a ScheduledEvent
+        self.logger = logging.getLogger("discord_bot")
+        self._heap = []
+        self._events = {}  # key -> {kind: ScheduledEvent}
+        self._live = 0
+        self._seq = itertools.count()
+        self._timer = None
+        self._timer_when = None
+        self._cancelled = 0
+        self._tasks = set()
+
+    def __len__(self):
+        return self._live
+
+    def schedule(self, key, kind, when, payload=None):
+        """Schedule an event at a wall-clock datetime, replacing any event with the same key and kind"""
+        self.cancel(key, kind)
+        event = ScheduledEvent(when, next(self._seq), key, kind, payload)
+        self._events.setdefault(key, {})[kind] = event
+        self._live += 1
+        heapq.heappush(self._heap, event)
+        if self._timer_when is None or when < self._timer_when:
+            self._arm()
+        return event
+
+    def reschedule(self, key, kind, when):
+        """Move a pending event to a new time; returns the new event or None"""
+        event = self.get(key, kind)
+        if event is None:
+            return None
+        return self.schedule(key, kind, when, event.payload)
+
+    def cancel(self, key, kind=None):
+        """Cancel one event, or every kind of event for a key when kind is None"""
+        events = self._events.get(key)
+        if not events:
+            return 0
+
+        if kind is None:
+            removed = list(events.values())
+            del self._events[key]
+        else:
+            event = events.pop(kind, None)
+            removed = [event] if event is not None else []
+            if not events:
+                del self._events[key]
+
+        for event in removed:
+            event.cancelled = True
+        cancelled = len(removed)
+        self._cancelled += cancelled
+        self._live -= cancelled
+
+        # Rebuild once tombstones dominate so the heap stays proportional to live events
+        if self._cancelled > 64 and self._cancelled > len(self._heap) // 2:
+            self._heap = [event for event in self._heap if not event.cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+        return cancelled
+
+    def get(self, key, kind):
+        return self._events.get(key, {}).get(kind)
+
+    def pending(self):
+        """Live events in firing order"""
+        return sorted(event for events in self._events.values() for event in events.values())
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        self._timer_when = None
+        for task in self._tasks:
+            task.cancel()
+
+    def _arm(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+            self._timer_when = None
+
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+        if not self._heap:
+            return
+
+        loop = asyncio.get_running_loop()
+        head = self._heap[0]
+        delay = max(0.0, (head.when - timeutil.now()).total_seconds())
+        self._timer = loop.call_at(loop.time() + delay, self._run_due)
+        self._timer_when = head.when
+
+    def _run_due(self):
+        self._timer = None
+        self._timer_when = None
+        now = timeutil.now()
+        loop = asyncio.get_running_loop()
+
+        while self._heap:
+            head = self._heap[0]
+            if head.cancelled:
+                heapq.heappop(self._heap)
+                self._cancelled -= 1
+                continue
+            if (head.when - now).total_seconds() > self.EARLY_TOLERANCE:
+                break
+
+            heapq.heappop(self._heap)
+            events = self._events[head.key]
+            del events[head.kind]
+            if not events:
+                del self._events[head.key]
+            self._live -= 1
+            task = loop.create_task(self._dispatch(head))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        self._arm()
+
+    async def _dispatch(self, event):
+        SCHEDULER_DELAY.labels(event.kind).observe(
+            max(0.0, (timeutil.now() - event.when).total_seconds())
+        )
+        started = time.perf_counter()
+        try:
+            await self.dispatch(event)
+        except Exception as e:
+            self.logger.error(f"Error handling scheduled {event.kind} for {event.key}: {e}")
+        finally:
+            SCHEDULER_HANDLER.labels(event.kind).observe(time.perf_counter() - started)
@@ -0,0 +1,28 @@
+# utils/timeutil.py
+"""Conversions between stored epoch seconds and the bot's wall-clock time.
+
+The database stores instants as integer Unix timestamps. The bot itself
+works with naive datetimes on the wall clock of ``Config.TIMEZONE``, which
+is what users type and read, and converts only at the database boundary.
+"""
+from datetime import datetime
+import pytz
+from config import Config
+
+
+TZ = pytz.timezone(Config.TIMEZONE)
+
+
+def now():
+    """Current wall-clock time in the bot's timezone"""
+    return datetime.now(TZ).replace(tzinfo=None)
+
+
+def to_epoch(moment):
+    """Unix seconds for a naive wall-clock datetime in the bot's timezone"""
+    return int(TZ.localize(moment).timestamp())
+
+
+def from_epoch(timestamp):
+    """Naive wall-clock datetime in the bot's timezone for Unix seconds"""
+    return datetime.fromtimestamp(timestamp, TZ).replace(tzinfo=None)
@@ -0,0 +1,101 @@
+# utils/write_buffer.py
+import asyncio
+import logging
+from config import Config
+
+
+class PunctualityWriteBuffer:
+    """Write-behind buffer for punctuality rows.
+
+    Rows are held in memory keyed by (meeting_id, user_id) and written in a
+    single transaction once the flush interval elapses or the batch size is
+    reached, so a join storm costs one commit instead of one per member.
+    ``on_written`` is called with the meeting ids of each batch stored.
+    """
+
+    def __init__(
+        self,
+        db,
+        flush_interval=Config.WRITE_FLUSH_INTERVAL_MS / 1000,
+        max_batch=Config.WRITE_BATCH_SIZE,
+        on_written=None,
+    ):
+        self.db = db
+        self.on_written = on_written
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.logger = logging.getLogger("discord_bot")
+        self._pending = {}  # (meeting_id, user_id) -> row tuple
+        self._timer = None
+        self._flush_queued = False
+        self._flush_lock = asyncio.Lock()
+        self._tasks = set()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, meeting_id, user_id, user_name, join_time, late_minutes=0, fee_amount=0):
+        """Queue a punctuality row; returns False if one is already pending for this member"""
+        key = (meeting_id, user_id)
+        if key in self._pending:
+            return False
+
+        self._pending[key] = (
+            meeting_id,
+            user_id,
+            user_name,
+            join_time,
+            late_minutes,
+            fee_amount,
+        )
+
+        if len(self._pending) >= self.max_batch:
+            # One flush per full batch, not one per row added before it runs
+            if not self._flush_queued:
+                self._spawn_flush()
+        elif self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.flush_interval, self._spawn_flush)
+        return True
+
+    def is_pending(self, meeting_id, user_id):
+        return (meeting_id, user_id) in self._pending
+
+    def _spawn_flush(self):
+        self._flush_queued = True
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self):
+        """Write all pending rows in one transaction"""
+        self._flush_queued = False
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            written = await self.db.record_punctuality_batch(list(batch.values()))
+
+            if written is None:
+                # Keep the rows for the next attempt, without clobbering newer ones
+                for key, row in batch.items():
+                    self._pending.setdefault(key, row)
+                if self._timer is None and self._pending:
+                    loop = asyncio.get_running_loop()
+                    self._timer = loop.call_later(self.flush_interval, self._spawn_flush)
+                return 0
+
+            if self.on_written is not None:
+                self.on_written({key[0] for key in batch})
+            return written
+
+    async def close(self):
+        """Flush everything still buffered; called on cog unload and shutdown"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.flush()
@@ -0,0 +1,212 @@
+# utils/writer_service.py
+"""One database writer shared by several bot processes.
+
+SQLite allows a single writer at a time, so sharded deployments run one
+writer process (``writer.py``) that owns the write connection and serves
+``DatabaseManager`` write jobs over a Unix socket. Bot processes keep
+reading the WAL database directly and send only their writes here.
+
+The protocol is one JSON object per line. A request names the private
+``DatabaseManager`` method and its arguments:
+
+    {"id": 7, "method": "_record_punctuality_batch", "args": [[...]]}
+
+and gets back ``{"id": 7, "result": ...}`` or ``{"id": 7, "error": "..."}``.
+Requests from one connection run in the order they were sent. Datetimes
+and dates travel as tagged ISO strings; tuples come back as lists.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+from datetime import date, datetime
+from config import Config
+
+
+class WriteOutcomeUnknown(Exception):
+    """A write job reached the writer but no answer came back; it may have been committed"""
+
+
+def _encode_default(value):
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"{type(value).__name__} cannot be sent to the writer")
+
+
+def _decode_hook(obj):
+    if "$datetime" in obj:
+        return datetime.fromisoformat(obj["$datetime"])
+    if "$date" in obj:
+        return date.fromisoformat(obj["$date"])
+    return obj
+
+
+def encode_message(message):
+    return json.dumps(message, default=_encode_default, separators=(",", ":")).encode() + b"\n"
+
+
+def decode_message(line):
+    return json.loads(line, object_hook=_decode_hook)
+
+
+class WriterService:
+    """Serves write jobs of a local DatabaseManager on a Unix socket"""
+
+    def __init__(self, db, socket_path=Config.DB_WRITER_SOCKET):
+        self.db = db
+        self.socket_path = socket_path
+        self.logger = logging.getLogger("discord_bot")
+        self._server = None
+
+    async def start(self):
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # A socket file left by a crashed writer would make bind() fail
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(
+            self._serve_client, path=self.socket_path, limit=2**24
+        )
+        os.chmod(self.socket_path, 0o600)
+        self.logger.info(f"Database writer listening on {self.socket_path}")
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _serve_client(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                # One task per request so a slow job doesn't hold up reading;
+                # each submits to the single writer thread in arrival order
+                task = asyncio.create_task(self._dispatch(decode_message(line), writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, ValueError) as e:
+            self.logger.error(f"Dropping writer client: {e}")
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def _dispatch(self, request, writer, lock):
+        method = request.get("method")
+        response = {"id": request.get("id")}
+        if method not in self.db.REMOTE_WRITES:
+            response["error"] = f"unknown write {method!r}"
+        else:
+            try:
+                response["result"] = await self.db._write(
+                    getattr(self.db, method), *request.get("args", ())
+                )
+            except Exception as e:
+                self.logger.error(f"Writer job {method} failed: {e}")
+                response["error"] = str(e)
+
+        async with lock:
+            try:
+                writer.write(encode_message(response))
+                await writer.drain()
+            except ConnectionError:
+                # The client is gone; the job itself has been committed
+                pass
+
+
+class WriterClient:
+    """Sends write jobs to the WriterService and waits for their results
+
+    If the writer can't be reached the job never ran: that is logged and
+    reported as None, the same way DatabaseManager reports a failed write,
+    so callers such as the write buffer keep their rows and retry. Once a
+    request is out, a missing answer raises WriteOutcomeUnknown instead.
+    """
+
+    def __init__(self, socket_path, timeout=Config.DB_WRITER_TIMEOUT_SECONDS):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.logger = logging.getLogger("discord_bot")
+        self._reader = None
+        self._writer = None
+        self._pending = {}  # request id -> Future
+        self._ids = itertools.count()
+        self._connect_lock = asyncio.Lock()
+        self._listener = None
+
+    async def connect(self):
+        async with self._connect_lock:
+            if self._writer is not None:
+                return
+            self._reader, self._writer = await asyncio.open_unix_connection(
+                self.socket_path, limit=2**24
+            )
+            self._listener = asyncio.create_task(self._listen(self._reader))
+
+    async def call(self, method, args, wait=False):
+        """Run a write job in the writer process and return its result
+
+        Waits up to ``timeout`` for the answer, or for as long as the job
+        takes with ``wait``. Raises WriteOutcomeUnknown if the request was
+        sent but the wait ran out or the connection dropped.
+        """
+        request_id = next(self._ids)
+        try:
+            await self.connect()
+        except OSError as e:
+            self.logger.error(f"Database writer unavailable for {method}: {e!r}")
+            return None
+        try:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+            self._writer.write(encode_message({"id": request_id, "method": method, "args": args}))
+            await self._writer.drain()
+            return await (future if wait else asyncio.wait_for(future, self.timeout))
+        except (OSError, asyncio.TimeoutError) as e:
+            self.logger.error(f"No answer from the database writer for {method}; it may have run: {e!r}")
+            raise WriteOutcomeUnknown(method) from e
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _listen(self, reader):
+        try:
+            while line := await reader.readline():
+                response = decode_message(line)
+                future = self._pending.get(response["id"])
+                if future is None or future.done():
+                    continue
+                if "error" in response:
+                    self.logger.error(f"Database writer error: {response['error']}")
+                    future.set_result(None)
+                else:
+                    future.set_result(response["result"])
+        except (ConnectionError, ValueError) as e:
+            self.logger.error(f"Lost connection to the database writer: {e}")
+        finally:
+            # Leave a newer connection alone if this one was already replaced
+            if self._reader is reader:
+                self._drop_connection(ConnectionResetError("database writer closed the connection"))
+
+    def _drop_connection(self, error):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        self._drop_connection(ConnectionResetError("writer client closed"))
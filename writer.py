@@ -0,0 +1,58 @@
+# writer.py
+"""Database writer for sharded deployments.
+
+Run one of these next to the shard processes (main.py with SHARD_COUNT
+set). It owns the database's write connection and runs the write jobs
+the shards send over DB_WRITER_SOCKET, plus archival and compaction.
+
+    DB_WRITER_SOCKET=/run/discord_bot/writer.sock python writer.py
+"""
+import asyncio
+import logging
+import signal
+import sys
+from config import Config
+from utils.db_manager import DatabaseManager
+from utils.logger import setup_logger, stop_logger
+from utils.retention import RetentionManager
+from utils.writer_service import WriterService
+
+setup_logger(file_name="writer.log")
+logger = logging.getLogger("discord_bot")
+
+
+async def main():
+    if not Config.DB_WRITER_SOCKET:
+        logger.error("DB_WRITER_SOCKET is not set")
+        return 1
+
+    # The writer itself always writes locally
+    db = DatabaseManager(writer_socket=None)
+    await db.initialize()
+    service = WriterService(db, Config.DB_WRITER_SOCKET)
+    await service.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    retention_task = None
+    if Config.RETENTION_DAYS > 0:
+        retention_task = asyncio.create_task(RetentionManager(db).run_forever())
+
+    await stop.wait()
+    logger.info("Database writer shutting down")
+    if retention_task is not None:
+        retention_task.cancel()
+        await asyncio.gather(retention_task, return_exceptions=True)
+    await service.stop()
+    await db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main()))
+    finally:
+        stop_logger()